@@ -9,13 +9,13 @@ Desc: Contains dodge class which handles the dodging of
 
 import itertools
 import json
-import math
 import random
-import numpy as np
 
 from module.data import ShipData
 from module.data import AsteroidData
 from module.pathfinding import PathFinding
+from module.frame_context import FrameContext
+from module.dodge_planner import DodgePlanner
 
 
 class DodgeAgent:
@@ -154,8 +154,16 @@ class Critic:
 # The `Dodge` class contains methods to calculate the thrust rate, turn rate, and take action for a
 # ship to avoid an asteroid.
 class Dodge:
-    def __init__(self):
+    def __init__(self, planner: DodgePlanner = None):
+        """
+        Parameters
+        ----------
+            planner : DodgePlanner
+                Picks the dodge from rolled out maneuvers (see module/dodge_planner.py) whenever there is a
+                FrameContext, in place of the thrust and turn rate formulas below.
+        """
         self.pathFinding = PathFinding()
+        self.planner = planner
         self.__ID = None
 
     # def distance_point_to_segment(self, x, y, x1, y1, x2, y2):
@@ -213,9 +221,9 @@ class Dodge:
         thrust = 0
 
         # Values from the ship and asteroid used for calculating acceleration
-        v_f = np.linalg.norm(asteroid.velocity)
-        v_i = np.linalg.norm(ship.velocity)
-        distance = math.dist(asteroid.position, ship.position)
+        v_f = asteroid.speed
+        v_i = ship.speed
+        distance = asteroid.distance
 
         # Acceleration fromula from vf^2 = vi^2 + 2a(dx)
         # a = vf^2 - vi^2/ 2(dx)
@@ -282,9 +290,9 @@ class Dodge:
         turn_rate = 0
 
         # Values from the ship and asteroid used for calculating acceleration
-        v_f = np.linalg.norm(asteroid.velocity)
-        v_i = np.linalg.norm(ship.velocity)
-        distance = math.dist(asteroid.position, ship.position)
+        v_f = asteroid.speed
+        v_i = ship.speed
+        distance = asteroid.distance
 
         # Acceleration fromula from vf^2 = vi^2 + 2a(dx)
         # a = vf^2 - vi^2/ 2(dx)
@@ -327,7 +335,8 @@ class Dodge:
         return turn_rate
 
     def take_action(
-        self, ship_state: dict, asteroids: dict, distances: dict, threats: dict
+        self, ship_state: dict, asteroids: dict, distances: dict, threats: dict, context: FrameContext = None,
+        delta_time: float = 1.0 / 30.0
     ) -> [float, float, bool]:
         """The function takes in ship state, asteroid data, IDs, and distances, and calculates the thrust
         and turn rate for the ship based on the closest asteroid.
@@ -348,6 +357,11 @@ class Dodge:
             distances : dict
                 The `distances` parameter is a dictionary that contains the distances between the ship and each
                 asteroid. It is used to determine the closest asteroid to the ship.
+            context : FrameContext
+                Geometry of the current frame. When given, the asteroid data is read from it instead of being
+                recomputed.
+            delta_time : float
+                Length of a frame, for the planner's rollouts.
 
         Returns
         -------
@@ -355,6 +369,9 @@ class Dodge:
 
         """
 
+        if self.planner is not None and context is not None:
+            return self.__plan(ship_state, context, delta_time)
+
         thrust = 0
         turn_rate = 0
 
@@ -362,10 +379,12 @@ class Dodge:
         asteroid = None
         n = 3
 
+        # distances holds only the nearest asteroids, ranked by nearest_k (see module/nearest.py)
         closest_n = dict(itertools.islice(distances.items(), n))
         if len(closest_n) > 0:
             closest_val = list(closest_n.values())[0]
             closest_key = list(closest_n.keys())[0]
+        paths_found = False
     
         for key, val in closest_n.items():
         
@@ -377,14 +396,24 @@ class Dodge:
             if val <= 120 and is_close and is_close >= 0.5:
                 if (len(closest_n) > 0):
                     if (val >= closest_val):
-                        self.pathFinding.path_find(asteroids[closest_key], ship_state, closest_key)
-                        if self.pathFinding(closest_key).collision:
-                            asteroid = AsteroidData(asteroids[closest_key], ship_state)
+                        # paths are kept per stable ID if the asteroids are tracked
+                        path_key = closest_key
+                        if context is None:
+                            self.pathFinding.path_find(asteroids[closest_key], ship_state, path_key)
+                        else:
+                            if context.ids is not None:
+                                path_key = int(context.ids[closest_key])
+                            # only the closest asteroid's path is read, find it once per frame
+                            if not paths_found:
+                                self.pathFinding.path_find_all(context, [closest_key])
+                                paths_found = True
+                        if self.pathFinding(path_key).collision:
+                            asteroid = self.__asteroid_data(asteroids, closest_key, ship_state, context)
                     else:
-                        asteroid = AsteroidData(asteroids[key], ship_state)
+                        asteroid = self.__asteroid_data(asteroids, key, ship_state, context)
                         
                 else:
-                    asteroid = AsteroidData(asteroids[key], ship_state)
+                    asteroid = self.__asteroid_data(asteroids, key, ship_state, context)
      
             
         # self.ship_path = self.pathFinding.path_find_ship(ship, 2)
@@ -407,6 +436,19 @@ class Dodge:
         else:
             return thrust, turn_rate, False
 
+    def __plan(self, ship_state: dict, context: FrameContext, delta_time: float) -> [float, float, bool]:
+        """Thrust and turn rate of the maneuver chosen by the planner, dodging unless it is coasting."""
+        maneuver = self.planner.plan(context, ship_state, delta_time)
+        if maneuver == 0:
+            return 0, 0, False
+        return float(self.planner.thrusts[maneuver]), float(self.planner.turn_rates[maneuver]), True
+
+    def __asteroid_data(self, asteroids: dict, index: int, ship_state: dict, context: FrameContext) -> AsteroidData:
+        """Returns the AsteroidData of an asteroid, from the frame context if there is one."""
+        if context is not None:
+            return AsteroidData.from_context(context, index)
+        return AsteroidData(asteroids[index], ship_state)
+
     def __get_facing(self, ship: ShipData):
         """The function returns the direction the ship is facing based on its angle.
 
@@ -16,14 +16,79 @@ from shapely.geometry import Polygon
 import math
 import numpy as np
 
+from module.frame_context import FrameContext
+from module.intercept import intercept, intercepts
+
 
 # The Shoot class provides methods for calculating the angle to turn and whether to shoot at an
 # asteroid in a game.
 class Shoot:
     def __init__(self):
         self.shot_at = []
+        # FrameContext and its intercepts, solved once per frame
+        self.__aim = (None, None)
+
+    def aim(self, context: FrameContext, ship: Dict):
+        '''
+        Desc:
+            Intercepts of every asteroid of the frame (see module/intercept.py),
+                solved the first time they are needed in a frame
+
+        Params:
+            context: The FrameContext of the current frame
+            ship: A dict containing the information about the ship
 
-    def shoot_at(self, asteroid: Dict, ship: Dict, index):
+        Returns:
+            Arrays of aim heading, turn time, bullet flight time and
+                whether the bullet hits inside the map, per asteroid
+        '''
+        if self.__aim[0] is not context:
+            self.__aim = (context, intercepts(context, ship.get("radius", 20.0)))
+        return self.__aim[1]
+
+    def __intercept(self, context: FrameContext, ship: Dict, index: int) -> Tuple[float, float]:
+        '''
+        Desc:
+            Aim heading and bullet flight time of one asteroid, read from
+                the frame's intercepts if they were solved already, else
+                solved for that asteroid only
+
+        Returns:
+            The aim heading, and the flight time (NaN if unreachable)
+        '''
+        if self.__aim[0] is context:
+            headings, _, flightTimes, _ = self.__aim[1]
+            return float(headings[index]), float(flightTimes[index])
+        return intercept(context, index, ship.get("radius", 20.0))
+
+    def best_target(self, context: FrameContext, ship: Dict):
+        '''
+        Desc:
+            Picks the asteroid that can be hit soonest, counting the time to
+                turn to it, out of the ones the bullet meets inside the map
+                and that are not already shot at
+
+        Params:
+            context: The FrameContext of the current frame
+            ship: A dict containing the information about the ship
+
+        Returns:
+            The index of the asteroid, None if none can be hit
+        '''
+        headings, turn_times, flight_times, in_map = self.aim(context, ship)
+        times = np.where(in_map, turn_times + flight_times, np.inf)
+
+        # skip the asteroids already shot at
+        keys = context.ids if context.ids is not None else np.arange(len(context))
+        shot = [asteroid[0] for asteroid in self.shot_at]
+        if shot:
+            times[np.isin(keys, shot)] = np.inf
+
+        if len(times) == 0 or not np.isfinite(times.min()):
+            return None
+        return int(np.argmin(times))
+
+    def shoot_at(self, asteroid: Dict, ship: Dict, index, context: FrameContext = None):
         '''
         Desc:
             Given an asteroid, find the turning distance needed
@@ -37,6 +102,9 @@ class Shoot:
             asteroid: A dict containg the information of the asteroid
             ship: A dict containing the information about the ship
             index: The index of the asteroid is the overall asteroid dict
+            context: The FrameContext of the current frame. When given, the
+                distance and angle to the asteroid are read from it, and
+                the shot_at list is keyed on the asteroid's stable ID
 
         Returns: 
             A tuple, containing the angle to turn, and a bool deciding 
@@ -51,16 +119,34 @@ class Shoot:
         shipPos = ship["position"]
         shipAngle = ship["heading"]
 
-        # get distance between ship and asteroid
-        distance = Point(shipPos[0], shipPos[1]).distance(
-            Point(asteroidPos[0], asteroidPos[1]))
+        if context is not None:
+            # get distance and angle vector from the frame context
+            distance = float(context.distances[index])
+            angleVector = {"vector": (-float(context.to_ship[index, 0]), -float(context.to_ship[index, 1])),
+                           "angle": float(context.bearings[index])}
+        else:
+            # get distance between ship and asteroid
+            distance = Point(shipPos[0], shipPos[1]).distance(
+                Point(asteroidPos[0], asteroidPos[1]))
+
+            # get angle vector
+            angleVector = self.__get_angle_vector(
+                asteroidPos[0], asteroidPos[1], shipPos[0], shipPos[1])
 
         # get estimated time to for bullet to hit
         estimateBulletTime = distance/800
 
-        # get angle vector
-        angleVector = self.__get_angle_vector(
-            asteroidPos[0], asteroidPos[1], shipPos[0], shipPos[1])
+        # exact aim heading and bullet time from the intercepts of the frame
+        interceptAngle = None
+        if context is not None:
+            heading, flightTime = self.__intercept(context, ship, index)
+            if not math.isnan(flightTime):
+                interceptAngle = heading
+                estimateBulletTime = flightTime
+
+        # key the shot_at list on the stable ID if the asteroids are tracked
+        if context is not None and context.ids is not None:
+            index = int(context.ids[index])
 
         # check if ship is already facing towards asteroid (within 15 degrees)
         if (math.isclose(angleVector["angle"], shipAngle, abs_tol=15)):
@@ -70,8 +156,7 @@ class Shoot:
                               asteroidPos[1] + (estimateBulletTime * velocity[1] * 1.25))
 
             # get new angle vector
-            newAngleVector = self.__get_angle_vector(
-                asteroidHitPos[0], asteroidHitPos[1], shipPos[0], shipPos[1])
+            newAngleVector = self.__lead_angle_vector(interceptAngle, asteroidHitPos, shipPos)
 
             abs_tol = 10 if asteroid['size'] > 1 else 5
 
@@ -95,8 +180,7 @@ class Shoot:
                               asteroidPos[1] + (estimateBulletTime * velocity[1] * 1.5))
 
             # get new angle vector
-            newAngleVector = self.__get_angle_vector(
-                asteroidHitPos[0], asteroidHitPos[1], shipPos[0], shipPos[1])
+            newAngleVector = self.__lead_angle_vector(interceptAngle, asteroidHitPos, shipPos)
 
 
             # Try to add to shoot list
@@ -204,6 +288,26 @@ class Shoot:
             else:
                 return 3
 
+    def __lead_angle_vector(self, interceptAngle, asteroidHitPos, shipPos):
+        '''
+        Desc:
+            The angle to lead an asteroid by, the exact intercept if it
+                was solved and else towards the estimated hit position
+
+        Parameters:
+            interceptAngle: The aim heading from the intercepts, or None
+            asteroidHitPos: The estimated hit position
+            shipPos: The ship position
+
+        Returns:
+            A dict with the angle and the vector
+        '''
+        if interceptAngle is None:
+            return self.__get_angle_vector(
+                asteroidHitPos[0], asteroidHitPos[1], shipPos[0], shipPos[1])
+        radians = math.radians(interceptAngle)
+        return {"vector": (math.cos(radians), math.sin(radians)), "angle": interceptAngle}
+
     def __get_angle_vector(self, x1, y1, x2, y2):
         ''' 
         Desc:
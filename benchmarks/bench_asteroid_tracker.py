@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+``AsteroidTracker.update`` time per frame against a brute force all-pairs match, for up to a few thousand asteroids,
+with the asteroids in the order the engine keeps them and shuffled (which skips the tracker's in-order fast path).
+Also checks the IDs against the engine's own asteroid objects over full games: an error is an asteroid whose ID
+changes while it survives, or an ID handed to two different asteroids.
+
+Run from the repository root with ``python -m benchmarks.bench_asteroid_tracker``, with kesslergame installed as for
+``game.py``
+"""
+
+import copy
+import time
+
+import numpy as np
+
+from kesslergame import KesslerObserver, Scenario, TrainerEnvironment
+from controller import Controller
+from module.asteroid_tracker import AsteroidTracker
+from module.frame_context import FrameContext, predict_asteroids
+
+MAP_SIZE = (1000.0, 800.0)
+DELTA_TIME = 1.0 / 30.0
+
+
+def brute_force(predicted: np.ndarray, positions: np.ndarray, tolerance: float) -> np.ndarray:
+    offset = np.abs(positions[:, None, :] - predicted[None, :, :])
+    offset = np.minimum(offset, np.asarray(MAP_SIZE) - offset)
+    distance = np.hypot(offset[..., 0], offset[..., 1])
+    nearest = np.argmin(distance, axis=1)
+    return np.where(distance[np.arange(len(positions)), nearest] <= tolerance, nearest, -1)
+
+
+def bench_matching() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'asteroids':>10} {'tracker (us)':>13} {'shuffled (us)':>14} {'all pairs (us)':>15} {'matched':>8}")
+    for count in (10, 100, 1000, 3000):
+        positions = rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE
+        velocities = rng.uniform(-100.0, 100.0, (count, 2))
+        tracker = AsteroidTracker()
+        tracker.update(FrameContext((0, 0), (0, 0), 0, positions, velocities), DELTA_TIME, MAP_SIZE)
+
+        # Next frame: every asteroid moved and a tenth destroyed, spread over the list. The engine keeps the order
+        # of the rest, the tracker is timed both with that order and with the rest shuffled
+        moved = predict_asteroids(positions, velocities, DELTA_TIME, 1, MAP_SIZE)
+        alive = np.sort(rng.permutation(count)[:count - count // 10])
+        shuffled = rng.permutation(alive)
+        t_tracker = []
+        for order in (alive, shuffled):
+            context = FrameContext((0, 0), (0, 0), 0, moved[order], velocities[order])
+            repeats = max(1, 2000 // count)
+            trials = [copy.deepcopy(tracker) for _ in range(repeats)]
+            start = time.perf_counter()
+            for trial in trials:
+                ids = trial.update(context, DELTA_TIME, MAP_SIZE)
+            t_tracker.append((time.perf_counter() - start) / repeats)
+            matched = np.count_nonzero(ids == order)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            brute_force(moved, context.positions, tracker.position_tolerance)
+        t_brute = (time.perf_counter() - start) / repeats
+
+        print(f"{count:>10} {t_tracker[0] * 1e6:>13.0f} {t_tracker[1] * 1e6:>14.0f} {t_brute * 1e6:>15.0f} "
+              f"{matched:>4}/{len(alive):<4}")
+
+
+class IdentityCheck(KesslerObserver):
+    """ Tracks the engine's asteroids and compares the IDs with the asteroid objects themselves"""
+
+    def __init__(self, frames: int) -> None:
+        self.frames = frames
+
+    def start(self, scenario, session) -> None:
+        self.tracker = AsteroidTracker()
+        # ID -> asteroid object, asteroid object -> ID
+        self.owner = {}
+        self.assigned = {}
+        self.seen = []
+        self.errors = 0
+        self.checked = 0
+        self.elapsed = 0.0
+        self.updates = 0
+        self.update(session, [])
+
+    def update(self, session, actions) -> None:
+        if session.sim_frame % self.frames:
+            return
+        asteroids = session.asteroids
+        positions = np.array([asteroid.position for asteroid in asteroids]).reshape(-1, 2)
+        velocities = np.array([asteroid.velocity for asteroid in asteroids]).reshape(-1, 2)
+        context = FrameContext((0, 0), (0, 0), 0, positions, velocities)
+        start = time.perf_counter()
+        ids = self.tracker.update(context, DELTA_TIME, session.scenario.map_size, self.frames)
+        self.elapsed += time.perf_counter() - start
+        self.updates += 1
+        # Keep the asteroids alive so their id() is never reused
+        self.seen.extend(asteroids)
+        for asteroid, asteroid_id in zip(asteroids, ids.tolist()):
+            key = id(asteroid)
+            if self.owner.setdefault(asteroid_id, key) != key or self.assigned.setdefault(key, asteroid_id) != asteroid_id:
+                self.errors += 1
+            self.checked += 1
+
+
+def bench_identity() -> None:
+    print(f"\n{'asteroids':>10} {'interval':>9} {'checked':>8} {'errors':>7} {'IDs':>5} {'update (us)':>12}")
+    for count in (10, 50, 150):
+        for frames in (1, 3):
+            scenario = Scenario(name="Asteroid tracker benchmark", num_asteroids=count, map_size=MAP_SIZE,
+                                time_limit=20, ship_states=[{"position": (500, 400), "lives": 99}], seed=count)
+            check = IdentityCheck(frames)
+            TrainerEnvironment(settings={"observers": [check]}).run(scenario=scenario, controllers=[Controller()])
+            print(f"{count:>10} {frames:>9} {check.checked:>8} {check.errors:>7} {len(check.owner):>5} "
+                  f"{check.elapsed / check.updates * 1e6:>12.1f}")
+
+
+def main() -> None:
+    bench_matching()
+    bench_identity()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Time to find every asteroid's collision with the ship the way ``PathFinding.path_find`` used to (a 10 second
+``LineString`` buffered by the asteroid radius, intersected with a buffered circle around the ship, one asteroid at a
+time) against ``closest_approach`` for all asteroids at once, ``wrapped_closest_approach`` on a map that wraps at its
+edges and ``PathFinding.path_find_all``, which also builds the (wrapped) ``Path`` objects. Also counts the asteroids on
+which the shapely and analytic collisions disagree, and the collisions only found by following paths across the map
+edges.
+
+Run from the repository root with ``python -m benchmarks.bench_closest_approach``
+"""
+
+import time
+
+import numpy as np
+from shapely.geometry import LineString, Point
+
+from module.closest_approach import closest_approach, wrapped_closest_approach
+from module.frame_context import FrameContext
+from module.pathfinding import PathFinding
+
+SHIP_RADIUS = PathFinding.SHIP_RADIUS
+PATH_TIME = PathFinding.PATH_TIME
+MAP_SIZE = (1000.0, 800.0)
+
+
+def shapely_collisions(positions: np.ndarray, velocities: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    ship = Point(0.0, 0.0).buffer(SHIP_RADIUS)
+    collides = np.zeros(len(positions), dtype=bool)
+    for index, (position, velocity, radius) in enumerate(zip(positions.tolist(), velocities.tolist(), radii.tolist())):
+        end = (position[0] + velocity[0] * PATH_TIME, position[1] + velocity[1] * PATH_TIME)
+        line = LineString([position, end]).buffer(radius)
+        collides[index] = not ship.intersection(line).is_empty
+    return collides
+
+
+def timed(function, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'asteroids':>10} {'shapely (us)':>13} {'solver (us)':>12} {'wrapped (us)':>13} {'paths (us)':>11} "
+          f"{'speedup':>8} {'collide':>8} {'disagree':>9} {'wrap only':>10}")
+    for count in (10, 30, 100, 1000):
+        # Asteroids relative to a ship in the middle of the map
+        positions = rng.uniform(-0.5, 0.5, (count, 2)) * MAP_SIZE
+        velocities = rng.uniform(-150.0, 150.0, (count, 2))
+        radii = rng.choice([8.0, 16.0, 24.0, 32.0], count)
+        context = FrameContext((0.0, 0.0), (0.0, 0.0), 0.0, positions, velocities, radii=radii, map_size=MAP_SIZE)
+        path_finding = PathFinding()
+        repeats = max(3, 3000 // count)
+
+        t_shapely, expected = timed(lambda: shapely_collisions(positions, velocities, radii), repeats)
+        t_solver, (_, _, collides, _) = timed(
+            lambda: closest_approach(positions, velocities, radii + SHIP_RADIUS, PATH_TIME), repeats)
+        t_wrapped, (_, _, wrapped, _) = timed(
+            lambda: wrapped_closest_approach(positions, velocities, radii + SHIP_RADIUS, PATH_TIME, MAP_SIZE), repeats)
+        t_paths, _ = timed(lambda: path_finding.path_find_all(context), repeats)
+
+        print(f"{count:>10} {t_shapely * 1e6:>13.0f} {t_solver * 1e6:>12.1f} {t_wrapped * 1e6:>13.1f} "
+              f"{t_paths * 1e6:>11.0f} {t_shapely / t_paths:>7.0f}x {np.count_nonzero(collides):>8} "
+              f"{np.count_nonzero(collides != expected):>9} {np.count_nonzero(wrapped & ~collides):>10}")
+
+
+if __name__ == '__main__':
+    main()
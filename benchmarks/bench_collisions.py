@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Micro-benchmark of the scalar ``circle_line_collision`` against the batched ``circle_line_collisions``.
+
+Run from the repository root with ``python -m benchmarks.bench_collisions``, with kesslergame installed as for
+``game.py``
+"""
+
+import time
+import random
+
+import numpy as np
+
+from kesslergame.collisions import circle_line_collision, circle_line_collisions
+
+
+def make_case(n: int, map_size: tuple[float, float] = (1000.0, 800.0), seed: int = 0):
+    rng = random.Random(seed)
+    heads = [(rng.uniform(0, map_size[0]), rng.uniform(0, map_size[1])) for _ in range(n)]
+    headings = [rng.uniform(0, 2*np.pi) for _ in range(n)]
+    tails = [(x - 12.0*np.cos(h), y - 12.0*np.sin(h)) for (x, y), h in zip(heads, headings)]
+    centers = [(rng.uniform(0, map_size[0]), rng.uniform(0, map_size[1])) for _ in range(n)]
+    radii = [8.0*rng.randint(1, 4) for _ in range(n)]
+    return heads, tails, centers, radii
+
+
+def time_it(func, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    print(f"{'bullets x asteroids':>20} {'scalar (ms)':>12} {'batched (ms)':>13} {'speedup':>8} {'scalar hits':>12} {'exact hits':>11}")
+    for n in (10, 100, 1000):
+        heads, tails, centers, radii = make_case(n)
+        heads_arr, tails_arr, centers_arr, radii_arr = np.array(heads), np.array(tails), np.array(centers), np.array(radii)
+
+        def scalar() -> int:
+            return sum(circle_line_collision(head, tail, center, radius)
+                       for head, tail in zip(heads, tails)
+                       for center, radius in zip(centers, radii))
+
+        def batched() -> np.ndarray:
+            return circle_line_collisions(heads_arr, tails_arr, centers_arr, radii_arr)
+
+        repeats = 3 if n == 1000 else 20
+        scalar_time = time_it(scalar, repeats)
+        batched_time = time_it(batched, repeats)
+        print(f"{f'{n} x {n}':>20} {1000*scalar_time:>12.3f} {1000*batched_time:>13.3f} "
+              f"{scalar_time/batched_time:>7.1f}x {scalar():>12d} {int(batched().sum()):>11d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Time per frame to find the asteroids in front of the ship with ``TriangleFind``'s shapely triangle (``update``, then
+``triangle_find``) against the analytic ``TriangleFind.cone_find`` on a ``FrameContext``, and the frames on which the
+two disagree. Also counts the asteroids only found when the cone wraps around the map edges.
+
+Run from the repository root with ``python -m benchmarks.bench_cone_find``
+"""
+
+import time
+
+import numpy as np
+
+from module.frame_context import FrameContext
+from module.triangle_find import TriangleFind
+
+MAP_SIZE = (1000.0, 800.0)
+FRAMES = 50
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'asteroids':>10} {'shapely (us)':>13} {'cone (us)':>10} {'speedup':>8} {'found':>6} {'disagree':>9} "
+          f"{'wrap only':>10}")
+    for count in (10, 100, 1000):
+        cone = TriangleFind(30, 200)
+        frames = []
+        for _ in range(FRAMES):
+            ship = {"position": tuple(rng.uniform(0.0, 1.0, 2) * MAP_SIZE), "heading": float(rng.uniform(0.0, 360.0))}
+            positions = rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE
+            frames.append((ship, [{"position": tuple(position)} for position in positions.tolist()], positions))
+
+        start = time.perf_counter()
+        expected = []
+        for ship, asteroids, _ in frames:
+            cone.update(ship)
+            expected.append(cone.triangle_find(asteroids))
+        t_shapely = (time.perf_counter() - start) / FRAMES
+
+        start = time.perf_counter()
+        found = []
+        for ship, _, positions in frames:
+            context = FrameContext(ship["position"], (0.0, 0.0), ship["heading"], positions, np.zeros_like(positions),
+                                   map_size=MAP_SIZE)
+            found.append(cone.cone_find(context))
+        t_cone = (time.perf_counter() - start) / FRAMES
+
+        disagree = sum(sorted(a) != sorted(b) for a, b in zip(found, expected))
+        wrap_only = 0
+        for (ship, _, positions), indexes in zip(frames, found):
+            context = FrameContext(ship["position"], (0.0, 0.0), ship["heading"], positions, np.zeros_like(positions),
+                                   map_size=MAP_SIZE)
+            wrap_only += len(set(cone.cone_find(context, wrap=True)) - set(indexes))
+
+        print(f"{count:>10} {t_shapely * 1e6:>13.0f} {t_cone * 1e6:>10.1f} {t_shapely / t_cone:>7.0f}x "
+              f"{sum(map(len, found)):>6} {disagree:>9} {wrap_only:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Time per ``DodgePlanner.plan`` on frames of random asteroids around a moving ship, for several time budgets, with the
+share of the maneuver library tested and the plans cut short by the budget, and without a budget. Then plays the same games with the
+Fuzzifiers ``Controller`` dodging with the planner and with the thrust and turn rate formulas of ``Dodge``, and prints
+the ship deaths, bullets hit and time per ``actions`` call of each.
+
+Run from the repository root with ``python -m benchmarks.bench_dodge_planner``, with kesslergame installed as for
+``game.py``
+"""
+
+import warnings
+from typing import List
+
+import numpy as np
+
+from kesslergame import Scenario, TrainerEnvironment
+from controller import Controller
+from module.dodge_planner import DodgePlanner
+from module.frame_context import FrameContext
+
+MAP_SIZE = (1000.0, 800.0)
+
+
+def frames(count: int, num_frames: int, rng: np.random.Generator) -> List[FrameContext]:
+    contexts = []
+    for _ in range(num_frames):
+        positions = rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE
+        velocities = rng.uniform(-150.0, 150.0, (count, 2))
+        radii = rng.choice([8.0, 16.0, 24.0, 32.0], count)
+        context = FrameContext((500.0, 400.0), (100.0, 0.0), 0.0, positions, velocities, radii=radii,
+                               map_size=MAP_SIZE)
+        # Built once per frame for the whole controller, so kept out of the timings
+        context.index
+        contexts.append(context)
+    return contexts
+
+
+def play(plan_dodges: bool, num_asteroids: int, seed: int) -> (int, int, float):
+    scenario = Scenario(name="Dodge planner benchmark", num_asteroids=num_asteroids, map_size=(1000, 800),
+                        time_limit=20, ship_states=[{"position": (500, 400), "lives": 99}], seed=seed)
+    controller = Controller(plan_dodges=plan_dodges)
+    score, perf_list = TrainerEnvironment(settings={"perf_tracker": True}).run(scenario=scenario,
+                                                                             controllers=[controller])
+    team = score.teams[0]
+    return team.deaths, team.bullets_hit, float(np.mean([perf['controller_times'][0] for perf in perf_list]))
+
+
+def main() -> None:
+    warnings.simplefilter("ignore")
+    rng = np.random.default_rng(0)
+    ship_state = {"position": (500.0, 400.0), "speed": 100.0, "heading": 0.0, "radius": 20.0}
+
+    print(f"{'asteroids':>10} {'budget (ms)':>12} {'plan (ms)':>10} {'max (ms)':>9} {'tested':>7} {'cut short':>10}")
+    for count in (10, 30, 100, 300, 1000, 2000):
+        contexts = frames(count, 50, rng)
+        for budget in (None, 0.002, 0.004, 0.008):
+            planner = DodgePlanner(budget=budget)
+            elapsed, tested = [], 0
+            for context in contexts:
+                planner.plan(context, ship_state)
+                elapsed.append(planner.elapsed)
+                tested += np.count_nonzero(planner.tested)
+            budget_ms = f"{budget * 1e3:.0f}" if budget is not None else "none"
+            print(f"{count:>10} {budget_ms:>12} {np.mean(elapsed) * 1e3:>10.2f} {np.max(elapsed) * 1e3:>9.2f} "
+                  f"{tested / (len(contexts) * len(planner)):>7.0%} {planner.timeouts:>7}/{len(contexts):<3}")
+
+    print()
+    print(f"{'dodging':>9} {'deaths':>7} {'hits':>5} {'actions (us)':>13}")
+    for plan_dodges in (False, True):
+        deaths, hits, times = 0, 0, []
+        for num_asteroids in (10, 30, 60):
+            for seed in range(3):
+                game_deaths, game_hits, game_time = play(plan_dodges, num_asteroids, seed)
+                deaths += game_deaths
+                hits += game_hits
+                times.append(game_time)
+        print(f"{'planner' if plan_dodges else 'formula':>9} {deaths:>7} {hits:>5} {np.mean(times) * 1e6:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
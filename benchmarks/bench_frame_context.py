@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Controller time per frame spent in the threat system, ``Shoot.shoot_at`` and ``Dodge.take_action``, with each of
+them computing its own ship to asteroid geometry (no ``FrameContext``) and with one shared ``FrameContext`` built per
+frame. Frames are recorded from a game played by the Fuzzifiers ``Controller`` and replayed through both paths.
+
+Run from the repository root with ``python -m benchmarks.bench_frame_context``, with kesslergame installed as for
+``game.py``
+"""
+
+import copy
+import time
+from typing import Dict, List, Tuple
+
+from kesslergame import Scenario, TrainerEnvironment
+from controller import Controller
+from actions.dodge import Dodge
+from actions.shoot import Shoot
+from module.frame_context import FrameContext
+from module.threat_system import TargetingSystem
+
+
+def record(num_asteroids: int, seed: int) -> List[Tuple[Dict, Dict]]:
+    scenario = Scenario(name="Frame context benchmark", num_asteroids=num_asteroids, map_size=(1000, 800),
+                        time_limit=10, ship_states=[{"position": (500, 400), "lives": 99}], seed=seed)
+    controller = Controller()
+    frames = []
+    actions = controller.actions
+
+    def recorded(ship_state, game_state):
+        frames.append((copy.deepcopy(ship_state), copy.deepcopy(game_state)))
+        return actions(ship_state, game_state)
+
+    controller.actions = recorded
+    TrainerEnvironment(settings={}).run(scenario=scenario, controllers=[controller])
+    return frames
+
+
+def replay(frames: List[Tuple[Dict, Dict]], targeting: TargetingSystem, shared: bool) -> float:
+    shoot = Shoot()
+    dodge = Dodge()
+    start = time.perf_counter()
+    for ship_state, game_state in frames:
+        asteroids = game_state["asteroids"]
+        if not asteroids:
+            continue
+        targeting.update(ship_state, game_state)
+        context = FrameContext.from_state(ship_state, game_state) if shared else None
+        if shared:
+            ids, distances = targeting.evaluate(context)
+        else:
+            ids = targeting.get_threats_ids
+            distances = targeting.distances
+        first_index = next(iter(distances), 0)
+        shoot.shoot_at(asteroids[first_index], ship_state, first_index, context)
+        dodge.take_action(ship_state, asteroids, distances, ids, context)
+        shoot.update(game_state["delta_time"])
+    return (time.perf_counter() - start) / len(frames)
+
+
+def main() -> None:
+    targeting = TargetingSystem()
+    print(f"{'asteroids':>10} {'separate (us)':>14} {'shared (us)':>12} {'speedup':>8}")
+    for num_asteroids in (10, 30, 100):
+        frames = record(num_asteroids, seed=1)
+        # Alternate the two so a busy machine slows both alike, and keep the best of each
+        runs = [(replay(frames, targeting, shared=False), replay(frames, targeting, shared=True))
+                for _ in range(7)]
+        separate = min(run[0] for run in runs)
+        shared = min(run[1] for run in runs)
+        print(f"{num_asteroids:>10} {separate * 1e6:>14.1f} {shared * 1e6:>12.1f} {separate / shared:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Threat FIS on skfuzzy against the same sets and rules on the NumPy ``MamdaniEngine``, at 10, 100 and 1000
+(distance, angle) inputs. skfuzzy is timed both with one ``compute()`` per input, as ``TargetingSystem`` used to
+call it, and with a single array ``compute()``. The largest difference between the two engines is reported.
+
+Run from the repository root with ``python -m benchmarks.bench_fuzzy_engine``
+"""
+
+import time
+
+import numpy as np
+
+from module.threat_system import TargetingSystem
+
+
+def main() -> None:
+    targeting = TargetingSystem()
+    engine = targeting.create_threat_engine
+    rng = np.random.default_rng(0)
+
+    print(f"{'inputs':>7} {'skfuzzy loop (ms)':>18} {'skfuzzy array (ms)':>19} {'engine (ms)':>12} "
+          f"{'speedup':>9} {'max diff':>9}")
+    for count in (10, 100, 1000):
+        distances = rng.uniform(0.0, 900.0, count)
+        angles = rng.uniform(0.0, 180.0, count)
+
+        fis = targeting.create_thread_fis
+        start = time.perf_counter()
+        for i in range(count):
+            fis.input["distance"] = distances[i]
+            fis.input["angle"] = angles[i]
+            fis.compute()
+        t_loop = time.perf_counter() - start
+
+        fis = targeting.create_thread_fis
+        start = time.perf_counter()
+        fis.input["distance"] = distances
+        fis.input["angle"] = angles
+        fis.compute()
+        expected = fis.output["threat_level"]
+        t_array = time.perf_counter() - start
+
+        start = time.perf_counter()
+        threat = engine.compute(distance=distances, angle=angles)["threat_level"]
+        t_engine = time.perf_counter() - start
+
+        print(f"{count:>7} {t_loop * 1e3:>18.2f} {t_array * 1e3:>19.2f} {t_engine * 1e3:>12.3f} "
+              f"{t_loop / t_engine:>8.0f}x {np.max(np.abs(threat - expected)):>9.5f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Per-frame allocation and build time of the eager ``game_state`` dictionaries against the lazy state views.
+
+Each frame builds the asteroid/ship/bullet/mine entries of ``game_state`` the way ``KesslerGame.run`` does, then reads
+``['position']`` and ``['velocity']`` of the nearest few asteroids as a typical controller would. Allocations are
+measured with tracemalloc as the peak traced memory of one frame, since each frame's game_state is released before the
+next one is built.
+
+Run from the repository root with ``python -m benchmarks.bench_game_state``
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from kesslergame import Scenario
+from kesslergame.bullet import Bullet
+from kesslergame.mines import Mine
+from kesslergame.state_views import (StateSequenceView, ASTEROID_STATE_FIELDS, SHIP_STATE_FIELDS,
+                                         BULLET_STATE_FIELDS, MINE_STATE_FIELDS)
+
+FRAMES = 100
+ASTEROIDS_READ = 5
+
+
+def eager_state(asteroids: List[Any], ships: List[Any], bullets: List[Any], mines: List[Any]) -> Dict[str, Any]:
+    return {
+        'asteroids': [asteroid.state for asteroid in asteroids],
+        'ships': [ship.state for ship in ships],
+        'bullets': [bullet.state for bullet in bullets],
+        'mines': [mine.state for mine in mines],
+    }
+
+
+def lazy_state(asteroids: List[Any], ships: List[Any], bullets: List[Any], mines: List[Any]) -> Dict[str, Any]:
+    return {
+        'asteroids': StateSequenceView(asteroids, ASTEROID_STATE_FIELDS),
+        'ships': StateSequenceView(ships, SHIP_STATE_FIELDS),
+        'bullets': StateSequenceView(bullets, BULLET_STATE_FIELDS),
+        'mines': StateSequenceView(mines, MINE_STATE_FIELDS),
+    }
+
+
+def controller_reads(game_state: Dict[str, Any]) -> float:
+    total = 0.0
+    for asteroid in game_state['asteroids'][:ASTEROIDS_READ]:
+        total += asteroid['position'][0] + asteroid['velocity'][1]
+    return total + game_state['ships'][0]['position'][0]
+
+
+def measure(build: Callable[..., Dict[str, Any]], objects: tuple) -> tuple[float, float]:
+    """ Returns (peak bytes allocated per frame, microseconds per frame)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for _ in range(FRAMES):
+        controller_reads(build(*objects))
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        controller_reads(build(*objects))
+    return peak, 1e6 * (time.perf_counter() - start) / FRAMES
+
+
+def main() -> None:
+    print(f"{'asteroids':>9} {'eager peak B/frame':>18} {'lazy peak B/frame':>17} {'eager us/frame':>15} {'lazy us/frame':>14}")
+    for num_asteroids in (50, 150, 1000, 5000):
+        scenario = Scenario(num_asteroids=num_asteroids, ship_states=[{'position': (500, 400)}, {'position': (300, 400)}],
+                            map_size=(4000, 3000), seed=0)
+        ships = scenario.ships()
+        asteroids = scenario.asteroids()
+        bullets = [Bullet((100.0 + i, 100.0), 45.0, owner=ships[0]) for i in range(40)]
+        mines = [Mine([200.0, 200.0], owner=ships[0]) for _ in range(2)]
+        objects = (asteroids, ships, bullets, mines)
+
+        eager_bytes, eager_us = measure(eager_state, objects)
+        lazy_bytes, lazy_us = measure(lazy_state, objects)
+        print(f"{num_asteroids:>9d} {eager_bytes:>18,d} {lazy_bytes:>17,d} {eager_us:>15.1f} {lazy_us:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
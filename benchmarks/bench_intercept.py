@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Time to aim at every asteroid of a frame the way ``Shoot.shoot_at`` used to (lead the asteroid by ``distance / 800``
+seconds times 1.25, one asteroid at a time with ``atan`` and quadrant fixups) against the closed form ``intercepts``
+for all asteroids at once. Also prints how far a bullet fired along each aim passes from the asteroid centre.
+
+Run from the repository root with ``python -m benchmarks.bench_intercept``
+"""
+
+import math
+import time
+
+import numpy as np
+
+from module.frame_context import FrameContext
+from module.intercept import BULLET_SPEED, intercepts
+
+MAP_SIZE = (1000.0, 800.0)
+MUZZLE = 20.0
+
+
+def lead_angle(asteroid_position, velocity, ship_position) -> float:
+    distance = math.dist(asteroid_position, ship_position)
+    lead = distance / BULLET_SPEED * 1.25
+    x = asteroid_position[0] + velocity[0] * lead - ship_position[0]
+    y = asteroid_position[1] + velocity[1] * lead - ship_position[1]
+    angle = math.degrees(math.atan(y / x))
+    if x <= 0:
+        angle += 180
+    elif y <= 0:
+        angle += 360
+    return angle
+
+
+def miss_distances(headings: np.ndarray, positions: np.ndarray, velocities: np.ndarray,
+                   ship_position: np.ndarray) -> np.ndarray:
+    # Closest the bullet fired along each heading passes to the asteroid centre, while it is on the map
+    radians = np.radians(headings)
+    bullet_velocities = BULLET_SPEED * np.column_stack((np.cos(radians), np.sin(radians)))
+    offsets = positions - ship_position - MUZZLE * bullet_velocities / BULLET_SPEED
+    relative = velocities - bullet_velocities
+    times = np.clip(-np.sum(offsets * relative, axis=1) / np.sum(relative * relative, axis=1), 0.0, 2.0)
+    return np.hypot(*(offsets + relative * times[:, None]).T)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'asteroids':>10} {'lead (us)':>10} {'intercept (us)':>15} {'speedup':>8} {'lead miss':>10} "
+          f"{'intercept miss':>15}")
+    for count in (10, 100, 1000):
+        ship_position = rng.uniform(0.0, 1.0, 2) * MAP_SIZE
+        positions = rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE
+        velocities = rng.uniform(-150.0, 150.0, (count, 2))
+        repeats = max(3, 3000 // count)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            context = FrameContext(ship_position, (0.0, 0.0), 0.0, positions, velocities, map_size=MAP_SIZE)
+            headings, _, _, _ = intercepts(context, MUZZLE)
+        t_intercept = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            leads = [lead_angle(position, velocity, ship_position)
+                     for position, velocity in zip(positions.tolist(), velocities.tolist())]
+        t_lead = (time.perf_counter() - start) / repeats
+
+        # Asteroids away from the muzzle, which every aim hits
+        far = context.distances > 2 * MUZZLE
+        lead_miss = miss_distances(np.array(leads), positions, velocities, ship_position)[far]
+        intercept_miss = miss_distances(headings, positions, velocities, ship_position)[far]
+        print(f"{count:>10} {t_lead * 1e6:>10.0f} {t_intercept * 1e6:>15.1f} {t_lead / t_intercept:>7.1f}x "
+              f"{np.median(lead_miss):>10.2f} {np.median(intercept_miss):>15.2e}")
+
+
+if __name__ == '__main__':
+    main()
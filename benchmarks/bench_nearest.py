@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Time to rank the asteroids near the ship the way ``TargetingSystem.evaluate`` used to (every asteroid within 250 put
+in a dict sorted by distance, of which Dodge reads 3) against ``nearest_k`` keeping the 3 nearest, with and without
+wrapping around the map edges.
+
+Run from the repository root with ``python -m benchmarks.bench_nearest``
+"""
+
+import time
+
+import numpy as np
+
+from module.nearest import nearest_k
+
+MAP_SIZE = (1000.0, 800.0)
+
+
+def sorted_dict(distances: np.ndarray) -> dict:
+    close = np.flatnonzero(distances <= 250)
+    return dict(sorted(zip(close.tolist(), distances[close].tolist()), key=lambda x: (x[1], x[0])))
+
+
+def timed(function, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    ship = np.asarray(MAP_SIZE) / 2
+    print(f"{'asteroids':>10} {'sorted dict (us)':>17} {'nearest_k (us)':>15} {'wrapped (us)':>13}")
+    for count in (10, 100, 1000, 10000):
+        positions = rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE
+        repeats = max(10, 20000 // count)
+        t_sorted = timed(lambda: sorted_dict(np.hypot(*(positions - ship).T)), repeats)
+        t_nearest = timed(lambda: dict(zip(*(values.tolist() for values in nearest_k(ship, positions, 3, 250)))),
+                          repeats)
+        t_wrapped = timed(lambda: dict(zip(*(values.tolist()
+                                            for values in nearest_k(ship, positions, 3, 250, MAP_SIZE)))), repeats)
+        print(f"{count:>10} {t_sorted * 1e6:>17.1f} {t_nearest * 1e6:>15.1f} {t_wrapped * 1e6:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
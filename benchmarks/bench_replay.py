@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Cost of recording a run with ``ReplayRecorder``, and of seeking in the resulting replay.
+
+The same seeded scenario is run with and without the recorder and the mean frame times are compared. The recorder's
+own share of each frame is taken from the ``observers_update`` perf entry. Seek times are measured on random frames.
+
+Run from the repository root with ``python -m benchmarks.bench_replay``
+"""
+
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, Tuple
+
+from kesslergame import Scenario, TrainerEnvironment, KesslerController
+from kesslergame.replay import ReplayRecorder, ReplayPlayer
+
+TIME_LIMIT = 30.0
+SEEKS = 500
+
+
+class SpinController(KesslerController):
+    """ Thrusts, turns at a fixed rate and fires whenever possible"""
+    def actions(self, ship_state: Dict[str, Any], game_state: Dict[str, Any]) -> Tuple[float, float, bool, bool]:
+        return 120.0, 60.0, True, False
+
+    @property
+    def name(self) -> str:
+        return "Spin Controller"
+
+
+def run(num_asteroids: int, settings: Dict[str, Any]) -> Tuple[float, float]:
+    scenario = Scenario(num_asteroids=num_asteroids, ship_states=[{'position': (500, 400), 'lives': 1000}], seed=2,
+                        time_limit=TIME_LIMIT)
+    _, perf_list = TrainerEnvironment({**settings, 'perf_tracker': True}).run(scenario, [SpinController()])
+    frame_time = sum(perf['total_frame_time'] for perf in perf_list) / len(perf_list)
+    observer_time = sum(perf['observers_update'] for perf in perf_list) / len(perf_list)
+    return frame_time, observer_time
+
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), 'bench.krp')
+    print(f"{'asteroids':>10} {'mode':>6} {'frame (us)':>11} {'recorded (us)':>14} {'recorder (us)':>14} "
+          f"{'share':>6} {'bytes/frame':>12} {'seek (us)':>10}")
+    for num_asteroids in (10, 50, 200):
+        for mode, settings in (('list', {}), ('store', {'vectorized_asteroids': True})):
+            frame_time, _ = run(num_asteroids, settings)
+            recorder = ReplayRecorder(path)
+            recorded_time, recorder_time = run(num_asteroids, {**settings, 'observers': [recorder]})
+
+            with ReplayPlayer(path) as player:
+                frames = [random.randrange(len(player)) for _ in range(SEEKS)]
+                start = time.perf_counter()
+                for frame in frames:
+                    player[frame]
+                seek_time = (time.perf_counter() - start) / SEEKS
+                bytes_per_frame = recorder.bytes_written / len(player)
+
+            print(f"{num_asteroids:>10} {mode:>6} {frame_time * 1e6:>11.1f} {recorded_time * 1e6:>14.1f} "
+                  f"{recorder_time * 1e6:>14.1f} {recorder_time / recorded_time:>6.1%} {bytes_per_frame:>12.0f} "
+                  f"{seek_time * 1e6:>10.1f}")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Cost of ``KesslerSession.snapshot()`` and ``restore()`` against world size, with and without the asteroid store.
+
+Each world is stepped for a few frames with the ship firing and dropping mines so bullets and mines are in play, then
+snapshots and restores are timed. A 15 frame rollout is also replayed from the snapshot to check it is reproduced.
+
+Run from the repository root with ``python -m benchmarks.bench_snapshot``
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+
+from kesslergame import Scenario, TrainerEnvironment, KesslerSession
+
+REPEATS = 200
+ROLLOUT_FRAMES = 15
+
+
+def actions(session: KesslerSession, frame: int) -> List[Tuple[float, float, bool, bool]]:
+    return [(240.0, 90.0, True, frame % 40 == 0) for _ in session.ships]
+
+
+def rollout(session: KesslerSession) -> List[Any]:
+    frames = []
+    for frame in range(ROLLOUT_FRAMES):
+        game_state, events, done, _ = session.step(actions(session, frame))
+        frames.append((len(game_state['asteroids']), len(game_state['bullets']), events['deaths'], done))
+        if done:
+            break
+    return frames
+
+
+def measure(num_asteroids: int, settings: Dict[str, Any]) -> Tuple[float, float, bool]:
+    session = TrainerEnvironment(settings).session()
+    scenario = Scenario(num_asteroids=num_asteroids, ship_states=[{'position': (500, 400), 'lives': 50, 'mines_remaining': 5}],
+                        seed=1, time_limit=60)
+    session.reset(scenario)
+    for frame in range(30):
+        session.step(actions(session, frame))
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        snapshot = session.snapshot()
+    t_snapshot = (time.perf_counter() - start) / REPEATS
+
+    reference = rollout(session)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        session.restore(snapshot)
+    t_restore = (time.perf_counter() - start) / REPEATS
+
+    return t_snapshot, t_restore, rollout(session) == reference
+
+
+def main() -> None:
+    print(f"{'asteroids':>10} {'mode':>8} {'snapshot (us)':>14} {'restore (us)':>13} {'rollout reproduced':>19}")
+    for num_asteroids in (10, 100, 1000, 5000):
+        for mode, settings in (('list', {}), ('store', {'vectorized_asteroids': True})):
+            t_snapshot, t_restore, reproduced = measure(num_asteroids, settings)
+            print(f"{num_asteroids:>10} {mode:>8} {t_snapshot * 1e6:>14.1f} {t_restore * 1e6:>13.1f} {str(reproduced):>19}")
+
+
+if __name__ == '__main__':
+    main()
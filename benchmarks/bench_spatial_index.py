@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Time to build a ``SpatialIndex`` and to run the controller's queries through it (3 nearest within 250 for the
+targeting system, the 30 degree cone of ``TriangleFind(30, 200)``, a 250 radius) against scanning every asteroid,
+on the default map and on a map that grows with the asteroid count so the density near the ship stays the same.
+
+Run from the repository root with ``python -m benchmarks.bench_spatial_index``
+"""
+
+import time
+
+import numpy as np
+
+from module.nearest import nearest_k
+from module.spatial_index import SpatialIndex
+from module.triangle_find import cone_find
+
+MAP_SIZE = np.array([1000.0, 800.0])
+CONE = (30.0, 373.2)
+
+
+def timed(function, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def scan_radius(positions: np.ndarray, center: np.ndarray, size: np.ndarray, radius: float) -> np.ndarray:
+    offsets = (positions - center + 0.5 * size) % size - 0.5 * size
+    return np.flatnonzero(np.hypot(offsets[:, 0], offsets[:, 1]) <= radius)
+
+
+def scan_cone(positions: np.ndarray, center: np.ndarray, size: np.ndarray, heading: float) -> np.ndarray:
+    return cone_find((positions - center + 0.5 * size) % size - 0.5 * size, heading, *CONE)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'asteroids':>10} {'map':>13} {'build':>6} {'nearest':>8} {'scan':>6} {'cone':>6} {'scan':>6} "
+          f"{'radius':>7} {'scan':>6}   (us)")
+    for count in (100, 1000, 10000):
+        for name, size in (("default", MAP_SIZE), ("same density", MAP_SIZE * np.sqrt(count / 30))):
+            positions = rng.uniform(0.0, 1.0, (count, 2)) * size
+            center = rng.uniform(0.0, 1.0, 2) * size
+            heading = float(rng.uniform(0.0, 360.0))
+            repeats = max(20, 20000 // count)
+            index = SpatialIndex(positions, tuple(size))
+
+            # The index gives the same asteroids as the scans
+            assert np.array_equal(index.query_cone(center, heading, *CONE), scan_cone(positions, center, size, heading))
+            assert np.array_equal(index.query_radius(center, 250.0)[0], scan_radius(positions, center, size, 250.0))
+
+            times = [
+                timed(lambda: SpatialIndex(positions, tuple(size)), repeats),
+                timed(lambda: index.nearest_k(center, 3, 250.0), repeats),
+                timed(lambda: nearest_k(center, positions, 3, 250.0, tuple(size)), repeats),
+                timed(lambda: index.query_cone(center, heading, *CONE), repeats),
+                timed(lambda: scan_cone(positions, center, size, heading), repeats),
+                timed(lambda: index.query_radius(center, 250.0), repeats),
+                timed(lambda: scan_radius(positions, center, size, 250.0), repeats),
+            ]
+            print(f"{count:>10} {name:>13} " + " ".join(f"{t * 1e6:>{w}.0f}"
+                                                       for t, w in zip(times, (6, 8, 6, 6, 6, 7, 6))))
+
+
+if __name__ == '__main__':
+    main()
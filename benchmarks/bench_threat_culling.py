@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Threat evaluation time per frame with ``TargetingSystem`` evaluating every asteroid and with culling, which only
+evaluates the asteroids inside the ``ThreatRegion`` derived from the threat FIS. Frames of random asteroids around a
+ship in the middle of the map are scored with the lookup table the controller uses, with the live NumPy Mamdani engine
+and with the scikit-fuzzy simulation. Prints the share of asteroids culled and the frames whose threats differ from a
+full evaluation, and checks the region against the lookup table: a cell outside the region whose corners reach the
+cutoff would be missed.
+
+Run from the repository root with ``python -m benchmarks.bench_threat_culling``
+"""
+
+import time
+import warnings
+from typing import List
+
+import numpy as np
+
+from module.frame_context import FrameContext
+from module.threat_system import THREAT_CUTOFF, TargetingSystem
+
+MAP_SIZE = (1000.0, 800.0)
+
+
+class EngineScorer:
+    """ Scores with the live Mamdani engine, in place of TargetingSystem's lookup table"""
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+
+    def evaluate(self, distances, angles) -> np.ndarray:
+        return self.engine.compute(default=0.0, distance=distances, angle=angles)["threat_level"]
+
+    def refresh(self) -> bool:
+        return False
+
+
+class SimulationScorer(EngineScorer):
+    """ Scores all asteroids in one call of the scikit-fuzzy simulation"""
+
+    def evaluate(self, distances, angles) -> np.ndarray:
+        self.engine.input["distance"] = np.asarray(distances, dtype=np.float64)
+        self.engine.input["angle"] = np.asarray(angles, dtype=np.float64)
+        self.engine.compute()
+        return np.atleast_1d(np.asarray(self.engine.output["threat_level"], dtype=np.float64))
+
+
+def frames(count: int, num_frames: int, rng: np.random.Generator) -> List[FrameContext]:
+    contexts = []
+    for _ in range(num_frames):
+        positions = rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE
+        velocities = rng.uniform(-150.0, 150.0, (count, 2))
+        context = FrameContext((500.0, 400.0), (0.0, 0.0), 0.0, positions, velocities, map_size=MAP_SIZE)
+        # Computed once per frame for the whole controller, so kept out of the timings
+        context.approach_angles
+        contexts.append(context)
+    return contexts
+
+
+def replay(contexts: List[FrameContext], targeting: TargetingSystem) -> (float, List[dict]):
+    threats = []
+    start = time.perf_counter()
+    for context in contexts:
+        threats.append(targeting.evaluate(context)[0])
+    return (time.perf_counter() - start) / len(contexts), threats
+
+
+def main() -> None:
+    warnings.simplefilter("ignore")
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    targeting = TargetingSystem(cull=True)
+    region = targeting.create_threat_region
+    build = time.perf_counter() - start
+    table = targeting._surface.table
+    corners = np.maximum.reduce([table[:-1, :-1], table[1:, :-1], table[:-1, 1:], table[1:, 1:]])
+    print(f"region: {region.cells.mean():.1%} of cells kept, reach {region.reach:.0f}, "
+          f"{np.count_nonzero((corners >= THREAT_CUTOFF) & ~region.cells)} cells missed, built in {build * 1e3:.0f} ms")
+
+    print(f"{'asteroids':>10} {'scorer':>7} {'full (us)':>10} {'culled (us)':>12} {'culled':>7} {'frames differ':>14}")
+    for count in (10, 30, 100, 1000):
+        for scorer in ("table", "engine", "skfuzzy"):
+            full = TargetingSystem()
+            culled = TargetingSystem(cull=True)
+            num_frames = 300
+            if scorer == "skfuzzy":
+                num_frames = 20
+                full._surface = SimulationScorer(full.create_thread_fis)
+                culled._surface = SimulationScorer(culled.create_thread_fis)
+            elif scorer == "engine":
+                full._surface = EngineScorer(full.create_threat_engine)
+                culled._surface = EngineScorer(culled.create_threat_engine)
+            contexts = frames(count, num_frames, rng)
+            for targeting in (full, culled):
+                replay(contexts[:5], targeting)
+
+            t_full, expected = replay(contexts, full)
+            t_culled, found = replay(contexts, culled)
+            differ = sum(set(a) != set(b) for a, b in zip(expected, found))
+            share = culled.culled / (culled.culled + culled.evaluated)
+            print(f"{count:>10} {scorer:>7} {t_full * 1e6:>10.1f} {t_culled * 1e6:>12.1f} {share:>7.0%} "
+                  f"{differ:>8}/{num_frames:<5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Time per ``Controller.actions`` call with the threats evaluated the way the controller used to (a new
+``ThreadPoolExecutor`` and ``multiprocessing.Queue`` every frame), and with the persistent ``ThreatPipeline``
+synchronously and speculatively. Also prints the pipeline's per stage latency and speculation hit rate.
+
+Run from the repository root with ``python -m benchmarks.bench_threat_pipeline``, with kesslergame installed as for
+``game.py``
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Queue
+from typing import List, Tuple
+
+from kesslergame import Scenario, TrainerEnvironment
+from controller import Controller
+
+
+class PerFramePool:
+    """ Evaluates the threats as Controller.actions did before the pipeline"""
+
+    def __init__(self, threat_system) -> None:
+        self.threat_system = threat_system
+
+    def evaluate(self, ship_state, game_state, context=None):
+        self.threat_system.update(ship_state, game_state)
+        result_queue = Queue()
+        with ThreadPoolExecutor(max_workers=12, thread_name_prefix="ThreatSystem") as executor:
+            future = executor.submit(lambda: result_queue.put(self.threat_system.get_threats_ids))
+        future.result()
+        ids = result_queue.get()
+        result_queue.close()
+        return ids, self.threat_system.distances
+
+    def prefetch(self, *args) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def run(mode: str, seed: int) -> Tuple[Controller, List[float]]:
+    scenario = Scenario(name="Threat pipeline benchmark", num_asteroids=30, map_size=(1000, 800), time_limit=20,
+                        ship_states=[{"position": (500, 400), "lives": 99}], seed=seed)
+    controller = Controller(speculate_threats=(mode == "speculative"))
+    if mode == "per-frame pool":
+        controller.threat_pipeline = PerFramePool(controller.threat_system)
+    _, perf_list = TrainerEnvironment(settings={"perf_tracker": True}).run(scenario=scenario, controllers=[controller])
+    controller.close()
+    return controller, [perf_dict['controller_times'][0] for perf_dict in perf_list]
+
+
+def main() -> None:
+    print(f"{'mode':>15} {'actions (us)':>13} {'game (s)':>9}")
+    for mode in ("per-frame pool", "sync", "speculative"):
+        times = []
+        start = time.perf_counter()
+        for seed in range(3):
+            controller, controller_times = run(mode, seed)
+            times += controller_times
+        print(f"{mode:>15} {sum(times) / len(times) * 1e6:>13.0f} {time.perf_counter() - start:>9.2f}")
+
+        if mode != "per-frame pool":
+            pipeline = controller.threat_pipeline
+            print(f"{'':>15} last game: {pipeline.hits} speculative hits, {pipeline.misses} misses")
+            for stage, latency in pipeline.latency().items():
+                if latency["count"]:
+                    print(f"{'':>15} {stage:>10} {latency['mean'] * 1e6:>8.1f} us mean {latency['max'] * 1e6:>8.0f} us max")
+
+
+if __name__ == '__main__':
+    main()
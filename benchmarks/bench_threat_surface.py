@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Threat levels from the live threat FIS, one ``compute()`` per asteroid, against the ``ThreatSurface`` lookup table
+used by ``TargetingSystem``. Also reports the table's build time, and the interpolation error sampled at the cell
+centres, for a few grid resolutions.
+
+Run from the repository root with ``python -m benchmarks.bench_threat_surface``
+"""
+
+import time
+
+import numpy as np
+
+from module.threat_system import TargetingSystem
+from module import threat_surface
+from module.threat_surface import ThreatSurface
+
+
+def main() -> None:
+    targeting = TargetingSystem()
+    fis = targeting.create_thread_fis
+
+    print(f"{'resolution':>11} {'build (s)':>10} {'sampled error':>14}")
+    for resolution in ((46, 46), (91, 91), (181, 181)):
+        # Drop the tables compiled so far and skip the disk cache so that each resolution is timed from scratch
+        threat_surface._SURFACES.clear()
+        start = time.perf_counter()
+        surface = ThreatSurface(lambda: targeting.create_thread_fis, resolution=resolution, cache_dir=None)
+        print(f"{resolution[0]:>5}x{resolution[1]:<5} {time.perf_counter() - start:>10.2f} {surface.sampled_error:>14.4f}")
+
+    rng = np.random.default_rng(0)
+    surface = targeting._surface
+    print(f"\n{'asteroids':>10} {'live FIS (ms)':>14} {'table (ms)':>11} {'speedup':>9} {'max diff':>9}")
+    for count in (10, 30, 100, 300):
+        distances = rng.uniform(0.0, 900.0, count)
+        angles = rng.uniform(0.0, 180.0, count)
+
+        start = time.perf_counter()
+        expected = np.empty(count)
+        for i in range(count):
+            fis.input["distance"] = distances[i]
+            fis.input["angle"] = angles[i]
+            fis.compute()
+            expected[i] = fis.output["threat_level"]
+        t_fis = time.perf_counter() - start
+
+        start = time.perf_counter()
+        threat = surface.evaluate(distances, angles)
+        t_table = time.perf_counter() - start
+
+        print(f"{count:>10} {t_fis * 1e3:>14.2f} {t_table * 1e3:>11.3f} {t_fis / t_table:>8.0f}x "
+              f"{np.max(np.abs(threat - expected)):>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
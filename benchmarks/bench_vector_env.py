@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+N sequential ``TrainerEnvironment.run`` calls against one ``VectorKesslerGame.run`` over the same N small seeded worlds.
+
+Every world gets its own cheap deterministic controller, so the timings are dominated by the engine. The scores of
+both runs are compared to check that the lockstep envs play out the same as the sequential runs. Both are timed with
+game_state dictionaries and with the lazy views of ``lazy_game_state``.
+
+Run from the repository root with ``python -m benchmarks.bench_vector_env``
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+
+from kesslergame import Scenario, TrainerEnvironment, KesslerController, Score
+from kesslergame.vector_env import VectorKesslerGame
+
+NUM_ASTEROIDS = 15
+TIME_LIMIT = 20.0
+
+
+class SpinController(KesslerController):
+    """ Thrusts, turns at a fixed rate and fires whenever possible"""
+    def __init__(self, turn_rate: float) -> None:
+        self.turn_rate = turn_rate
+
+    def actions(self, ship_state: Dict[str, Any], game_state: Dict[str, Any]) -> Tuple[float, float, bool, bool]:
+        return 120.0, self.turn_rate, True, False
+
+    @property
+    def name(self) -> str:
+        return "Spin Controller"
+
+
+def make_scenario(idx: int) -> Scenario:
+    return Scenario(name=f"World {idx}", num_asteroids=NUM_ASTEROIDS, ship_states=[{'position': (500, 400), 'lives': 3}],
+                    seed=idx, time_limit=TIME_LIMIT)
+
+
+def make_controllers(idx: int) -> List[KesslerController]:
+    return [SpinController(30.0 + 2.0 * (idx % 64))]
+
+
+def summary(score: Score) -> List[Tuple[int, int, int, int]]:
+    return [(team.asteroids_hit, team.bullets_hit, team.shots_fired, team.deaths) for team in score.teams]
+
+
+def main() -> None:
+    print(f"{'envs':>5} {'lazy':>5} {'sequential (s)':>15} {'vectorized (s)':>15} {'speedup':>8} {'identical':>10}")
+    for num_envs in (16, 64, 128):
+        for lazy in (False, True):
+            settings = {'lazy_game_state': lazy}
+            start = time.perf_counter()
+            sequential = [TrainerEnvironment(settings=settings).run(make_scenario(idx), make_controllers(idx))[0]
+                          for idx in range(num_envs)]
+            t_sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vectorized, _ = VectorKesslerGame(settings=settings).run([make_scenario(idx) for idx in range(num_envs)],
+                                                                     [make_controllers(idx) for idx in range(num_envs)])
+            t_vectorized = time.perf_counter() - start
+
+            identical = all(summary(a) == summary(b) and a.stop_reason == b.stop_reason and a.sim_time == b.sim_time
+                            for a, b in zip(sequential, vectorized))
+            print(f"{num_envs:>5} {str(lazy):>5} {t_sequential:>15.3f} {t_vectorized:>15.3f} "
+                  f"{t_sequential / t_vectorized:>7.2f}x {str(identical):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,83 +6,83 @@
 from kesslergame import KesslerController
 from typing import Dict, Tuple
 from module.threat_system import TargetingSystem
+from module.threat_pipeline import ThreatPipeline
+from module.frame_context import FrameContext
+from module.asteroid_tracker import AsteroidTracker
 from module.pathfinding import PathFinding
 from actions.shoot import Shoot
 from actions.dodge import Dodge
+from module.dodge_planner import DodgePlanner
 from module.triangle_find import TriangleFind
 from module.action_list import ActionList, action_type
-from multiprocessing import Queue
-from concurrent.futures import ThreadPoolExecutor
 
 # The TestController class is a game character controller that determines the actions to be taken by a
 # ship in a game based on the current ship state and game state.
 class Controller(KesslerController):
-    def __init__(self):
+    def __init__(self, decision_interval=1, speculate_threats=False, cull_threats=False, plan_dodges=False):
         '''The function initializes various components of a game character, including a targeting system,
         pathfinding, shooting, dodging, and an action list.
 
+        :param decision_interval: number of frames between calls to actions(); the engine holds the last
+        command in between, which cuts the time spent in the threat system on long runs
+        :param speculate_threats: evaluate the threats of the next call on a worker thread while the engine
+        runs physics, instead of synchronously in actions() (see module/threat_pipeline.py)
+        :param cull_threats: skip the asteroids outside the part of the distance x angle space where the
+        threat FIS can reach a threat (see module/threat_region.py)
+        :param plan_dodges: dodge with the maneuver planner, which rolls out a library of thrust and turn
+        maneuvers against the predicted asteroid paths (see module/dodge_planner.py), instead of the dodge
+        formula. It costs several times the formula per call
         '''
+        self.decision_interval = decision_interval
         self.eval_frames = 0
-        self.threat_system = TargetingSystem()
+        self.threat_system = TargetingSystem(cull=cull_threats)
+        self.threat_pipeline = ThreatPipeline(self.threat_system, speculate=speculate_threats)
+        self.asteroid_tracker = AsteroidTracker()
         self.pathFinding = PathFinding()
         self.shoot = Shoot()
-        self.dodge = Dodge()
+        self.dodge = Dodge(DodgePlanner() if plan_dodges else None)
         
         self.action_list = ActionList()  # CURRENT ONLY WORKS WITH DODGE
         self.jobs = []
 
-        # input the width and angle of the triangle
+        # input the width and angle of the triangle. Only the idle branch of actions() looks in it, and that
+        # branch is disabled, so neither triangle_find nor cone_find runs in a game yet. Use cone_find on
+        # the frame's FrameContext when it is enabled
         self.idle = TriangleFind(30, 200)
     
-    def get_ids(self, result_queue):
-        """
-        The function "get_ids" retrieves threat IDs from the threat system and puts them into a result
-        queue.
-        
-        :param result_queue: The `result_queue` parameter is a queue object that is used to store the
-        result of the `get_ids` method. It allows the method to pass the `ids` variable to another part
-        of the code for further processing or retrieval
-        """
-        ids = self.threat_system.get_threats_ids
-        result_queue.put(ids)
-
     def actions(self, ship_state: Dict, game_state: Dict) -> Tuple[float, float, bool, bool]:
      # The `actions` function is a method that is called at each time step by a controller. It
      # determines the actions to be taken by a ship in a game based on the current ship state and game
      # state.
 
-        # THIS VALUE IS HARD CODED DUE TO ME NOT BEING ABLE TO UNDERSTAND HOW TO GET IT
-        # FROM KESSLERGAME
-        deltatime = 1.0/30.0
+        # time until the next call, the engine holds this command for decision_interval frames
+        deltatime = game_state.get('delta_time', 1.0/30.0) * self.decision_interval
         fire = False
         drop_mine = False
         turn_rate = 0
         thrust = 0
         new_turn_rate = 0
         asteroids = game_state['asteroids']
-        self.threat_system.update(ship_state, game_state)
-
-        ids = {}
-        
-        # Initialize a queue to store results
-        result_queue = Queue()
 
-        # Use ThreadPoolExecutor for concurrent execution in the ThreatSystem
-        with ThreadPoolExecutor(max_workers=12, thread_name_prefix="ThreatSystem") as executor:
-            # Submit a task to retrieve IDs asynchronously
-            future = executor.submit(self.get_ids, result_queue)
+        # Geometry between the ship and every asteroid, shared by the threat system, shoot and dodge
+        context = FrameContext.from_state(ship_state, game_state)
 
-        # Wait for the task to complete and retrieve the results
-        future.result()
-        ids = result_queue.get()
+        # Stable asteroid IDs, so the per asteroid caches survive asteroids being destroyed or split
+        self.asteroid_tracker.update(context, game_state.get('delta_time', 1.0/30.0), game_state['map_size'],
+                                     self.decision_interval)
+        self.asteroid_tracker.prune(self.dodge.pathFinding.paths)
+        self.action_list.drop(self.asteroid_tracker.lost.tolist())
 
-        # Close the result queue after processing
-        result_queue.close()
+        # Threat ids and close asteroid distances, kept by the pipeline across frames
+        ids, self.threat_system.distances = self.threat_pipeline.evaluate(ship_state, game_state, context)
 
         if len(self.threat_system.distances.keys()) > 0:
             first_index = list(self.threat_system.distances.keys())[0]
         else:
-            first_index = 0
+            # no close threats, go for the asteroid that can be hit soonest
+            first_index = self.shoot.best_target(context, ship_state)
+            if first_index is None:
+                first_index = 0
         
 
 
@@ -93,7 +93,7 @@ class Controller(KesslerController):
         # if len(ids) > 0 :
 
         shootingData = self.shoot.shoot_at(game_state["asteroids"][first_index],
-                                            ship_state, first_index)
+                                            ship_state, first_index, context)
         # print(f"IDS: {self.threat_system.distances}")
 
         # INSERT FUZZY LOGIC HERE LATER, (SHOOT OR DODGE)
@@ -102,8 +102,8 @@ class Controller(KesslerController):
 
 
         # if the action list is empty then try to append shooting action
-        if (self.action_list.is_empty()):
-            self.action_list.take_action(action_type.Shoot, first_index)
+        if (self.action_list.is_empty()) and len(context) > 0:
+            self.action_list.take_action(action_type.Shoot, int(context.ids[first_index]))
 
         # get shooting data based on action
 
@@ -117,7 +117,8 @@ class Controller(KesslerController):
         
 
         dodgingData = self.dodge.take_action(
-            ship_state, asteroids, self.threat_system.distances, ids)
+            ship_state, asteroids, self.threat_system.distances, ids, context,
+            game_state.get('delta_time', 1.0/30.0))
         
         # print("DODGING: " , dodgingData[2])
         # if data returned then turn
@@ -140,7 +141,8 @@ class Controller(KesslerController):
             self.action_list.take_action(action_type.Dodge, ID)
             thrust = dodgingData[0] 
             
-            new_turn_rate += dodgingData[1] / 2
+            # planned maneuvers were rolled out at their full turn rate
+            new_turn_rate += dodgingData[1] if self.dodge.planner is not None else dodgingData[1] / 2
                 
                 
             if (dodgingData[2]):
@@ -232,6 +234,9 @@ class Controller(KesslerController):
         self.shoot.update(deltatime)
         self.threat_system.distances = {}
 
+        # Start on the threats of the next call while the engine moves everything
+        self.threat_pipeline.prefetch(ship_state, game_state, thrust, turn_rate, self.decision_interval)
+
         self.eval_frames += 1
         # turn_rate = 0
         # thrust = 0
@@ -245,6 +250,12 @@ class Controller(KesslerController):
 
         return thrust, turn_rate, fire, drop_mine
 
+    def close(self):
+        '''Stops the threat pipeline's worker thread. The controller can still be used afterwards, the
+        worker is started again on the next speculative evaluation.
+        '''
+        self.threat_pipeline.close()
+
     @property
     def name(self) -> str:
         return "Fuzzifiers"
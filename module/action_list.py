@@ -26,7 +26,7 @@ class ActionList:
 
         Args:
             action (action_type): An enum denoting the action to be taken
-            ID (int): An integer denoting the index of the asteroid in the asteroid list
+            ID (int): The stable ID of the asteroid from AsteroidTracker
             actionData (tuple): A tuple containing the data for said action,
             EX: Shoot (turn_rate, bool), dodge (turn_rate, thrust, etc)
             urgent (bool): A flag that sets the action as important or not, auto false
@@ -92,6 +92,18 @@ class ActionList:
         else:
             return None
 
+    def drop(self, IDs):
+        '''Removes the actions on asteroids that no longer exist
+
+        Args:
+            IDs (iterable): Stable IDs of the asteroids that are gone
+
+        Returns: N/A
+        '''
+        gone = set(IDs)
+        if gone:
+            self.actions = [action for action in self.actions if action.ID not in gone]
+
     def is_empty(self):
         '''Returns a bool depending on the state of the action list
 
@@ -3,54 +3,131 @@ Filename: action_select
 Author: David Mann (david.mann@digipen.edu)
 
 '''
-from state import State
-from typing import Dict
+from module.state import State
+from module.fuzzy_engine import MamdaniEngine, FuzzyRule
+from typing import Dict, List, Tuple
+import math
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl 
+
+# Sets for the action FIS, all angles in degrees
+DISTANCE_SETS = {
+    "close": [0.0, 0.0, 300.0],
+    "near": [150.0, 400.0, 650.0],
+    "far": [500.0, 1000.0, 1000.0],
+}
+TURN_ANGLE_SETS = {
+    "small": [0.0, 0.0, 30.0],
+    "medium": [15.0, 60.0, 105.0],
+    "high": [90.0, 180.0, 180.0],
+}
+ANGLE_TO_SHIP_SETS = {
+    "small": [0.0, 0.0, 45.0],
+    "medium": [30.0, 90.0, 150.0],
+    "high": [120.0, 180.0, 180.0],
+}
+ACTION_SETS = {
+    "dodge": [-1.0, -1.0, 0.0],
+    "idle": [-0.5, 0.0, 0.5],
+    "shoot": [0.0, 1.0, 1.0],
+}
+
+# Action values
+DODGE = -1
+IDLE = 0
+SHOOT = 1
+
 
 class AsteroidFits:
-    def __init__(self) -> None:
-        self.distance
-        self.turn_angle
-        self.angle_to_ship
-    
+    def __init__(self, distance: float, turn_angle: float, angle_to_ship: float) -> None:
+        self.distance = distance
+        self.turn_angle = turn_angle
+        self.angle_to_ship = angle_to_ship
+
+
+def Asteroid_Fit(asteroid: Dict, ship_state: Dict) -> AsteroidFits:
+    '''
+    Desc: Inputs of the action FIS for one asteroid
+
+    Parameters: asteroid - asteroid state from game_state
+                ship_state - ship state from kessler_game
+
+    Returns: distance to the ship, how far the ship has to turn to face the
+        asteroid, and the angle between the asteroid's velocity and the
+        asteroid to ship vector (0 = coming straight at the ship)
+    '''
+    dx = asteroid['position'][0] - ship_state['position'][0]
+    dy = asteroid['position'][1] - ship_state['position'][1]
+    distance = math.hypot(dx, dy)
 
-def State_Fit(state:State):
+    turn_angle = abs((math.degrees(math.atan2(dy, dx)) - ship_state['heading'] + 180.0) % 360.0 - 180.0)
 
+    vx, vy = asteroid['velocity']
+    speed = math.hypot(vx, vy)
+    if distance == 0.0 or speed == 0.0:
+        angle_to_ship = 90.0
+    else:
+        cosine = (-dx * vx - dy * vy) / (distance * speed)
+        angle_to_ship = math.degrees(math.acos(max(-1.0, min(1.0, cosine))))
+
+    return AsteroidFits(distance, turn_angle, angle_to_ship)
+
+
+def Create_Action_Engine() -> MamdaniEngine:
     '''
-    rules 
+    rules
     -1 = dodge
-    0 = idle 
+    0 = idle
     1 = shoot
 
     small turn_angle = shoot
     close distance + small angle_to_ship = dodge
     far distance + high turn_angle = idle
-
-    highest absolute value = target
     '''
+    return MamdaniEngine(
+        inputs={"distance": DISTANCE_SETS, "turn_angle": TURN_ANGLE_SETS, "angle_to_ship": ANGLE_TO_SHIP_SETS},
+        outputs={"action": ACTION_SETS},
+        rules=[
+            FuzzyRule({"turn_angle": "small"}, "action", "shoot"),
+            FuzzyRule({"distance": "close", "angle_to_ship": "small"}, "action", "dodge"),
+            FuzzyRule({"distance": "far", "turn_angle": "high"}, "action", "idle"),
+        ],
+    )
 
-    asteroid1:AsteroidFits
-    asteroid2:AsteroidFits
-    asteroid3:AsteroidFits
 
+_ACTION_ENGINE = Create_Action_Engine()
 
-    asteroid1.distance = ctrl.Antecedent
-    asteroid2.distance = ctrl.Antecedent
-    asteroid3.distance = ctrl.Antecedent
 
-    asteroid1.turn_angle = ctrl.Antecedent(np.arange(-180, 180, 1), "turn angle1")
-    asteroid2.turn_angle = ctrl.Antecedent(np.arange(-180, 180, 1), "turn angle2")
-    asteroid3.turn_angle = ctrl.Antecedent(np.arange(-180, 180, 1), "turn angle3")
+def State_Fit(state: State) -> Tuple[List[AsteroidFits], np.ndarray]:
+    '''
+    Desc: Runs the action FIS for the (up to) three asteroids in the state,
+        all in one engine call. An asteroid no rule applies to scores 0 (idle)
 
-    asteroid1.angle_to_ship = ctrl.Antecedent(np.arange(-180, 180, 1), "ship path1")
-    asteroid2.angle_to_ship = ctrl.Antecedent(np.arange(-180, 180, 1), "ship path2")
-    asteroid3.angle_to_ship = ctrl.Antecedent(np.arange(-180, 180, 1), "ship path3")
+    Returns: the inputs per asteroid and their action values, -1 (dodge) to 1 (shoot)
+    '''
+    fits = [Asteroid_Fit(asteroid, state.ship) for asteroid in state.asteroids]
+    if not fits:
+        return fits, np.zeros(0)
+
+    actions = _ACTION_ENGINE.compute(
+        default=0.0,
+        distance=[fit.distance for fit in fits],
+        turn_angle=[fit.turn_angle for fit in fits],
+        angle_to_ship=[fit.angle_to_ship for fit in fits],
+    )["action"]
+    return fits, actions
 
-    
 
-    state.asteroids[0]
+def Action_Select(state: State) -> Tuple[int, int]:
+    '''
+    Desc: Picks the asteroid with the highest absolute action value as
+        the target
 
-def Action_Select(state: State):
+    Returns: index of the target in state.asteroids (-1 if there is none)
+        and the action to take on it (DODGE, IDLE or SHOOT)
+    '''
+    _, actions = State_Fit(state)
+    if len(actions) == 0:
+        return -1, IDLE
 
+    target = int(np.argmax(np.abs(actions)))
+    return target, int(np.rint(actions[target]))
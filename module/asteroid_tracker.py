@@ -0,0 +1,222 @@
+'''
+Filename: asteroid_tracker
+Date: 10/18/26
+
+Desc: Gives asteroids IDs that stay the same across frames. kessler_game
+only lists asteroids by index, and indices shift whenever an asteroid
+is destroyed or split. Each frame's asteroids are matched to where the
+previous frame's asteroids should be now, on a grid, so per-asteroid
+caches can be keyed on the ID instead of the index
+
+'''
+import numpy as np
+
+from typing import Dict, Optional, Tuple
+from module.frame_context import FrameContext, predict_asteroids
+
+
+class AsteroidTracker:
+    """
+    Desc: Matches the asteroids of each frame to the previous frame's,
+        moved forward by their velocity and wrapped around the map. An
+        asteroid keeps its ID while it is within position_tolerance of
+        where it was predicted and its velocity has not changed. Split
+        children and new asteroids get new IDs
+    """
+    def __init__(self, position_tolerance: float = 1.0, velocity_tolerance: float = 1e-6, cell_size: float = 32.0):
+        '''
+        Parameters: position_tolerance - Largest distance between an asteroid and its
+                        predicted position for the two to match
+                    velocity_tolerance - Largest change in velocity for the two to match
+                    cell_size - Size of the grid cells the predicted positions are
+                        bucketed into, raised to twice position_tolerance if smaller
+        '''
+        self.position_tolerance = position_tolerance
+        self.velocity_tolerance = velocity_tolerance
+        self.cell_size = cell_size
+
+        # IDs of the current frame's asteroids, by index
+        self.ids = np.empty(0, dtype=np.int64)
+        # IDs that appeared and disappeared in the last update
+        self.born = np.empty(0, dtype=np.int64)
+        self.lost = np.empty(0, dtype=np.int64)
+
+        self.__next_id = 0
+        self.__positions = np.empty((0, 2))
+        self.__velocities = np.empty((0, 2))
+        self.__index: Optional[Dict[int, int]] = None
+
+    def update(self, context: FrameContext, delta_time: float, map_size: Tuple[float, float],
+               frames: int = 1) -> np.ndarray:
+        '''
+        Desc: Assigns IDs to this frame's asteroids and stores them in
+            context.ids
+
+        Parameters: context - FrameContext of the current frame
+                    delta_time - Time step of the game
+                    map_size - Size of the map, asteroids wrap around its edges
+                    frames - Frames since the last update (the controller's decision interval)
+
+        Returns: (N,) IDs, in the order of the context's asteroids
+        '''
+        predicted = predict_asteroids(self.__positions, self.__velocities, delta_time, frames, map_size)
+        match = match_asteroids(predicted, self.__velocities, context.positions, context.velocities, map_size,
+                                self.position_tolerance, self.velocity_tolerance, self.cell_size)
+
+        matched = match >= 0
+        ids = np.empty(len(match), dtype=np.int64)
+        ids[matched] = self.ids[match[matched]]
+        new = np.count_nonzero(~matched)
+        ids[~matched] = np.arange(self.__next_id, self.__next_id + new)
+        self.__next_id += new
+
+        kept = np.zeros(len(self.ids), dtype=bool)
+        kept[match[matched]] = True
+        self.born = ids[~matched]
+        self.lost = self.ids[~kept]
+
+        self.ids = ids
+        self.__positions = context.positions
+        self.__velocities = context.velocities
+        self.__index = None
+        context.ids = ids
+        return ids
+
+    def index_of(self, asteroid_id: int) -> Optional[int]:
+        '''
+        Returns: index of an asteroid in the current frame, None if it is gone
+        '''
+        if self.__index is None:
+            self.__index = {asteroid_id: index for index, asteroid_id in enumerate(self.ids.tolist())}
+        return self.__index.get(asteroid_id)
+
+    def prune(self, cache: Dict) -> Dict:
+        '''
+        Desc: Removes the entries of asteroids that are gone from a dict
+            keyed on asteroid ID
+
+        Returns: the same dict
+        '''
+        for asteroid_id in self.lost.tolist():
+            cache.pop(asteroid_id, None)
+        return cache
+
+
+def match_asteroids(predicted: np.ndarray, predicted_velocities: np.ndarray, positions: np.ndarray,
+                    velocities: np.ndarray, map_size: Tuple[float, float], position_tolerance: float,
+                    velocity_tolerance: float, cell_size: float, skip: int = 8) -> np.ndarray:
+    '''
+    Desc: Matches asteroids to predicted asteroids. kessler_game removes
+        asteroids without reordering the rest and appends new ones, so
+        runs of asteroids line up with the predictions index for index.
+        Up to skip runs are matched directly, each skipping up to skip
+        destroyed asteroids before it. Whatever is left, like split
+        children, a frame with many asteroids destroyed or a list in
+        another order, is matched on a grid (see grid_match)
+
+    Returns: (N,) index of the matched prediction per asteroid, -1 if none
+    '''
+    count = len(positions)
+    result = np.full(count, -1, dtype=np.int64)
+    if count == 0 or len(predicted) == 0:
+        return result
+    size = np.asarray(map_size, dtype=np.float64)
+
+    def lines_up(rows, candidates) -> np.ndarray:
+        distance = wrapped_distance(positions[rows], predicted[candidates], size)
+        return (distance <= position_tolerance) & np.all(
+            np.abs(velocities[rows] - predicted_velocities[candidates]) <= velocity_tolerance, axis=1)
+
+    used = np.zeros(len(predicted), dtype=bool)
+    i = j = 0
+    for _ in range(skip):
+        n = min(count - i, len(predicted) - j)
+        aligned = lines_up(slice(i, i + n), slice(j, j + n))
+        run = n if aligned.all() else int(np.argmin(aligned))
+        result[i:i + run] = np.arange(j, j + run)
+        used[j:j + run] = True
+        i += run
+        j += run
+        if i == count or j == len(predicted):
+            break
+
+        # The next prediction the asteroid at i lines up with, the ones in between were destroyed
+        window = min(skip, len(predicted) - j - 1)
+        ahead = np.flatnonzero(lines_up(np.full(window, i), np.arange(j + 1, j + 1 + window)))
+        if len(ahead) == 0:
+            break
+        j += 1 + int(ahead[0])
+
+    if i == count or used.all():
+        return result
+    unused = np.flatnonzero(~used)
+    rest = grid_match(predicted[unused], predicted_velocities[unused], positions[i:], velocities[i:], size,
+                      position_tolerance, velocity_tolerance, cell_size)
+    result[i:] = np.where(rest >= 0, unused[np.maximum(rest, 0)], -1)
+    return result
+
+
+def grid_match(predicted: np.ndarray, predicted_velocities: np.ndarray, positions: np.ndarray,
+               velocities: np.ndarray, size: np.ndarray, position_tolerance: float,
+               velocity_tolerance: float, cell_size: float) -> np.ndarray:
+    '''
+    Desc: Nearest neighbour matching on a grid. The predicted positions are
+        bucketed into cells at least twice the tolerance wide and sorted by
+        cell, so each asteroid only has to look at its own cell and the
+        neighbours on the side of the cell it is closest to (wrapping at
+        the map edge). The cost is O(n log n) for the sort. If two
+        asteroids match the same prediction the closer one keeps it
+
+    Returns: (N,) index of the matched prediction per asteroid, -1 if none
+    '''
+    count = len(positions)
+    cells = np.maximum((size // max(cell_size, 2.0 * position_tolerance)).astype(np.int64), 1)
+    width = size / cells
+
+    predicted_cells = np.floor(predicted / width).astype(np.int64) % cells
+    keys = predicted_cells[:, 0] * cells[1] + predicted_cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    # Own cell, and the step towards the nearest neighbouring cell per axis
+    scaled = positions / width
+    own = np.floor(scaled).astype(np.int64)
+    step = np.where(scaled - own < 0.5, -1, 1)
+
+    best = np.full(count, -1, dtype=np.int64)
+    best_distance = np.full(count, np.inf)
+    for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+        neighbour = (((own[:, 0] + dx * step[:, 0]) % cells[0]) * cells[1]
+                     + (own[:, 1] + dy * step[:, 1]) % cells[1])
+        low = np.searchsorted(sorted_keys, neighbour, side="left")
+        span = np.searchsorted(sorted_keys, neighbour, side="right") - low
+
+        # Cells rarely hold more than one asteroid, so this loop is short
+        for k in range(int(span.max())):
+            rows = np.flatnonzero(span > k)
+            candidates = order[low[rows] + k]
+            distance = wrapped_distance(positions[rows], predicted[candidates], size)
+            close = ((distance <= position_tolerance) & (distance < best_distance[rows])
+                     & np.all(np.abs(velocities[rows] - predicted_velocities[candidates]) <= velocity_tolerance,
+                              axis=1))
+            best[rows[close]] = candidates[close]
+            best_distance[rows[close]] = distance[close]
+
+    # One asteroid per prediction, the closest
+    result = np.full(count, -1, dtype=np.int64)
+    matched = np.flatnonzero(best >= 0)
+    matched = matched[np.argsort(best_distance[matched], kind="stable")]
+    _, first = np.unique(best[matched], return_index=True)
+    keep = matched[first]
+    result[keep] = best[keep]
+    return result
+
+
+def wrapped_distance(a: np.ndarray, b: np.ndarray, size: np.ndarray) -> np.ndarray:
+    '''
+    Returns: distances between two (N, 2) arrays of points, the short way
+        around a map that wraps at its edges
+    '''
+    offset = np.abs(a - b)
+    offset = np.minimum(offset, size - offset)
+    return np.hypot(offset[:, 0], offset[:, 1])
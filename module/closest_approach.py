@@ -0,0 +1,153 @@
+'''
+Filename: closest_approach
+Date: 10/18/26
+
+Desc: Closest point of approach between the ship and every asteroid,
+solved analytically for all asteroids at once instead of intersecting
+shapely buffers one asteroid at a time, on an open plane or on a map
+that wraps at its edges
+
+'''
+import math
+import numpy as np
+
+from typing import Tuple
+
+
+def closest_approach(offsets: np.ndarray, velocities: np.ndarray, radii: np.ndarray,
+                     horizon: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Desc: For each asteroid moving at a constant velocity relative to the
+        ship, finds when it is closest to the ship within the next horizon
+        seconds, and whether and when it gets within radii of the ship.
+        The entry time is the first root of |p + v t| = r, a quadratic in t
+
+    Parameters: offsets - (N, 2) asteroid positions relative to the ship
+                velocities - (N, 2) asteroid velocities relative to the ship
+                radii - (N,) or scalar, sum of the asteroid and ship radii
+                horizon - How far ahead to look, in seconds
+
+    Returns: (N,) time of closest approach in [0, horizon], distance at that
+        time, whether the asteroid collides within the horizon, and the
+        time it first touches the ship (0 if already touching, NaN if it
+        does not collide)
+    '''
+    px, py = offsets[:, 0], offsets[:, 1]
+    vx, vy = velocities[:, 0], velocities[:, 1]
+    a = vx * vx + vy * vy
+    b = px * vx + py * vy
+    c = px * px + py * py - radii * radii
+
+    # Still asteroids (a == 0) are closest right away
+    with np.errstate(invalid="ignore", divide="ignore"):
+        times = np.clip(np.where(a > 0.0, -b / a, 0.0), 0.0, horizon)
+    distances = np.hypot(px + vx * times, py + vy * times)
+    collides = distances * distances <= radii * radii
+
+    # First root of a t^2 + 2 b t + c = 0, only taken where the distance at closest approach is within the radii,
+    # which also means the discriminant is not negative
+    with np.errstate(invalid="ignore", divide="ignore"):
+        entry = (-b - np.sqrt(np.maximum(b * b - a * c, 0.0))) / a
+    entry = np.where(c <= 0.0, 0.0, entry)
+    entry_times = np.where(collides, entry, np.nan)
+    return times, distances, collides, entry_times
+
+
+def _images_reached(nearest: np.ndarray, velocities: np.ndarray, horizon: float, size: np.ndarray,
+                    reach: np.ndarray) -> np.ndarray:
+    '''
+    Desc: How many images of the ship along each axis every asteroid can
+        get within reach of. Along an axis the k-th image ahead of the
+        asteroid is k maps ahead of the ship, so the asteroid gets within
+        reach of it only if it moves that far, less its offset along the
+        velocity, less the reach
+
+    Parameters: nearest - (N, 2) minimum image offsets
+                velocities, horizon - as for closest_approach
+                size - Size of the map
+                reach - (N,) distance to get within
+
+    Returns: (N, 2) number of images per axis, at least 1
+    '''
+    ahead = np.abs(velocities) * horizon + np.sign(velocities) * nearest + np.reshape(reach, (-1, 1))
+    return np.maximum(np.floor(ahead / size), 0.0).astype(np.intp) + 1
+
+
+def _tiled_closest_approach(nearest: np.ndarray, velocities: np.ndarray, radii: np.ndarray, horizon: float,
+                            size: np.ndarray, reached: np.ndarray) -> Tuple[np.ndarray, ...]:
+    '''
+    Desc: closest_approach against the images of the ship along each
+        asteroid's velocity, keeping the first image to collide, or the
+        closest one if none collides
+
+    Parameters: nearest - (N, 2) minimum image offsets
+                velocities, radii, horizon - as for closest_approach
+                size - Size of the map
+                reached - (N, 2) images to test per axis, from _images_reached
+
+    Returns: as for closest_approach
+    '''
+    # Most asteroids only reach their nearest image, so the images are listed per asteroid, one row each
+    images_per = reached[:, 0] * reached[:, 1]
+    rows = np.repeat(np.arange(len(nearest)), images_per)
+    starts = np.cumsum(images_per) - images_per
+    within = np.arange(len(rows)) - starts[rows]
+    images = np.stack(np.divmod(within, reached[rows, 1]), axis=-1)
+    # Moving towards +x, the ship's next image along x is a map width ahead, so the asteroid's offset to it is a
+    # map width less
+    ahead = -np.sign(velocities) * size
+    times, distances, collides, entry_times = closest_approach(nearest[rows] + images * ahead[rows], velocities[rows],
+                                                               radii[rows], horizon)
+    if len(rows) == 0:
+        return times, distances, collides, entry_times
+
+    # Colliding images rank by entry time, all before the others, which rank by distance. Of equal images the
+    # nearest is kept
+    rank = np.where(collides, entry_times, horizon + 1.0 + distances)
+    best = rank == np.minimum.reduceat(rank, starts)[rows]
+    kept = np.minimum.reduceat(np.where(best, np.arange(len(rows)), len(rows)), starts)
+    return times[kept], distances[kept], collides[kept], entry_times[kept]
+
+
+def wrapped_closest_approach(offsets: np.ndarray, velocities: np.ndarray, radii: np.ndarray, horizon: float,
+                             map_size: Tuple[float, float],
+                             max_distance: float = math.inf) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Desc: closest_approach on a map that wraps at its edges. Each offset
+        is first taken the short way around the map (the minimum image).
+        The asteroid is then tested against the tiled images of the map
+        around the ship, so a path that leaves one edge and comes back in
+        on the other is still seen, however many times it crosses the map
+        within the horizon. Images behind the asteroid's velocity only
+        get further away, so along each axis the images tested are the
+        nearest one and the next ones along the velocity, as many as that
+        asteroid can reach. Of those, the first to collide is kept, or the
+        closest one if none collides
+
+        An image only needs testing if the asteroid can get within the radii
+        of it, to collide, or closer than it passes the nearest image. The
+        nearest image is solved first to find that distance for each
+        asteroid, and only the asteroids that can reach further images are
+        tested against them
+
+    Parameters: offsets, velocities, radii, horizon - as for closest_approach
+                map_size - Size of the map
+                max_distance - (N,) or scalar. Distances of closest approach are
+                    exact up to it, images that cannot come that close are
+                    skipped, so a larger distance is only known to be beyond it
+
+    Returns: as for closest_approach, for the kept image of each asteroid
+    '''
+    size = np.asarray(map_size, dtype=np.float64)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (len(offsets),))
+    nearest = (offsets + 0.5 * size) % size - 0.5 * size
+    result = closest_approach(nearest, velocities, radii, horizon)
+    reached = _images_reached(nearest, velocities, horizon, size,
+                              np.maximum(np.minimum(result[1], max_distance), radii))
+    # Asteroids that can only reach the nearest image are done
+    tiled = np.flatnonzero((reached > 1).any(axis=1))
+    if len(tiled):
+        for values, found in zip(result, _tiled_closest_approach(nearest[tiled], velocities[tiled], radii[tiled],
+                                                                 horizon, size, reached[tiled])):
+            values[tiled] = found
+    return result
@@ -11,6 +11,8 @@ from typing import Dict, Tuple
 import math
 import numpy as np
 
+from module.frame_context import FrameContext
+
 class Position:
     """
     Desc: Class that contains positional data
@@ -41,9 +43,30 @@ class AsteroidData:
         self.pos:  Position = None
         self.__velocity = None
         self.__vector_to_ship = None
+        self.__speed = None
+        self.__distance = None
         self.__ship = None
         self.update(asteroid, ship_state)
 
+    @classmethod
+    def from_context(cls, context: FrameContext, index: int) -> "AsteroidData":
+        '''
+        Desc: AsteroidData of one asteroid, read from the frame's
+            FrameContext instead of recomputed
+
+        Parameters: context - FrameContext of the current frame
+                    index - Index of the asteroid in game_state["asteroids"]
+        '''
+        data = cls.__new__(cls)
+        data.__ship = None
+        data.__velocity = (float(context.velocities[index, 0]), float(context.velocities[index, 1]))
+        data.pos = Position((float(context.positions[index, 0]), float(context.positions[index, 1])))
+        data.__vector_to_ship = (float(context.to_ship[index, 0]), float(context.to_ship[index, 1]))
+        data.__angle = float(context.approach_angles[index])
+        data.__speed = float(context.speeds[index])
+        data.__distance = float(context.distances[index])
+        return data
+
     @property
     def angle(self) -> float:
         return self.__angle
@@ -60,6 +83,14 @@ class AsteroidData:
     def vector_to_ship(self):
         return self.__vector_to_ship
 
+    @property
+    def speed(self) -> float:
+        return self.__speed
+
+    @property
+    def distance(self) -> float:
+        return self.__distance
+
     def update(self, asteroid: Dict, ship_state: Dict):
         '''
         Desc: Updates the current data in the AsteroidData class
@@ -94,6 +125,8 @@ class AsteroidData:
         # Update variables
         self.__vector_to_ship = vector_to_ship
         self.__angle = math.degrees(angle)
+        self.__speed = np.linalg.norm(self.__velocity)
+        self.__distance = math.dist(self.position, self.__ship.position)
 
 
 # Class for containing data for mines
@@ -198,6 +231,10 @@ class ShipData:
     def velocity(self):
         return self.__velocity
 
+    @property
+    def speed(self) -> float:
+        return np.linalg.norm(self.__velocity)
+
     def update(self, ship_state: Dict):
         '''
         Desc: Updates the current data in the ShipData class
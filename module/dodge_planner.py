@@ -0,0 +1,288 @@
+'''
+Filename: dodge_planner
+Date: 10/18/26
+
+Desc: Lookahead dodging. A fixed library of maneuvers, each a thrust and
+turn rate held for 0.5 to 2 seconds before coasting, is rolled out with
+the engine's ship physics and tested against the predicted paths of the
+asteroids, all maneuvers and asteroids at once as NumPy arrays. The
+maneuver that keeps the ship clear of every asteroid with the least
+effort is chosen, optionally within a time budget per frame
+
+'''
+import time
+import numpy as np
+
+from typing import Dict, Optional, Sequence
+from module.frame_context import FrameContext
+from module.closest_approach import wrapped_closest_approach
+
+# kessler_game ship limits, used when the ship state does not give them
+DRAG = 80.0
+THRUST = 480.0
+TURN_RATE = 180.0
+MAX_SPEED = 240.0
+SHIP_RADIUS = 20.0
+
+
+class DodgePlanner:
+    """
+    Desc: Picks a maneuver for the ship from a library of primitives.
+        Every primitive is stepped frame by frame like Ship.update (drag,
+        thrust, speed limit, turn), and the asteroids move in straight
+        lines, both wrapping around the map. For each primitive the
+        planner finds the first frame the ship touches an asteroid and
+        the smallest gap to any asteroid over the horizon
+
+        Primitives that touch nothing are ranked by their gap, capped at
+        safe_clearance so that any safe enough maneuver is as good as
+        another, then by effort, so coasting wins whenever it is safe.
+        If every primitive touches an asteroid, the one touching it
+        latest wins. Primitives are tested in chunks, the strongest first
+
+        Without a budget every primitive is tested against every asteroid
+        in reach, so the choice only depends on the game state. With one,
+        the planner stops once the next chunk would not fit in it. The cost
+        of a plan grows with the asteroids in reach, so the time per
+        asteroid of each stage is measured and the clock is checked before
+        the work that grows with them. Asteroids are ranked by how close
+        their paths come to the ship, and only as many as fit in the rest
+        of the budget are tested, with at least coasting and the strongest
+        escape. If not even those fit, the last maneuver is kept. The
+        choice then depends on the machine's speed, so plans with a budget
+        are not reproducible
+    """
+    def __init__(self, thrusts: Sequence[float] = (-THRUST, -THRUST / 2.0, 0.0, THRUST / 2.0, THRUST),
+                 turn_rates: Sequence[float] = (-TURN_RATE, -TURN_RATE / 2.0, 0.0, TURN_RATE / 2.0, TURN_RATE),
+                 durations: Sequence[float] = (0.5, 1.0, 2.0), horizon: float = 2.0, safe_clearance: float = 10.0,
+                 budget: Optional[float] = None, chunk: int = 25, probe: int = 5):
+        '''
+        Parameters: thrusts, turn_rates, durations - Primitives are every combination, holding the
+                        thrust and turn rate for the duration in seconds, then coasting
+                    horizon - How far ahead maneuvers are rolled out, in seconds
+                    safe_clearance - Gap to the nearest asteroid beyond which maneuvers are
+                        only ranked by effort
+                    budget - Time allowed per plan, in seconds, or None to test every
+                        primitive against every asteroid in reach
+                    chunk - Most primitives tested at once
+                    probe - Primitives in the first chunk (coasting and the strongest escapes),
+                        which is always tested. With a budget, later chunks are sized from
+                        its time to fit the rest of the budget
+        '''
+        # Coasting is the same for any duration, so it is kept once, first
+        primitives = [(0.0, 0.0, 0.0)]
+        primitives += [(thrust, turn_rate, duration) for thrust in thrusts for turn_rate in turn_rates
+                       for duration in durations if thrust != 0.0 or turn_rate != 0.0]
+        # Strongest escapes first, so they are the ones tested when the budget runs out
+        primitives[1:] = sorted(primitives[1:], key=lambda p: (-abs(p[0]), -p[2], abs(p[1])))
+        self.thrusts, self.turn_rates, self.durations = (np.array(values, dtype=np.float64)
+                                                         for values in zip(*primitives))
+        self.effort = (np.abs(self.thrusts) / THRUST + np.abs(self.turn_rates) / TURN_RATE) * self.durations
+        self.horizon = horizon
+        self.safe_clearance = safe_clearance
+        self.budget = budget
+        self.chunk = chunk
+        self.probe = probe
+
+        # Result of the last plan, per primitive: first frame touching an asteroid (-1 if none),
+        # smallest gap to an asteroid, and whether it was tested before the budget ran out
+        self.contacts = np.full(len(self.thrusts), -1)
+        self.clearances = np.full(len(self.thrusts), np.inf)
+        self.tested = np.zeros(len(self.thrusts), dtype=bool)
+        # Time spent in the last plan, and plans cut short by the budget
+        self.elapsed = 0.0
+        self.timeouts = 0
+        # Last chosen primitive, kept when the budget runs out before any is tested
+        self.previous = 0
+        # Seconds per asteroid and frame to lay out the asteroid paths, and per primitive, asteroid and frame
+        # to test them, measured on each plan
+        self.build_rate = 2e-8
+        self.test_rate = 2e-8
+
+    def __len__(self) -> int:
+        return len(self.thrusts)
+
+    def rollout(self, ship_state: Dict, delta_time: float, steps: int) -> np.ndarray:
+        '''
+        Desc: Ship positions of every primitive over the next frames, stepped
+            like Ship.update. Speeds are stepped frame by frame since drag
+            and the speed limit clip them, headings and positions are
+            cumulative sums
+
+        Returns: (P, steps, 2) positions, not wrapped around the map
+        '''
+        thrust_range = ship_state.get("thrust_range", (-THRUST, THRUST))
+        turn_rate_range = ship_state.get("turn_rate_range", (-TURN_RATE, TURN_RATE))
+        max_speed = ship_state.get("max_speed", MAX_SPEED)
+        drag_amount = ship_state.get("drag", DRAG) * delta_time
+
+        held = np.arange(1, steps + 1)[None, :] <= np.round(self.durations / delta_time)[:, None]
+        thrusts = np.where(held, np.clip(self.thrusts, *thrust_range)[:, None], 0.0)
+        turns = np.where(held, np.clip(self.turn_rates, *turn_rate_range)[:, None], 0.0)
+
+        # Drag stops the ship outright rather than pushing it past zero speed
+        speeds = np.empty((steps, len(self.thrusts)))
+        speed = np.full(len(self.thrusts), float(ship_state["speed"]))
+        for step, accelerate in enumerate(np.ascontiguousarray(thrusts.T) * delta_time):
+            speed = np.copysign(np.maximum(np.abs(speed) - drag_amount, 0.0), speed) + accelerate
+            np.minimum(speed, max_speed, out=speed)
+            np.maximum(speed, -max_speed, out=speed)
+            speeds[step] = speed
+        speeds = speeds.T
+
+        headings = np.radians(ship_state["heading"] + np.cumsum(turns * delta_time, axis=1))
+        steps_xy = np.stack((np.cos(headings), np.sin(headings)), axis=-1) * (speeds * delta_time)[..., None]
+        return np.asarray(ship_state["position"], dtype=np.float64) + np.cumsum(steps_xy, axis=1)
+
+    def plan(self, context: FrameContext, ship_state: Dict, delta_time: float = 1.0 / 30.0) -> int:
+        '''
+        Desc: Chooses the maneuver for this frame
+
+        Parameters: context - FrameContext of the current frame
+                    ship_state - Ship state, for its speed and limits
+                    delta_time - Length of a frame
+
+        Returns: index of the chosen primitive, 0 (coasting) if nothing is in reach
+        '''
+        start = time.perf_counter()
+        steps = max(1, int(round(self.horizon / delta_time)))
+        times = delta_time * np.arange(1, steps + 1)
+        ship_radius = ship_state.get("radius", SHIP_RADIUS)
+        self.contacts[:] = -1
+        self.clearances[:] = np.inf
+        self.tested[:] = False
+
+        # Only asteroids that can meet the ship within the horizon
+        if len(context) > 0:
+            max_speed = ship_state.get("max_speed", MAX_SPEED)
+            asteroid_speed = float(np.max(np.hypot(context.velocities[:, 0], context.velocities[:, 1])))
+            reach = (max_speed + asteroid_speed) * self.horizon + ship_radius + float(np.max(context.radii))
+            near, _ = context.index.query_radius(context.ship_position, reach)
+        else:
+            near = np.empty(0, dtype=np.intp)
+        if len(near) == 0:
+            return self.__finish(0, start, everything=True)
+
+        ships = self.rollout(ship_state, delta_time, steps)
+        size = np.asarray(context.map_size, dtype=np.float64) if context.map_size is not None else None
+        start_position = np.asarray(context.ship_position, dtype=np.float64)
+        ships -= start_position
+        furthest = np.hypot(ships[..., 0], ships[..., 1]).max(axis=0)
+
+        # No maneuver gets further from the start than the furthest one, so an asteroid whose path stays
+        # safe_clearance beyond that from the start cannot change the choice. How close it comes also ranks
+        # the asteroids, nearest first, for when the budget only covers some
+        offsets = context.positions[near] - start_position
+        velocities = context.velocities[near]
+        radii = context.radii[near] + ship_radius
+        if size is not None:
+            _, closest, _, _ = wrapped_closest_approach(offsets, velocities, radii, self.horizon, size,
+                                                        radii + float(furthest.max()) + self.safe_clearance)
+        else:
+            closest = (np.hypot(offsets[:, 0], offsets[:, 1])
+                       - np.hypot(velocities[:, 0], velocities[:, 1]) * self.horizon)
+        bounds = closest - radii
+        near = np.flatnonzero(bounds < float(furthest.max()) + self.safe_clearance)
+        if len(near) == 0:
+            return self.__finish(0, start, everything=True)
+
+        # Asteroids whose paths and smallest probe (coasting and the strongest escape) fit in the rest of the
+        # budget
+        smallest = min(2, len(self))
+        if self.budget is None:
+            fits = len(near)
+        else:
+            fits = int((self.budget - (time.perf_counter() - start))
+                       / ((self.build_rate + smallest * self.test_rate) * steps))
+        if fits <= 0:
+            self.timeouts += 1
+            return self.__finish(self.previous, start)
+        cut = fits < len(near)
+        if cut:
+            near = near[np.argpartition(bounds[near], fits - 1)[:fits]]
+        offsets, velocities, radii = offsets[near], velocities[near], radii[near]
+
+        # (2, N, steps) asteroid centres relative to where the ship starts, x then y, each taken the short way
+        # around the map
+        build_start = time.perf_counter()
+        asteroids = np.empty((2, len(near), steps))
+        for axis in range(2):
+            np.multiply(velocities[:, axis, None], times[None, :], out=asteroids[axis])
+            asteroids[axis] += offsets[:, axis, None]
+            if size is not None:
+                asteroids[axis] -= size[axis] * np.round(asteroids[axis] / size[axis])
+
+        # Asteroids that stay safe_clearance beyond the furthest maneuver at every frame cannot change the choice
+        limits = radii[:, None] + furthest[None, :] + self.safe_clearance
+        squared = asteroids[0] * asteroids[0]
+        squared += asteroids[1] * asteroids[1]
+        keep = (squared < limits * limits).any(axis=1)
+        asteroids, radii = asteroids[:, keep], radii[keep][:, None]
+        now = time.perf_counter()
+        self.build_rate = 0.5 * (self.build_rate + (now - build_start) / (len(near) * steps))
+
+        if asteroids.shape[1] == 0:
+            if cut:
+                self.timeouts += 1
+            return self.__finish(0, start, everything=not cut)
+
+        # With both wrapped to the map, every offset between them is within a map size on each axis, and its
+        # shortest way around the map is min(|d|, size - |d|)
+        if size is not None:
+            ships = (ships + 0.5 * size) % size - 0.5 * size
+
+        # Probe as many of the strongest primitives as fit, at least the smallest probe
+        per_primitive = self.test_rate * asteroids.shape[1] * steps
+        first = 0
+        if self.budget is None:
+            count = min(self.probe, len(self))
+        else:
+            count = min(self.probe, len(self), max(smallest, int((self.budget - (now - start)) / per_primitive)))
+        chunks_start = now
+        while count > 0:
+            chunk = slice(first, first + count)
+            squared = None
+            for axis in range(2):
+                offsets = np.abs(ships[chunk, None, :, axis] - asteroids[axis][None, :, :])
+                if size is not None:
+                    np.minimum(offsets, size[axis] - offsets, out=offsets)
+                np.multiply(offsets, offsets, out=offsets)
+                squared = offsets if squared is None else np.add(squared, offsets, out=squared)
+            gaps = (np.sqrt(squared, out=squared) - radii[None, :, :]).min(axis=1)
+            touching = gaps < 0.0
+            self.contacts[chunk] = np.where(touching.any(axis=1), touching.argmax(axis=1), -1)
+            self.clearances[chunk] = gaps.min(axis=1)
+            self.tested[chunk] = True
+
+            first += count
+            now = time.perf_counter()
+            per_primitive = (now - chunks_start) / first
+            count = min(self.chunk, len(self) - first)
+            if self.budget is not None:
+                # Larger chunks cost more per primitive than the probe, so each takes at most half of what is left
+                count = min(count, int(0.5 * (self.budget - (now - start)) / per_primitive))
+        self.test_rate = 0.5 * (self.test_rate + per_primitive / (asteroids.shape[1] * steps))
+        if cut or first < len(self):
+            self.timeouts += 1
+
+        # Safe primitives by capped gap then effort, others by how late they touch
+        tested = np.flatnonzero(self.tested)
+        safe = self.contacts[tested] < 0
+        rank = np.where(safe, steps + np.minimum(self.clearances[tested], self.safe_clearance) / self.safe_clearance,
+                        self.contacts[tested])
+        best = tested[np.lexsort((self.effort[tested], -rank))[0]]
+        return self.__finish(int(best), start)
+
+    def __finish(self, best: int, start: float, everything: bool = False) -> int:
+        '''
+        Desc: Records the choice and the time spent on the plan
+
+        Parameters: best - Chosen primitive
+                    start - perf_counter() at the start of the plan
+                    everything - Nothing was in reach, so every primitive counts as tested
+        '''
+        if everything:
+            self.tested[:] = True
+        self.previous = best
+        self.elapsed = time.perf_counter() - start
+        return best
@@ -0,0 +1,144 @@
+'''
+Filename: frame_context
+Date: 10/18/26
+
+Desc: Geometry between the ship and every asteroid for one frame,
+computed once as NumPy arrays and shared by the targeting system,
+Shoot and Dodge
+
+'''
+import math
+import numpy as np
+
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from module.spatial_index import SpatialIndex
+
+
+class FrameContext:
+    """
+    Desc: Per asteroid arrays, in the order of game_state["asteroids"]:
+
+        positions, velocities - (N, 2) asteroid state
+        sizes, radii - (N,) asteroid size class and radius
+        to_ship - (N, 2) vector from each asteroid to the ship
+        distances - (N,) distance between centres
+        bearings - (N,) direction of each asteroid seen from the ship,
+            degrees in [0, 360), 0 along +x
+        speeds - (N,) asteroid speeds
+        approach_angles - (N,) angle in degrees between each asteroid's
+            velocity and its vector to the ship, 0 when it flies straight
+            at the ship, NaN for a still asteroid or one on the ship
+        closing_speeds - (N,) rate at which each asteroid gets closer to
+            the ship, negative when moving apart
+        ids - (N,) stable IDs from AsteroidTracker, None until tracked
+        map_size - size of the map the asteroids wrap around, None if
+            not known
+        index - SpatialIndex of the asteroid positions, for radius, cone
+            and nearest queries
+
+        Arrays past distances are computed for all asteroids the first
+        time they are read, then kept for the frame
+    """
+    def __init__(self, ship_position: Sequence[float], ship_velocity: Sequence[float], ship_heading: float,
+                 positions: np.ndarray, velocities: np.ndarray,
+                 sizes: np.ndarray = None, radii: np.ndarray = None, map_size: Tuple[float, float] = None):
+        '''
+        Parameters: ship_position, ship_velocity, ship_heading - ship state
+                    positions, velocities - (N, 2) asteroid arrays
+                    sizes, radii - Optional (N,) asteroid arrays, zero if not given
+                    map_size - Optional size of the map
+        '''
+        self.ship_position = (float(ship_position[0]), float(ship_position[1]))
+        self.ship_velocity = (float(ship_velocity[0]), float(ship_velocity[1]))
+        self.ship_heading = float(ship_heading)
+        self.ship_speed = math.hypot(*self.ship_velocity)
+
+        self.positions = positions
+        self.velocities = velocities
+        count = len(positions)
+        self.sizes = sizes if sizes is not None else np.zeros(count)
+        self.radii = radii if radii is not None else np.zeros(count)
+        self.map_size = map_size
+
+        # Stable asteroid IDs, set by AsteroidTracker.update
+        self.ids: np.ndarray = None
+
+        self.to_ship = np.asarray(self.ship_position) - positions
+        self.distances = np.hypot(self.to_ship[:, 0], self.to_ship[:, 1])
+
+    @classmethod
+    def from_state(cls, ship_state: Dict, game_state: Dict) -> "FrameContext":
+        '''
+        Desc: Builds the context of a frame from the states kessler_game
+            passes to the controller
+        '''
+        positions, velocities, sizes, radii = gather(game_state["asteroids"])
+        return cls(ship_state["position"], ship_state.get("velocity", (0.0, 0.0)), ship_state.get("heading", 0.0),
+                   positions, velocities, sizes, radii, game_state.get("map_size"))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @cached_property
+    def index(self) -> "SpatialIndex":
+        # Imported here, spatial_index uses triangle_find, which uses this module
+        from module.spatial_index import SpatialIndex
+        return SpatialIndex(self.positions, self.map_size)
+
+    @cached_property
+    def bearings(self) -> np.ndarray:
+        return np.degrees(np.arctan2(-self.to_ship[:, 1], -self.to_ship[:, 0])) % 360.0
+
+    @cached_property
+    def speeds(self) -> np.ndarray:
+        return np.hypot(self.velocities[:, 0], self.velocities[:, 1])
+
+    @cached_property
+    def __dot(self) -> np.ndarray:
+        # Asteroid velocity dotted with its vector to the ship
+        return self.to_ship[:, 0] * self.velocities[:, 0] + self.to_ship[:, 1] * self.velocities[:, 1]
+
+    @cached_property
+    def approach_angles(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cosine = self.__dot / (self.distances * self.speeds)
+        return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+    @cached_property
+    def closing_speeds(self) -> np.ndarray:
+        # Asteroid minus ship velocity, along the asteroid to ship direction
+        ship_dot = self.to_ship[:, 0] * self.ship_velocity[0] + self.to_ship[:, 1] * self.ship_velocity[1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (self.__dot - ship_dot) / self.distances
+
+
+def gather(asteroids: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Desc: Collects a list of asteroid states into arrays, in one pass
+
+    Returns: (N, 2) positions and velocities, (N,) sizes and radii
+    '''
+    if len(asteroids) == 0:
+        return np.empty((0, 2)), np.empty((0, 2)), np.empty(0), np.empty(0)
+    rows = np.array([(*asteroid["position"], *asteroid["velocity"], asteroid["size"], asteroid["radius"])
+                     for asteroid in asteroids], dtype=np.float64)
+    return rows[:, 0:2], rows[:, 2:4], rows[:, 4], rows[:, 5]
+
+
+def predict_asteroids(positions: np.ndarray, velocities: np.ndarray, delta_time: float, frames: int,
+                      map_size: Tuple[float, float]) -> np.ndarray:
+    '''
+    Desc: Asteroid positions after some frames if nothing hits them,
+        wrapped around the map like the engine does each frame
+
+    Returns: predicted positions, the velocities do not change
+    '''
+    positions = np.array(positions, dtype=np.float64)
+    size = np.asarray(map_size, dtype=np.float64)
+    for _ in range(frames):
+        positions += velocities * delta_time
+        np.mod(positions, size, out=positions)
+    return positions
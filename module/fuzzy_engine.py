@@ -0,0 +1,203 @@
+'''
+Filename: fuzzy_engine
+Date: 10/18/26
+
+Desc: Small Mamdani inference engine on NumPy arrays, for triangular
+membership functions. Evaluates whole arrays of inputs per call: the
+inputs are fuzzified as arrays, rules are applied with min/max and the
+outputs are defuzzified with the exact centroid of the clipped sets
+
+'''
+import numpy as np
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# term name -> [a, b, c] triangle, as in threats_config.json
+Terms = Dict[str, Sequence[float]]
+
+
+def trimf(x, abc: Sequence[float]) -> np.ndarray:
+    '''
+    Desc: Triangular membership of x, with the same edge cases as
+        skfuzzy.trimf (a == b or b == c give a vertical edge)
+
+    Parameters: x - Array of values
+                abc - Triangle feet and peak [a, b, c], a <= b <= c
+
+    Returns: Array of memberships, the shape of x
+    '''
+    a, b, c = (float(v) for v in abc)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.zeros(x.shape)
+    if a != b:
+        rising = (a < x) & (x < b)
+        y[rising] = (x[rising] - a) / (b - a)
+    if b != c:
+        falling = (b < x) & (x < c)
+        y[falling] = (c - x[falling]) / (c - b)
+    y[x == b] = 1.0
+    return y
+
+
+class FuzzyRule:
+    """
+    Desc: IF antecedents THEN output is term. Antecedents are
+        {input name: term name}, combined with min ("and") or max ("or")
+    """
+    def __init__(self, antecedents: Dict[str, str], output: str, term: str, connective: str = "and"):
+        if connective not in ("and", "or"):
+            raise ValueError("Rule connective must be 'and' or 'or'")
+        self.antecedents = antecedents
+        self.output = output
+        self.term = term
+        self.connective = connective
+
+
+class MamdaniEngine:
+    """
+    Desc: Mamdani fuzzy system with triangular input and output sets.
+        Rule strengths clip their output set (min implication), clipped
+        sets are combined with max and defuzzified by centroid. Output
+        sets are piecewise linear, so the centroid is computed exactly
+        from their breakpoints instead of on a sampled universe
+
+        With universes given for the inputs and outputs it reproduces a
+        skfuzzy ControlSystem built from the same sets and rules: inputs
+        are fuzzified by interpolating the sets sampled on the input
+        universe, and outputs are truncated to their universe's range.
+        The remaining difference comes from skfuzzy linearly
+        interpolating between its universe points where two clipped sets
+        cross. It is within 2e-3 for the threat FIS (see
+        benchmarks/bench_fuzzy_engine.py)
+    """
+    def __init__(self, inputs: Dict[str, Terms], outputs: Dict[str, Terms], rules: Sequence[FuzzyRule],
+                 universes: Optional[Dict[str, np.ndarray]] = None):
+        '''
+        Parameters: inputs - input name -> {term name: [a, b, c]}
+                    outputs - output name -> {term name: [a, b, c]}
+                    rules - FuzzyRule list
+                    universes - Optional variable name -> sampled universe,
+                        to match skfuzzy as described above
+        '''
+        universes = universes if universes is not None else {}
+        for rule in rules:
+            for name, term in rule.antecedents.items():
+                if term not in inputs.get(name, {}):
+                    raise ValueError(f"Rule uses unknown input term {name}.{term}")
+            if rule.term not in outputs.get(rule.output, {}):
+                raise ValueError(f"Rule uses unknown output term {rule.output}.{rule.term}")
+
+        self.inputs = {name: {term: tuple(float(v) for v in abc) for term, abc in terms.items()}
+                       for name, terms in inputs.items()}
+        self.outputs = {name: {term: tuple(float(v) for v in abc) for term, abc in terms.items()}
+                        for name, terms in outputs.items()}
+        self.rules = list(rules)
+
+        # Input sets sampled on their universe, for skfuzzy style fuzzification
+        self.__sampled: Dict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]] = {}
+        for name, terms in self.inputs.items():
+            if name in universes:
+                universe = np.asarray(universes[name], dtype=np.float64)
+                self.__sampled[name] = (universe, {term: trimf(universe, abc) for term, abc in terms.items()})
+
+        # Per output: triangles as (K, 3), domain, and the breakpoints that do
+        # not depend on the rule strengths (domain ends, vertices, crossings
+        # of two sets' edges)
+        self.__output_sets: Dict[str, Tuple[List[str], np.ndarray, Tuple[float, float], np.ndarray]] = {}
+        for name, terms in self.outputs.items():
+            labels = list(terms)
+            triangles = np.array([terms[label] for label in labels], dtype=np.float64)
+            if name in universes:
+                domain = (float(np.min(universes[name])), float(np.max(universes[name])))
+            else:
+                domain = (float(triangles[:, 0].min()), float(triangles[:, 2].max()))
+            self.__output_sets[name] = (labels, triangles, domain, self.__static_breakpoints(triangles, domain))
+
+    @staticmethod
+    def __static_breakpoints(triangles: np.ndarray, domain: Tuple[float, float]) -> np.ndarray:
+        # Each non vertical edge as a line y = slope * x + offset
+        lines = []
+        for a, b, c in triangles:
+            if b > a:
+                lines.append((1.0 / (b - a), -a / (b - a)))
+            if c > b:
+                lines.append((-1.0 / (c - b), c / (c - b)))
+        points = [domain[0], domain[1]] + triangles.ravel().tolist()
+        for i in range(len(lines)):
+            for j in range(i + 1, len(lines)):
+                (s1, t1), (s2, t2) = lines[i], lines[j]
+                if s1 != s2:
+                    points.append((t2 - t1) / (s1 - s2))
+        points = np.clip(np.unique(points), *domain)
+        return np.unique(points)
+
+    def fuzzify(self, name: str, values) -> Dict[str, np.ndarray]:
+        '''
+        Desc: Membership of an array of values in each term of an input
+
+        Returns: term name -> array of memberships
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        if name in self.__sampled:
+            universe, sampled = self.__sampled[name]
+            return {term: np.interp(values, universe, mf) for term, mf in sampled.items()}
+        return {term: trimf(values, abc) for term, abc in self.inputs[name].items()}
+
+    def activations(self, **inputs) -> Dict[str, Dict[str, np.ndarray]]:
+        '''
+        Desc: Rule strengths aggregated per output term with max
+
+        Returns: output name -> term name -> array of activations
+        '''
+        shape = np.broadcast(*[np.asarray(v) for v in inputs.values()]).shape
+        memberships = {name: self.fuzzify(name, np.broadcast_to(values, shape)) for name, values in inputs.items()}
+
+        result = {name: {term: np.zeros(shape) for term in terms} for name, terms in self.outputs.items()}
+        for rule in self.rules:
+            degrees = [memberships[name][term] for name, term in rule.antecedents.items()]
+            strength = degrees[0]
+            for degree in degrees[1:]:
+                strength = np.minimum(strength, degree) if rule.connective == "and" else np.maximum(strength, degree)
+            np.maximum(result[rule.output][rule.term], strength, out=result[rule.output][rule.term])
+        return result
+
+    def compute(self, default: float = np.nan, **inputs) -> Dict[str, np.ndarray]:
+        '''
+        Desc: Crisp outputs for arrays of inputs (broadcast together)
+
+        Parameters: default - Output where no rule fires
+                    inputs - input name -> array of values
+
+        Returns: output name -> array of crisp values
+        '''
+        result = {}
+        for name, cuts in self.activations(**inputs).items():
+            labels, triangles, domain, static_points = self.__output_sets[name]
+            cut = np.stack([cuts[label] for label in labels], axis=-1)
+            shape = cut.shape[:-1]
+            cut = cut.reshape(-1, len(labels))
+
+            # Breakpoints of the aggregated set: the static ones, plus where
+            # each set's edges cross every rule strength level
+            a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+            level = cut[:, :, None]
+            rising = a[None, None, :] + level * (b - a)[None, None, :]
+            falling = c[None, None, :] - level * (c - b)[None, None, :]
+            x = np.concatenate([np.broadcast_to(static_points, (len(cut), len(static_points))),
+                                rising.reshape(len(cut), -1), falling.reshape(len(cut), -1)], axis=1)
+            x = np.sort(np.clip(x, *domain), axis=1)
+
+            # Aggregated membership at the breakpoints, linear in between
+            y = np.zeros(x.shape)
+            for k in range(len(labels)):
+                np.maximum(y, np.minimum(trimf(x, triangles[k]), cut[:, k:k + 1]), out=y)
+
+            # Exact area and first moment of the piecewise linear set
+            x1, x2, y1, y2 = x[:, :-1], x[:, 1:], y[:, :-1], y[:, 1:]
+            width = x2 - x1
+            area = np.sum(width * (y1 + y2), axis=1) * 0.5
+            moment = np.sum(width * (x1 * (2.0 * y1 + y2) + x2 * (y1 + 2.0 * y2)), axis=1) / 6.0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                crisp = np.where(area > 0.0, moment / area, default)
+            result[name] = crisp.reshape(shape)
+        return result
@@ -0,0 +1,112 @@
+'''
+Filename: intercept
+Date: 10/18/26
+
+Desc: Where and when a bullet fired from the ship meets each asteroid,
+solved in closed form for all asteroids at once
+
+'''
+import math
+import numpy as np
+
+from typing import Tuple
+from module.frame_context import FrameContext
+
+# kessler_game bullet speed, and ship turn rate limit in degrees per second
+BULLET_SPEED = 800.0
+TURN_RATE = 180.0
+
+
+def intercept_times(offsets: np.ndarray, velocities: np.ndarray, muzzle: float,
+                    bullet_speed: float = BULLET_SPEED) -> np.ndarray:
+    '''
+    Desc: Time for a bullet fired now to meet each asteroid's centre. The
+        bullet starts muzzle ahead of the ship along its heading, so it
+        meets the asteroid at time t when |d + v t| = muzzle + s t, a
+        quadratic in t
+
+    Parameters: offsets - (N, 2) asteroid positions relative to the ship
+                velocities - (N, 2) asteroid velocities
+                muzzle - Distance from the ship centre to where bullets appear
+                bullet_speed - Speed of the bullet
+
+    Returns: (N,) intercept times, 0 for an asteroid already over the
+        muzzle, NaN if the bullet can never reach it
+    '''
+    dx, dy = offsets[:, 0], offsets[:, 1]
+    vx, vy = velocities[:, 0], velocities[:, 1]
+    a = vx * vx + vy * vy - bullet_speed * bullet_speed
+    b = dx * vx + dy * vy - muzzle * bullet_speed
+    c = dx * dx + dy * dy - muzzle * muzzle
+
+    # Bullets are faster than asteroids, so a < 0 and c > 0 leave exactly one positive root
+    with np.errstate(invalid="ignore", divide="ignore"):
+        times = (-b - np.sqrt(b * b - a * c)) / a
+    times = np.where(times >= 0.0, times, np.nan)
+    return np.where(c <= 0.0, 0.0, times)
+
+
+def intercepts(context: FrameContext, muzzle: float, bullet_speed: float = BULLET_SPEED,
+               turn_rate: float = TURN_RATE) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Desc: Aim for every asteroid of a frame, for a bullet fired now. The
+        turn time is how long the ship needs to face the aim heading at
+        turn_rate. By then the aim has moved, but the controller solves
+        again every frame while it turns, and only fires once it faces
+        the asteroid, when the turn time is close to 0
+
+    Parameters: context - FrameContext of the current frame
+                muzzle - Distance from the ship centre to where bullets appear (its radius)
+                bullet_speed - Speed of the bullet
+                turn_rate - Fastest the ship turns, in degrees per second
+
+    Returns: (N,) aim heading in degrees [0, 360), time to turn to it, bullet
+        flight time (NaN if unreachable), and whether the bullet meets the
+        asteroid inside the map, before kessler_game removes it at the map
+        edge (only whether it is reachable if the map size is unknown)
+    '''
+    offsets = -context.to_ship
+    velocities = context.velocities
+    flight_times = intercept_times(offsets, velocities, muzzle, bullet_speed)
+    hit = offsets + velocities * flight_times[:, None]
+    headings = np.degrees(np.arctan2(hit[:, 1], hit[:, 0])) % 360.0
+    turn_times = np.abs((headings - context.ship_heading + 180.0) % 360.0 - 180.0) / turn_rate
+
+    if context.map_size is None:
+        in_map = ~np.isnan(flight_times)
+    else:
+        point = hit + np.asarray(context.ship_position)
+        with np.errstate(invalid="ignore"):
+            in_map = np.all((point >= 0.0) & (point <= np.asarray(context.map_size, dtype=np.float64)), axis=1)
+    return headings, turn_times, flight_times, in_map
+
+
+def intercept(context: FrameContext, index: int, muzzle: float,
+              bullet_speed: float = BULLET_SPEED) -> Tuple[float, float]:
+    '''
+    Desc: Aim heading and flight time of one asteroid, as intercepts()
+        gives them, solved with floats. For a single asteroid NumPy's
+        per call overhead costs more than the arithmetic
+
+    Parameters: context - FrameContext of the current frame
+                index - Index of the asteroid
+                muzzle - Distance from the ship centre to where bullets appear
+                bullet_speed - Speed of the bullet
+
+    Returns: aim heading in degrees [0, 360) and bullet flight time, both
+        NaN if the bullet can never reach the asteroid
+    '''
+    dx, dy = (-value for value in context.to_ship[index].tolist())
+    vx, vy = context.velocities[index].tolist()
+    a = vx * vx + vy * vy - bullet_speed * bullet_speed
+    b = dx * vx + dy * vy - muzzle * bullet_speed
+    c = dx * dx + dy * dy - muzzle * muzzle
+    if c <= 0.0:
+        time = 0.0
+    else:
+        discriminant = b * b - a * c
+        time = (-b - math.sqrt(discriminant)) / a if discriminant >= 0.0 and a != 0.0 else math.nan
+        if not time >= 0.0:
+            return math.nan, math.nan
+    heading = math.degrees(math.atan2(dy + vy * time, dx + vx * time)) % 360.0
+    return heading, time
@@ -0,0 +1,53 @@
+'''
+Filename: nearest
+Date: 10/18/26
+
+Desc: The k asteroids nearest to the ship, ranked with a partial sort
+instead of sorting every asteroid. Shared by the targeting system,
+Dodge and State
+
+'''
+import math
+import numpy as np
+
+from typing import Dict, Sequence, Tuple, Union
+
+
+def nearest_k(ship: Union[Dict, Sequence[float]], asteroids: Union[np.ndarray, Sequence[Dict]], k: int = None,
+              max_range: float = math.inf, map_size: Tuple[float, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Desc: Finds the k asteroids closest to the ship within max_range.
+        np.partition finds the k-th smallest squared distance in O(n),
+        and only the asteroids up to it are sorted. Ties are broken by
+        index, as when the whole list was sorted
+
+    Parameters: ship - Ship state, or the ship position
+                asteroids - (N, 2) asteroid positions, or a list of asteroid states
+                k - Number of asteroids to keep, all of them in range if None
+                max_range - Largest distance from the ship
+                map_size - Size of the map. When given, distances are taken
+                    the short way around the map edges
+
+    Returns: indexes of the nearest asteroids and their distances, nearest first
+    '''
+    position = ship["position"] if isinstance(ship, dict) else ship
+    if not isinstance(asteroids, np.ndarray):
+        asteroids = np.array([asteroid["position"] for asteroid in asteroids], dtype=np.float64).reshape(-1, 2)
+
+    offsets = asteroids - np.asarray(position, dtype=np.float64)
+    if map_size is not None:
+        size = np.asarray(map_size, dtype=np.float64)
+        offsets = (offsets + 0.5 * size) % size - 0.5 * size
+    squared = offsets[:, 0] * offsets[:, 0] + offsets[:, 1] * offsets[:, 1]
+
+    candidates = np.flatnonzero(squared <= max_range * max_range) if max_range < math.inf else np.arange(len(squared))
+    if k is not None and k < len(candidates):
+        if k <= 0:
+            candidates = candidates[:0]
+        else:
+            # Everything up to the k-th smallest distance, so ties with it are kept for the index order below
+            kth = np.partition(squared[candidates], k - 1)[k - 1]
+            candidates = candidates[squared[candidates] <= kth]
+
+    indexes = candidates[np.lexsort((candidates, squared[candidates]))][:k]
+    return indexes, np.sqrt(squared[indexes])
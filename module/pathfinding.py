@@ -6,13 +6,16 @@ Date: 3/14/24
 Desc: Class for creating paths for ship and asteroids
 
 '''
-from typing import Dict, Tuple
+from typing import Dict, Sequence, Tuple
 from shapely.geometry import LineString
 from shapely.geometry import Point
 from shapely.geometry import Polygon
-from math import sqrt, cos, sin
+from math import cos, sin
 import numpy as np
 
+from module.closest_approach import closest_approach, wrapped_closest_approach
+from module.frame_context import FrameContext
+
 class PathFinding:
     """PathFinding class that creats a path from a given asteroid and ship,
        then creats a Dictionary with all found paths
@@ -21,67 +24,99 @@ class PathFinding:
         (Dict or Path): A Dictionary of all the Path objects ( PathFinding() ) or
                         you can get a single class Object with PathFinding(index)
     """
-         
+    # Seconds of asteroid movement a path covers
+    PATH_TIME = 10.0
+    # Radius of the ship when checking for collisions
+    SHIP_RADIUS = 25.0
+
 
     ##############################################################
     class __Path:
         """
         Desc: Path class contains relevant data about the path generated including
-            collision, the path itself, it's area, estimated time to collsion
+            collision, the path itself, it's area, estimated time to collsion.
+            Collision and time come from the closest point of approach, the
+            shapely line and collision polygons are only built when read
         """
         def __init__(
             self,
-            line: Polygon,
-            collision: Polygon = None,
-            area: float = None,
+            position: Tuple[float, float],
+            velocity: Tuple[float, float],
+            radius: float,
+            ship_position: Tuple[float, float],
+            ship_radius: float,
+            collision: bool,
             time: float = None,
+            closest_time: float = None,
+            closest_distance: float = None,
         ):
-            self.__line = line  # Line is to be a POLYGON of the path of the asteroid
-            self.__collision = (
-                # Colllision is the POLYGON of the collision (MAY BE NULL)
-                collision
-            )
-            # AREA is to be a number (float) of the area of the collision (MAY BE NULL)
-            self.__area = area
-            # TIME is to be a estimate (float) of the time to collide with the ship
+            self.__position = position
+            self.__velocity = velocity
+            self.__radius = radius
+            self.__ship_position = ship_position
+            self.__ship_radius = ship_radius
+            # COLLISION is whether the asteroid comes within reach of the ship inside the path's time
+            self.__collision = collision
+            # TIME is when the asteroid first touches the ship (NULL without a collision)
             self.__time = time
+            # When and how close the asteroid passes the ship
+            self.__closest_time = closest_time
+            self.__closest_distance = closest_distance
+            self.__line = None
+            self.__area = None
 
         @property
-        def collision(self):
+        def collision(self) -> bool:
             return self.__collision
 
         @property
-        def line(self):
+        def line(self) -> Polygon:
+            # Line is a POLYGON of the path of the asteroid over PATH_TIME seconds
+            if self.__line is None:
+                end = (self.__position[0] + self.__velocity[0] * PathFinding.PATH_TIME,
+                       self.__position[1] + self.__velocity[1] * PathFinding.PATH_TIME)
+                self.__line = LineString([self.__position, end]).buffer(self.__radius)
             return self.__line
 
         @property
-        def area(self):
+        def area(self) -> float:
+            # AREA of the path overlapping the ship (NULL without a collision)
+            if self.__area is None and self.__collision:
+                ship = Point(*self.__ship_position).buffer(self.__ship_radius)
+                self.__area = ship.intersection(self.line).area
             return self.__area
 
         @property
         def time(self):
             return self.__time
 
+        @property
+        def closest_time(self):
+            return self.__closest_time
+
+        @property
+        def closest_distance(self):
+            return self.__closest_distance
+
         def __call__(self) -> Dict:
             return {
-                "line": self.__line,
+                "line": self.line,
                 "collision": self.__collision,
-                "area": self.__area,
+                "area": self.area,
                 "time": self.__time,
+                "closest_time": self.__closest_time,
+                "closest_distance": self.__closest_distance,
             }
 
     ##############################################################
-    def __init__(self, map_size: tuple = (1000,800)):
+    def __init__(self, map_size: tuple = (1000,800), wrap: bool = True):
+        '''
+        Parameters: map_size - Size of the map, used when a frame does not give it
+                    wrap - Find collisions of paths that wrap around the map edges
+        '''
         self.paths = {}
         self.map_size = map_size
-
-        # create map edge lines
-        edge1 = LineString([(0,0), (map_size[0], 0)])
-        edge2 = LineString([(map_size[0], 0), map_size])
-        edge3 = LineString([map_size, (0, map_size[1])])
-        edge4 = LineString([(map_size[1], 0), (0,0)])
-
-        self.edges = [edge1, edge2, edge3, edge4]
+        self.wrap = wrap
 
     def __call__(self, index=None, call=False):
         '''
@@ -101,7 +136,7 @@ class PathFinding:
             else:
                 return self.paths
             return None
-        
+
     def __get_path(self, x1, y1, x2, y2, width) -> LineString:
         '''
         Desc: Creates a path using shapely linestring and buffering
@@ -117,86 +152,6 @@ class PathFinding:
         '''
         return LineString([(x1, y1), (x2, y2)]).buffer(width)
 
-    def __get_path_split(self, x1, y1, x2, y2, width):
-        '''
-        DESC: Given two points in a 2d space, create a polygon representing
-            the path between those two points, wrapping around the edges of the screen 
-            as required
-
-        RETURNS: A list containing the polygons
-        '''
-        # create empty list for appending of new lines
-        lines = []
-
-        # variables for first line
-        start = (x1, y1)
-        end = (x2, y2)
-        line = LineString([start, end])
-
-        # loop until break clause is reached 
-        while(1):
-            # check for intersection against map edge lines
-            for edge in self.edges:
-                if not (line.intersection(edge).is_empty):
-                    # set to some value to save
-                    #print(line.intersection(edge))
-                    #print(edge)
-                    newEnd = line.intersection(edge)
-                    # check if intersection is the start or end points
-                    if not (newEnd == Point(line.coords[0]) or newEnd == Point(line.coords[1])):
-                        print(newEnd)
-                        print(Point(line.coords[0]))
-                        print(newEnd == line.coords[0])
-
-                        # if not start or end points then append to list and break
-                        lines.append(LineString([currentStart, newEnd]).buffer(width))
-                        break
-                    else:
-
-                        # reset value to prevent looping
-                        newEnd = Point()
-
-            # if edge was touched then split line
-            if not (newEnd.is_empty):
-                # get new endpoint in coords
-                newEnd = [newEnd.x, newEnd.y]
-                currentStart = newEnd
-
-                # adjust line endpoint and get new start point
-                for idx, pos in enumerate(start):
-                    # check against both map edges
-                    # print(idx)
-                    bound = self.map_size[idx]
-                    # print(bound)
-                    offset = bound - pos
-                    # print(offset)
-
-                    # find new start point
-                    if (currentStart[idx] % bound == 0):
-                        print("CURRENT START: ", currentStart)
-                        currentStart[idx] = abs(newEnd[idx] - bound)
-                        print("CURRENT START: ", currentStart)
-                        print(bound)
-
-                    # find new endpoint
-                    if offset < 0 or offset > bound:
-                        # adjust position to other side 
-                        start[idx] += bound * np.sign(offset)
-                        break
-
-                # get new line 
-                line = LineString([currentStart, start])
-                print(line)
-
-                # set to empty point to remove data
-                newEnd = Point()
-            else:
-                # append last line to list and break from loop
-                lines.append(line.buffer(width))
-                break
-        
-        return lines
-
     def __circle_line_collision(self, circle, line, radius):
         '''
         Desc: Creates a cricle using shapely given a point and then
@@ -265,51 +220,65 @@ class PathFinding:
         Returns:
             Path: current asteroid path
         """
-        # get asteroid data
-        # static values rn because im stupid
-        asteroidPos = asteroid["position"]
-        asteroidVelocity = asteroid["velocity"]
-        asteroidRadius = asteroid["radius"]
         shipPos = ship["position"]
+        shipVelocity = ship.get("velocity", (0.0, 0.0))
+        offset = np.array([[asteroid["position"][0] - shipPos[0], asteroid["position"][1] - shipPos[1]]])
+        velocity = np.array([[asteroid["velocity"][0] - shipVelocity[0], asteroid["velocity"][1] - shipVelocity[1]]])
+        approach = self.__closest_approach(offset, velocity, asteroid["radius"] + self.SHIP_RADIUS, self.map_size)
 
-        # Asteroid end position after 10 seconds
-        # Does velocity work in units/s / is *10 valid?
-        asteroidEndPos = (
-            asteroidPos[0] + (asteroidVelocity[0] * 10),
-            asteroidPos[1] + (asteroidVelocity[1] * 10),
-        )
-
-        # call get path as polygon
-        line = self.__get_path(
-            asteroidPos[0],
-            asteroidPos[1],
-            asteroidEndPos[0],
-            asteroidEndPos[1],
-            asteroid["radius"],
-        )
-
-        # find collision
-        collision = self.__circle_line_collision(shipPos, line, 25)
-
-        # If colliding
-        if ~collision.is_empty:
-            # Get area of collision
-            area = collision.area
-
-            # Shapely point at start
-            endPoint = Point(asteroidPos[0], asteroidPos[1])
-
-            # Find estimated time to collision
-            timeToCollision = collision.distance(endPoint) / sqrt(
-                asteroidVelocity[0] ** 2 + asteroidVelocity[1] ** 2
-            )
-
-            asteroidPath = self.__Path(line, collision, area, timeToCollision)
-        else:
-            # Create path class with no collision
-            asteroidPath = __Path(line, None, None, None)
+        asteroidPath = self.__make_path(asteroid["position"], asteroid["velocity"], asteroid["radius"], shipPos,
+                                        *(values[0] for values in approach))
 
         if id in self.paths.keys():
             self.paths.pop(id)
 
         self.paths[id] = asteroidPath
+        return asteroidPath
+
+    def path_find_all(self, context: FrameContext,
+                      indexes: Sequence[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Finds the paths of the asteroids of a frame at once, keyed by
+           stable ID if the asteroids are tracked and by index otherwise
+
+        Args:
+            context (FrameContext): Geometry of the current frame
+            indexes (Sequence[int]): Only find these asteroids' paths, every
+            asteroid's if None
+
+        Returns:
+            Arrays of closest_approach: time and distance of closest
+            approach, collision and time to collision per asteroid found
+        """
+        indexes = np.arange(len(context)) if indexes is None else np.asarray(indexes, dtype=np.intp)
+        offsets = -context.to_ship[indexes]
+        velocities = context.velocities[indexes] - np.asarray(context.ship_velocity)
+        approach = self.__closest_approach(offsets, velocities, context.radii[indexes] + self.SHIP_RADIUS,
+                                           context.map_size or self.map_size)
+
+        keys = context.ids[indexes].tolist() if context.ids is not None else indexes.tolist()
+        positions = context.positions[indexes].tolist()
+        asteroidVelocities = context.velocities[indexes].tolist()
+        radii = context.radii[indexes].tolist()
+        for index, (key, *values) in enumerate(zip(keys, *(values.tolist() for values in approach))):
+            self.paths[key] = self.__make_path(positions[index], asteroidVelocities[index], radii[index],
+                                               context.ship_position, *values)
+        return approach
+
+    def __closest_approach(self, offsets, velocities, radii, map_size):
+        '''
+        Desc: Closest approach over the next PATH_TIME seconds, wrapping
+            around the map edges unless wrap is off
+        '''
+        if self.wrap:
+            return wrapped_closest_approach(offsets, velocities, radii, self.PATH_TIME, map_size)
+        return closest_approach(offsets, velocities, radii, self.PATH_TIME)
+
+    def __make_path(self, position, velocity, radius, shipPos, closestTime, closestDistance, collision, time):
+        '''
+        Desc: Creates a Path from the closest approach of one asteroid
+
+        Return: The Path, with no time if it does not collide
+        '''
+        return self.__Path(tuple(position), tuple(velocity), radius, tuple(shipPos), self.SHIP_RADIUS,
+                           bool(collision), float(time) if collision else None, float(closestTime),
+                           float(closestDistance))
@@ -4,39 +4,37 @@ Author: David Mann (david.mann@digipen.edu)
 
 '''
 
-import math
 from typing import Dict
 
+from module.nearest import nearest_k
+
 class Asteroid_State:
     def __init__(self, ):
-        self.distance_from_ship
-        self.angle_from_ship
-    
+        self.distance_from_ship = None
+        self.angle_from_ship = None
+
     def SetDistance(self, distance):
         self.distance_from_ship = distance
-    
+
     def SetAngle(self, angle):
         self.angle_from_ship = angle
 
     def GetDistance(self):
         return self.distance_from_ship
-    
+
     def GetAngle(self):
         return self.angle_from_ship
 
 class State:
     def __init__(self):
         self.asteroids = []
-        self.ship
+        self.ship = None
 
     def SetState(self, game_state: Dict, ship_state: Dict):
+        '''
+        Desc: Keeps the ship state and the (up to) three asteroids closest to the ship
+        '''
         self.ship = ship_state
-        for asteroid in game_state.get('Asteroids'):
-            distance = math.dist(asteroid.position, ship_state.position)
-            if len(self.asteroids) < 3:
-                self.asteroids.append(asteroid)
-            else:
-                for i in range(len(self.asteroids)):
-                    if distance < math.dist(self.asteroids[i], ship_state.position):
-                        self.asteroids[i] = asteroid
-                        break
+        asteroids = game_state['asteroids']
+        nearest, _ = nearest_k(ship_state, asteroids, 3, map_size=game_state.get('map_size'))
+        self.asteroids = [asteroids[i] for i in nearest.tolist()]
@@ -0,0 +1,218 @@
+'''
+Filename: threat_pipeline
+Date: 10/18/26
+
+Desc: Long-lived threat evaluation owned by the controller. With
+speculation on, once the controller has picked its command the pipeline
+predicts where the ship and asteroids will be when it is next called and
+evaluates their threats on a worker thread while the engine runs physics
+and collisions. If the next frame matches the prediction that result is
+used, otherwise the threats are evaluated synchronously.
+
+The worker shares the GIL with the engine, so speculation only pays off
+when evaluating the threats costs more than handing them to a thread.
+With the threat lookup table it does not, and it is off by default
+
+'''
+import math
+import time
+import weakref
+import numpy as np
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from module.threat_system import TargetingSystem
+from module.frame_context import FrameContext, predict_asteroids
+
+# (threat ids, distances) as returned by TargetingSystem.evaluate
+Threats = Tuple[Dict[int, float], Dict[int, float]]
+
+# Stages timed on the calling thread, and on the worker thread
+STAGES = ("update", "context", "wait", "evaluate", "predict")
+WORKER_STAGES = ("speculate",)
+
+
+class ThreatPipeline:
+    """
+    Desc: Evaluates the threats of each frame for one controller, reusing
+        one worker thread across frames. With speculate=False, or when a
+        prediction misses (an asteroid was destroyed or split, the ship
+        died, ...), threats are evaluated on the calling thread
+    """
+    def __init__(self, threat_system: TargetingSystem, speculate: bool = False, tolerance: float = 1e-9):
+        '''
+        Parameters: threat_system - Targeting system whose lookup table the threats come from
+                    speculate - Evaluate the predicted next frame in the background
+                    tolerance - Largest difference between a predicted and an actual position
+                        or velocity for which the speculative result is still used
+        '''
+        self.threat_system = threat_system
+        self.speculate = speculate
+        self.tolerance = tolerance
+
+        # Number of frames whose speculative result was used or thrown away
+        self.hits = 0
+        self.misses = 0
+
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        # Shuts the worker down if the pipeline is dropped without close()
+        self.__finalizer: Optional[weakref.finalize] = None
+        # Future of the speculative evaluation and the predicted frame it was run on
+        self.__pending: Optional[Tuple[Future, FrameContext]] = None
+        # Context of the last evaluated frame, reused by prefetch
+        self.__context: Optional[FrameContext] = None
+        # stage -> [count, total seconds, max seconds], each only written by its own thread
+        self.__latency: Dict[str, list] = {stage: [0, 0.0, 0.0] for stage in STAGES}
+        self.__worker_latency: Dict[str, list] = {stage: [0, 0.0, 0.0] for stage in WORKER_STAGES}
+
+    def __record(self, stage: str, start: float, latency: Optional[Dict[str, list]] = None) -> float:
+        now = time.perf_counter()
+        elapsed = now - start
+        entry = (self.__latency if latency is None else latency)[stage]
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+        return now
+
+    def evaluate(self, ship_state: Dict, game_state: Dict, context: Optional[FrameContext] = None) -> Threats:
+        '''
+        Desc: Threats of the current frame. Uses the speculative result if
+            it was evaluated on this frame's inputs
+
+        Parameters: ship_state - ship state from kessler_game
+                    game_state - game state from kessler_game
+                    context - This frame's FrameContext, built here if not given
+
+        Returns: asteroid index -> threat level for the asteroids posing a
+            threat, and asteroid index -> distance for the asteroids close
+            to the ship, sorted by distance
+        '''
+        start = time.perf_counter()
+        # The worker reads the lookup table, so it must be done before
+        # update() can rebuild it
+        pending, self.__pending = self.__pending, None
+        if pending is not None:
+            future, predicted = pending
+            threats = future.result()
+            start = self.__record("wait", start)
+
+        rebuilt = self.threat_system.update(ship_state, game_state)
+        start = self.__record("update", start)
+
+        if context is None:
+            context = FrameContext.from_state(ship_state, game_state)
+            start = self.__record("context", start)
+        self.__context = context
+
+        if pending is not None:
+            # A rebuilt table makes the speculative result stale
+            if (not rebuilt and len(predicted) == len(context)
+                    and abs(predicted.ship_position[0] - context.ship_position[0]) <= self.tolerance
+                    and abs(predicted.ship_position[1] - context.ship_position[1]) <= self.tolerance
+                    and np.allclose(predicted.positions, context.positions, rtol=0.0, atol=self.tolerance)
+                    and np.allclose(predicted.velocities, context.velocities, rtol=0.0, atol=self.tolerance)):
+                self.hits += 1
+                return threats
+            self.misses += 1
+
+        threats = self.threat_system.evaluate(context)
+        self.__record("evaluate", start)
+        return threats
+
+    def prefetch(self, ship_state: Dict, game_state: Dict, thrust: float, turn_rate: float, frames: int = 1):
+        '''
+        Desc: Starts evaluating the threats of the frame the controller is
+            next called on, in the background. Call it after evaluate() with
+            the command returned to the engine
+
+        Parameters: ship_state - ship state from kessler_game
+                    game_state - game state from kessler_game
+                    thrust - thrust command returned for this frame
+                    turn_rate - turn rate command returned for this frame
+                    frames - frames until the next call (the controller's decision interval)
+        '''
+        if not self.speculate or self.__context is None:
+            return
+        start = time.perf_counter()
+        delta_time = game_state.get("delta_time", 1.0 / 30.0)
+        map_size = game_state["map_size"]
+        context = self.__context
+        ship_position, ship_velocity, ship_heading = predict_ship(ship_state, thrust, turn_rate, delta_time, frames,
+                                                                  map_size)
+        positions = predict_asteroids(context.positions, context.velocities, delta_time, frames, map_size)
+        predicted = FrameContext(ship_position, ship_velocity, ship_heading, positions,
+                                 context.velocities, context.sizes, context.radii, context.map_size)
+        self.__record("predict", start)
+
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ThreatPipeline")
+            self.__finalizer = weakref.finalize(self, self.__executor.shutdown, wait=False)
+        future = self.__executor.submit(self.__speculate, predicted)
+        self.__pending = (future, predicted)
+
+    def __speculate(self, predicted: FrameContext) -> Threats:
+        start = time.perf_counter()
+        threats = self.threat_system.evaluate(predicted)
+        self.__record("speculate", start, self.__worker_latency)
+        return threats
+
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        '''
+        Desc: Time spent in each stage so far. "wait" is the time spent
+            blocked on a speculative result, "speculate" the time the worker
+            spent evaluating it
+
+        Returns: stage -> {"count", "total", "mean", "max"}, in seconds
+        '''
+        entries = {**self.__latency, **{stage: list(entry) for stage, entry in self.__worker_latency.items()}}
+        return {stage: {"count": count, "total": total, "mean": total / count if count else 0.0, "max": longest}
+                for stage, (count, total, longest) in entries.items()}
+
+    def close(self):
+        '''
+        Desc: Drops any pending speculation and stops the worker thread
+        '''
+        self.__pending = None
+        if self.__executor is not None:
+            self.__finalizer.detach()
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+            self.__finalizer = None
+
+
+def predict_ship(ship_state: Dict, thrust: float, turn_rate: float, delta_time: float, frames: int,
+                 map_size: Tuple[float, float]) -> Tuple[Tuple[float, float], Tuple[float, float], float]:
+    '''
+    Desc: Ship state after holding a command for some frames, stepping
+        the same way as the engine's Ship.update
+
+    Returns: predicted position, velocity and heading
+    '''
+    speed = ship_state["speed"]
+    heading = ship_state["heading"]
+    x, y = ship_state["position"]
+    drag = ship_state.get("drag", 80.0)
+    max_speed = ship_state.get("max_speed", 240.0)
+    thrust_range = ship_state.get("thrust_range", (-480.0, 480.0))
+    turn_rate_range = ship_state.get("turn_rate_range", (-180.0, 180.0))
+    thrust = min(max(thrust_range[0], thrust), thrust_range[1])
+    turn_rate = min(max(turn_rate_range[0], turn_rate), turn_rate_range[1])
+
+    velocity = tuple(ship_state.get("velocity", (0.0, 0.0)))
+    for _ in range(frames):
+        drag_amount = drag * delta_time
+        if drag_amount > abs(speed):
+            speed = 0.0
+        else:
+            speed -= drag_amount * np.sign(speed)
+        speed += thrust * delta_time
+        speed = min(max(-max_speed, speed), max_speed)
+
+        heading = (heading + turn_rate * delta_time) % 360.0
+        rad_heading = math.radians(heading)
+        velocity = (math.cos(rad_heading) * speed, math.sin(rad_heading) * speed)
+        x = (x + velocity[0] * delta_time) % map_size[0]
+        y = (y + velocity[1] * delta_time) % map_size[1]
+    return (x, y), velocity, heading
+
@@ -0,0 +1,144 @@
+'''
+Filename: threat_region
+Date: 10/18/26
+
+Desc: Part of the (distance, angle) input space of the threat FIS where
+an asteroid can reach a threat level at or above a cutoff, derived from
+the membership functions and rules. Asteroids outside it can skip
+inference
+
+'''
+import math
+import numpy as np
+
+from typing import Dict, Tuple
+from module.fuzzy_engine import MamdaniEngine, trimf
+
+
+class ThreatRegion:
+    """
+    Desc: Mask over the cells of a (distance, angle) grid, True where the
+        threat level may reach the cutoff somewhere in the cell
+
+        Over a cell, each input term's membership lies between its lowest
+        and highest value on the cell, so each rule's strength, and each
+        output term's activation, lies between bounds. The centroid of the
+        aggregated output set mu is at least the cutoff only if the
+        integral of (x - cutoff) mu(x) is not negative. Above the cutoff
+        mu is at most the output sets clipped at their highest
+        activations, below it at least the sets clipped at their lowest,
+        so a cell where even that integral is negative cannot reach the
+        cutoff. Every value interpolated from the corners of the cell
+        (as by ThreatSurface) is below the cutoff too
+    """
+    def __init__(self, engine: MamdaniEngine, universes: Dict[str, np.ndarray], distance_grid: np.ndarray,
+                 angle_grid: np.ndarray, output: str = "threat_level", cutoff: float = 0.5, tolerance: float = 0.01,
+                 samples: int = 401):
+        '''
+        Parameters: engine - Threat FIS with "distance" and "angle" inputs
+                    universes - The engine's universes, to find the points where its
+                        sampled memberships bend and the range of the output
+                    distance_grid, angle_grid - Evenly spaced ascending grid points, the corners
+                        of the cells
+                    output - Name of the threat output
+                    cutoff - Lowest threat level that counts as a threat
+                    tolerance - Cells are kept if they may reach cutoff - tolerance, which
+                        covers the difference between the engine and the skfuzzy FIS
+                        the lookup table is sampled from
+                    samples - Points the output integrals are taken on
+        '''
+        self.distance_grid = np.asarray(distance_grid, dtype=np.float64)
+        self.angle_grid = np.asarray(angle_grid, dtype=np.float64)
+        self.cutoff = cutoff
+        self.__steps = (self.distance_grid[1] - self.distance_grid[0], self.angle_grid[1] - self.angle_grid[0])
+
+        lower, upper = {}, {}
+        for name, grid in (("distance", self.distance_grid), ("angle", self.angle_grid)):
+            lower[name], upper[name] = self.__membership_bounds(engine, name, universes.get(name), grid)
+
+        # Bounds on every output term's activation, per cell
+        shape = (len(self.distance_grid) - 1, len(self.angle_grid) - 1)
+        terms = engine.outputs[output]
+        low = {term: np.zeros(shape) for term in terms}
+        high = {term: np.zeros(shape) for term in terms}
+        for rule in engine.rules:
+            if rule.output != output:
+                continue
+            combine = np.minimum if rule.connective == "and" else np.maximum
+            bounds = []
+            for bound in (lower, upper):
+                strength = None
+                for name, term in rule.antecedents.items():
+                    degree = bound[name][term]
+                    degree = degree[:, None] if name == "distance" else degree[None, :]
+                    strength = degree if strength is None else combine(strength, degree)
+                bounds.append(np.broadcast_to(strength, shape))
+            np.maximum(low[rule.term], bounds[0], out=low[rule.term])
+            np.maximum(high[rule.term], bounds[1], out=high[rule.term])
+
+        # Moment of the aggregated set about the cutoff, taken low below it and high above it
+        level = cutoff - tolerance
+        x = np.linspace(float(np.min(universes[output])), float(np.max(universes[output])), samples)
+        above = x >= level
+        mu = np.zeros(shape + (samples,))
+        for term, abc in terms.items():
+            membership = trimf(x, abc)
+            clipped = np.where(above, np.minimum(high[term][..., None], membership),
+                               np.minimum(low[term][..., None], membership))
+            np.maximum(mu, clipped, out=mu)
+        # Trapezoid rule on the evenly spaced points
+        weighted = (x - level) * mu
+        moment = (weighted.sum(axis=-1) - 0.5 * (weighted[..., 0] + weighted[..., -1])) * (x[1] - x[0])
+        # Where no rule can fire the output set is empty, with no centroid to reach the cutoff
+        fires = np.any([high[term] > 0.0 for term in terms], axis=0)
+        self.cells = (moment >= 0.0) & fires
+
+        # Furthest distance at which a cell may reach the cutoff, inf if the last cell, which
+        # covers every distance past the grid, does
+        rows = np.flatnonzero(self.cells.any(axis=1))
+        if len(rows) == 0:
+            self.reach = 0.0
+        elif rows[-1] == shape[0] - 1:
+            self.reach = math.inf
+        else:
+            self.reach = float(self.distance_grid[rows[-1] + 1])
+
+    @staticmethod
+    def __membership_bounds(engine: MamdaniEngine, name: str, universe: np.ndarray,
+                            grid: np.ndarray) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        '''
+        Desc: Lowest and highest membership of each term of an input on every
+            grid interval. Memberships are piecewise linear, bending at the
+            universe points and the triangle vertices, so the extremes on an
+            interval are at its ends or at the bends inside it
+
+        Returns: term name -> (cells,) lowest memberships, and the highest
+        '''
+        bends = [abc for abc in engine.inputs[name].values()]
+        bends = np.unique(np.concatenate([np.ravel(bends)] + ([np.asarray(universe)] if universe is not None else [])))
+        lower = {term: np.empty(len(grid) - 1) for term in engine.inputs[name]}
+        upper = {term: np.empty(len(grid) - 1) for term in engine.inputs[name]}
+        for k in range(len(grid) - 1):
+            inside = bends[(bends > grid[k]) & (bends < grid[k + 1])]
+            points = np.concatenate(([grid[k], grid[k + 1]], inside))
+            for term, degrees in engine.fuzzify(name, points).items():
+                lower[term][k] = degrees.min()
+                upper[term][k] = degrees.max()
+        return lower, upper
+
+    def contains(self, distances: np.ndarray, angles: np.ndarray) -> np.ndarray:
+        '''
+        Desc: Whether each asteroid's cell may reach the cutoff. Inputs are
+            clamped to the grid, NaN inputs (which give no threat) are outside
+
+        Returns: Boolean array, the shape of the inputs
+        '''
+        distances = np.asarray(distances, dtype=np.float64)
+        angles = np.asarray(angles, dtype=np.float64)
+        valid = ~(np.isnan(distances) | np.isnan(angles))
+        cells = []
+        for values, grid, step in ((distances, self.distance_grid, self.__steps[0]),
+                                   (angles, self.angle_grid, self.__steps[1])):
+            cell = (np.clip(np.where(valid, values, grid[0]), grid[0], grid[-1]) - grid[0]) / step
+            cells.append(np.minimum(cell.astype(np.intp), len(grid) - 2))
+        return self.cells[cells[0], cells[1]] & valid
@@ -0,0 +1,248 @@
+'''
+Filename: threat_surface
+Date: 10/18/26
+
+Desc: Dense distance x angle lookup table compiled from the threat
+FIS, evaluated for all asteroids at once by bilinear interpolation.
+Compiled tables are cached on disk and memory-mapped on load
+
+'''
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+from typing import Callable, Dict, Tuple
+from skfuzzy.control import ControlSystemSimulation
+
+# Surfaces already compiled in this process, keyed by config hash, ranges and
+# resolution, so every controller built from the same config shares one table
+_SURFACES: Dict[str, Tuple[np.ndarray, float]] = {}
+
+# Bumped whenever the way tables are built or stored changes, so that
+# older cache entries are no longer used
+CACHE_VERSION = 2
+
+
+class ThreatSurface:
+    """
+    Desc: Threat level sampled from the live FIS on a regular
+        (distance, angle) grid. The table is built once per config and
+        rebuilt when the config file changes on disk. Built tables are
+        saved to cache_dir under a hash of the config contents and grid,
+        so later processes memory-map them instead of sampling the FIS
+    """
+    def __init__(self, fis_factory: Callable[[], ControlSystemSimulation],
+                 config_path: str = "threats_config.json",
+                 distance_range: Tuple[float, float] = (0.0, 900.0),
+                 angle_range: Tuple[float, float] = (0.0, 180.0),
+                 resolution: Tuple[int, int] = (91, 91),
+                 validate: bool = True,
+                 cache_dir: str = ""):
+        '''
+        Parameters: fis_factory - Builds the threat FIS from the current config,
+                        with "distance" and "angle" inputs and a "threat_level" output
+                    config_path - File the FIS is built from, watched for changes
+                    distance_range - Distances covered by the table, inputs are clamped to it
+                    angle_range - Angles (degrees) covered by the table, inputs are clamped to it
+                    resolution - Number of grid points along distance and angle
+                    validate - Compare the table with the live FIS at the cell centres
+                        and report the largest difference in sampled_error
+                    cache_dir - Directory of the on-disk table cache. Defaults to
+                        .fuzzy_cache next to the config file, None disables it
+        '''
+        if resolution[0] < 2 or resolution[1] < 2:
+            raise ValueError("ThreatSurface needs at least 2 grid points per axis")
+        self.fis_factory = fis_factory
+        self.config_path = config_path
+        self.distance_range = (float(distance_range[0]), float(distance_range[1]))
+        self.angle_range = (float(angle_range[0]), float(angle_range[1]))
+        self.resolution = (int(resolution[0]), int(resolution[1]))
+        self.validate = validate
+        if cache_dir == "":
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(config_path)), ".fuzzy_cache")
+        self.cache_dir = cache_dir
+
+        # np.memmap when loaded from the cache
+        self.table: np.ndarray = None
+        # Largest |table - FIS| found at the cell centres, None if not validated. An estimate of the
+        # interpolation error, not a bound: the FIS can differ more elsewhere in a cell
+        self.sampled_error: float = None
+        self.__config_stamp = None
+        self.__config_hash = None
+
+        # Grid spacing, used to map inputs to fractional cell coordinates
+        self.__distance_step = (self.distance_range[1] - self.distance_range[0]) / (self.resolution[0] - 1)
+        self.__angle_step = (self.angle_range[1] - self.angle_range[0]) / (self.resolution[1] - 1)
+
+        self.refresh()
+
+    @property
+    def distance_grid(self) -> np.ndarray:
+        return np.linspace(self.distance_range[0], self.distance_range[1], self.resolution[0])
+
+    @property
+    def angle_grid(self) -> np.ndarray:
+        return np.linspace(self.angle_range[0], self.angle_range[1], self.resolution[1])
+
+    def refresh(self) -> bool:
+        '''
+        Desc: Rebuilds the table if the config file changed since it was built.
+            Only the file's mtime and size are checked unless they changed
+
+        Returns: True if the table was rebuilt
+        '''
+        try:
+            stat = os.stat(self.config_path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if self.table is not None and stamp == self.__config_stamp:
+            return False
+        self.__config_stamp = stamp
+
+        config_hash = self.__hash_config()
+        if self.table is not None and config_hash == self.__config_hash:
+            return False
+        self.__config_hash = config_hash
+
+        # Tables depend on the config contents and on the grid, nothing else
+        key = hashlib.sha1(json.dumps([CACHE_VERSION, config_hash, self.distance_range, self.angle_range,
+                                       self.resolution, self.validate]).encode("utf-8")).hexdigest()
+        if key not in _SURFACES:
+            surface = self.__load_cached(key)
+            if surface is None:
+                surface = self.__build()
+                self.__store_cached(key, *surface)
+            _SURFACES[key] = surface
+        self.table, self.sampled_error = _SURFACES[key]
+        return True
+
+    def __cache_paths(self, key: str) -> Tuple[str, str]:
+        return (os.path.join(self.cache_dir, key + ".npy"),
+                os.path.join(self.cache_dir, key + ".json"))
+
+    def __load_cached(self, key: str) -> Tuple[np.ndarray, float]:
+        '''
+        Desc: Memory-maps a cached table. Entries that are missing, do not
+            match the manifest or fail its checksum are ignored (and later
+            overwritten by a fresh build)
+
+        Returns: (table, sampled_error), or None
+        '''
+        if self.cache_dir is None:
+            return None
+        table_path, manifest_path = self.__cache_paths(key)
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+            table = np.load(table_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(manifest, dict) or manifest.get("key") != key or table.shape != self.resolution or table.dtype != np.float64
+                or hashlib.sha1(table.tobytes()).hexdigest() != manifest.get("checksum")):
+            return None
+        return table, manifest.get("sampled_error")
+
+    def __store_cached(self, key: str, table: np.ndarray, sampled_error: float):
+        '''
+        Desc: Writes a table and its manifest. Both are written to temporary
+            files and renamed into place, so other processes never see a
+            partial entry. Failing to write the cache is not an error
+        '''
+        if self.cache_dir is None:
+            return
+        table_path, manifest_path = self.__cache_paths(key)
+        manifest = {
+            "key": key,
+            "version": CACHE_VERSION,
+            "config_path": os.path.abspath(self.config_path),
+            "config_hash": self.__config_hash,
+            "distance_range": self.distance_range,
+            "angle_range": self.angle_range,
+            "resolution": self.resolution,
+            "sampled_error": sampled_error,
+            "checksum": hashlib.sha1(np.ascontiguousarray(table).tobytes()).hexdigest(),
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for path, write in ((table_path, lambda f: np.save(f, table)),
+                                (manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))):
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        write(f)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+        except OSError:
+            pass
+
+    def __hash_config(self) -> str:
+        try:
+            with open(self.config_path, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return ""
+
+    def __sample(self, distances: np.ndarray, angles: np.ndarray) -> np.ndarray:
+        '''
+        Desc: Runs the live FIS on a whole grid of inputs in one compute() call
+        '''
+        fis = self.fis_factory()
+        fis.input["distance"] = distances
+        fis.input["angle"] = angles
+        fis.compute()
+        return np.array(fis.output["threat_level"], dtype=np.float64)
+
+    def __build(self) -> Tuple[np.ndarray, float]:
+        distances, angles = np.meshgrid(self.distance_grid, self.angle_grid, indexing="ij")
+        table = self.__sample(distances, angles)
+
+        sampled_error = None
+        if self.validate:
+            # The table is exact at the grid points. The FIS surface bends
+            # wherever a membership function or a clipped output set changes
+            # slope, which can be anywhere inside a cell, so no point of a
+            # cell is known to be the worst. The cell centres, the points
+            # furthest from the grid, are sampled as an estimate
+            mid_distances, mid_angles = np.meshgrid(self.distance_grid[:-1] + 0.5 * self.__distance_step,
+                                                    self.angle_grid[:-1] + 0.5 * self.__angle_step,
+                                                    indexing="ij")
+            expected = self.__sample(mid_distances, mid_angles)
+            interpolated = 0.25 * (table[:-1, :-1] + table[1:, :-1] + table[:-1, 1:] + table[1:, 1:])
+            sampled_error = float(np.max(np.abs(interpolated - expected)))
+        return table, sampled_error
+
+    def evaluate(self, distances, angles) -> np.ndarray:
+        '''
+        Desc: Threat level for arrays of distances and angles by bilinear
+            interpolation of the table. Inputs outside the table are clamped
+            to its edges, NaN inputs give NaN
+
+        Parameters: distances - Distances from the ship
+                    angles - Angles (degrees) between the asteroid velocity
+                        and the asteroid to ship vector
+
+        Returns: Array of threat levels, the shape of the inputs
+        '''
+        d = (np.clip(np.asarray(distances, dtype=np.float64), *self.distance_range)
+             - self.distance_range[0]) / self.__distance_step
+        a = (np.clip(np.asarray(angles, dtype=np.float64), *self.angle_range)
+             - self.angle_range[0]) / self.__angle_step
+
+        # Cell index, kept one short of the last grid point so the far edge
+        # interpolates inside the last cell
+        valid = ~(np.isnan(d) | np.isnan(a))
+        i = np.minimum(np.where(valid, d, 0.0).astype(np.intp), self.resolution[0] - 2)
+        j = np.minimum(np.where(valid, a, 0.0).astype(np.intp), self.resolution[1] - 2)
+        td = d - i
+        ta = a - j
+
+        # Plain ndarray view of a memory-mapped table, indexing a np.memmap goes through Python
+        table = np.asarray(self.table)
+        low = table[i, j] + (table[i + 1, j] - table[i, j]) * td
+        high = table[i, j + 1] + (table[i + 1, j + 1] - table[i, j + 1]) * td
+        return low + (high - low) * ta
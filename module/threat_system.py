@@ -10,22 +10,73 @@ Desc: Contains ThreatSystem class which
 
 """
 
-import math
 import numpy as np
 import skfuzzy as fuzz
 import json
 
-from typing import Dict
+from typing import Dict, Tuple
 from skfuzzy import control as ctrl
-from module.data import AsteroidData, ShipData
+from module.threat_surface import ThreatSurface
+from module.threat_region import ThreatRegion
+from module.fuzzy_engine import MamdaniEngine, FuzzyRule
+from module.frame_context import FrameContext
+
+# Universes of the threat FIS variables
+DISTANCE_UNIVERSE = np.arange(0, 1000.0, 10)
+ANGLE_UNIVERSE = np.arange(-180, 180, 1)
+THREAT_UNIVERSE = np.arange(-1, 1, 0.05)
+
+# Threat level output sets
+THREAT_LEVELS = {
+    "low": [-1.0, -1.0, 0.0],
+    "medium": [-1.0, 0.0, 1.0],
+    "high": [0.0, 1.0, 1.0],
+}
+
+# Lowest threat level of an asteroid posing a threat
+THREAT_CUTOFF = 0.5
+
+# Rules for calculating threat level, as (distance, angle, threat_level)
+THREAT_RULES = [
+    ("far", "acute", "low"),
+    ("far", "right", "low"),
+    ("far", "obtuse", "low"),
+    ("near", "acute", "high"),
+    ("near", "right", "medium"),
+    ("near", "obtuse", "medium"),
+    ("close", "acute", "high"),
+    ("close", "right", "high"),
+    ("close", "obtuse", "medium"),
+]
 
 # The `TargetingSystem` class is a Python class that represents a targeting system for a game, which
 # calculates the threat level of asteroids based on their distance and angle from the ship and returns
 # a dictionary of the 10 most threatening asteroids.
 class TargetingSystem:
-    def __init__(self) -> None:
+    def __init__(self, surface_resolution: Tuple[int, int] = (91, 91), nearest: int = 3, cull: bool = False) -> None:
+        '''
+        Parameters
+        ----------
+            surface_resolution : Tuple[int, int]
+                Number of distance and angle grid points of the threat lookup table. The table is sampled
+                from the threat FIS once per config, its sampled_error reports the largest interpolation
+                error found against the live FIS at the cell centres.
+            nearest : int
+                Number of close asteroids kept in distances. The controller reads the nearest one and Dodge
+                the nearest 3.
+            cull : bool
+                Only evaluate the asteroids inside the ThreatRegion derived from the threat FIS, the part
+                of the distance x angle table where the threat level can reach THREAT_CUTOFF. The
+                threats found are the same as without culling. Pays off with a scorer whose cost grows
+                with the number of asteroids, the lookup table costs about the same for any number.
+        '''
+        self.nearest = nearest
+        # Asteroids skipped by culling, and asteroids passed to the scorer
+        self.culled = 0
+        self.evaluated = 0
         self.asteroids = None
-        self._fis = self.create_thread_fis
+        self._surface = ThreatSurface(lambda: self.create_thread_fis, resolution=surface_resolution)
+        self._region = self.create_threat_region if cull else None
         self.distances = {}
 
     def update(self, ship_state: Dict, game_state: Dict):
@@ -41,12 +92,22 @@ class TargetingSystem:
                 the game. It may include information such as the position and velocity of the ship, the positions
                 and velocities of asteroids, the score, the level, and any other relevant information needed to
                 update the game.
+
+        Returns
+        -------
+            True if the threat lookup table was rebuilt.
         
         '''
         self.ship = ship_state
         self.game = game_state
         self.asteroids = game_state["asteroids"]
 
+        # Rebuild the threat lookup table if threats_config.json was edited
+        rebuilt = self._surface.refresh()
+        if rebuilt and self._region is not None:
+            self._region = self.create_threat_region
+        return rebuilt
+
     def __load_config(self):
         file = "threats_config.json"
 
@@ -66,9 +127,9 @@ class TargetingSystem:
             ControlSystemSimulation: Fuzzy control system simulation created from the function.
         """
 
-        distance = ctrl.Antecedent(np.arange(0, 1000.0, 10), "distance")
-        angle = ctrl.Antecedent(np.arange(-180, 180, 1), "angle")
-        threat_level = ctrl.Consequent(np.arange(-1, 1, 0.05), "threat_level")
+        distance = ctrl.Antecedent(DISTANCE_UNIVERSE, "distance")
+        angle = ctrl.Antecedent(ANGLE_UNIVERSE, "angle")
+        threat_level = ctrl.Consequent(THREAT_UNIVERSE, "threat_level")
 
         # distance.automf(
         #     3, variable_type="", invert=True, names=["close", "near", "far"]
@@ -90,35 +151,12 @@ class TargetingSystem:
         angle["right"] = fuzz.trimf(angle.universe, config_data['angle']['right'])
         angle["obtuse"] = fuzz.trimf(angle.universe, config_data['angle']['obtuse'])
 
-        threat_level["low"] = fuzz.trimf(
-            threat_level.universe, [-1.0, -1.0, 0.0])
-        threat_level["medium"] = fuzz.trimf(
-            threat_level.universe, [-1.0, 0.0, 1.0])
-        threat_level["high"] = fuzz.trimf(
-            threat_level.universe, [0.0, 1.0, 1.0])
+        for level, abc in THREAT_LEVELS.items():
+            threat_level[level] = fuzz.trimf(threat_level.universe, abc)
 
         # Rules for calculating threat level
 
-        rule1 = ctrl.Rule(distance["far"] &
-                          angle["acute"], threat_level["low"])
-        rule2 = ctrl.Rule(distance["far"] &
-                          angle["right"], threat_level["low"])
-        rule3 = ctrl.Rule(distance["far"] &
-                          angle["obtuse"], threat_level["low"])
-        rule4 = ctrl.Rule(distance["near"] &
-                          angle["acute"], threat_level["high"])
-        rule5 = ctrl.Rule(distance["near"] &
-                          angle["right"], threat_level["medium"])
-        rule6 = ctrl.Rule(distance["near"] &
-                          angle["obtuse"], threat_level["medium"])
-        rule7 = ctrl.Rule(distance["close"] &
-                          angle["acute"], threat_level["high"])
-        rule8 = ctrl.Rule(distance["close"] &
-                          angle["right"], threat_level["high"])
-        rule9 = ctrl.Rule(distance["close"] &
-                          angle["obtuse"], threat_level["medium"])
-
-        rules = [rule1, rule2, rule3, rule4, rule5, rule6, rule7, rule8, rule9]
+        rules = [ctrl.Rule(distance[d] & angle[a], threat_level[t]) for d, a, t in THREAT_RULES]
 
         fis1_ctrl = ctrl.ControlSystem(rules)
 
@@ -126,89 +164,92 @@ class TargetingSystem:
         return ctrl.ControlSystemSimulation(fis1_ctrl)
 
     @property
-    def get_threats_ids(self) -> dict:
-        '''The `get_threats_ids` function calculates the threat level of asteroids based on their distance
-        and angle from the ship, and returns a dictionary of the 10 most threatening asteroids.
+    def create_threat_engine(self) -> MamdaniEngine:
+        """Creates the same threat level system as create_thread_fis on the
+        NumPy fuzzy engine, which evaluates arrays of inputs in one call.
+
+        Returns:
+            MamdaniEngine: Engine with "distance" and "angle" inputs and a "threat_level" output.
+        """
+        config_data = self.__load_config()
+
+        return MamdaniEngine(
+            inputs={"distance": config_data['distances'], "angle": config_data['angle']},
+            outputs={"threat_level": THREAT_LEVELS},
+            rules=[FuzzyRule({"distance": d, "angle": a}, "threat_level", t) for d, a, t in THREAT_RULES],
+            universes={"distance": DISTANCE_UNIVERSE, "angle": ANGLE_UNIVERSE, "threat_level": THREAT_UNIVERSE},
+        )
+
+    @property
+    def create_threat_region(self) -> ThreatRegion:
+        """Derives the part of the lookup table where the threat FIS can reach THREAT_CUTOFF, from the
+        current config.
+
+        Returns:
+            ThreatRegion: Region over the cells of the lookup table.
+        """
+        return ThreatRegion(self.create_threat_engine,
+                            {"distance": DISTANCE_UNIVERSE, "angle": ANGLE_UNIVERSE, "threat_level": THREAT_UNIVERSE},
+                            self._surface.distance_grid, self._surface.angle_grid, cutoff=THREAT_CUTOFF)
+
+    def evaluate(self, context: FrameContext) -> Tuple[Dict[int, float], Dict[int, float]]:
+        '''Threat levels of the asteroids of a frame. Reads the lookup table but no other state of the
+        targeting system (other than its counters), so it can run on another thread.
+
+        Parameters
+        ----------
+            context : FrameContext
+                Distances and approach angles of the asteroids.
 
         Returns
         -------
-            The method `get_threats_ids` returns a dictionary containing the index of asteroids that are
-            posing a threat, along with their corresponding threat level.
-
+            The index and threat level of every asteroid posing a threat, and the index and distance of the
+            nearest asteroids within 250 of the ship, sorted by distance. Both use context.distances, measured
+            straight across the map rather than around its edges.
         '''
         asteroids_ids = {}
-        self.distances = {}
+        if len(context) == 0:
+            return asteroids_ids, {}
 
-        for i in range(len(self.asteroids)):
-            asteroid = AsteroidData(self.asteroids[i], self.ship)
-            ship = ShipData(self.ship)
-            # 1. Calculate Vector from ship to asteroid
-
-            # 3. Distance of asteroid and ship
-            distance = math.dist(
-                asteroid.position, ship.position)
-
-            """
-                # if distance < 250 and len(asteroids_ids) < 10:
-                #     asteroids_ids.append(i)
-                #     print(f"DISTANCE: {distance}\n")
-                # else:
-                #     if i in asteroids_ids:
-                #         asteroids_ids.remove(i)
-
-                # MAX ANGLE = +-180
-                # MAX DISTANCE = 1100
-
-                # print(f"V1: {distance}", end="\r")
-            """
-
-            # Clamps distance to max(1000)
-            if distance > 900:
-                distance = 900
-
-            # Calculates the threat level from -1 to 1
-            self._fis.input["distance"] = distance
-            self._fis.input["angle"] = asteroid.angle
-            self._fis.compute()
-
-            """
-                # print(
-                #     f"THEAD_LEVEL: {self._fis.output['threat_level'].round(2)}, ANGLE: {angle}, DISTANCE: {distance}",
-                #     end="\r",
-                # )
-            """
-
-            # 4. Set the 10 most threatening in a list
-                
-
-            if self._fis.output["threat_level"] >= 0.5:
-                asteroids_ids[i] = self._fis.output["threat_level"]
-             
-            if distance <= 250:   
-                self.distances[i] = distance
-            
-                
-           
+        # Clamps distance to max(900)
+        distance = np.minimum(context.distances, 900.0)
 
-                # print(f"ANGLE: {asteroid.angle}, DISTANCE: {distance}\n")
-                
-                
-            
-            # print(f"THEAD_LEVEL: {self._fis.output['threat_level']}\n")
-            """
-                # print(f"ANGLE: {angle}")
-                # if angle < 50.0 and distance < 250.0 and len(asteroids_ids) < 10:
-                #     asteroids_ids.append(i)
-                #     # print(f"ANGLE: {angle}, DISTANCE: {distance}\n")
+        angle = context.approach_angles
+
+        # Asteroids outside the threat region cannot reach the cutoff
+        if self._region is not None:
+            candidates = np.flatnonzero(distance <= self._region.reach)
+            candidates = candidates[self._region.contains(distance[candidates], angle[candidates])]
+            self.culled += len(context) - len(candidates)
+        else:
+            candidates = np.arange(len(context))
+
+        # Threat level from -1 to 1, interpolated from the FIS lookup table
+        if len(candidates) > 0:
+            threat = self._surface.evaluate(distance[candidates], angle[candidates])
+            self.evaluated += len(candidates)
+        else:
+            threat = np.empty(0)
 
-                # else:
-                #     if i in asteroids_ids:
-                #         asteroids_ids.remove(i)
+        for k in np.flatnonzero(threat >= THREAT_CUTOFF).tolist():
+            asteroids_ids[int(candidates[k])] = float(threat[k])
 
-            """
+        close, close_distances = context.index.nearest_k(context.ship_position, self.nearest, 250, wrap=False)
+        distances = dict(zip(close.tolist(), close_distances.tolist()))
 
-        self.distances = dict(sorted(self.distances.items(),
-                                     key=lambda x: (x[1], x[0])))
+        return asteroids_ids, distances  # Index of asteroid that is posing a threat
 
-        return asteroids_ids  # Index of asteroid that is posing a threat
+    @property
+    def get_threats_ids(self) -> dict:
+        '''The `get_threats_ids` function calculates the threat level of asteroids based on their distance
+        and angle from the ship, and returns a dictionary of the 10 most threatening asteroids.
+
+        Returns
+        -------
+            The method `get_threats_ids` returns a dictionary containing the index of asteroids that are
+            posing a threat, along with their corresponding threat level.
+
+        '''
+        asteroids_ids, self.distances = self.evaluate(FrameContext.from_state(self.ship, self.game))
+        return asteroids_ids
 
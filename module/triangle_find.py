@@ -3,12 +3,17 @@ Filename: cone_find.py
 Author: Nathan D (nathan.delcampo@digipen.edu)
 Date: 11/13/2023
 Desc: Given ship position and angle, create a 'pyramid' polygon
-in that direction and find all asteroids in that direction
+in that direction and find all asteroids in that direction. cone_find
+answers the same query from asteroid bearings and distances, without
+shapely
 
 '''
 from shapely import Polygon, Point, affinity
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import math
+import numpy as np
+
+from module.frame_context import FrameContext
 
 
 class TriangleFind:
@@ -20,10 +25,27 @@ class TriangleFind:
 
     def __init__(self, angle, length):
         # The acute angle of the isoceles triangle
-        self.triangle = self.__create_triangle__(angle, length)
+        self.__triangle = self.__create_triangle__(angle, length)
         self.rotation = 0
         self.asteroids = []
 
+        # The triangle's tip angle and how far it reaches in front of the tip, for cone_find
+        self.angle = angle
+        self.depth = self.__triangle.exterior.coords[1][0]
+
+        # Ship state of the last update, the triangle is only moved there when it is used
+        self.__ship = None
+
+    @property
+    def triangle(self) -> Polygon:
+        '''
+        Returns: The shapely triangle, at the ship of the last update
+        '''
+        if self.__ship is not None:
+            self.__place(*self.__ship)
+            self.__ship = None
+        return self.__triangle
+
     def __create_triangle__(self, angle, length):
         '''
         Desc: Creates a shapely triangle at a certain angle
@@ -62,11 +84,11 @@ class TriangleFind:
 
         Returns: N/A
         '''
-        self.triangle = affinity.rotate(self.triangle,
-                                        angle,
-                                        origin=(
-                                            self.triangle.exterior.coords[0]),
-                                        use_radians=False)
+        self.__triangle = affinity.rotate(self.__triangle,
+                                          angle,
+                                          origin=(
+                                              self.__triangle.exterior.coords[0]),
+                                          use_radians=False)
 
     def update(self, ship: Dict):
         '''
@@ -75,23 +97,32 @@ class TriangleFind:
 
         Parameters: ship - The ship object
 
+        Returns: N/A
+        '''
+        self.__ship = (ship["heading"], ship["position"])
+
+    def __place(self, heading, shipPos):
+        '''
+        Desc: Rotates and moves the triangle to the ship
+
+        Parameters: heading - The ship heading
+                    shipPos - The ship position
+
         Returns: N/A
         '''
         # get amount triangle should rotate
-        rotateAngle = ship["heading"] - self.rotation
+        rotateAngle = heading - self.rotation
 
         # rotate
         self.__rotate(rotateAngle)
         # print("CURRENT TRIANGLE ANGLE: ", self.rotation)
         # print("TURN BY: ", rotateAngle)
-        # print("SHIP ROTATION: ", ship["heading"])
+        # print("SHIP ROTATION: ", heading)
         # update rotation var
-        self.rotation = ship["heading"]
+        self.rotation = heading
 
         # triangle 'tip' pos
-        trianglePos = self.triangle.exterior.coords[0]
-
-        shipPos = ship["position"]
+        trianglePos = self.__triangle.exterior.coords[0]
 
         # print("SHIP POS: ", shipPos)
 
@@ -100,9 +131,9 @@ class TriangleFind:
         ydiff = shipPos[1] - trianglePos[1]
 
         # move triangle
-        self.triangle = affinity.translate(self.triangle,
-                                           xoff=xdiff,
-                                           yoff=ydiff)
+        self.__triangle = affinity.translate(self.__triangle,
+                                             xoff=xdiff,
+                                             yoff=ydiff)
 
         # print("CURRENT TRIANGLE POINTS: ", self.triangle)
 
@@ -117,6 +148,7 @@ class TriangleFind:
         '''
         # create a list of the indexes of asteroids
         intersectionAsteroids = []
+        triangle = self.triangle
 
         # Check intersections of each asteroid
         for i in range(len(asteroids)):
@@ -128,18 +160,19 @@ class TriangleFind:
 
             # if intersection
             # MAYBE MULTIPROCESS THIS?
-            if self.__check_intersection(pos[0], pos[1]):
+            if self.__check_intersection(triangle, pos[0], pos[1]):
                 # append
                 intersectionAsteroids.append(i)
 
         # return the list of indexes
         return intersectionAsteroids
 
-    def __check_intersection(self, x, y):
+    def __check_intersection(self, triangle, x, y):
         '''
         Desc: Checks a given position against the triangle
 
-        Parameters: x - The x pos
+        Parameters: triangle - The placed triangle
+                    x - The x pos
                     y - The y pos
 
         Returns: True or false based on if intersecting
@@ -148,7 +181,45 @@ class TriangleFind:
         asteroid = Point(x, y)
 
         # check intersection and return
-        if (self.triangle.intersection(asteroid)):
+        if (triangle.intersection(asteroid)):
             return True
         else:
             return False
+
+    def cone_find(self, context: FrameContext, wrap: bool = False) -> List[int]:
+        '''
+        Desc: Same asteroids as triangle_find, found in one NumPy pass
+            over the asteroids near the ship in the frame's spatial index:
+            those within angle/2 of the ship heading and at most depth
+            ahead of the ship
+
+        Parameters: context - FrameContext of the current frame
+                    wrap - Take each asteroid the short way around the map,
+                        so asteroids across a map edge are found too
+
+        Returns: The list of indexes of asteroids in the triangle, closest first
+        '''
+        return context.index.query_cone(context.ship_position, context.ship_heading, self.angle, self.depth,
+                                        wrap).tolist()
+
+
+def cone_find(offsets: np.ndarray, heading: float, angle: float, depth: float) -> np.ndarray:
+    '''
+    Desc: Finds the points inside an isoceles triangle with its tip at the
+        origin, pointing along heading. A point is inside when it is
+        within angle/2 of the heading and at most depth along it
+
+    Parameters: offsets - (N, 2) points relative to the tip
+                heading - Direction of the triangle in degrees
+                angle - The tip angle in degrees
+                depth - Height of the triangle
+
+    Returns: indexes of the points inside, closest to the tip first
+    '''
+    radians = math.radians(heading)
+    forward = offsets[:, 0] * math.cos(radians) + offsets[:, 1] * math.sin(radians)
+    side = offsets[:, 1] * math.cos(radians) - offsets[:, 0] * math.sin(radians)
+    inside = np.flatnonzero((forward >= 0.0) & (forward <= depth)
+                            & (np.abs(side) <= forward * math.tan(math.radians(angle) / 2.0)))
+    distances = forward[inside] ** 2 + side[inside] ** 2
+    return inside[np.argsort(distances, kind="stable")]
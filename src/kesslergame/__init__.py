@@ -4,14 +4,19 @@
 # this source code package.
 
 from .ship import Ship
-from .kessler_game import KesslerGame, TrainerEnvironment
+from .kessler_game import KesslerGame, TrainerEnvironment, KesslerSession, WorldSnapshot, StopReason
+from .vector_env import VectorKesslerGame
 from .controller import KesslerController
 from .controller_gamepad import GamepadController
 from .scenario import Scenario
 from .score import Score
+from .batch import BatchResult, BatchRun
 from .graphics import GraphicsType, KesslerGraphics
+from .observer import KesslerObserver
+from .replay import ReplayRecorder, ReplayPlayer
 from ._version import __version__
 
 
-__all__ = ['KesslerGame', 'TrainerEnvironment', 'KesslerController', 'Scenario', 'Score', 'GraphicsType',
-           'KesslerGraphics', 'GamepadController', 'Ship']
+__all__ = ['KesslerGame', 'TrainerEnvironment', 'KesslerSession', 'WorldSnapshot', 'StopReason', 'VectorKesslerGame', 'KesslerController', 'Scenario', 'Score', 'GraphicsType',
+           'KesslerGraphics', 'GamepadController', 'Ship',
+           'BatchResult', 'BatchRun', 'KesslerObserver', 'ReplayRecorder', 'ReplayPlayer']
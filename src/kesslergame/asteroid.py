@@ -19,7 +19,8 @@ class Asteroid:
                  position: Tuple[float, float],
                  speed: Optional[float] = None,
                  angle: Optional[float] = None,
-                 size: Optional[int] = None) -> None:
+                 size: Optional[int] = None,
+                 rng: Optional[random.Random] = None) -> None:
         """
         Constructor for Asteroid Sprite
 
@@ -27,7 +28,9 @@ class Asteroid:
         :param speed: Optional Starting Speed
         :param angle: Optional Starting heading angle (degrees)
         :param size: Optional Starting size (1 to 4 inclusive)
+        :param rng: Optional random number generator, defaults to the global ``random`` module
         """
+        rand = rng if rng is not None else random
 
         # Set size to 4 if none is specified. Notify if out of size range
         if size:
@@ -51,8 +54,8 @@ class Asteroid:
         self.mass = 0.25*math.pi*self.radius*self.radius
 
         # Use optional angle and speed arguments otherwise generate random angle and speed
-        starting_angle = angle if angle is not None else random.random()*360.0
-        starting_speed = speed if speed is not None else random.random()*self.max_speed - self.max_speed/2.0
+        starting_angle = angle if angle is not None else rand.random()*360.0
+        starting_speed = speed if speed is not None else rand.random()*self.max_speed - self.max_speed/2.0
 
         # Set velocity based on starting angle and speed
         # self.velocity = [
@@ -68,8 +71,8 @@ class Asteroid:
         self.position = position
 
         # Random rotations for use in display or future use with complex hit box
-        self.angle: float = random.uniform(0.0, 360.0)
-        self.turnrate: float = random.uniform(-100, 100)
+        self.angle: float = rand.uniform(0.0, 360.0)
+        self.turnrate: float = rand.uniform(-100, 100)
 
     @property
     def state(self) -> Dict[str, Any]:
@@ -86,8 +89,8 @@ class Asteroid:
         self.position = (self.position[0] + self.velocity[0] * delta_time, self.position[1] + self.velocity[1] * delta_time)
         self.angle += delta_time * self.turnrate
 
-    def destruct(self, impactor: Union['Bullet', 'Mine', 'Ship']) -> list['Asteroid']:
-        """ Spawn child asteroids"""
+    def destruct(self, impactor: Union['Bullet', 'Mine', 'Ship'], rng: Optional[random.Random] = None) -> list['Asteroid']:
+        """ Spawn child asteroids, drawing their random spin from ``rng`` if given"""
 
         if self.size != 1:
             if isinstance(impactor, Mine):
@@ -140,7 +143,7 @@ class Asteroid:
             theta = math.degrees(math.atan2(vfy, vfx))
             angles = [theta + split_angle, theta, theta - split_angle]
 
-            return [Asteroid(position=self.position, size=self.size-1, speed=v, angle=angle) for angle in angles]
+            return [Asteroid(position=self.position, size=self.size-1, speed=v, angle=angle, rng=rng) for angle in angles]
 
                 # Old method of doing random splits
                 # return [Asteroid(position=self.position, size=self.size-1) for _ in range(self.num_children)]
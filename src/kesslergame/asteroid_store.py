@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import operator
+from typing import Iterable, List, Tuple, Set, Union, Dict, Any, Callable, Optional, SupportsIndex
+
+import numpy as np
+
+from .asteroid import Asteroid
+
+# Names of the per-asteroid arrays of an AsteroidStore
+_FIELDS = ('_position', '_velocity', '_radius', '_mass', '_size', '_angle', '_turnrate')
+
+
+class AsteroidView(Asteroid):
+    """
+    Asteroid whose physical state lives in a row of an ``AsteroidStore``. Reads and writes of the usual ``Asteroid``
+    attributes go through to the store arrays, so graphics, game state generation and ``destruct`` work unchanged.
+    """
+    __slots__ = ('_store', '_idx')
+
+    def __init__(self, store: 'AsteroidStore', idx: int) -> None:
+        self._store = store
+        self._idx = idx
+
+    @property
+    def position(self) -> Tuple[float, float]:  # type: ignore[override]
+        x, y = self._store._position[self._idx].tolist()
+        return x, y
+
+    @position.setter
+    def position(self, value: Tuple[float, float]) -> None:
+        self._store._position[self._idx] = value
+
+    @property
+    def velocity(self) -> Tuple[float, float]:  # type: ignore[override]
+        vx, vy = self._store._velocity[self._idx].tolist()
+        return vx, vy
+
+    @property
+    def vx(self) -> float:  # type: ignore[override]
+        return float(self._store._velocity[self._idx, 0])
+
+    @property
+    def vy(self) -> float:  # type: ignore[override]
+        return float(self._store._velocity[self._idx, 1])
+
+    @property
+    def radius(self) -> float:  # type: ignore[override]
+        return float(self._store._radius[self._idx])
+
+    @property
+    def mass(self) -> float:  # type: ignore[override]
+        return float(self._store._mass[self._idx])
+
+    @property
+    def size(self) -> int:  # type: ignore[override]
+        return int(self._store._size[self._idx])
+
+    @property
+    def angle(self) -> float:  # type: ignore[override]
+        return float(self._store._angle[self._idx])
+
+    @angle.setter
+    def angle(self, value: float) -> None:
+        self._store._angle[self._idx] = value
+
+    @property
+    def turnrate(self) -> float:  # type: ignore[override]
+        return float(self._store._turnrate[self._idx])
+
+    def update(self, delta_time: float = 1/30) -> None:
+        """ Move the asteroid based on velocity"""
+        store, idx = self._store, self._idx
+        store._position[idx] += store._velocity[idx] * delta_time
+        store._angle[idx] += delta_time * store._turnrate[idx]
+
+
+class AsteroidStore(List[Asteroid]):
+    """
+    Struct-of-arrays container for asteroids.
+
+    Position, velocity, radius, mass, size, angle and turn rate are kept in contiguous NumPy arrays so that position
+    integration, spin and map wrapping run as single vectorized operations. The store is also the asteroid list used by
+    the game loop: asteroids added to it are copied into the arrays and replaced by ``AsteroidView`` objects. Every
+    list method that adds, removes or reorders asteroids moves their rows along, and ``remove_indices`` removes many
+    at once. Asteroids removed from the store keep a private copy of their last state.
+    """
+    __slots__ = ('_count', '_position', '_velocity', '_radius', '_mass', '_size', '_angle', '_turnrate')
+
+    def __init__(self, asteroids: Iterable[Asteroid] = (), capacity: int = 64) -> None:
+        super().__init__()
+        capacity = max(capacity, 1)
+        self._count = 0
+        self._position = np.empty((capacity, 2), dtype=np.float64)
+        self._velocity = np.empty((capacity, 2), dtype=np.float64)
+        self._radius = np.empty(capacity, dtype=np.float64)
+        self._mass = np.empty(capacity, dtype=np.float64)
+        self._size = np.empty(capacity, dtype=np.int64)
+        self._angle = np.empty(capacity, dtype=np.float64)
+        self._turnrate = np.empty(capacity, dtype=np.float64)
+        self.extend(asteroids)
+
+    # Array views over the live rows
+    @property
+    def position(self) -> np.ndarray:
+        return self._position[:self._count]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._velocity[:self._count]
+
+    @property
+    def radius(self) -> np.ndarray:
+        return self._radius[:self._count]
+
+    @property
+    def mass(self) -> np.ndarray:
+        return self._mass[:self._count]
+
+    @property
+    def size(self) -> np.ndarray:
+        return self._size[:self._count]
+
+    @property
+    def angle(self) -> np.ndarray:
+        return self._angle[:self._count]
+
+    @property
+    def turnrate(self) -> np.ndarray:
+        return self._turnrate[:self._count]
+
+    def states(self) -> List[Dict[str, Any]]:
+        """
+        ``Asteroid.state`` dictionaries for every asteroid, built from the arrays in one pass instead of going through
+        the per-asteroid views
+        """
+        n = self._count
+        return [{
+            "position": (position[0], position[1]),
+            "velocity": (velocity[0], velocity[1]),
+            "size": size,
+            "mass": mass,
+            "radius": radius
+        } for position, velocity, size, mass, radius in zip(self._position[:n].tolist(), self._velocity[:n].tolist(),
+                                                             self._size[:n].tolist(), self._mass[:n].tolist(),
+                                                             self._radius[:n].tolist())]
+
+    def _reserve(self, count: int) -> None:
+        capacity = self._radius.shape[0]
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        for name in _FIELDS:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+
+    def _write(self, idx: int, asteroid: Asteroid) -> AsteroidView:
+        # Copy an asteroid into row idx, returns the view of the row
+        self._position[idx] = asteroid.position
+        self._velocity[idx] = (asteroid.vx, asteroid.vy)
+        self._radius[idx] = asteroid.radius
+        self._mass[idx] = asteroid.mass
+        self._size[idx] = asteroid.size
+        self._angle[idx] = asteroid.angle
+        self._turnrate[idx] = asteroid.turnrate
+        view = AsteroidView(self, idx)
+        view.max_speed = asteroid.max_speed
+        view.num_children = asteroid.num_children
+        return view
+
+    def append(self, asteroid: Asteroid) -> None:
+        self.extend((asteroid,))
+
+    def extend(self, asteroids: Iterable[Asteroid]) -> None:
+        asteroids = list(asteroids)
+        start = self._count
+        self._reserve(start + len(asteroids))
+        for idx, asteroid in enumerate(asteroids, start):
+            super().append(self._write(idx, asteroid))
+        self._count = start + len(asteroids)
+
+    def __iadd__(self, asteroids: Iterable[Asteroid]) -> 'AsteroidStore':
+        self.extend(asteroids)
+        return self
+
+    def __imul__(self, count: SupportsIndex) -> 'AsteroidStore':
+        self._rearrange(list(self) * count)
+        return self
+
+    def insert(self, index: SupportsIndex, asteroid: Asteroid) -> None:
+        asteroids = list(self)
+        asteroids.insert(index, asteroid)
+        self._rearrange(asteroids)
+
+    def __setitem__(self, key: Union[SupportsIndex, slice], value: Any) -> None:  # type: ignore[override]
+        # Same errors as a list, raised before the store is changed
+        asteroids = list(self)
+        asteroids[key] = value
+        self._rearrange(asteroids)
+
+    def __delitem__(self, key: Union[SupportsIndex, slice]) -> None:
+        if isinstance(key, slice):
+            self.remove_indices(set(range(self._count)[key]))
+        else:
+            self.pop(key)
+
+    def pop(self, index: SupportsIndex = -1) -> Asteroid:
+        if not self:
+            raise IndexError("pop from empty list")
+        idx = operator.index(index)
+        if not -self._count <= idx < self._count:
+            raise IndexError("pop index out of range")
+        idx %= self._count
+        view = self[idx]
+        self.remove_indices({idx})
+        return view
+
+    def remove(self, asteroid: Asteroid) -> None:
+        self.remove_indices({self.index(asteroid)})
+
+    def reverse(self) -> None:
+        self._rearrange(self[::-1])
+
+    def sort(self, *, key: Optional[Callable[[Asteroid], Any]] = None,  # type: ignore[override]
+             reverse: bool = False) -> None:
+        self._rearrange(sorted(self, key=key, reverse=reverse))  # type: ignore[type-var]
+
+    def _rearrange(self, asteroids: List[Asteroid]) -> None:
+        """
+        Make the store hold ``asteroids`` in that order. Views of this store move with their rows, other asteroids and
+        repeated views are copied in as new views, and views left out are detached
+        """
+        n = self._count
+        # Row each asteroid is read from, -1 for asteroids from outside the store
+        sources: List[int] = []
+        kept = np.zeros(n, dtype=bool)
+        for asteroid in asteroids:
+            row = asteroid._idx if isinstance(asteroid, AsteroidView) and asteroid._store is self else -1
+            sources.append(row)
+            if row >= 0:
+                kept[row] = True
+        views = list(self)
+        for idx, view in enumerate(views):
+            if not kept[idx]:
+                self._detach(view)  # type: ignore[arg-type]
+
+        m = len(asteroids)
+        rows = np.array(sources, dtype=np.int64)
+        inside = rows >= 0
+        self._reserve(m)
+        for name in _FIELDS:
+            arr = getattr(self, name)
+            arr[:m][inside] = arr[:n][rows[inside]]
+
+        super().clear()
+        moved: Set[int] = set()
+        for idx, (asteroid, row) in enumerate(zip(asteroids, sources)):
+            if row < 0:
+                super().append(self._write(idx, asteroid))
+            elif row in moved:
+                # The row was copied above, only the view is new
+                copy = AsteroidView(self, idx)
+                copy.max_speed = asteroid.max_speed
+                copy.num_children = asteroid.num_children
+                super().append(copy)
+            else:
+                moved.add(row)
+                view = views[row]
+                view._idx = idx  # type: ignore[attr-defined]
+                super().append(view)
+        self._count = m
+
+    def clear(self) -> None:
+        for view in self:
+            self._detach(view)  # type: ignore[arg-type]
+        super().clear()
+        self._count = 0
+
+    def reload(self, asteroids: Iterable[Asteroid]) -> None:
+        """
+        Replace every asteroid in the store, reusing the allocated arrays. Unlike ``clear``, the views of the old
+        asteroids are not detached, so they must not be used afterwards
+        """
+        super().clear()
+        self._count = 0
+        self.extend(asteroids)
+
+    def snapshot(self) -> Tuple[List[Asteroid], Tuple[np.ndarray, ...]]:
+        """ Copy of the live rows of every array together with the current views, for ``restore``"""
+        n = self._count
+        return list(self), tuple(getattr(self, name)[:n].copy() for name in _FIELDS)
+
+    def restore(self, snapshot: Tuple[List[Asteroid], Tuple[np.ndarray, ...]]) -> None:
+        """
+        Return the store to a ``snapshot`` of it. The snapshot's views are reattached to their rows, even if they were
+        removed since. Views of asteroids created after the snapshot must not be used afterwards
+        """
+        views, arrays = snapshot
+        n = len(views)
+        self._reserve(n)
+        for name, array in zip(_FIELDS, arrays):
+            getattr(self, name)[:n] = array
+        super().clear()
+        super().extend(views)
+        for idx, view in enumerate(views):
+            view._store = self  # type: ignore[attr-defined]
+            view._idx = idx  # type: ignore[attr-defined]
+        self._count = n
+
+    def update(self, delta_time: float = 1/30) -> None:
+        """ Move every asteroid based on its velocity and spin it by its turn rate"""
+        n = self._count
+        self._position[:n] += self._velocity[:n] * delta_time
+        self._angle[:n] += delta_time * self._turnrate[:n]
+
+    def wrap(self, map_size: Tuple[float, float]) -> None:
+        """ Wrap every asteroid to the other side of the map"""
+        position = self._position[:self._count]
+        np.remainder(position, map_size, out=position)
+
+    def overlapping(self, center: Union[Tuple[float, float], List[float]], radius: float, box_check: bool = False) -> np.ndarray:
+        """
+        Indices (ascending) of asteroids whose circle overlaps the circle at ``center`` with ``radius``. This is the
+        same ``dx*dx + dy*dy <= radius_sum*radius_sum`` test used by the game loop, optionally preceded by its
+        ``abs(dx) <= radius_sum`` bounding box check.
+        """
+        n = self._count
+        dx = center[0] - self._position[:n, 0]
+        dy = center[1] - self._position[:n, 1]
+        radius_sum = radius + self._radius[:n]
+        mask = dx * dx + dy * dy <= radius_sum * radius_sum
+        if box_check:
+            mask &= (np.abs(dx) <= radius_sum) & (np.abs(dy) <= radius_sum)
+        return np.flatnonzero(mask)
+
+    def remove_indices(self, idxs: Set[int]) -> None:
+        """ Remove the asteroids at the given list indices and compact the arrays"""
+        if not idxs:
+            return
+        n = self._count
+        keep = np.ones(n, dtype=bool)
+        keep[list(idxs)] = False
+        m = int(keep.sum())
+
+        # Removed views copy their rows before the arrays are compacted
+        views: List[AsteroidView] = []
+        for idx, view in enumerate(self):
+            if keep[idx]:
+                views.append(view)  # type: ignore[arg-type]
+            else:
+                self._detach(view)  # type: ignore[arg-type]
+        for name in _FIELDS:
+            arr = getattr(self, name)
+            arr[:m] = arr[:n][keep]
+        for idx, view in enumerate(views):
+            view._idx = idx
+        super().clear()
+        super().extend(views)
+        self._count = m
+
+    def _detach(self, view: AsteroidView) -> None:
+        # Give a removed view its own single row store so references held elsewhere stay readable
+        store = AsteroidStore(capacity=1)
+        idx = view._idx
+        for name in _FIELDS:
+            getattr(store, name)[0] = getattr(self, name)[idx]
+        store._count = 1
+        list.append(store, view)
+        view._store = store
+        view._idx = 0
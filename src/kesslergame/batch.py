@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import os
+import time
+import random
+import traceback
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .scenario import Scenario
+from .score import Score
+from .controller import KesslerController
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+ControllerFactory = Callable[[], List[KesslerController]]
+
+
+class BatchResult:
+    """
+    Outcome of one (scenario, controller factory) task run by ``KesslerGame.run_many``.
+
+    ``status`` is one of ``'ok'``, ``'error'`` (the scenario raised an exception), ``'crashed'`` (the worker process
+    died) or ``'timeout'`` (the task exceeded the per-task time limit and its worker was killed). ``score`` is only set
+    for ``'ok'`` results and has its ``final_controllers`` removed, since controllers are not required to be picklable.
+    """
+    __slots__ = ('index', 'scenario_name', 'seed', 'status', 'score', 'error', 'eval_time')
+
+    def __init__(self, index: int, scenario_name: Optional[str], seed: int, status: str, score: Optional[Score] = None,
+                 error: Optional[str] = None, eval_time: float = 0.0) -> None:
+        self.index = index
+        self.scenario_name = scenario_name
+        self.seed = seed
+        self.status = status
+        self.score = score
+        self.error = error
+        self.eval_time = eval_time
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def __repr__(self) -> str:
+        return f"BatchResult(index={self.index}, scenario={self.scenario_name!r}, status={self.status!r}, eval_time={self.eval_time:.3f})"
+
+
+def task_seed(base_seed: int, index: int) -> int:
+    """ Deterministic, well separated 32 bit seed for task ``index`` of a batch seeded with ``base_seed``"""
+    return int(np.random.SeedSequence(base_seed, spawn_key=(index,)).generate_state(1)[0])
+
+
+def _worker_main(conn: Connection, settings: Dict[str, Any]) -> None:
+    """
+    Worker process loop. Receives (index, scenario, controller_factory, seed) tasks until it gets ``None``.
+    """
+    from .kessler_game import KesslerGame
+    game = KesslerGame(settings)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        index, scenario, controller_factory, seed = task
+        random.seed(seed)
+        np.random.seed(seed)
+        start = time.perf_counter()
+        try:
+            score, _ = game.run(scenario=scenario, controllers=controller_factory())
+            score.final_controllers = []
+            conn.send((index, 'ok', score, None, time.perf_counter() - start))
+        except Exception:
+            conn.send((index, 'error', None, traceback.format_exc(), time.perf_counter() - start))
+    conn.close()
+
+
+class _Worker:
+    __slots__ = ('process', 'conn', 'task', 'started')
+
+    def __init__(self, context: Any, settings: Dict[str, Any]) -> None:
+        parent_conn, child_conn = context.Pipe()
+        self.process: 'BaseProcess' = context.Process(target=_worker_main, args=(child_conn, settings), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn: Connection = parent_conn
+        self.task: Optional[Tuple[int, Optional[str], int]] = None
+        self.started = 0.0
+
+    def submit(self, index: int, scenario: Scenario, controller_factory: ControllerFactory, seed: int) -> None:
+        self.conn.send((index, scenario, controller_factory, seed))
+        self.task = (index, scenario.name, seed)
+        self.started = time.perf_counter()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1.0)
+        self.kill()
+
+
+class BatchRun:
+    """
+    Iterable over the results of a batch of scenarios spread across worker processes.
+
+    Iterating starts the workers and yields a ``BatchResult`` for each task as soon as it finishes, in completion order.
+    Throughput figures are updated as results arrive and are final once iteration ends.
+    """
+
+    def __init__(self, tasks: Iterable[Tuple[Scenario, ControllerFactory]], settings: Dict[str, Any],
+                 max_workers: Optional[int] = None, timeout: Optional[float] = None, seed: int = 0,
+                 prints_on: bool = False) -> None:
+        self.tasks = list(tasks)
+        self.settings = settings
+        self.max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(self.tasks) or 1))
+        self.timeout = timeout
+        self.seed = seed
+        self.prints_on = prints_on
+
+        self.completed = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """ Successfully completed scenarios per second of wall time"""
+        return self.completed / self.elapsed if self.elapsed > 0.0 else 0.0
+
+    def __iter__(self) -> Iterator[BatchResult]:
+        context = multiprocessing.get_context()
+        pending = list(enumerate(self.tasks))
+        pending.reverse()
+        workers = [_Worker(context, self.settings) for _ in range(self.max_workers)]
+        start = time.perf_counter()
+        try:
+            while pending or any(worker.task is not None for worker in workers):
+                # Hand out tasks to idle workers. A task that cannot be sent (e.g. an unpicklable controller factory)
+                # fails on its own without taking the worker down
+                for idx, worker in enumerate(workers):
+                    while worker.task is None and pending:
+                        index, (scenario, controller_factory) = pending.pop()
+                        seed = task_seed(self.seed, index)
+                        if not worker.process.is_alive():
+                            worker.kill()
+                            worker = workers[idx] = _Worker(context, self.settings)
+                        try:
+                            worker.submit(index, scenario, controller_factory, seed)
+                        except Exception:
+                            self.failed += 1
+                            self.elapsed = time.perf_counter() - start
+                            yield BatchResult(index, getattr(scenario, 'name', None), seed, 'error',
+                                              error=traceback.format_exc())
+
+                if not any(worker.task is not None for worker in workers):
+                    continue
+
+                # Wait for a result, a dead worker or the nearest task deadline
+                busy = [worker for worker in workers if worker.task is not None]
+                wait_time = None
+                if self.timeout is not None:
+                    now = time.perf_counter()
+                    wait_time = max(0.0, min(worker.started + self.timeout - now for worker in busy))
+                ready = wait([worker.conn for worker in busy] + [worker.process.sentinel for worker in busy], wait_time)
+
+                for idx, worker in enumerate(workers):
+                    if worker.task is None:
+                        continue
+                    index, scenario_name, seed = worker.task
+                    result: Optional[BatchResult] = None
+                    if worker.conn in ready or worker.process.sentinel in ready:
+                        try:
+                            if not worker.conn.poll():
+                                raise EOFError
+                            _, status, score, error, eval_time = worker.conn.recv()
+                            result = BatchResult(index, scenario_name, seed, status, score, error, eval_time)
+                        except (EOFError, OSError):
+                            # Reap the worker first, its exit code is None until it is joined
+                            worker.kill()
+                            result = BatchResult(index, scenario_name, seed, 'crashed',
+                                                 error=f"Worker exited with code {worker.process.exitcode}",
+                                                 eval_time=time.perf_counter() - worker.started)
+                    elif self.timeout is not None and time.perf_counter() - worker.started >= self.timeout:
+                        result = BatchResult(index, scenario_name, seed, 'timeout',
+                                             error=f"Task exceeded the {self.timeout} s time limit",
+                                             eval_time=time.perf_counter() - worker.started)
+                    if result is None:
+                        continue
+
+                    worker.task = None
+                    if result.status in ('crashed', 'timeout'):
+                        # The worker is dead or stuck, so replace it. A crashed worker was already reaped above
+                        if result.status == 'timeout':
+                            worker.kill()
+                        workers[idx] = _Worker(context, self.settings)
+                    if result.ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    self.elapsed = time.perf_counter() - start
+                    yield result
+        finally:
+            for worker in workers:
+                if worker.task is None:
+                    worker.stop()
+                else:
+                    worker.kill()
+            self.elapsed = time.perf_counter() - start
+            if self.prints_on:
+                print(f"Ran {self.completed + self.failed} scenarios ({self.failed} failed) in {self.elapsed:.2f} s "
+                      f"using {self.max_workers} workers: {self.throughput:.2f} scenarios/s")
@@ -5,6 +5,9 @@
 
 import math
 
+import numpy as np
+
+
 def circle_line_collision(line_A: tuple[float, float], line_B: tuple[float, float], center: tuple[float, float], radius: float) -> bool:
     # Check if circle edge is within the outer bounds of the line segment (offset for radius)
     # Not 100% accurate (some false positives) but fast and rare inaccuracies
@@ -27,3 +30,47 @@ def circle_line_collision(line_A: tuple[float, float], line_B: tuple[float, floa
 
     # If circle distance to line segment is less than circle radius, they are colliding
     return cen_dist < radius
+
+
+def circle_line_collisions(line_A: np.ndarray, line_B: np.ndarray, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """
+    Batched, exact version of ``circle_line_collision``.
+
+    :param line_A: (B, 2) array of segment start points (e.g. bullet heads)
+    :param line_B: (B, 2) array of segment end points (e.g. bullet tails)
+    :param centers: (A, 2) array of circle centers
+    :param radii: (A,) array of circle radii
+    :return: (B, A) boolean hit matrix, True where the distance from the circle center to the segment is less than the
+        circle radius. Unlike the scalar function, the exact point-to-segment distance is used so there are no false
+        positives near the segment ends.
+    """
+    line_A = np.asarray(line_A, dtype=np.float64).reshape(-1, 2)
+    line_B = np.asarray(line_B, dtype=np.float64).reshape(-1, 2)
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    radii = np.asarray(radii, dtype=np.float64).reshape(-1)
+
+    # Segment direction and squared length, (B, 1) so they broadcast against the (B, A) pair arrays
+    seg_x = (line_B[:, 0] - line_A[:, 0])[:, np.newaxis]
+    seg_y = (line_B[:, 1] - line_A[:, 1])[:, np.newaxis]
+    seg_len_sq = seg_x * seg_x + seg_y * seg_y
+
+    # Vector from each segment start to each circle center, (B, A)
+    rel_x = centers[np.newaxis, :, 0] - line_A[:, 0, np.newaxis]
+    rel_y = centers[np.newaxis, :, 1] - line_A[:, 1, np.newaxis]
+
+    # Parameter of the closest point on each segment, clamped to the segment. Degenerate segments use their start point
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(seg_len_sq > 0.0, (rel_x * seg_x + rel_y * seg_y) / seg_len_sq, 0.0)
+    np.clip(t, 0.0, 1.0, out=t)
+
+    dx = rel_x - t * seg_x
+    dy = rel_y - t * seg_y
+    return dx * dx + dy * dy < radii * radii
+
+
+def circle_line_collision_pairs(line_A: np.ndarray, line_B: np.ndarray, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """
+    Same test as ``circle_line_collisions`` but returns a (K, 2) integer array of (segment index, circle index) pairs
+    for every hit, ordered by segment index and then circle index
+    """
+    return np.argwhere(circle_line_collisions(line_A, line_B, centers, radii))
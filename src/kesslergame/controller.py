@@ -30,6 +30,27 @@ class KesslerController:
     def ship_id(self, value: int) -> None:
         self._ship_id = value
 
+    # Number of frames between calls to actions(). The engine re-applies the last returned command on the frames in
+    # between, so a controller with an interval of k is called on every k-th frame only
+    @property
+    def decision_interval(self) -> int:
+        return getattr(self, '_decision_interval', 1)
+
+    @decision_interval.setter
+    def decision_interval(self, value: int) -> None:
+        if int(value) != value or value < 1:
+            raise ValueError("decision_interval must be an integer of at least 1")
+        self._decision_interval = int(value)
+
     @property
     def name(self) -> str:
         raise NotImplementedError(f"This controller {self.__class__} needs to have a name() property specified.")
+
+
+def decision_due(controller: KesslerController, sim_frame: int, holding: bool) -> bool:
+    """
+    Whether the engine calls ``controller.actions()`` on frame ``sim_frame``. ``holding`` is whether the ship has a
+    command from an earlier call to re-apply. A ship without one, at the start of a run, is always called, otherwise
+    the controller is called on every ``decision_interval``-th frame.
+    """
+    return not holding or sim_frame % controller.decision_interval == 0
@@ -4,22 +4,29 @@
 # this source code package.
 
 import time
+import random
 
 import math
-from typing import Dict, Any, List, Tuple, TypedDict, Optional
+import numpy as np
+from typing import Dict, Any, List, Tuple, TypedDict, Optional, Sequence, Mapping, Iterable
 from enum import Enum
 from collections import OrderedDict
 
 from .scenario import Scenario
+from .batch import BatchRun, ControllerFactory
 from .score import Score
-from .controller import KesslerController
-from .collisions import circle_line_collision
+from .controller import KesslerController, decision_due
+from .collisions import circle_line_collision, circle_line_collision_pairs
+from .spatial_hash import SpatialHashGrid
 from .graphics import GraphicsType, GraphicsHandler
 from .mines import Mine
 from .asteroid import Asteroid
+from .asteroid_store import AsteroidStore
+from .state_views import StateSequenceView, ASTEROID_STATE_FIELDS, SHIP_STATE_FIELDS, BULLET_STATE_FIELDS, MINE_STATE_FIELDS
 from .ship import Ship
 from .bullet import Bullet
 from .graphics import KesslerGraphics
+from .observer import KesslerObserver
 
 
 class StopReason(Enum):
@@ -37,6 +44,7 @@ class PerfDict(TypedDict, total=False):
     collisions_check: float
     score_update: float
     graphics_draw: float
+    observers_update: float
     total_frame_time: float
 
 
@@ -45,6 +53,9 @@ class KesslerGame:
 
         if settings is None:
             settings = {}
+        # Keep a copy of the settings so batch workers can recreate this game
+        self._settings: Dict[str, Any] = dict(settings)
+
         # Game settings
         self.frequency: float = settings.get("frequency", 30.0)
         self.time_step: float = 1 / settings.get("frequency", 30.0)
@@ -55,6 +66,22 @@ class KesslerGame:
         self.realtime_multiplier: float = settings.get("realtime_multiplier", 0 if self.graphics_type==GraphicsType.NoGraphics else 1)
         self.time_limit: float = settings.get("time_limit", float("inf"))
 
+        # Collision settings. The spatial hash broadphase gives identical results to the full bullet-asteroid scan
+        self.spatial_hash_collisions: bool = settings.get("spatial_hash_collisions", True)
+        self.spatial_hash_cell_size: float = settings.get("spatial_hash_cell_size", 64.0)
+        # Test all bullets against all asteroids in one batched NumPy call using the exact segment distance. This
+        # removes the scalar check's false positives near bullet ends, so results can differ from the default path
+        self.exact_bullet_collisions: bool = settings.get("exact_bullet_collisions", False)
+
+        # Keep asteroid state in contiguous NumPy arrays and update/wrap all asteroids in single vectorized operations
+        self.vectorized_asteroids: bool = settings.get("vectorized_asteroids", False)
+
+        # Give controllers read-only views over the live objects instead of building a state dict per object each frame
+        self.lazy_game_state: bool = settings.get("lazy_game_state", False)
+
+        # Observers (e.g. a replay recorder) that are given the world state of every frame of run()
+        self.observers: List[KesslerObserver] = list(settings.get("observers", []))
+
         # UI settings
         default_ui = {'ships': True, 'lives_remaining': True, 'accuracy': True,
                       'asteroids_hit': True, 'bullets_remaining': True, 'controller_name': True}
@@ -63,7 +90,16 @@ class KesslerGame:
             self.UI_settings = {'ships': True, 'lives_remaining': True, 'accuracy': True,
                                 'asteroids_hit': True, 'shots_fired': True, 'bullets_remaining': True,
                                 'controller_name': True}
-        
+
+        # Step-wise session reused by run()
+        self._session: Optional[KesslerSession] = None
+
+    def session(self) -> 'KesslerSession':
+        """
+        Create a step-wise session that runs scenarios with this game's settings, one frame per ``step`` call
+        """
+        return KesslerSession(self)
+
     def run(self, scenario: Scenario, controllers: List[KesslerController]) -> Tuple[Score, List[PerfDict]]:
         """
         Run an entire scenario from start to finish and return score and stop reason
@@ -72,28 +108,17 @@ class KesslerGame:
         ##################
         # INITIALIZATION #
         ##################
-        # Initialize objects lists from scenario
-        asteroids: List[Asteroid] = scenario.asteroids()
-        ships: List[Ship] = scenario.ships()
-        bullets: List[Bullet] = []
-        mines: List[Mine] = []
-
-        # Initialize Scoring class
-        score = Score(scenario)
-
-        # Initialize environment parameters
-        stop_reason = StopReason.not_stopped
-        sim_time: float = 0.0
-        step: int = 0
-        time_limit = scenario.time_limit if scenario.time_limit else self.time_limit
-
-        # Assign controllers to each ship
-        for controller, ship in zip(controllers, ships):
-            controller.ship_id = ship.id
-            ship.controller = controller
+        # The session owns the world state and is reused across runs of this game
+        if self._session is None:
+            self._session = self.session()
+        session = self._session
+        game_state = session.reset(scenario, controllers)
+        ships = session.ships
 
         # Initialize graphics display
         graphics = GraphicsHandler(type=self.graphics_type, scenario=scenario, UI_settings=self.UI_settings, graphics_obj=self.graphics_obj)
+        for observer in self.observers:
+            observer.start(scenario, session)
 
         # Initialize list of dictionary for performance tracking (will remain empty if perf_tracker is false
         perf_list: List[PerfDict] = []
@@ -101,234 +126,64 @@ class KesslerGame:
         ######################
         # MAIN SCENARIO LOOP #
         ######################
-        bullet_remove_idxs: list[int] = []
-        asteroid_remove_idxs: set[int] = set()
-        mine_remove_idxs: list[int] = []
-        new_asteroids: list[Asteroid] = []
-        while stop_reason == StopReason.not_stopped:
+        actions: List[Optional[Tuple[float, float, bool, bool]]] = [None] * len(ships)
+        done = False
+        while not done:
 
             # Get perf time at the start of time step evaluation and initialize performance tracker
             step_start = time.perf_counter()
             perf_dict: PerfDict = {}
 
             # --- CALL CONTROLLER FOR EACH SHIP ------------------------------------------------------------------------
-            # Get all live ships
-            liveships = [ship for ship in ships if ship.alive]
-
-            # Generate game_state info to send to controllers
-            game_state = {
-                'asteroids': [asteroid.state for asteroid in asteroids],
-                'ships': [ship.state for ship in liveships],
-                'bullets': [bullet.state for bullet in bullets],
-                'mines': [mine.state for mine in mines],
-                'map_size': scenario.map_size,
-                'time': sim_time,
-                'delta_time': self.time_step,
-                'sim_frame': step,
-                'time_limit': time_limit
-            }
-
             # Initialize controller time recording in performance tracker
             if self.perf_tracker:
                 perf_dict['controller_times'] = []
                 t_start = time.perf_counter()
 
-            # Loop through each controller/ship combo and apply their actions
+            # Loop through each controller/ship combo and get their actions. Controllers with a decision interval
+            # above 1 are only called every decision_interval frames, their last command is held in between
             for idx, ship in enumerate(ships):
+                called = False
                 if ship.alive:
-                    # Reset controls on ship to defaults
-                    ship.thrust = 0.0
-                    ship.turn_rate = 0.0
-                    ship.fire = False
                     # Evaluate each controller letting control be applied
                     if controllers[idx].ship_id != ship.id:
                         raise RuntimeError("Controller and ship ID do not match")
-                    ship.thrust, ship.turn_rate, ship.fire, ship.drop_mine = controllers[idx].actions(ship.ownstate, game_state)
-
-                # Update controller evaluation time if performance tracking
+                    if decision_due(controllers[idx], session.sim_frame, actions[idx] is not None):
+                        actions[idx] = controllers[idx].actions(ship.ownstate, game_state)
+                        called = True
+                else:
+                    actions[idx] = None
+
+                # Update controller evaluation time if performance tracking. Held frames count as 0.0 so that they
+                # are left out of the score's evaluation time statistics
                 if self.perf_tracker:
-                    controller_time = time.perf_counter() - t_start if ship.alive else 0.00
+                    controller_time = time.perf_counter() - t_start if called else 0.00
                     perf_dict['controller_times'].append(controller_time)
                     t_start = time.perf_counter()
 
             if self.perf_tracker:
                 perf_dict['total_controller_time'] = time.perf_counter() - step_start
-                prev = time.perf_counter()
-
-            # --- UPDATE STATE INFORMATION OF EACH OBJECT --------------------------------------------------------------
-
-            # Update each Asteroid, Bullet, and Ship
-            for bullet in bullets:
-                bullet.update(self.time_step)
-            for mine in mines:
-                mine.update(self.time_step)
-            for asteroid in asteroids:
-                asteroid.update(self.time_step)
-            for ship in liveships:
-                if ship.alive:
-                    new_bullet, new_mine = ship.update(self.time_step)
-                    if new_bullet is not None:
-                        bullets.append(new_bullet)
-                    if new_mine is not None:
-                        mines.append(new_mine)
-
-            # Cull any bullets past the map edge
-            bullets = [bullet
-                       for bullet
-                       in bullets
-                       if 0.0 <= bullet.position[0] <= scenario.map_size[0]
-                       and 0.0 <= bullet.position[1] <= scenario.map_size[1]]
-
-            # Wrap ships and asteroids to other side of map
-            for ship in liveships:
-                ship.position = (ship.position[0] % scenario.map_size[0], ship.position[1] % scenario.map_size[1])
 
-            for asteroid in asteroids:
-                asteroid.position = (asteroid.position[0] % scenario.map_size[0], asteroid.position[1] % scenario.map_size[1])
-
-            # Update performance tracker with
+            # --- ADVANCE THE SIMULATION ONE FRAME ---------------------------------------------------------------------
+            game_state, _, done, _ = session.step(actions, perf_dict.get('controller_times'))
             if self.perf_tracker:
-                perf_dict['physics_update'] = time.perf_counter() - prev
+                perf_dict.update(session.perf)
                 prev = time.perf_counter()
 
-            # --- CHECK FOR COLLISIONS ---------------------------------------------------------------------------------
-
-
-            # --- Check asteroid-bullet collisions ---
-            for idx_bul, bullet in enumerate(bullets):
-                for idx_ast, asteroid in enumerate(asteroids):
-                    if idx_ast in asteroid_remove_idxs:
-                        continue
-                    # If collision occurs
-                    if circle_line_collision(bullet.position, bullet.tail, asteroid.position, asteroid.radius):
-                        # Increment hit values on ship that fired bullet then destruct bullet and mark for removal
-                        bullet.owner.asteroids_hit += 1
-                        bullet.owner.bullets_hit += 1
-                        bullet.destruct()
-                        bullet_remove_idxs.append(idx_bul)
-                        # Asteroid destruct function and mark for removal
-                        asteroids.extend(asteroid.destruct(impactor=bullet))
-                        asteroid_remove_idxs.add(idx_ast)
-                        # Stop checking this bullet
-                        break
-            # Cull bullets and asteroids that are marked for removal
-            if bullet_remove_idxs:
-                bullets = [bullet for idx, bullet in enumerate(bullets) if idx not in bullet_remove_idxs]
-                bullet_remove_idxs.clear()
-
-            # --- Check mine-asteroid and mine-ship effects ---
-            for idx_mine, mine in enumerate(mines):
-                if mine.detonating:
-                    for idx_ast, asteroid in enumerate(asteroids):
-                        if idx_ast in asteroid_remove_idxs:
-                            continue
-                        dx = asteroid.position[0] - mine.position[0]
-                        dy = asteroid.position[1] - mine.position[1]
-                        radius_sum = mine.blast_radius + asteroid.radius
-                        if dx * dx + dy * dy <= radius_sum * radius_sum:
-                            mine.owner.asteroids_hit += 1
-                            mine.owner.mines_hit += 1
-                            new_asteroids.extend(asteroid.destruct(impactor=mine))
-                            asteroid_remove_idxs.add(idx_ast)
-                    for ship in liveships:
-                        if not ship.is_respawning:
-                            dx = ship.position[0] - mine.position[0]
-                            dy = ship.position[1] - mine.position[1]
-                            radius_sum = mine.blast_radius + ship.radius
-                            if dx * dx + dy * dy <= radius_sum * radius_sum:
-                                # Ship destruct function.
-                                ship.destruct(map_size=scenario.map_size)
-                    if idx_mine not in mine_remove_idxs:
-                        mine_remove_idxs.append(idx_mine)
-                    mine.destruct()
-            if mine_remove_idxs:
-                mines = [mine for idx, mine in enumerate(mines) if idx not in mine_remove_idxs]
-                mine_remove_idxs.clear()
-            if new_asteroids:
-                asteroids.extend(new_asteroids)
-                new_asteroids.clear()
-
-
-            # --- Check asteroid-ship collisions ---
-            for ship in liveships:
-                if not ship.is_respawning:
-                    for idx_ast, asteroid in enumerate(asteroids):
-                        if idx_ast in asteroid_remove_idxs:
-                            continue
-                        dx = ship.position[0] - asteroid.position[0]
-                        dy = ship.position[1] - asteroid.position[1]
-                        radius_sum = ship.radius + asteroid.radius
-                        # Most of the time no collision occurs, so use early exit to optimize collision check
-                        if abs(dx) <= radius_sum and abs(dy) <= radius_sum and dx * dx + dy * dy <= radius_sum * radius_sum:
-                            # Asteroid destruct function and mark for removal
-                            asteroids.extend(asteroid.destruct(impactor=ship))
-                            asteroid_remove_idxs.add(idx_ast)
-                            # Ship destruct function. Add one to asteroids_hit
-                            ship.asteroids_hit += 1
-                            ship.destruct(map_size=scenario.map_size)
-                            # Stop checking this ship's collisions
-                            break
-            # Cull ships if not alive and asteroids that are marked for removal
-            liveships = [ship for ship in liveships if ship.alive]
-            if asteroid_remove_idxs:
-                asteroids = [asteroid for idx, asteroid in enumerate(asteroids) if idx not in asteroid_remove_idxs]
-                asteroid_remove_idxs.clear()
-
-            # --- Check ship-ship collisions ---
-            for i, ship1 in enumerate(liveships):
-                for ship2 in liveships[i + 1:]:
-                    if not ship2.is_respawning and not ship1.is_respawning:
-                        dx = ship1.position[0] - ship2.position[0]
-                        dy = ship1.position[1] - ship2.position[1]
-                        radius_sum = ship1.radius + ship2.radius
-                        # Most of the time no collision occurs, so use early exit to optimize collision check
-                        if abs(dx) <= radius_sum and abs(dy) <= radius_sum and dx * dx + dy * dy <= radius_sum * radius_sum:
-                            ship1.destruct(map_size=scenario.map_size)
-                            ship2.destruct(map_size=scenario.map_size)
-            # Cull ships that are not alive
-            liveships = [ship for ship in liveships if ship.alive]
-
-            # Update performance tracker with collisions timing
-            if self.perf_tracker:
-                perf_dict['collisions_check'] = time.perf_counter() - prev
-                prev = time.perf_counter()
-
-            # --- UPDATE SCORE CLASS -----------------------------------------------------------------------------------
-            if self.perf_tracker:
-                score.update(ships, sim_time, perf_dict['controller_times'])
-            else:
-                score.update(ships, sim_time)
-
-            # Update performance tracker with score timing
-            if self.perf_tracker:
-                perf_dict['score_update'] = time.perf_counter() - prev
-                prev = time.perf_counter()
-
-
             # --- UPDATE GRAPHICS --------------------------------------------------------------------------------------
-            graphics.update(score, ships, asteroids, bullets, mines)
+            graphics.update(session.score, ships, session.asteroids, session.bullets, session.mines)
 
             # Update performance tracker with graphics timing
             if self.perf_tracker:
                 perf_dict['graphics_draw'] = time.perf_counter() - prev
                 prev = time.perf_counter()
 
-            # --- CHECK STOP CONDITIONS --------------------------------------------------------------------------------
-            sim_time += self.time_step
-            step += 1
-
-            # No asteroids remain
-            if not asteroids:
-                stop_reason = StopReason.no_asteroids
-            # No ships are alive
-            elif not liveships:
-                stop_reason = StopReason.no_ships
-            # All live ships are out of bullets and no bullets are on map
-            elif not sum([ship.bullets_remaining for ship in liveships]) and not len(bullets)>0 and scenario.stop_if_no_ammo:
-                stop_reason = StopReason.out_of_bullets
-            # Out of time
-            elif sim_time > time_limit:
-                stop_reason = StopReason.time_expired
+            # --- UPDATE OBSERVERS -------------------------------------------------------------------------------------
+            for observer in self.observers:
+                observer.update(session, actions)
+
+            if self.perf_tracker:
+                perf_dict['observers_update'] = time.perf_counter() - prev
 
             # --- FINISHING TIME STEP ----------------------------------------------------------------------------------
             # Get overall time step compute time
@@ -346,14 +201,590 @@ class KesslerGame:
         # Finalization after scenario has been run #
         ############################################
 
-        # Close graphics display
+        # Close graphics display. The session has already finalized the score
         graphics.close()
-
-        # Finalize score class before returning
-        score.finalize(sim_time, stop_reason, ships)
+        for observer in self.observers:
+            observer.close(session)
 
         # Return the score and stop condition
-        return score, perf_list
+        return session.score, perf_list
+
+    def run_many(self, tasks: Iterable[Tuple[Scenario, ControllerFactory]], max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None, seed: int = 0) -> BatchRun:
+        """
+        Run many scenarios in parallel across a pool of worker processes.
+
+        :param tasks: (scenario, controller_factory) pairs. The factory is called in the worker and must return the
+            list of controllers for that scenario, so both it and the scenario must be picklable (e.g. a module level
+            function or class, not a lambda).
+        :param max_workers: Number of worker processes, defaults to the number of CPUs
+        :param timeout: Optional wall time limit in seconds per task. Workers that exceed it are killed and replaced
+        :param seed: Base seed. Task ``i`` seeds ``random`` and ``numpy.random`` with a seed derived from (seed, i),
+            so results do not depend on which worker runs a task or in what order
+        :return: A ``BatchRun`` which yields a ``BatchResult`` per task as each one finishes and reports aggregate
+            throughput in scenarios per second. Workers always run without graphics, observers or realtime pacing.
+        """
+        worker_settings = {**self._settings,
+                           'graphics_type': GraphicsType.NoGraphics,
+                           'graphics_obj': None,
+                           'observers': [],
+                           'realtime_multiplier': 0,
+                           'prints_on': False}
+        return BatchRun(tasks, worker_settings, max_workers=max_workers, timeout=timeout, seed=seed,
+                        prints_on=self.prints_on)
+
+
+class FrameEvents(TypedDict):
+    """ Ship IDs involved in each kind of event during one frame, one entry per occurrence"""
+    bullets_fired: List[int]
+    mines_deployed: List[int]
+    bullet_hits: List[int]
+    mine_hits: List[int]
+    asteroid_collisions: List[int]
+    ship_collisions: List[int]
+    deaths: List[int]
+
+
+class _ScenarioTemplate:
+    """ Cached initial state of a seeded scenario, so resetting to it skips asteroid generation and score setup"""
+    __slots__ = ('signature', 'asteroids', 'bullet_limit', 'score', 'random_state')
+
+    def __init__(self, signature: Tuple[Any, ...], asteroids: List[Asteroid], bullet_limit: int, score: Score,
+                 random_state: Any) -> None:
+        self.signature = signature
+        self.asteroids = asteroids
+        self.bullet_limit = bullet_limit
+        self.score = score
+        self.random_state = random_state
+
+
+# Ship attributes that change while a scenario runs
+_SHIP_STATE_SLOTS = ('thrust', 'turn_rate', 'fire', 'drop_mine', 'speed', 'position', 'velocity', 'heading', 'lives',
+                     'deaths', '_respawning', '_fire_limiter', '_mine_limiter', 'mines_remaining', 'bullets_remaining',
+                     'bullets_shot', 'mines_dropped', 'bullets_hit', 'mines_hit', 'asteroids_hit')
+_TEAM_RESULT_ATTRS = ('asteroids_hit', 'bullets_hit', 'shots_fired', 'bullets_remaining', 'deaths', 'lives_remaining')
+
+
+class WorldSnapshot:
+    """
+    Saved state of a ``KesslerSession``, created by ``snapshot()`` and applied with ``restore()``.
+
+    Game objects are shared with the session rather than copied. Only the attributes the simulation reassigns are
+    saved, and these values are immutable (tuples and numbers), so taking a snapshot is cheap. With the asteroid store,
+    the asteroid arrays are copied instead.
+    """
+    __slots__ = ('asteroids', 'asteroid_store', 'ships', 'liveships', 'bullets', 'mines', 'score', 'teams',
+                 'random_state', 'sim_time', 'sim_frame', 'stop_reason')
+
+    def __init__(self, session: 'KesslerSession') -> None:
+        if session.asteroid_store is not None:
+            self.asteroid_store: Optional[Tuple[List[Asteroid], Tuple[np.ndarray, ...]]] = session.asteroid_store.snapshot()
+            self.asteroids: List[Tuple[Asteroid, Tuple[float, float], float]] = []
+        else:
+            self.asteroid_store = None
+            self.asteroids = [(asteroid, asteroid.position, asteroid.angle) for asteroid in session.asteroids]
+        self.ships = [(ship, tuple([getattr(ship, name) for name in _SHIP_STATE_SLOTS])) for ship in session.ships]
+        self.liveships = list(session.liveships)
+        self.bullets = [(bullet, bullet.position, bullet.tail) for bullet in session.bullets]
+        self.mines = [(mine, mine.countdown_timer, mine.detonating) for mine in session.mines]
+        score = session.score
+        self.score = (score.sim_time, score.stop_reason)
+        self.teams = [(team, tuple([getattr(team, name) for name in _TEAM_RESULT_ATTRS]), len(team.eval_times))
+                      for team in score.teams]
+        self.random_state = random.getstate()
+        self.sim_time = session.sim_time
+        self.sim_frame = session.sim_frame
+        self.stop_reason = session.stop_reason
+
+    def apply(self, session: 'KesslerSession') -> None:
+        if self.asteroid_store is not None:
+            assert session.asteroid_store is not None
+            session.asteroid_store.restore(self.asteroid_store)
+        else:
+            asteroids = []
+            for asteroid, position, angle in self.asteroids:
+                asteroid.position = position
+                asteroid.angle = angle
+                asteroids.append(asteroid)
+            session.asteroids = asteroids
+        for ship, values in self.ships:
+            for name, value in zip(_SHIP_STATE_SLOTS, values):
+                setattr(ship, name, value)
+        session.liveships = list(self.liveships)
+        bullets = []
+        for bullet, position, tail in self.bullets:
+            bullet.position = position
+            bullet.tail = tail
+            bullets.append(bullet)
+        session.bullets = bullets
+        mines = []
+        for mine, countdown_timer, detonating in self.mines:
+            mine.countdown_timer = countdown_timer
+            mine.detonating = detonating
+            mines.append(mine)
+        session.mines = mines
+        session.score.sim_time, session.score.stop_reason = self.score
+        for team, values, num_eval_times in self.teams:
+            for name, value in zip(_TEAM_RESULT_ATTRS, values):
+                setattr(team, name, value)
+            del team.eval_times[num_eval_times:]
+        random.setstate(self.random_state)
+        session.sim_time = self.sim_time
+        session.sim_frame = self.sim_frame
+        session.stop_reason = self.stop_reason
+
+
+def _clone_asteroid(asteroid: Asteroid) -> Asteroid:
+    clone = Asteroid.__new__(Asteroid)
+    for name in Asteroid.__slots__:
+        setattr(clone, name, getattr(asteroid, name))
+    return clone
+
+
+class KesslerSession:
+    """
+    Step-wise interface to the simulation, for driving it frame by frame from an optimizer or RL loop.
+
+    ``reset(scenario)`` starts an episode and returns the first ``game_state``. ``step(actions)`` applies one
+    (thrust, turn_rate, fire, drop_mine) action per ship and advances one frame. It returns the next ``game_state``, the
+    frame's ``FrameEvents``, a done flag and the stop reason. There are no graphics. If the game's ``perf_tracker`` is
+    on, ``perf`` holds the timings of the last step.
+
+    Object lists, the asteroid store and the collision scratch buffers are reused across episodes. Seeded scenarios are
+    also cached after their first reset. Their asteroids, score teams and the resulting global ``random`` state are
+    then restored instead of regenerated, so episodes play out exactly as they would from a fresh ``KesslerGame.run``.
+    """
+    # Number of seeded scenarios whose initial state is kept
+    template_cache_size = 8
+
+    def __init__(self, game: KesslerGame) -> None:
+        self.game = game
+        self.scenario: Optional[Scenario] = None
+        self.asteroids: List[Asteroid] = []
+        self.asteroid_store: Optional[AsteroidStore] = None
+        self.ships: List[Ship] = []
+        self.liveships: List[Ship] = []
+        self.bullets: List[Bullet] = []
+        self.mines: List[Mine] = []
+        self.score: Score
+        self.stop_reason = StopReason.not_stopped
+        self.sim_time: float = 0.0
+        self.sim_frame: int = 0
+        self.time_limit: float = float("inf")
+        self.perf: PerfDict = {}
+
+        # Scratch buffers reused every frame
+        self._bullet_remove_idxs: list[int] = []
+        self._asteroid_remove_idxs: set[int] = set()
+        self._mine_remove_idxs: list[int] = []
+        self._new_asteroids: list[Asteroid] = []
+        self._asteroid_grid: Optional[SpatialHashGrid] = None
+        self._templates: OrderedDict[int, Tuple[Scenario, _ScenarioTemplate]] = OrderedDict()
+
+    @property
+    def done(self) -> bool:
+        return self.stop_reason != StopReason.not_stopped
+
+    def reset(self, scenario: Scenario, controllers: Optional[List[KesslerController]] = None) -> Dict[str, Any]:
+        """
+        Start a new episode of ``scenario`` and return its first ``game_state``. If ``controllers`` are given they
+        are attached to the ships in order, as ``KesslerGame.run`` does
+        """
+        game = self.game
+        self.scenario = scenario
+        self.time_step = game.time_step
+        self.perf_tracker = game.perf_tracker
+        self.lazy_game_state = game.lazy_game_state
+        self.exact_bullet_collisions = game.exact_bullet_collisions
+        if game.spatial_hash_collisions:
+            if self._asteroid_grid is None or self._asteroid_grid.cell_size != game.spatial_hash_cell_size:
+                self._asteroid_grid = SpatialHashGrid(game.spatial_hash_cell_size)
+        else:
+            self._asteroid_grid = None
+
+        # Initialize objects lists and scoring class from scenario, or from its cached initial state
+        asteroids, ships, score = self._initial_state(scenario)
+        if game.vectorized_asteroids:
+            if self.asteroid_store is None:
+                self.asteroid_store = AsteroidStore(asteroids)
+            else:
+                self.asteroid_store.reload(asteroids)
+            self.asteroids = self.asteroid_store
+        else:
+            self.asteroid_store = None
+            self.asteroids = asteroids
+        self.ships = ships
+        self.liveships = [ship for ship in ships if ship.alive]
+        self.bullets.clear()
+        self.mines.clear()
+        self.score = score
+
+        # Initialize environment parameters
+        self.stop_reason = StopReason.not_stopped
+        self.sim_time = 0.0
+        self.sim_frame = 0
+        self.time_limit = scenario.time_limit if scenario.time_limit else game.time_limit
+        self.perf = {}
+
+        # Assign controllers to each ship
+        if controllers is not None:
+            for controller, ship in zip(controllers, ships):
+                controller.ship_id = ship.id
+                ship.controller = controller
+
+        return self.game_state()
+
+    def _initial_state(self, scenario: Scenario) -> Tuple[List[Asteroid], List[Ship], Score]:
+        if scenario.seed is None:
+            # Unseeded scenarios draw new asteroids every time
+            return scenario.asteroids(), scenario.ships(), Score(scenario)
+
+        signature = (scenario.seed, tuple(scenario.map_size), repr(scenario.asteroid_states), repr(scenario.ship_states),
+                     scenario._ammo_limit_multiplier)
+        cached = self._templates.get(id(scenario))
+        if cached is not None and cached[0] is scenario and cached[1].signature == signature:
+            template = cached[1]
+            self._templates.move_to_end(id(scenario))
+            random.setstate(template.random_state)
+            asteroids = [_clone_asteroid(asteroid) for asteroid in template.asteroids]
+            ships = [Ship(idx + 1, bullets_remaining=template.bullet_limit, **ship_state)
+                     for idx, ship_state in enumerate(scenario.ship_states)]
+            return asteroids, ships, template.score.copy_initial()
+
+        asteroids = scenario.asteroids()
+        ships = scenario.ships()
+        score = Score(scenario)
+        template = _ScenarioTemplate(signature, [_clone_asteroid(asteroid) for asteroid in asteroids],
+                                     ships[0].bullets_remaining if ships else scenario.bullet_limit, score.copy_initial(),
+                                     random.getstate())
+        self._templates[id(scenario)] = (scenario, template)
+        self._templates.move_to_end(id(scenario))
+        while len(self._templates) > self.template_cache_size:
+            self._templates.popitem(last=False)
+        return asteroids, ships, score
+
+    def snapshot(self) -> WorldSnapshot:
+        """
+        Save the current world: asteroids, bullets, mines, ships including their fire/mine/respawn timers, score
+        results, the global ``random`` state and the sim clock. Use ``restore`` to return to it, e.g. after a
+        lookahead rollout. Snapshots belong to this session and episode
+        """
+        return WorldSnapshot(self)
+
+    def restore(self, snapshot: WorldSnapshot) -> None:
+        """
+        Return the world to ``snapshot``. A snapshot can be restored any number of times. Objects created after it
+        (e.g. bullets fired or asteroids split during a rollout) are dropped. Call ``game_state()`` for the matching
+        game state if needed
+        """
+        snapshot.apply(self)
+
+    def game_state(self) -> Dict[str, Any]:
+        """ Generate game_state info to send to controllers. Lazy views only read object fields when accessed"""
+        asteroids, liveships, bullets, mines = self.asteroids, self.liveships, self.bullets, self.mines
+        if self.lazy_game_state:
+            asteroid_states: Sequence[Mapping[str, Any]] = StateSequenceView(asteroids, ASTEROID_STATE_FIELDS)
+            ship_states: Sequence[Mapping[str, Any]] = StateSequenceView(liveships, SHIP_STATE_FIELDS)
+            bullet_states: Sequence[Mapping[str, Any]] = StateSequenceView(bullets, BULLET_STATE_FIELDS)
+            mine_states: Sequence[Mapping[str, Any]] = StateSequenceView(mines, MINE_STATE_FIELDS)
+        else:
+            asteroid_states = self.asteroid_store.states() if self.asteroid_store is not None else [asteroid.state for asteroid in asteroids]
+            ship_states = [ship.state for ship in liveships]
+            bullet_states = [bullet.state for bullet in bullets]
+            mine_states = [mine.state for mine in mines]
+        assert self.scenario is not None
+        return {
+            'asteroids': asteroid_states,
+            'ships': ship_states,
+            'bullets': bullet_states,
+            'mines': mine_states,
+            'map_size': self.scenario.map_size,
+            'time': self.sim_time,
+            'delta_time': self.time_step,
+            'sim_frame': self.sim_frame,
+            'time_limit': self.time_limit
+        }
+
+    def step(self, actions: Sequence[Optional[Tuple[float, float, bool, bool]]],
+             controller_times: Optional[List[float]] = None) -> Tuple[Dict[str, Any], FrameEvents, bool, StopReason]:
+        """
+        Advance the simulation by one frame
+
+        :param actions: One (thrust, turn_rate, fire, drop_mine) tuple per ship in ship order. Entries for dead ships
+            are ignored and may be None
+        :param controller_times: Optional per-ship controller evaluation times to record in the score
+        :return: The next game_state, the events of this frame, whether the episode is over and its stop reason
+        """
+        if self.scenario is None or self.done:
+            raise RuntimeError("The episode is over or was never started, call reset() first")
+        scenario = self.scenario
+        time_step = self.time_step
+        asteroids = self.asteroids
+        asteroid_store = self.asteroid_store
+        ships = self.ships
+        liveships = self.liveships
+        bullets = self.bullets
+        mines = self.mines
+        bullet_remove_idxs = self._bullet_remove_idxs
+        asteroid_remove_idxs = self._asteroid_remove_idxs
+        mine_remove_idxs = self._mine_remove_idxs
+        new_asteroids = self._new_asteroids
+        asteroid_grid = self._asteroid_grid
+        events: FrameEvents = {'bullets_fired': [], 'mines_deployed': [], 'bullet_hits': [], 'mine_hits': [],
+                               'asteroid_collisions': [], 'ship_collisions': [], 'deaths': []}
+        perf_dict: PerfDict = {}
+        if self.perf_tracker:
+            prev = time.perf_counter()
+
+        # Apply the actions of each live ship
+        for idx, ship in enumerate(ships):
+            if ship.alive:
+                action = actions[idx]
+                if action is None:
+                    raise ValueError(f"Missing action for live ship {ship.id}")
+                ship.thrust, ship.turn_rate, ship.fire, ship.drop_mine = action
+
+        # --- UPDATE STATE INFORMATION OF EACH OBJECT ------------------------------------------------------------------
+
+        # Update each Asteroid, Bullet, and Ship
+        for bullet in bullets:
+            bullet.update(time_step)
+        for mine in mines:
+            mine.update(time_step)
+        if asteroid_store is not None:
+            asteroid_store.update(time_step)
+        else:
+            for asteroid in asteroids:
+                asteroid.update(time_step)
+        for ship in liveships:
+            if ship.alive:
+                new_bullet, new_mine = ship.update(time_step)
+                if new_bullet is not None:
+                    bullets.append(new_bullet)
+                    events['bullets_fired'].append(ship.id)
+                if new_mine is not None:
+                    mines.append(new_mine)
+                    events['mines_deployed'].append(ship.id)
+
+        # Cull any bullets past the map edge
+        bullets = [bullet
+                   for bullet
+                   in bullets
+                   if 0.0 <= bullet.position[0] <= scenario.map_size[0]
+                   and 0.0 <= bullet.position[1] <= scenario.map_size[1]]
+
+        # Wrap ships and asteroids to other side of map
+        for ship in liveships:
+            ship.position = (ship.position[0] % scenario.map_size[0], ship.position[1] % scenario.map_size[1])
+
+        if asteroid_store is not None:
+            asteroid_store.wrap(scenario.map_size)
+        else:
+            for asteroid in asteroids:
+                asteroid.position = (asteroid.position[0] % scenario.map_size[0], asteroid.position[1] % scenario.map_size[1])
+
+        # Update performance tracker with
+        if self.perf_tracker:
+            perf_dict['physics_update'] = time.perf_counter() - prev
+            prev = time.perf_counter()
+
+        # --- CHECK FOR COLLISIONS -------------------------------------------------------------------------------------
+
+
+        # --- Check asteroid-bullet collisions ---
+        # Either find every exact bullet-asteroid hit up front in one batched call, or bucket asteroids into the
+        # spatial hash so each bullet is only tested against nearby asteroids
+        exact_hits: Optional[List[List[int]]] = None
+        if self.exact_bullet_collisions and bullets and asteroids:
+            bullet_heads = np.array([bullet.position for bullet in bullets])
+            bullet_tails = np.array([bullet.tail for bullet in bullets])
+            if asteroid_store is not None:
+                hit_pairs = circle_line_collision_pairs(bullet_heads, bullet_tails, asteroid_store.position, asteroid_store.radius)
+            else:
+                hit_pairs = circle_line_collision_pairs(bullet_heads, bullet_tails,
+                                                        np.array([asteroid.position for asteroid in asteroids]),
+                                                        np.array([asteroid.radius for asteroid in asteroids]))
+            exact_hits = [[] for _ in bullets]
+            for idx_bul, idx_ast in hit_pairs.tolist():
+                exact_hits[idx_bul].append(idx_ast)
+        elif asteroid_grid is not None and bullets:
+            if asteroid_store is not None:
+                asteroid_grid.build_arrays(asteroid_store.position, asteroid_store.radius)
+            else:
+                asteroid_grid.build(asteroids)
+        for idx_bul, bullet in enumerate(bullets):
+            if exact_hits is not None:
+                candidate_idxs = exact_hits[idx_bul]
+            elif asteroid_grid is not None:
+                candidate_idxs = asteroid_grid.query_segment(bullet.position, bullet.tail)
+            else:
+                candidate_idxs = range(len(asteroids))
+            for idx_ast in candidate_idxs:
+                if idx_ast in asteroid_remove_idxs:
+                    continue
+                asteroid = asteroids[idx_ast]
+                # If collision occurs (already known for the exact batched hits)
+                if exact_hits is not None or circle_line_collision(bullet.position, bullet.tail, asteroid.position, asteroid.radius):
+                    # Increment hit values on ship that fired bullet then destruct bullet and mark for removal
+                    bullet.owner.asteroids_hit += 1
+                    bullet.owner.bullets_hit += 1
+                    events['bullet_hits'].append(bullet.owner.id)
+                    bullet.destruct()
+                    bullet_remove_idxs.append(idx_bul)
+                    # Asteroid destruct function and mark for removal. Children can still be hit by later bullets
+                    # this frame, so they are added to the grid as well
+                    child_asteroids = asteroid.destruct(impactor=bullet)
+                    if exact_hits is not None:
+                        if child_asteroids and idx_bul + 1 < len(bullets):
+                            child_pairs = circle_line_collision_pairs(bullet_heads[idx_bul + 1:], bullet_tails[idx_bul + 1:],
+                                                                      np.array([child.position for child in child_asteroids]),
+                                                                      np.array([child.radius for child in child_asteroids]))
+                            for offset_bul, offset_ast in child_pairs.tolist():
+                                exact_hits[idx_bul + 1 + offset_bul].append(len(asteroids) + offset_ast)
+                    elif asteroid_grid is not None:
+                        asteroid_grid.extend(child_asteroids, start=len(asteroids))
+                    asteroids.extend(child_asteroids)
+                    asteroid_remove_idxs.add(idx_ast)
+                    # Stop checking this bullet
+                    break
+        # Cull bullets and asteroids that are marked for removal
+        if bullet_remove_idxs:
+            bullets = [bullet for idx, bullet in enumerate(bullets) if idx not in bullet_remove_idxs]
+            bullet_remove_idxs.clear()
+
+        # --- Check mine-asteroid and mine-ship effects ---
+        for idx_mine, mine in enumerate(mines):
+            if mine.detonating:
+                # With the asteroid store, only asteroids inside the blast radius need the per-asteroid check
+                if asteroid_store is not None:
+                    candidate_idxs = asteroid_store.overlapping(mine.position, mine.blast_radius).tolist()
+                else:
+                    candidate_idxs = range(len(asteroids))
+                for idx_ast in candidate_idxs:
+                    if idx_ast in asteroid_remove_idxs:
+                        continue
+                    asteroid = asteroids[idx_ast]
+                    dx = asteroid.position[0] - mine.position[0]
+                    dy = asteroid.position[1] - mine.position[1]
+                    radius_sum = mine.blast_radius + asteroid.radius
+                    if dx * dx + dy * dy <= radius_sum * radius_sum:
+                        mine.owner.asteroids_hit += 1
+                        mine.owner.mines_hit += 1
+                        events['mine_hits'].append(mine.owner.id)
+                        new_asteroids.extend(asteroid.destruct(impactor=mine))
+                        asteroid_remove_idxs.add(idx_ast)
+                for ship in liveships:
+                    if not ship.is_respawning:
+                        dx = ship.position[0] - mine.position[0]
+                        dy = ship.position[1] - mine.position[1]
+                        radius_sum = mine.blast_radius + ship.radius
+                        if dx * dx + dy * dy <= radius_sum * radius_sum:
+                            # Ship destruct function.
+                            ship.destruct(map_size=scenario.map_size)
+                            events['deaths'].append(ship.id)
+                if idx_mine not in mine_remove_idxs:
+                    mine_remove_idxs.append(idx_mine)
+                mine.destruct()
+        if mine_remove_idxs:
+            mines = [mine for idx, mine in enumerate(mines) if idx not in mine_remove_idxs]
+            mine_remove_idxs.clear()
+        if new_asteroids:
+            asteroids.extend(new_asteroids)
+            new_asteroids.clear()
+
+
+        # --- Check asteroid-ship collisions ---
+        for ship in liveships:
+            if not ship.is_respawning:
+                if asteroid_store is not None:
+                    candidate_idxs = asteroid_store.overlapping(ship.position, ship.radius, box_check=True).tolist()
+                else:
+                    candidate_idxs = range(len(asteroids))
+                for idx_ast in candidate_idxs:
+                    if idx_ast in asteroid_remove_idxs:
+                        continue
+                    asteroid = asteroids[idx_ast]
+                    dx = ship.position[0] - asteroid.position[0]
+                    dy = ship.position[1] - asteroid.position[1]
+                    radius_sum = ship.radius + asteroid.radius
+                    # Most of the time no collision occurs, so use early exit to optimize collision check
+                    if abs(dx) <= radius_sum and abs(dy) <= radius_sum and dx * dx + dy * dy <= radius_sum * radius_sum:
+                        # Asteroid destruct function and mark for removal
+                        asteroids.extend(asteroid.destruct(impactor=ship))
+                        asteroid_remove_idxs.add(idx_ast)
+                        # Ship destruct function. Add one to asteroids_hit
+                        ship.asteroids_hit += 1
+                        ship.destruct(map_size=scenario.map_size)
+                        events['asteroid_collisions'].append(ship.id)
+                        events['deaths'].append(ship.id)
+                        # Stop checking this ship's collisions
+                        break
+        # Cull ships if not alive and asteroids that are marked for removal
+        liveships = [ship for ship in liveships if ship.alive]
+        if asteroid_remove_idxs:
+            if asteroid_store is not None:
+                asteroid_store.remove_indices(asteroid_remove_idxs)
+            else:
+                asteroids = [asteroid for idx, asteroid in enumerate(asteroids) if idx not in asteroid_remove_idxs]
+            asteroid_remove_idxs.clear()
+
+        # --- Check ship-ship collisions ---
+        for i, ship1 in enumerate(liveships):
+            for ship2 in liveships[i + 1:]:
+                if not ship2.is_respawning and not ship1.is_respawning:
+                    dx = ship1.position[0] - ship2.position[0]
+                    dy = ship1.position[1] - ship2.position[1]
+                    radius_sum = ship1.radius + ship2.radius
+                    # Most of the time no collision occurs, so use early exit to optimize collision check
+                    if abs(dx) <= radius_sum and abs(dy) <= radius_sum and dx * dx + dy * dy <= radius_sum * radius_sum:
+                        ship1.destruct(map_size=scenario.map_size)
+                        ship2.destruct(map_size=scenario.map_size)
+                        events['ship_collisions'].extend((ship1.id, ship2.id))
+                        events['deaths'].extend((ship1.id, ship2.id))
+        # Cull ships that are not alive
+        liveships = [ship for ship in liveships if ship.alive]
+
+        # Update performance tracker with collisions timing
+        if self.perf_tracker:
+            perf_dict['collisions_check'] = time.perf_counter() - prev
+            prev = time.perf_counter()
+
+        # --- UPDATE SCORE CLASS ---------------------------------------------------------------------------------------
+        self.score.update(ships, self.sim_time, controller_times)
+
+        # Update performance tracker with score timing
+        if self.perf_tracker:
+            perf_dict['score_update'] = time.perf_counter() - prev
+
+        # --- CHECK STOP CONDITIONS ------------------------------------------------------------------------------------
+        self.sim_time += time_step
+        self.sim_frame += 1
+
+        # No asteroids remain
+        if not asteroids:
+            self.stop_reason = StopReason.no_asteroids
+        # No ships are alive
+        elif not liveships:
+            self.stop_reason = StopReason.no_ships
+        # All live ships are out of bullets and no bullets are on map
+        elif not sum([ship.bullets_remaining for ship in liveships]) and not len(bullets)>0 and scenario.stop_if_no_ammo:
+            self.stop_reason = StopReason.out_of_bullets
+        # Out of time
+        elif self.sim_time > self.time_limit:
+            self.stop_reason = StopReason.time_expired
+
+        # Store the object lists that were rebuilt this frame
+        self.asteroids = asteroids
+        self.liveships = liveships
+        self.bullets = bullets
+        self.mines = mines
+        self.perf = perf_dict
+
+        # Finalize score class once the episode is over
+        if self.done:
+            self.score.finalize(self.sim_time, self.stop_reason, ships)
+
+        return self.game_state(), events, self.done, self.stop_reason
 
 
 class TrainerEnvironment(KesslerGame):
@@ -369,6 +800,12 @@ class TrainerEnvironment(KesslerGame):
             'prints_on': settings.get("prints_on", False),
             'graphics_type': GraphicsType.NoGraphics,
             'realtime_multiplier': 0,
-            'time_limit': settings.get("time_limit", float("inf"))
+            'time_limit': settings.get("time_limit", float("inf")),
+            'spatial_hash_collisions': settings.get("spatial_hash_collisions", True),
+            'spatial_hash_cell_size': settings.get("spatial_hash_cell_size", 64.0),
+            'vectorized_asteroids': settings.get("vectorized_asteroids", False),
+            'exact_bullet_collisions': settings.get("exact_bullet_collisions", False),
+            'lazy_game_state': settings.get("lazy_game_state", False),
+            'observers': settings.get("observers", []),
         }
         super().__init__(trainer_settings)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from typing import Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .scenario import Scenario
+
+if TYPE_CHECKING:
+    from .kessler_game import KesslerSession
+
+
+class KesslerObserver:
+    """
+    Receives the world state of every frame of a ``KesslerGame.run``, alongside the graphics. Pass instances in the
+    ``observers`` game setting. Observers must not modify the session.
+    """
+
+    def start(self, scenario: Scenario, session: 'KesslerSession') -> None:
+        """ Called once the session has been reset, before the first frame"""
+        pass
+
+    def update(self, session: 'KesslerSession', actions: Sequence[Optional[Tuple[float, float, bool, bool]]]) -> None:
+        """ Called after each frame with the actions the controllers returned for it (None for dead ships)"""
+        pass
+
+    def close(self, session: 'KesslerSession') -> None:
+        """ Called once the scenario is over and the score has been finalized"""
+        pass
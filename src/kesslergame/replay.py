@@ -0,0 +1,547 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+"""
+Binary replays of ``KesslerGame.run``.
+
+A replay file is laid out as::
+
+    header      b'KRPL', format version (u16), JSON length (u32), JSON (scenario, ships, teams, frequency)
+    frames      one record per frame, see ``_FRAME``
+    index       u64 byte offset of every frame record
+    footer      JSON (stop reason, final sim time)
+    trailer     index offset (u64), frame count (u32), footer JSON length (u32), b'KEND'
+
+Positions are quantized to 1/256 m. Every ``keyframe_interval`` frames a keyframe stores all asteroid positions as
+absolute int32 values. Other frames store asteroid positions as int16 differences from the previous frame, with
+absolute exceptions for asteroids that wrapped around the map, as long as the asteroid count and sizes are unchanged.
+Bullets, mines, ships, team results and the controller outputs are stored in full every frame as float32/int32
+values, since they are either few or change from frame to frame anyway. Decoding a frame needs at most ``keyframe_interval`` records from the
+nearest keyframe, so seeking takes constant time whatever the length of the replay.
+
+A replay that was not closed (e.g. the run raised) has no index or trailer. It can still be read, the player then
+rebuilds the index by scanning the frame records.
+"""
+
+import json
+import math
+import mmap
+import random
+import struct
+import time
+from itertools import chain
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .scenario import Scenario
+from .team import Team
+from .asteroid import Asteroid
+from .bullet import Bullet
+from .mines import Mine
+from .observer import KesslerObserver
+from .graphics import GraphicsType, GraphicsHandler, KesslerGraphics
+
+if TYPE_CHECKING:
+    from .kessler_game import KesslerSession
+
+Action = Tuple[float, float, bool, bool]
+
+_MAGIC = b'KRPL'
+_END_MAGIC = b'KEND'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHI')
+# record size, flags, frame index, sim time, asteroid count, bullet count, mine count, asteroid exception count
+_FRAME = struct.Struct('<IBIdIIII')
+_TRAILER = struct.Struct('<QII4s')
+
+_KEYFRAME = 1
+_ASTEROID_DELTA = 2
+
+# Positions are stored as integer multiples of 1/_POSITION_SCALE m. An int16 delta covers 128 m per frame, far more
+# than anything but a wrap around the map moves
+_POSITION_SCALE = 256.0
+_DELTA_ESCAPE = -32768
+
+_SHIP_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('vx', '<f4'), ('vy', '<f4'), ('heading', '<f4'),
+                        ('respawn', '<f4'), ('thrust', '<f4'), ('turn_rate', '<f4'), ('lives', '<i2'), ('flags', 'u1')])
+_SHIP = struct.Struct('<8fhB')
+_SHIP_ACTION = 1
+_SHIP_FIRE = 2
+_SHIP_MINE = 4
+
+# Team results recorded each frame, in column order
+_TEAM_FIELDS = ('asteroids_hit', 'bullets_hit', 'shots_fired', 'bullets_remaining', 'deaths', 'lives_remaining')
+_TEAM = struct.Struct(f'<{len(_TEAM_FIELDS)}i')
+
+# Engine constants that replays do not record, read from the engine's own objects. The asteroids get a generator of
+# their own so that building them does not draw from the global random state
+_ASTEROIDS = {size: Asteroid((0.0, 0.0), speed=0.0, angle=0.0, size=size, rng=random.Random(0)) for size in range(1, 5)}
+_BULLET = Bullet((0.0, 0.0), 0.0, owner=None)  # type: ignore[arg-type]
+_MINE = Mine([0.0, 0.0], owner=None)  # type: ignore[arg-type]
+
+
+class ReplayRecorder(KesslerObserver):
+    """
+    Observer that writes a ``KesslerGame.run`` to a binary replay file, see the module docstring for the format.
+    The initial world is recorded as frame 0, followed by one frame per simulated frame. Pass it in the ``observers``
+    game setting. Each run overwrites ``path``.
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = 30) -> None:
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.bytes_written = 0
+        self._file: Optional[BinaryIO] = None
+        self._offsets: List[int] = []
+        self._prev_positions = np.empty((0, 2), dtype=np.int32)
+        self._prev_sizes = np.empty(0, dtype=np.uint8)
+
+    def start(self, scenario: Scenario, session: 'KesslerSession') -> None:
+        if self._file is not None:
+            self._file.close()
+        ships = session.ships
+        header = {
+            'frequency': 1.0 / session.time_step,
+            'keyframe_interval': self.keyframe_interval,
+            'scenario': {
+                'name': scenario.name,
+                'map_size': list(scenario.map_size),
+                'time_limit': (scenario.time_limit if scenario.time_limit and math.isfinite(scenario.time_limit)
+                               else None),
+                'seed': scenario.seed,
+            },
+            'ships': [{'id': ship.id, 'team': ship.team, 'team_name': ship.team_name, 'radius': ship.radius,
+                       'mass': ship.mass, 'position': list(ship.position), 'angle': ship.heading, 'lives': ship.lives,
+                       'controller': ship.controller.name if ship.controller is not None else None}
+                      for ship in ships],
+            'teams': [{'team_id': team.team_id, 'team_name': team.team_name, 'total_bullets': team.total_bullets,
+                       'total_asteroids': team.total_asteroids} for team in session.score.teams],
+            'asteroids': [{'position': list(asteroid.position), 'size': int(asteroid.size),
+                           'speed': math.hypot(*asteroid.velocity),
+                           'angle': math.degrees(math.atan2(asteroid.velocity[1], asteroid.velocity[0]))}
+                          for asteroid in session.asteroids],
+        }
+        header_bytes = json.dumps(header).encode('utf-8')
+        self._file = open(self.path, 'wb')
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, len(header_bytes)))
+        self._file.write(header_bytes)
+        self.bytes_written = _HEADER.size + len(header_bytes)
+        self._offsets = []
+        self._write_frame(session, [None] * len(ships))
+
+    def update(self, session: 'KesslerSession', actions: Sequence[Optional[Action]]) -> None:
+        if self._file is None:
+            raise RuntimeError("The recorder has not been started")
+        self._write_frame(session, actions)
+
+    def close(self, session: 'KesslerSession') -> None:
+        if self._file is None:
+            return
+        stop_reason = session.score.stop_reason
+        footer = json.dumps({'stop_reason': stop_reason.name if stop_reason is not None else None,
+                             'sim_time': session.sim_time}).encode('utf-8')
+        index_offset = self.bytes_written
+        index = np.asarray(self._offsets, dtype='<u8').tobytes()
+        self._file.write(index)
+        self._file.write(footer)
+        self._file.write(_TRAILER.pack(index_offset, len(self._offsets), len(footer), _END_MAGIC))
+        self.bytes_written += len(index) + len(footer) + _TRAILER.size
+        self._file.close()
+        self._file = None
+
+    def _write_frame(self, session: 'KesslerSession', actions: Sequence[Optional[Action]]) -> None:
+        assert self._file is not None
+        frame = len(self._offsets)
+
+        # Ships and controller outputs, then team results
+        chunks = []
+        for idx, ship in enumerate(session.ships):
+            action = actions[idx] if idx < len(actions) else None
+            if action is None:
+                thrust, turn_rate, flags = 0.0, 0.0, 0
+            else:
+                thrust, turn_rate = action[0], action[1]
+                flags = _SHIP_ACTION | (_SHIP_FIRE if action[2] else 0) | (_SHIP_MINE if action[3] else 0)
+            position, velocity = ship.position, ship.velocity
+            chunks.append(_SHIP.pack(position[0], position[1], velocity[0], velocity[1], ship.heading,
+                                     ship.respawn_time_left, thrust, turn_rate, ship.lives, flags))
+        for team in session.score.teams:
+            chunks.append(_TEAM.pack(team.asteroids_hit, team.bullets_hit, team.shots_fired, team.bullets_remaining,
+                                     team.deaths, team.lives_remaining))
+
+        # Asteroids, as deltas from the previous frame where possible
+        asteroids = session.asteroids
+        store = session.asteroid_store
+        if store is not None:
+            positions = np.rint(store.position * _POSITION_SCALE).astype(np.int32)
+            sizes = store.size.astype(np.uint8)
+        elif asteroids:
+            coords = np.fromiter(chain.from_iterable([asteroid.position for asteroid in asteroids]), dtype=np.float64,
+                                 count=2 * len(asteroids))
+            positions = np.rint(coords * _POSITION_SCALE).astype(np.int32).reshape(-1, 2)
+            sizes = np.fromiter((asteroid.size for asteroid in asteroids), dtype=np.uint8, count=len(asteroids))
+        else:
+            positions = np.empty((0, 2), dtype=np.int32)
+            sizes = np.empty(0, dtype=np.uint8)
+
+        flags = 0
+        num_exceptions = 0
+        if frame % self.keyframe_interval == 0:
+            flags |= _KEYFRAME
+            chunks += (positions.astype('<i4').tobytes(), sizes.tobytes())
+        elif len(sizes) == len(self._prev_sizes) and np.array_equal(sizes, self._prev_sizes):
+            flags |= _ASTEROID_DELTA
+            deltas = positions - self._prev_positions
+            escaped = np.abs(deltas) > 32767
+            if escaped.any():
+                exceptions = np.flatnonzero(escaped.any(axis=1)).astype('<i4')
+                num_exceptions = len(exceptions)
+                deltas[exceptions] = _DELTA_ESCAPE
+                chunks += (deltas.astype('<i2').tobytes(), exceptions.tobytes(),
+                           positions[exceptions].astype('<i4').tobytes())
+            else:
+                chunks.append(deltas.astype('<i2').tobytes())
+        else:
+            chunks += (positions.astype('<i4').tobytes(), sizes.tobytes())
+        self._prev_positions = positions
+        self._prev_sizes = sizes
+
+        # Bullets and mines
+        bullets = session.bullets
+        if bullets:
+            values = [value for bullet in bullets for value in (bullet.position[0], bullet.position[1], bullet.heading)]
+            chunks.append(struct.pack(f'<{len(values)}f', *values))
+        mines = session.mines
+        if mines:
+            values = [value for mine in mines for value in (mine.position[0], mine.position[1], mine.countdown_timer)]
+            chunks.append(struct.pack(f'<{len(values)}f', *values))
+
+        body = b''.join(chunks)
+        size = _FRAME.size + len(body)
+        self._file.write(_FRAME.pack(size, flags, frame, session.sim_time, len(sizes), len(bullets), len(mines),
+                                     num_exceptions) + body)
+        self._offsets.append(self.bytes_written)
+        self.bytes_written += size
+
+
+class _ReplayController:
+    """ Stands in for a ship's controller, graphics only read its name"""
+    __slots__ = ('name',)
+
+    def __init__(self, name: Optional[str]) -> None:
+        self.name = name
+
+
+class ReplayShip:
+    """ Ship as recorded in a replay frame, with the attributes the graphics backends read from ``Ship``"""
+    __slots__ = ('id', 'team', 'team_name', 'radius', 'mass', 'controller', 'position', 'velocity', 'heading', 'lives',
+                 'respawn_time_left', 'action')
+
+    def __init__(self, info: Dict[str, Any], controller: _ReplayController, record: np.void, action: Optional[Action]) -> None:
+        self.id: int = info['id']
+        self.team: int = info['team']
+        self.team_name: str = info['team_name']
+        self.radius: float = info['radius']
+        self.mass: float = info['mass']
+        self.controller = controller
+        self.position = (float(record['x']), float(record['y']))
+        self.velocity = (float(record['vx']), float(record['vy']))
+        self.heading = float(record['heading'])
+        self.lives = int(record['lives'])
+        self.respawn_time_left = float(record['respawn'])
+        self.action = action
+
+    @property
+    def alive(self) -> bool:
+        return self.lives > 0
+
+    @property
+    def is_respawning(self) -> bool:
+        return self.respawn_time_left > 0.0
+
+    @property
+    def speed(self) -> float:
+        return math.hypot(*self.velocity)
+
+
+class ReplayAsteroid:
+    __slots__ = ('position', 'size', 'radius', 'mass')
+
+    def __init__(self, position: Tuple[float, float], size: int) -> None:
+        self.position = position
+        self.size = size
+        self.radius = _ASTEROIDS[size].radius
+        self.mass = _ASTEROIDS[size].mass
+
+
+class ReplayBullet:
+    __slots__ = ('position', 'heading', 'tail', 'length', 'mass')
+
+    def __init__(self, position: Tuple[float, float], heading: float) -> None:
+        self.position = position
+        self.heading = heading
+        self.length = _BULLET.length
+        self.mass = _BULLET.mass
+        rad_heading = math.radians(heading)
+        self.tail = (position[0] - self.length * math.cos(rad_heading), position[1] - self.length * math.sin(rad_heading))
+
+
+class ReplayMine:
+    __slots__ = ('position', 'countdown_timer', 'fuse_time', 'detonation_time', 'mass', 'radius', 'blast_radius')
+
+    def __init__(self, position: Tuple[float, float], countdown_timer: float) -> None:
+        self.position = position
+        self.countdown_timer = countdown_timer
+        self.fuse_time = _MINE.fuse_time
+        self.detonation_time = _MINE.detonation_time
+        self.mass = _MINE.mass
+        self.radius = _MINE.radius
+        self.blast_radius = _MINE.blast_radius
+
+
+class ReplayScore:
+    """ Score as recorded in a replay frame. Controller evaluation times are not recorded"""
+    __slots__ = ('sim_time', 'stop_reason', 'teams')
+
+    def __init__(self, sim_time: float, stop_reason: Optional[str], teams: List[Team]) -> None:
+        self.sim_time = sim_time
+        self.stop_reason = stop_reason
+        self.teams = teams
+
+
+class ReplayFrame:
+    """
+    One decoded frame. The raw arrays are meant for analysis, the ``ships``, ``asteroids``, ``bullets``, ``mines`` and
+    ``score`` properties build objects that can be handed to a ``KesslerGraphics`` backend.
+    """
+    __slots__ = ('_player', 'frame', 'sim_time', 'ship_records', 'team_results', 'asteroid_positions', 'asteroid_sizes',
+                 'bullet_positions', 'bullet_headings', 'mine_states')
+
+    def __init__(self, player: 'ReplayPlayer', frame: int, sim_time: float, ship_records: np.ndarray,
+                 team_results: np.ndarray, asteroid_positions: np.ndarray, asteroid_sizes: np.ndarray,
+                 bullet_positions: np.ndarray, bullet_headings: np.ndarray, mine_states: np.ndarray) -> None:
+        self._player = player
+        self.frame = frame
+        self.sim_time = sim_time
+        self.ship_records = ship_records
+        self.team_results = team_results
+        self.asteroid_positions = asteroid_positions
+        self.asteroid_sizes = asteroid_sizes
+        self.bullet_positions = bullet_positions
+        self.bullet_headings = bullet_headings
+        self.mine_states = mine_states
+
+    @property
+    def actions(self) -> List[Optional[Action]]:
+        """ Controller outputs that led to this frame, None for dead ships and for frame 0"""
+        actions: List[Optional[Action]] = []
+        for record in self.ship_records:
+            flags = int(record['flags'])
+            if flags & _SHIP_ACTION:
+                actions.append((float(record['thrust']), float(record['turn_rate']), bool(flags & _SHIP_FIRE),
+                                bool(flags & _SHIP_MINE)))
+            else:
+                actions.append(None)
+        return actions
+
+    @property
+    def ships(self) -> List[ReplayShip]:
+        player = self._player
+        return [ReplayShip(info, controller, record, action) for info, controller, record, action
+                in zip(player.ship_info, player._controllers, self.ship_records, self.actions)]
+
+    @property
+    def asteroids(self) -> List[ReplayAsteroid]:
+        return [ReplayAsteroid((x, y), size) for (x, y), size
+                in zip(self.asteroid_positions.tolist(), self.asteroid_sizes.tolist())]
+
+    @property
+    def bullets(self) -> List[ReplayBullet]:
+        return [ReplayBullet((x, y), heading) for (x, y), heading
+                in zip(self.bullet_positions.tolist(), self.bullet_headings.tolist())]
+
+    @property
+    def mines(self) -> List[ReplayMine]:
+        return [ReplayMine((x, y), countdown) for x, y, countdown in self.mine_states.tolist()]
+
+    @property
+    def score(self) -> ReplayScore:
+        teams = []
+        for info, results in zip(self._player.header['teams'], self.team_results.tolist()):
+            team = Team(info['team_id'], info['team_name'])
+            team.total_bullets = info['total_bullets']
+            team.total_asteroids = info['total_asteroids']
+            for field, value in zip(_TEAM_FIELDS, results):
+                setattr(team, field, value)
+            teams.append(team)
+        last = self.frame == len(self._player) - 1
+        return ReplayScore(self.sim_time, self._player.stop_reason if last else None, teams)
+
+
+class ReplayPlayer:
+    """
+    Reads a replay file written by ``ReplayRecorder``. The file is memory mapped and frames are decoded on demand, so
+    ``player[i]`` only touches the records from the keyframe before frame ``i`` onwards. Sequential access decodes
+    each record once.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._mmap
+        magic, version, header_length = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a Kessler replay file")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported replay format version {version}")
+        self.header: Dict[str, Any] = json.loads(bytes(data[_HEADER.size:_HEADER.size + header_length]))
+        self.frequency: float = self.header['frequency']
+        self.keyframe_interval: int = self.header['keyframe_interval']
+        self.ship_info: List[Dict[str, Any]] = self.header['ships']
+        self._controllers = [_ReplayController(info['controller']) for info in self.ship_info]
+        self._num_teams = len(self.header['teams'])
+        self._frames_start = _HEADER.size + header_length
+
+        # Frame index from the trailer, or from a scan if the recording was not closed
+        self.stop_reason: Optional[str] = None
+        self.complete = False
+        if len(data) >= self._frames_start + _TRAILER.size:
+            index_offset, num_frames, footer_length, end_magic = _TRAILER.unpack_from(data, len(data) - _TRAILER.size)
+            if end_magic == _END_MAGIC:
+                self._offsets = np.frombuffer(data, dtype='<u8', count=num_frames, offset=index_offset).copy()
+                footer = json.loads(bytes(data[index_offset + 8 * num_frames:index_offset + 8 * num_frames + footer_length]))
+                self.stop_reason = footer['stop_reason']
+                self.complete = True
+        if not self.complete:
+            self._offsets = self._scan()
+
+        # Last decoded asteroid state, so that sequential access only applies one delta per frame
+        self._cached_frame = -1
+        self._cached_positions = np.empty((0, 2), dtype=np.int32)
+        self._cached_sizes = np.empty(0, dtype=np.uint8)
+
+    def _scan(self) -> np.ndarray:
+        data = self._mmap
+        offsets = []
+        offset = self._frames_start
+        while offset + _FRAME.size <= len(data):
+            size = _FRAME.unpack_from(data, offset)[0]
+            if size < _FRAME.size or offset + size > len(data):
+                break
+            offsets.append(offset)
+            offset += size
+        return np.asarray(offsets, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, frame: int) -> ReplayFrame:
+        num_frames = len(self._offsets)
+        if frame < 0:
+            frame += num_frames
+        if not 0 <= frame < num_frames:
+            raise IndexError(f"Frame {frame} is out of range for a replay of {num_frames} frames")
+
+        # Decode asteroids forward from the nearest keyframe, or from the cached frame if that is closer
+        if self._cached_frame < frame and frame - self._cached_frame < self.keyframe_interval:
+            first = self._cached_frame + 1
+        else:
+            first = frame - frame % self.keyframe_interval
+        for idx in range(first, frame):
+            self._decode(idx, asteroids_only=True)
+        return self._decode(frame)
+
+    def __iter__(self) -> Iterator[ReplayFrame]:
+        for frame in range(len(self)):
+            yield self[frame]
+
+    def _decode(self, frame: int, asteroids_only: bool = False) -> Any:
+        data = self._mmap
+        offset = int(self._offsets[frame])
+        _, flags, _, sim_time, num_asteroids, num_bullets, num_mines, num_exceptions = _FRAME.unpack_from(data, offset)
+        offset += _FRAME.size
+        ship_records = np.frombuffer(data, dtype=_SHIP_DTYPE, count=len(self.ship_info), offset=offset)
+        offset += ship_records.nbytes
+        team_results = np.frombuffer(data, dtype='<i4', count=self._num_teams * len(_TEAM_FIELDS),
+                                     offset=offset).reshape(self._num_teams, len(_TEAM_FIELDS))
+        offset += team_results.nbytes
+
+        if flags & _ASTEROID_DELTA:
+            deltas = np.frombuffer(data, dtype='<i2', count=2 * num_asteroids, offset=offset).reshape(num_asteroids, 2)
+            offset += deltas.nbytes
+            exceptions = np.frombuffer(data, dtype='<i4', count=num_exceptions, offset=offset)
+            offset += exceptions.nbytes
+            absolute = np.frombuffer(data, dtype='<i4', count=2 * num_exceptions, offset=offset).reshape(num_exceptions, 2)
+            offset += absolute.nbytes
+            positions = self._cached_positions + deltas
+            positions[exceptions] = absolute
+            sizes = self._cached_sizes
+        else:
+            positions = np.frombuffer(data, dtype='<i4', count=2 * num_asteroids, offset=offset).reshape(num_asteroids, 2)
+            offset += positions.nbytes
+            sizes = np.frombuffer(data, dtype=np.uint8, count=num_asteroids, offset=offset)
+            offset += sizes.nbytes
+        # Keep copies only, so that no array refers to the mapped file once it is closed
+        self._cached_frame = frame
+        self._cached_positions = positions.astype(np.int32)
+        self._cached_sizes = sizes.copy() if not flags & _ASTEROID_DELTA else sizes
+        if asteroids_only:
+            return None
+
+        bullet_states = np.frombuffer(data, dtype='<f4', count=3 * num_bullets, offset=offset).reshape(num_bullets, 3)
+        offset += bullet_states.nbytes
+        mine_states = np.frombuffer(data, dtype='<f4', count=3 * num_mines, offset=offset).reshape(num_mines, 3)
+
+        return ReplayFrame(self, frame, sim_time, ship_records.copy(), team_results.copy(),
+                           self._cached_positions / _POSITION_SCALE, sizes.astype(np.int64),
+                           bullet_states[:, :2].astype(np.float64), bullet_states[:, 2].astype(np.float64),
+                           mine_states.astype(np.float64))
+
+    def scenario(self) -> Scenario:
+        """ Scenario matching the recorded map, time limit, ships and initial asteroids, for starting graphics"""
+        info = self.header['scenario']
+        ship_states = [{'position': tuple(ship['position']), 'angle': ship['angle'], 'lives': ship['lives'],
+                        'team': ship['team'], 'team_name': ship['team_name']} for ship in self.ship_info]
+        asteroid_states = [{'position': tuple(asteroid['position']), 'size': asteroid['size'], 'speed': asteroid['speed'],
+                            'angle': asteroid['angle']} for asteroid in self.header['asteroids']]
+        time_limit = info['time_limit'] if info['time_limit'] is not None else float("inf")
+        return Scenario(name=info['name'], asteroid_states=asteroid_states or [{}], ship_states=ship_states,
+                        map_size=tuple(info['map_size']), time_limit=time_limit)
+
+    def play(self, graphics_type: GraphicsType = GraphicsType.Tkinter, graphics_obj: Optional[KesslerGraphics] = None,
+             UI_settings: Optional[Dict[str, bool]] = None, realtime_multiplier: float = 1.0, start: int = 0,
+             stop: Optional[int] = None) -> None:
+        """
+        Draw frames ``start`` to ``stop`` (exclusive, defaults to the end) with a graphics backend, paced at
+        ``realtime_multiplier`` times the recorded frame rate (0 draws as fast as possible)
+        """
+        graphics = GraphicsHandler(type=graphics_type, scenario=self.scenario(), UI_settings=UI_settings,
+                                   graphics_obj=graphics_obj)
+        time_step = 1.0 / self.frequency
+        try:
+            for frame in range(start, len(self) if stop is None else min(stop, len(self))):
+                step_start = time.perf_counter()
+                replay_frame = self[frame]
+                graphics.update(replay_frame.score, replay_frame.ships, replay_frame.asteroids,  # type: ignore[arg-type]
+                                replay_frame.bullets, replay_frame.mines)
+                if realtime_multiplier != 0:
+                    while time.perf_counter() - step_start < time_step / realtime_multiplier:
+                        pass
+        finally:
+            graphics.close()
+
+    def close(self) -> None:
+        self._offsets = np.empty(0, dtype=np.uint64)
+        self._mmap.close()
+
+    def __enter__(self) -> 'ReplayPlayer':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -33,6 +33,22 @@ class Score:
                 if team.team_id == ship.team:
                     team.total_bullets += scenario.bullet_limit
 
+    def copy_initial(self) -> 'Score':
+        """
+        New score with the same teams and starting totals as this one and no results yet. This is much cheaper than
+        ``Score(scenario)``, which regenerates the scenario's asteroids and ships to count them
+        """
+        score = Score.__new__(Score)
+        score.sim_time = 0.0
+        score.stop_reason = None
+        score.teams = []
+        for team in self.teams:
+            new_team = Team(team.team_id, team.team_name)
+            new_team.total_asteroids = team.total_asteroids
+            new_team.total_bullets = team.total_bullets
+            score.teams.append(new_team)
+        return score
+
     def update(self, ships: List[Ship], sim_time: float, controller_perf: Optional[List[float]] = None) -> None:
         self.sim_time = sim_time
         for team in self.teams:
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+from typing import Dict, List, Tuple, Sequence, Optional, Union, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .asteroid import Asteroid
+
+# Padding applied to segment query boxes so rounding in the cell computations can never drop a candidate
+_QUERY_PAD = 1e-6
+
+
+def _cell_key(cx: Union[int, np.ndarray], cy: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+    # Pack a (possibly negative) cell coordinate pair into a single sortable integer
+    return (cx + (1 << 30)) * (1 << 31) + (cy + (1 << 30))
+
+
+class SpatialHashGrid:
+    """
+    Uniform spatial hash used as a broadphase for bullet-asteroid collisions.
+
+    Each asteroid is bucketed into every cell overlapped by its bounding box (center +/- radius). A segment query
+    returns the indices of all asteroids sharing a cell with the segment's bounding box, in ascending index order, so
+    the narrowphase can visit candidates in the same order as a full scan of the asteroid list.
+    """
+    __slots__ = ('cell_size', '_inv_cell_size', 'cells', '_keys', '_starts', '_members')
+
+    def __init__(self, cell_size: float = 64.0) -> None:
+        if cell_size <= 0.0:
+            raise ValueError("Spatial hash cell size must be > 0")
+        self.cell_size = cell_size
+        self._inv_cell_size = 1.0 / cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        # Sorted cell keys, run starts and run members filled by build_arrays()
+        self._keys: Optional[np.ndarray] = None
+        self._starts: Optional[np.ndarray] = None
+        self._members: Optional[np.ndarray] = None
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self._keys = None
+
+    def insert(self, idx: int, center: Tuple[float, float], radius: float) -> None:
+        """
+        Add the circle with list index ``idx`` to every cell overlapped by its bounding box
+        """
+        inv = self._inv_cell_size
+        x_min = math.floor((center[0] - radius) * inv)
+        x_max = math.floor((center[0] + radius) * inv)
+        y_min = math.floor((center[1] - radius) * inv)
+        y_max = math.floor((center[1] + radius) * inv)
+        cells = self.cells
+        for cx in range(x_min, x_max + 1):
+            for cy in range(y_min, y_max + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [idx]
+                else:
+                    bucket.append(idx)
+
+    def extend(self, asteroids: Sequence['Asteroid'], start: int) -> None:
+        """
+        Insert asteroids that are about to be appended to the asteroid list at index ``start`` onwards
+        """
+        for offset, asteroid in enumerate(asteroids):
+            self.insert(start + offset, asteroid.position, asteroid.radius)
+
+    def build(self, asteroids: Sequence['Asteroid']) -> None:
+        """
+        Rebuild the grid from scratch using the current asteroid positions and radii
+        """
+        self.clear()
+        self.extend(asteroids, 0)
+
+    def build_arrays(self, centers: np.ndarray, radii: np.ndarray) -> None:
+        """
+        Rebuild the grid from (N, 2) center and (N,) radius arrays without a Python loop over the asteroids.
+
+        Every (cell, asteroid) pair is generated in one vectorized pass and stably sorted by cell key, which gives one
+        contiguous, index-ordered run of asteroids per occupied cell. Asteroids inserted afterwards with ``insert`` or
+        ``extend`` go to the regular per-cell buckets and are merged in at query time.
+        """
+        self.cells.clear()
+        inv = self._inv_cell_size
+        x_min = np.floor((centers[:, 0] - radii) * inv).astype(np.int64)
+        x_max = np.floor((centers[:, 0] + radii) * inv).astype(np.int64)
+        y_min = np.floor((centers[:, 1] - radii) * inv).astype(np.int64)
+        y_max = np.floor((centers[:, 1] + radii) * inv).astype(np.int64)
+
+        # Expand each asteroid into the cells of its bounding box
+        span_y = y_max - y_min + 1
+        counts = (x_max - x_min + 1) * span_y
+        owners = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(owners.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        span_y = span_y[owners]
+        keys = _cell_key(x_min[owners] + local // span_y, y_min[owners] + local % span_y)
+
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        self._keys = keys[np.concatenate(([0], boundaries))] if keys.shape[0] else keys
+        self._starts = np.concatenate(([0], boundaries, [keys.shape[0]])) if keys.shape[0] else np.zeros(1, np.int64)
+        self._members = owners[order]
+
+    def _array_bucket(self, cx: int, cy: int) -> List[int]:
+        keys = self._keys
+        if keys is None or not keys.shape[0]:
+            return []
+        key = _cell_key(cx, cy)
+        pos = int(np.searchsorted(keys, key))
+        if pos == keys.shape[0] or keys[pos] != key:
+            return []
+        return self._members[self._starts[pos]:self._starts[pos + 1]].tolist()
+
+    def query_segment(self, line_A: Tuple[float, float], line_B: Tuple[float, float]) -> List[int]:
+        """
+        Return the sorted indices of all asteroids whose cells overlap the bounding box of segment A-B
+        """
+        inv = self._inv_cell_size
+        x_min = math.floor((min(line_A[0], line_B[0]) - _QUERY_PAD) * inv)
+        x_max = math.floor((max(line_A[0], line_B[0]) + _QUERY_PAD) * inv)
+        y_min = math.floor((min(line_A[1], line_B[1]) - _QUERY_PAD) * inv)
+        y_max = math.floor((max(line_A[1], line_B[1]) + _QUERY_PAD) * inv)
+        cells = self.cells
+        array_mode = self._keys is not None
+
+        # Most bullet segments fall inside a single cell, so skip the set/sort work in that case
+        if x_min == x_max and y_min == y_max and not array_mode:
+            return cells.get((x_min, y_min), [])
+
+        candidates: set[int] = set()
+        for cx in range(x_min, x_max + 1):
+            for cy in range(y_min, y_max + 1):
+                if array_mode:
+                    candidates.update(self._array_bucket(cx, cy))
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    candidates.update(bucket)
+        return sorted(candidates)
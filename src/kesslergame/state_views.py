@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterator, Union, overload
+
+# Field getters for each object type. Each one returns exactly the value found under the same key in the object's
+# ``state`` dictionary, so a view compares equal to (and can be converted into) that dictionary
+FieldGetters = Dict[str, Callable[[Any], Any]]
+
+ASTEROID_STATE_FIELDS: FieldGetters = {
+    "position": lambda asteroid: asteroid.position,
+    "velocity": lambda asteroid: asteroid.velocity,
+    "size": lambda asteroid: asteroid.size,
+    "mass": lambda asteroid: asteroid.mass,
+    "radius": lambda asteroid: asteroid.radius,
+}
+
+SHIP_STATE_FIELDS: FieldGetters = {
+    "is_respawning": lambda ship: True if ship.is_respawning else False,
+    "position": lambda ship: tuple(ship.position),
+    "velocity": lambda ship: tuple([float(v) for v in ship.velocity]),
+    "speed": lambda ship: float(ship.speed),
+    "heading": lambda ship: float(ship.heading),
+    "mass": lambda ship: float(ship.mass),
+    "radius": lambda ship: float(ship.radius),
+    "id": lambda ship: int(ship.id),
+    "team": lambda ship: str(ship.team),
+    "lives_remaining": lambda ship: int(ship.lives),
+}
+
+BULLET_STATE_FIELDS: FieldGetters = {
+    "position": lambda bullet: tuple(bullet.position),
+    "velocity": lambda bullet: tuple(bullet.velocity),
+    "heading": lambda bullet: float(bullet.heading),
+    "mass": lambda bullet: float(bullet.mass),
+}
+
+MINE_STATE_FIELDS: FieldGetters = {
+    "position": lambda mine: tuple(mine.position),
+    "mass": lambda mine: float(mine.mass),
+    "fuse_time": lambda mine: float(mine.fuse_time),
+    "remaining_time": lambda mine: float(mine.countdown_timer),
+}
+
+
+class StateView(Mapping[str, Any]):
+    """
+    Read-only mapping over a live game object. Fields are read from the object only when they are accessed, so a
+    controller that only looks at ``['position']`` never pays for building the rest of the state dictionary.
+    """
+    __slots__ = ('_obj', '_fields')
+
+    def __init__(self, obj: Any, fields: FieldGetters) -> None:
+        self._obj = obj
+        self._fields = fields
+
+    def __getitem__(self, key: str) -> Any:
+        return self._fields[key](self._obj)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class StateSequenceView(Sequence[StateView]):
+    """
+    Read-only sequence of ``StateView`` objects over a list of live game objects. No per-object allocation happens
+    until an element is indexed.
+
+    The views read the objects as they are when accessed, so they are only meant to be used during the
+    ``actions()`` call they were passed to. Use ``dict(view)`` to keep a snapshot of an object's state.
+    """
+    __slots__ = ('_objects', '_fields')
+
+    def __init__(self, objects: Sequence[Any], fields: FieldGetters) -> None:
+        self._objects = objects
+        self._fields = fields
+
+    @overload
+    def __getitem__(self, idx: int) -> StateView: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> 'StateSequenceView': ...
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[StateView, 'StateSequenceView']:
+        if isinstance(idx, slice):
+            return StateSequenceView(self._objects[idx], self._fields)
+        return StateView(self._objects[idx], self._fields)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self) -> Iterator[StateView]:
+        fields = self._fields
+        for obj in self._objects:
+            yield StateView(obj, fields)
+
+    def __repr__(self) -> str:
+        return repr([dict(view) for view in self])
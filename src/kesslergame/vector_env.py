@@ -0,0 +1,750 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+import time
+import random
+import warnings
+from typing import Dict, Any, List, Mapping, Tuple, Optional, Sequence, Set, Union
+
+import numpy as np
+
+from .scenario import Scenario
+from .score import Score
+from .team import Team
+from .controller import KesslerController, decision_due
+from .collisions import circle_line_collision
+from .kessler_game import StopReason, PerfDict
+from .asteroid import Asteroid
+from .bullet import Bullet
+from .mines import Mine
+from .ship import Ship
+from .state_views import FieldGetters, StateSequenceView
+
+# Columns of the shared object buffers. Rows are kept sorted by their env column so each env owns a contiguous slice
+_ASTEROID_FIELDS = ('ast_env', 'ast_pos', 'ast_vel', 'ast_radius', 'ast_mass', 'ast_size', 'ast_angle', 'ast_turnrate')
+_BULLET_FIELDS = ('bul_env', 'bul_pos', 'bul_tail', 'bul_vel', 'bul_heading', 'bul_owner')
+_MINE_FIELDS = ('mine_env', 'mine_pos', 'mine_countdown', 'mine_detonating', 'mine_owner')
+
+
+class _Impactor:
+    """ Velocity and mass of a bullet or ship, which is all ``Asteroid.destruct`` reads from a non-mine impactor"""
+    __slots__ = ('velocity', 'mass')
+
+    def __init__(self, velocity: Tuple[float, float], mass: float) -> None:
+        self.velocity = velocity
+        self.mass = mass
+
+
+class _VectorWorld:
+    """
+    State of N lockstep worlds. Asteroids, bullets, mines and ships of every env are rows of shared NumPy arrays with an
+    env column, so the physics update, map wrapping and collision candidate search run once for all envs. Collision
+    candidates are then resolved per env in the same order as ``KesslerGame.run``, so that hits, asteroid splits and
+    deaths follow the same rules.
+    """
+
+    def __init__(self, scenarios: Sequence[Scenario], controllers: Sequence[List[KesslerController]],
+                 time_step: float, time_limit: float, lazy_game_state: bool = False) -> None:
+        self.n_envs = len(scenarios)
+        self.lazy_game_state = lazy_game_state
+        self.scenarios = list(scenarios)
+        self.controllers = [list(env_controllers) for env_controllers in controllers]
+        self.time_step = time_step
+
+        self.map_size = np.array([scenario.map_size for scenario in scenarios], dtype=np.float64)
+        self.time_limits = [scenario.time_limit if scenario.time_limit else time_limit for scenario in scenarios]
+        self.active = np.ones(self.n_envs, dtype=bool)
+        self.stop_reasons = [StopReason.not_stopped] * self.n_envs
+        self.scores: List[Score] = []
+        self.rngs: List[random.Random] = []
+
+        asteroids: List[Tuple[int, Asteroid]] = []
+        self.ships: List[Ship] = []
+        ship_env: List[int] = []
+        self.ship_slices: List[range] = []
+        for env, (scenario, env_controllers) in enumerate(zip(scenarios, self.controllers)):
+            # Same initialization order as KesslerGame.run, then give the env its own generator continuing from the
+            # resulting global random state so asteroid splits draw the same numbers as a sequential run
+            env_asteroids = scenario.asteroids()
+            env_ships = scenario.ships()
+            self.scores.append(Score(scenario))
+            rng = random.Random()
+            rng.setstate(random.getstate())
+            self.rngs.append(rng)
+
+            for controller, ship in zip(env_controllers, env_ships):
+                controller.ship_id = ship.id
+                ship.controller = controller
+            asteroids.extend((env, asteroid) for asteroid in env_asteroids)
+            self.ship_slices.append(range(len(self.ships), len(self.ships) + len(env_ships)))
+            self.ships.extend(env_ships)
+            ship_env.extend([env] * len(env_ships))
+
+        # Asteroid buffers
+        self.ast_env = np.array([env for env, _ in asteroids], dtype=np.int64)
+        self.ast_pos = np.array([asteroid.position for _, asteroid in asteroids], dtype=np.float64).reshape(-1, 2)
+        self.ast_vel = np.array([(asteroid.vx, asteroid.vy) for _, asteroid in asteroids], dtype=np.float64).reshape(-1, 2)
+        self.ast_radius = np.array([asteroid.radius for _, asteroid in asteroids], dtype=np.float64)
+        self.ast_mass = np.array([asteroid.mass for _, asteroid in asteroids], dtype=np.float64)
+        self.ast_size = np.array([asteroid.size for _, asteroid in asteroids], dtype=np.int64)
+        self.ast_angle = np.array([asteroid.angle for _, asteroid in asteroids], dtype=np.float64)
+        self.ast_turnrate = np.array([asteroid.turnrate for _, asteroid in asteroids], dtype=np.float64)
+
+        # Bullet and mine buffers start empty
+        self.bul_env = np.empty(0, dtype=np.int64)
+        self.bul_pos = np.empty((0, 2), dtype=np.float64)
+        self.bul_tail = np.empty((0, 2), dtype=np.float64)
+        self.bul_vel = np.empty((0, 2), dtype=np.float64)
+        self.bul_heading = np.empty(0, dtype=np.float64)
+        self.bul_owner = np.empty(0, dtype=np.int64)
+        self.mine_env = np.empty(0, dtype=np.int64)
+        self.mine_pos = np.empty((0, 2), dtype=np.float64)
+        self.mine_countdown = np.empty(0, dtype=np.float64)
+        self.mine_detonating = np.empty(0, dtype=bool)
+        self.mine_owner = np.empty(0, dtype=np.int64)
+
+        # Ship buffers. Ships are never removed, dead ships and ships of finished envs are masked out
+        ships = self.ships
+        self.ship_env = np.array(ship_env, dtype=np.int64)
+        self.ship_pos = np.array([ship.position for ship in ships], dtype=np.float64).reshape(-1, 2)
+        self.ship_vel = np.array([ship.velocity for ship in ships], dtype=np.float64).reshape(-1, 2)
+        self.ship_speed = np.array([ship.speed for ship in ships], dtype=np.float64)
+        self.ship_heading = np.array([ship.heading for ship in ships], dtype=np.float64)
+        self.ship_lives = np.array([ship.lives for ship in ships], dtype=np.int64)
+        self.ship_deaths = np.zeros(len(ships), dtype=np.int64)
+        self.ship_respawning = np.zeros(len(ships), dtype=np.float64)
+        self.ship_fire_limiter = np.zeros(len(ships), dtype=np.float64)
+        self.ship_mine_limiter = np.zeros(len(ships), dtype=np.float64)
+        self.ship_bullets_remaining = np.array([ship.bullets_remaining for ship in ships], dtype=np.int64)
+        self.ship_mines_remaining = np.array([ship.mines_remaining for ship in ships], dtype=np.int64)
+        self.ship_bullets_shot = np.zeros(len(ships), dtype=np.int64)
+        self.ship_mines_dropped = np.zeros(len(ships), dtype=np.int64)
+        self.ship_bullets_hit = np.zeros(len(ships), dtype=np.int64)
+        self.ship_mines_hit = np.zeros(len(ships), dtype=np.int64)
+        self.ship_asteroids_hit = np.zeros(len(ships), dtype=np.int64)
+        self.ship_thrust = np.zeros(len(ships), dtype=np.float64)
+        self.ship_turn_rate = np.zeros(len(ships), dtype=np.float64)
+        self.ship_fire = np.zeros(len(ships), dtype=bool)
+        self.ship_drop_mine = np.zeros(len(ships), dtype=bool)
+        # Whether each ship has a command from an earlier controller call to hold
+        self.ship_holding = np.zeros(len(ships), dtype=bool)
+
+        self.multi_ship_envs = [env for env, ship_slice in enumerate(self.ship_slices) if len(ship_slice) > 1]
+
+        # Team of each ship, used to record controller evaluation times
+        self.ship_teams: List[Optional[Team]] = []
+        for env, score in enumerate(self.scores):
+            for idx in self.ship_slices[env]:
+                self.ship_teams.append(next((team for team in score.teams if team.team_id == ships[idx].team), None))
+
+        # Ship physical constants are the same for every ship
+        template = ships[0] if ships else Ship(0, (0.0, 0.0))
+        self.ship_radius = template.radius
+        self.ship_mass = template.mass
+        self.thrust_range = template.thrust_range
+        self.turn_rate_range = template.turn_rate_range
+        self.max_speed = template.max_speed
+        self.drag = template.drag
+        self.respawn_time = template._respawn_time
+        self.fire_time = template._fire_time
+        self.mine_deploy_time = template._mine_deploy_time
+
+        # Bullet and mine constants, read from the engine classes like the ship constants
+        self.bullet_mass = float(Bullet((0.0, 0.0), 0.0, owner=template).mass)
+        mine = Mine([0.0, 0.0], owner=template)
+        self.mine_mass = float(mine.mass)
+        self.mine_fuse_time = float(mine.fuse_time)
+
+        # Field getters of the lazy game_state views. Each view object is a buffer row, read when a field is accessed,
+        # so the views are only valid during the actions() call they are passed to, like KesslerGame's
+        self.asteroid_fields: FieldGetters = {
+            "position": lambda row: tuple(self.ast_pos[row].tolist()),
+            "velocity": lambda row: tuple(self.ast_vel[row].tolist()),
+            "size": lambda row: int(self.ast_size[row]),
+            "mass": lambda row: float(self.ast_mass[row]),
+            "radius": lambda row: float(self.ast_radius[row]),
+        }
+        self.bullet_fields: FieldGetters = {
+            "position": lambda row: tuple(self.bul_pos[row].tolist()),
+            "velocity": lambda row: tuple(self.bul_vel[row].tolist()),
+            "heading": lambda row: float(self.bul_heading[row]),
+            "mass": lambda row: self.bullet_mass,
+        }
+        self.mine_fields: FieldGetters = {
+            "position": lambda row: tuple(self.mine_pos[row].tolist()),
+            "mass": lambda row: self.mine_mass,
+            "fuse_time": lambda row: self.mine_fuse_time,
+            "remaining_time": lambda row: float(self.mine_countdown[row]),
+        }
+
+    # --- Buffer helpers -----------------------------------------------------------------------------------------------
+    def _filter(self, fields: Tuple[str, ...], keep: np.ndarray) -> None:
+        for name in fields:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _append(self, fields: Tuple[str, ...], columns: Sequence[Any]) -> None:
+        # Append rows then restore the env ordering. The stable sort keeps each env's rows in insertion order
+        for name, column in zip(fields, columns):
+            old = getattr(self, name)
+            setattr(self, name, np.concatenate((old, np.asarray(column, dtype=old.dtype).reshape((-1,) + old.shape[1:]))))
+        env = getattr(self, fields[0])
+        if env.shape[0] > 1 and np.any(env[1:] < env[:-1]):
+            self._filter(fields, np.argsort(env, kind='stable'))
+
+    def _bounds(self, env_column: np.ndarray) -> List[int]:
+        # Row offsets of each env's slice, env e owns rows bounds[e]:bounds[e + 1]
+        return np.searchsorted(env_column, np.arange(self.n_envs + 1)).tolist()
+
+    @staticmethod
+    def _env_pairs(env_column: np.ndarray, bounds: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        # Every (row, other row) pair where the other row belongs to the same env, ordered by row then other row
+        starts = np.asarray(bounds[:-1], dtype=np.int64)[env_column]
+        counts = np.asarray(bounds[1:], dtype=np.int64)[env_column] - starts
+        rows = np.repeat(np.arange(env_column.shape[0]), counts)
+        others = np.arange(rows.shape[0]) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return rows, others
+
+    def _parent(self, row: int) -> Asteroid:
+        # Asteroid object carrying the fields of buffer row ``row`` that ``Asteroid.destruct`` reads
+        asteroid = Asteroid.__new__(Asteroid)
+        asteroid.size = int(self.ast_size[row])
+        asteroid.radius = float(self.ast_radius[row])
+        asteroid.mass = float(self.ast_mass[row])
+        asteroid.vx, asteroid.vy = self.ast_vel[row].tolist()
+        asteroid.velocity = (asteroid.vx, asteroid.vy)
+        x, y = self.ast_pos[row].tolist()
+        asteroid.position = (x, y)
+        return asteroid
+
+    def _destruct_ship(self, idx: int) -> None:
+        # Same as Ship.destruct, the ship respawns where it died
+        self.ship_lives[idx] -= 1
+        self.ship_deaths[idx] += 1
+        self.ship_respawning[idx] = self.respawn_time
+        self.ship_speed[idx] = 0.0
+        self.ship_vel[idx] = 0.0
+
+    # --- Controllers --------------------------------------------------------------------------------------------------
+    def call_controllers(self, sim_time: float, step: int, perf_tracker: bool) -> List[float]:
+        """
+        Build each active env's game_state and apply its controllers' actions. Returns per-ship controller times
+        """
+        asteroid_bounds = self._bounds(self.ast_env)
+        bullet_bounds = self._bounds(self.bul_env)
+        mine_bounds = self._bounds(self.mine_env)
+        if self.lazy_game_state:
+            asteroid_states: Sequence[Mapping[str, Any]] = StateSequenceView(range(len(self.ast_env)),
+                                                                             self.asteroid_fields)
+            bullet_states: Sequence[Mapping[str, Any]] = StateSequenceView(range(len(self.bul_env)),
+                                                                           self.bullet_fields)
+            mine_states: Sequence[Mapping[str, Any]] = StateSequenceView(range(len(self.mine_env)), self.mine_fields)
+        else:
+            asteroid_states, bullet_states, mine_states = self._states()
+
+        ship_states = self._ship_states()
+        lives = self.ship_lives.tolist()
+        holding = self.ship_holding.tolist()
+        controller_times = [0.0] * len(self.ships)
+        for env in np.flatnonzero(self.active).tolist():
+            ship_slice = self.ship_slices[env]
+            game_state = {
+                'asteroids': asteroid_states[asteroid_bounds[env]:asteroid_bounds[env + 1]],
+                'ships': [ship_states[idx] for idx in ship_slice if lives[idx] > 0],
+                'bullets': bullet_states[bullet_bounds[env]:bullet_bounds[env + 1]],
+                'mines': mine_states[mine_bounds[env]:mine_bounds[env + 1]],
+                'map_size': self.scenarios[env].map_size,
+                'time': sim_time,
+                'delta_time': self.time_step,
+                'sim_frame': step,
+                'time_limit': self.time_limits[env]
+            }
+            controllers = self.controllers[env]
+            for local_idx, idx in enumerate(ship_slice):
+                if lives[idx] <= 0:
+                    continue
+                controller = controllers[local_idx]
+                if controller.ship_id != self.ships[idx].id:
+                    raise RuntimeError("Controller and ship ID do not match")
+                # Between decisions the ship keeps its last command
+                if not decision_due(controller, step, holding[idx]):
+                    continue
+                t_start = time.perf_counter() if perf_tracker else 0.0
+                thrust, turn_rate, fire, drop_mine = controller.actions(self._ownstate(idx, ship_states[idx]), game_state)
+                if perf_tracker:
+                    controller_times[idx] = time.perf_counter() - t_start
+                self.ship_thrust[idx] = thrust
+                self.ship_turn_rate[idx] = turn_rate
+                self.ship_fire[idx] = fire
+                self.ship_drop_mine[idx] = drop_mine
+                self.ship_holding[idx] = True
+        return controller_times
+
+    def _states(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        # Asteroid, bullet and mine state dictionaries of every env, in buffer row order
+        asteroid_states = [{
+            "position": (position[0], position[1]),
+            "velocity": (velocity[0], velocity[1]),
+            "size": size,
+            "mass": mass,
+            "radius": radius
+        } for position, velocity, size, mass, radius in zip(self.ast_pos.tolist(), self.ast_vel.tolist(),
+                                                             self.ast_size.tolist(), self.ast_mass.tolist(),
+                                                             self.ast_radius.tolist())]
+        bullet_states = [{
+            "position": (position[0], position[1]),
+            "velocity": (velocity[0], velocity[1]),
+            "heading": heading,
+            "mass": self.bullet_mass
+        } for position, velocity, heading in zip(self.bul_pos.tolist(), self.bul_vel.tolist(), self.bul_heading.tolist())]
+        mine_states = [{
+            "position": (position[0], position[1]),
+            "mass": self.mine_mass,
+            "fuse_time": self.mine_fuse_time,
+            "remaining_time": countdown
+        } for position, countdown in zip(self.mine_pos.tolist(), self.mine_countdown.tolist())]
+        return asteroid_states, bullet_states, mine_states
+
+    def _ship_states(self) -> List[Dict[str, Any]]:
+        return [{
+            "is_respawning": True if respawning else False,
+            "position": (position[0], position[1]),
+            "velocity": (velocity[0], velocity[1]),
+            "speed": speed,
+            "heading": heading,
+            "mass": float(self.ship_mass),
+            "radius": float(self.ship_radius),
+            "id": int(ship.id),
+            "team": str(ship.team),
+            "lives_remaining": lives,
+        } for ship, respawning, position, velocity, speed, heading, lives in zip(
+            self.ships, self.ship_respawning.tolist(), self.ship_pos.tolist(), self.ship_vel.tolist(),
+            self.ship_speed.tolist(), self.ship_heading.tolist(), self.ship_lives.tolist())]
+
+    def _ownstate(self, idx: int, state: Dict[str, Any]) -> Dict[str, Any]:
+        bullets_remaining = int(self.ship_bullets_remaining[idx])
+        mines_remaining = int(self.ship_mines_remaining[idx])
+        return {**state,
+                "bullets_remaining": bullets_remaining,
+                "mines_remaining": mines_remaining,
+                "can_fire": (not self.ship_fire_limiter[idx]) and bullets_remaining != 0,
+                "fire_rate": 1 / self.fire_time,
+                "can_deploy_mine": (not self.ship_mine_limiter[idx]) and mines_remaining != 0,
+                "mine_deploy_rate": 1 / self.mine_deploy_time,
+                "thrust_range": self.thrust_range,
+                "turn_rate_range": self.turn_rate_range,
+                "max_speed": self.max_speed,
+                "drag": self.drag,
+        }
+
+    # --- Physics ------------------------------------------------------------------------------------------------------
+    def update(self) -> None:
+        """ Move every object of every env one time step forward and wrap/cull them at the map edges"""
+        dt = self.time_step
+        self.bul_pos += self.bul_vel * dt
+        self.bul_tail += self.bul_vel * dt
+        self.mine_countdown -= dt
+        self.mine_detonating |= self.mine_countdown <= 1e-15
+        self.ast_pos += self.ast_vel * dt
+        self.ast_angle += dt * self.ast_turnrate
+
+        ships = np.flatnonzero((self.ship_lives > 0) & self.active[self.ship_env])
+        if ships.size:
+            self._update_ships(ships)
+
+        # Cull bullets past the map edge
+        if self.bul_env.shape[0]:
+            map_size = self.map_size[self.bul_env]
+            x, y = self.bul_pos[:, 0], self.bul_pos[:, 1]
+            keep = (0.0 <= x) & (x <= map_size[:, 0]) & (0.0 <= y) & (y <= map_size[:, 1])
+            if not keep.all():
+                self._filter(_BULLET_FIELDS, keep)
+
+        # Wrap ships and asteroids to the other side of the map
+        self.ship_pos[ships] = np.remainder(self.ship_pos[ships], self.map_size[self.ship_env[ships]])
+        np.remainder(self.ast_pos, self.map_size[self.ast_env], out=self.ast_pos)
+
+    def _update_ships(self, ships: np.ndarray) -> None:
+        # Vectorized Ship.update for the given ship rows
+        dt = self.time_step
+
+        # Fire bullets and deploy mines using the ship state from before this update
+        firing = ships[self.ship_fire[ships] & (self.ship_fire_limiter[ships] == 0.0) & (self.ship_bullets_remaining[ships] != 0)]
+        if firing.size:
+            new_bullets = []
+            for idx in firing.tolist():
+                x, y = self.ship_pos[idx].tolist()
+                heading = float(self.ship_heading[idx])
+                rad_heading = math.radians(heading)
+                bullet = Bullet((x + self.ship_radius * math.cos(rad_heading), y + self.ship_radius * math.sin(rad_heading)),
+                                heading, owner=self.ships[idx])
+                new_bullets.append(bullet)
+            self.ship_respawning[firing] = 0.0
+            self.ship_fire_limiter[firing] = self.fire_time
+            self.ship_bullets_remaining[firing] -= self.ship_bullets_remaining[firing] > 0
+            self.ship_bullets_shot[firing] += 1
+            self._append(_BULLET_FIELDS, (self.ship_env[firing],
+                                          [bullet.position for bullet in new_bullets],
+                                          [bullet.tail for bullet in new_bullets],
+                                          [bullet.velocity for bullet in new_bullets],
+                                          [bullet.heading for bullet in new_bullets],
+                                          firing))
+
+        deploying = ships[self.ship_drop_mine[ships] & (self.ship_mine_limiter[ships] == 0.0) & (self.ship_mines_remaining[ships] != 0)]
+        if deploying.size:
+            self.ship_respawning[deploying] = 0.0
+            self.ship_mine_limiter[deploying] = self.mine_deploy_time
+            self.ship_mines_remaining[deploying] -= self.ship_mines_remaining[deploying] > 0
+            self.ship_mines_dropped[deploying] += 1
+            self._append(_MINE_FIELDS, (self.ship_env[deploying], self.ship_pos[deploying],
+                                        np.full(deploying.shape[0], self.mine_fuse_time), np.zeros(deploying.shape[0], dtype=bool),
+                                        deploying))
+
+        # Decrement respawn, fire and mine deployment timers
+        respawning = self.ship_respawning[ships]
+        self.ship_respawning[ships] = np.where(respawning <= 0.0, 0.0, respawning - dt)
+        for limiter in (self.ship_fire_limiter, self.ship_mine_limiter):
+            values = limiter[ships]
+            values = np.where(values != 0.0, values - dt, values)
+            limiter[ships] = np.where(values <= 0.00000000001, 0.0, values)
+
+        # Apply drag. Fully stop the ship if it would cross zero speed in this time
+        speed = self.ship_speed[ships]
+        drag_amount = self.drag * dt
+        speed = np.where(drag_amount > np.abs(speed), 0.0, speed - drag_amount * np.sign(speed))
+
+        # Bounds check the thrust and turn rate commands
+        thrust = self.ship_thrust[ships]
+        turn_rate = self.ship_turn_rate[ships]
+        for idx in ships[(thrust < self.thrust_range[0]) | (thrust > self.thrust_range[1])].tolist():
+            warnings.warn('Ship ' + str(self.ships[idx].id) + ' thrust command outside of allowable range', RuntimeWarning)
+        for idx in ships[(turn_rate < self.turn_rate_range[0]) | (turn_rate > self.turn_rate_range[1])].tolist():
+            warnings.warn('Ship ' + str(self.ships[idx].id) + ' turn rate command outside of allowable range', RuntimeWarning)
+        thrust = np.clip(thrust, self.thrust_range[0], self.thrust_range[1])
+        turn_rate = np.clip(turn_rate, self.turn_rate_range[0], self.turn_rate_range[1])
+
+        # Apply thrust, bound the speed and turn
+        speed = np.clip(speed + thrust * dt, -self.max_speed, self.max_speed)
+        heading = np.remainder(self.ship_heading[ships] + turn_rate * dt, 360.0)
+        rad_heading = np.radians(heading)
+        velocity = np.stack((np.cos(rad_heading) * speed, np.sin(rad_heading) * speed), axis=1)
+
+        self.ship_speed[ships] = speed
+        self.ship_heading[ships] = heading
+        self.ship_vel[ships] = velocity
+        self.ship_pos[ships] = self.ship_pos[ships] + velocity * dt
+
+    # --- Collisions ---------------------------------------------------------------------------------------------------
+    def check_collisions(self) -> None:
+        """
+        Find collision candidates for all envs with vectorized bounding box and distance tests, then resolve them per
+        env in the order used by ``KesslerGame.run``
+        """
+        n_envs = self.n_envs
+        asteroid_bounds = self._bounds(self.ast_env)
+        removed: Set[int] = set()
+        removed_bullets: Set[int] = set()
+        # Asteroids created during this frame, per env. Children can still be hit later in the same frame
+        children: List[List[Asteroid]] = [[] for _ in range(n_envs)]
+        removed_children: List[Set[int]] = [set() for _ in range(n_envs)]
+        alive = (self.ship_lives > 0) & self.active[self.ship_env]
+        alive_ships = alive.tolist()
+
+        # --- Bullet-asteroid: every same-env pair passing the bounding box check of circle_line_collision ---
+        n_bullets = self.bul_env.shape[0]
+        if n_bullets:
+            bul_idx, ast_idx = self._env_pairs(self.bul_env, asteroid_bounds)
+            x_min = np.minimum(self.bul_pos[:, 0], self.bul_tail[:, 0])[bul_idx]
+            x_max = np.maximum(self.bul_pos[:, 0], self.bul_tail[:, 0])[bul_idx]
+            y_min = np.minimum(self.bul_pos[:, 1], self.bul_tail[:, 1])[bul_idx]
+            y_max = np.maximum(self.bul_pos[:, 1], self.bul_tail[:, 1])[bul_idx]
+            center_x, center_y, radius = self.ast_pos[ast_idx, 0], self.ast_pos[ast_idx, 1], self.ast_radius[ast_idx]
+            in_box = ((center_x >= x_min - radius) & (center_x <= x_max + radius)
+                      & (center_y >= y_min - radius) & (center_y <= y_max + radius))
+            candidates: Dict[int, List[Tuple[int, List[float], float]]] = {}
+            for idx_bul, idx_ast, center, radius_ast in zip(bul_idx[in_box].tolist(), ast_idx[in_box].tolist(),
+                                                             self.ast_pos[ast_idx[in_box]].tolist(), radius[in_box].tolist()):
+                candidates.setdefault(idx_bul, []).append((idx_ast, center, radius_ast))
+
+            bullet_bounds = self._bounds(self.bul_env)
+            envs_with_candidates = sorted(set(self.bul_env[bul_idx[in_box]].tolist()))
+            bul_pos, bul_tail, bul_vel = self.bul_pos.tolist(), self.bul_tail.tolist(), self.bul_vel.tolist()
+            owners = self.bul_owner.tolist()
+            for env in envs_with_candidates:
+                env_children = children[env]
+                for idx_bul in range(bullet_bounds[env], bullet_bounds[env + 1]):
+                    env_candidates = candidates.get(idx_bul)
+                    if env_candidates is None and not env_children:
+                        continue
+                    head_pos, tail_pos = bul_pos[idx_bul], bul_tail[idx_bul]
+                    parent: Optional[Asteroid] = None
+                    for idx_ast, center, radius_ast in env_candidates or ():
+                        if idx_ast not in removed and circle_line_collision(head_pos, tail_pos, center, radius_ast):
+                            parent = self._parent(idx_ast)
+                            removed.add(idx_ast)
+                            break
+                    if parent is None:
+                        for idx_child, child in enumerate(env_children):
+                            if idx_child not in removed_children[env] and circle_line_collision(head_pos, tail_pos, child.position, child.radius):
+                                parent = child
+                                removed_children[env].add(idx_child)
+                                break
+                    if parent is None:
+                        continue
+                    owner = owners[idx_bul]
+                    self.ship_asteroids_hit[owner] += 1
+                    self.ship_bullets_hit[owner] += 1
+                    removed_bullets.add(idx_bul)
+                    env_children.extend(parent.destruct(impactor=_Impactor(bul_vel[idx_bul], self.bullet_mass), rng=self.rngs[env]))
+            if removed_bullets:
+                keep = np.ones(n_bullets, dtype=bool)
+                keep[list(removed_bullets)] = False
+                self._filter(_BULLET_FIELDS, keep)
+
+        # --- Mine-asteroid and mine-ship effects ---
+        detonating = np.flatnonzero(self.mine_detonating)
+        if detonating.size:
+            mine_children: List[List[Asteroid]] = [[] for _ in range(n_envs)]
+            for idx_mine in detonating.tolist():
+                env = int(self.mine_env[idx_mine])
+                owner = int(self.mine_owner[idx_mine])
+                mx, my = self.mine_pos[idx_mine].tolist()
+                mine = Mine([mx, my], owner=self.ships[owner])
+                start, end = asteroid_bounds[env], asteroid_bounds[env + 1]
+                dx = self.ast_pos[start:end, 0] - mx
+                dy = self.ast_pos[start:end, 1] - my
+                radius_sum = mine.blast_radius + self.ast_radius[start:end]
+                hits = [idx_ast for idx_ast in (np.flatnonzero(dx * dx + dy * dy <= radius_sum * radius_sum) + start).tolist()
+                        if idx_ast not in removed]
+                for idx_ast in hits:
+                    self.ship_asteroids_hit[owner] += 1
+                    self.ship_mines_hit[owner] += 1
+                    mine_children[env].extend(self._parent(idx_ast).destruct(impactor=mine, rng=self.rngs[env]))
+                    removed.add(idx_ast)
+                for idx_child, child in enumerate(children[env]):
+                    if idx_child in removed_children[env]:
+                        continue
+                    cdx = child.position[0] - mx
+                    cdy = child.position[1] - my
+                    radius_sum_child = mine.blast_radius + child.radius
+                    if cdx * cdx + cdy * cdy <= radius_sum_child * radius_sum_child:
+                        self.ship_asteroids_hit[owner] += 1
+                        self.ship_mines_hit[owner] += 1
+                        mine_children[env].extend(child.destruct(impactor=mine, rng=self.rngs[env]))
+                        removed_children[env].add(idx_child)
+                for idx in self.ship_slices[env]:
+                    if alive_ships[idx] and not self.ship_respawning[idx]:
+                        sx, sy = self.ship_pos[idx].tolist()
+                        dx_ship = sx - mx
+                        dy_ship = sy - my
+                        radius_sum_ship = mine.blast_radius + self.ship_radius
+                        if dx_ship * dx_ship + dy_ship * dy_ship <= radius_sum_ship * radius_sum_ship:
+                            self._destruct_ship(idx)
+            for env, env_mine_children in enumerate(mine_children):
+                children[env].extend(env_mine_children)
+            self._filter(_MINE_FIELDS, ~self.mine_detonating)
+
+        # --- Asteroid-ship: overlap of every same-env (ship, asteroid) pair, first unremoved asteroid wins ---
+        ships = np.flatnonzero(alive)
+        if ships.size:
+            ship_pairs, ast_idx = self._env_pairs(self.ship_env[ships], asteroid_bounds)
+            ship_idx = ships[ship_pairs]
+            dx = self.ship_pos[ship_idx, 0] - self.ast_pos[ast_idx, 0]
+            dy = self.ship_pos[ship_idx, 1] - self.ast_pos[ast_idx, 1]
+            radius_sum = self.ship_radius + self.ast_radius[ast_idx]
+            overlap = (np.abs(dx) <= radius_sum) & (np.abs(dy) <= radius_sum) & (dx * dx + dy * dy <= radius_sum * radius_sum)
+            overlapping: Dict[int, List[int]] = {}
+            for idx, idx_ast in zip(ship_idx[overlap].tolist(), ast_idx[overlap].tolist()):
+                overlapping.setdefault(idx, []).append(idx_ast)
+
+            for idx in ships.tolist():
+                env = int(self.ship_env[idx])
+                if self.ship_respawning[idx] or (idx not in overlapping and not children[env]):
+                    continue
+                parent = None
+                for idx_ast in overlapping.get(idx, ()):
+                    if idx_ast not in removed:
+                        parent = self._parent(idx_ast)
+                        removed.add(idx_ast)
+                        break
+                if parent is None:
+                    sx, sy = self.ship_pos[idx].tolist()
+                    for idx_child, child in enumerate(children[env]):
+                        if idx_child in removed_children[env]:
+                            continue
+                        cdx = sx - child.position[0]
+                        cdy = sy - child.position[1]
+                        radius_sum_child = self.ship_radius + child.radius
+                        if abs(cdx) <= radius_sum_child and abs(cdy) <= radius_sum_child and cdx * cdx + cdy * cdy <= radius_sum_child * radius_sum_child:
+                            parent = child
+                            removed_children[env].add(idx_child)
+                            break
+                if parent is None:
+                    continue
+                vx, vy = self.ship_vel[idx].tolist()
+                children[env].extend(parent.destruct(impactor=_Impactor((vx, vy), self.ship_mass), rng=self.rngs[env]))
+                self.ship_asteroids_hit[idx] += 1
+                self._destruct_ship(idx)
+
+        # Cull asteroids marked for removal and add the surviving children at the end of their env's slice
+        if removed:
+            keep = np.ones(self.ast_env.shape[0], dtype=bool)
+            keep[list(removed)] = False
+            self._filter(_ASTEROID_FIELDS, keep)
+        new_asteroids = [(env, child) for env, env_children in enumerate(children)
+                         for idx_child, child in enumerate(env_children) if idx_child not in removed_children[env]]
+        if new_asteroids:
+            self._append(_ASTEROID_FIELDS, ([env for env, _ in new_asteroids],
+                                            [child.position for _, child in new_asteroids],
+                                            [(child.vx, child.vy) for _, child in new_asteroids],
+                                            [child.radius for _, child in new_asteroids],
+                                            [child.mass for _, child in new_asteroids],
+                                            [child.size for _, child in new_asteroids],
+                                            [child.angle for _, child in new_asteroids],
+                                            [child.turnrate for _, child in new_asteroids]))
+
+        # --- Ship-ship collisions ---
+        for env in self.multi_ship_envs:
+            if not self.active[env]:
+                continue
+            ship_slice = self.ship_slices[env]
+            live = [idx for idx in ship_slice if self.ship_lives[idx] > 0]
+            for i, idx1 in enumerate(live):
+                for idx2 in live[i + 1:]:
+                    if not self.ship_respawning[idx2] and not self.ship_respawning[idx1]:
+                        dx_ship = float(self.ship_pos[idx1, 0] - self.ship_pos[idx2, 0])
+                        dy_ship = float(self.ship_pos[idx1, 1] - self.ship_pos[idx2, 1])
+                        radius_sum_ship = self.ship_radius + self.ship_radius
+                        if abs(dx_ship) <= radius_sum_ship and abs(dy_ship) <= radius_sum_ship and dx_ship * dx_ship + dy_ship * dy_ship <= radius_sum_ship * radius_sum_ship:
+                            self._destruct_ship(idx1)
+                            self._destruct_ship(idx2)
+
+    # --- Stop conditions ----------------------------------------------------------------------------------------------
+    def check_stop(self, sim_time: float) -> None:
+        """ Stop and finalize every env that met one of its stop conditions"""
+        ast_counts = np.bincount(self.ast_env, minlength=self.n_envs)
+        bullet_counts = np.bincount(self.bul_env, minlength=self.n_envs)
+        live = self.ship_lives > 0
+        live_ships = np.bincount(self.ship_env[live], minlength=self.n_envs)
+        ammo = np.bincount(self.ship_env[live], weights=self.ship_bullets_remaining[live], minlength=self.n_envs)
+        finished = []
+        for env in np.flatnonzero(self.active).tolist():
+            if not ast_counts[env]:
+                reason = StopReason.no_asteroids
+            elif not live_ships[env]:
+                reason = StopReason.no_ships
+            elif not ammo[env] and not bullet_counts[env] > 0 and self.scenarios[env].stop_if_no_ammo:
+                reason = StopReason.out_of_bullets
+            elif sim_time > self.time_limits[env]:
+                reason = StopReason.time_expired
+            else:
+                continue
+            self.stop_reasons[env] = reason
+            finished.append(env)
+
+        for env in finished:
+            self.active[env] = False
+            self._finalize(env, sim_time)
+        if finished:
+            self._filter(_ASTEROID_FIELDS, self.active[self.ast_env])
+            self._filter(_BULLET_FIELDS, self.active[self.bul_env])
+            self._filter(_MINE_FIELDS, self.active[self.mine_env])
+
+    def _finalize(self, env: int, sim_time: float) -> None:
+        # Copy the ship buffers back into the env's Ship objects and finalize its score
+        ships = [self.ships[idx] for idx in self.ship_slices[env]]
+        for idx, ship in zip(self.ship_slices[env], ships):
+            ship.position = tuple(self.ship_pos[idx].tolist())
+            ship.velocity = tuple(self.ship_vel[idx].tolist())
+            ship.speed = float(self.ship_speed[idx])
+            ship.heading = float(self.ship_heading[idx])
+            ship.lives = int(self.ship_lives[idx])
+            ship.deaths = int(self.ship_deaths[idx])
+            ship._respawning = float(self.ship_respawning[idx])
+            ship._fire_limiter = float(self.ship_fire_limiter[idx])
+            ship._mine_limiter = float(self.ship_mine_limiter[idx])
+            ship.bullets_remaining = int(self.ship_bullets_remaining[idx])
+            ship.mines_remaining = int(self.ship_mines_remaining[idx])
+            ship.bullets_shot = int(self.ship_bullets_shot[idx])
+            ship.mines_dropped = int(self.ship_mines_dropped[idx])
+            ship.bullets_hit = int(self.ship_bullets_hit[idx])
+            ship.mines_hit = int(self.ship_mines_hit[idx])
+            ship.asteroids_hit = int(self.ship_asteroids_hit[idx])
+        score = self.scores[env]
+        score.update(ships, sim_time)
+        score.finalize(sim_time, self.stop_reasons[env], ships)
+
+
+class VectorKesslerGame:
+    """
+    Runs N independent scenarios in lockstep on one core.
+
+    The asteroids, bullets, mines and ships of all envs live in shared NumPy buffers, so each frame's physics update,
+    map wrapping and collision tests are done once for every env instead of once per env. Controllers are still called
+    per env with the usual ``ship_state``/``game_state`` dictionaries. Each env draws asteroid split randomness from its
+    own generator, which continues from the global ``random`` state left by its scenario setup. A seeded scenario
+    therefore plays out the same as it would in ``KesslerGame.run``. Graphics are not supported.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        if settings is None:
+            settings = {}
+        self.frequency: float = settings.get("frequency", 30.0)
+        self.time_step: float = 1 / settings.get("frequency", 30.0)
+        self.perf_tracker: bool = settings.get("perf_tracker", False)
+        self.time_limit: float = settings.get("time_limit", float("inf"))
+        self.lazy_game_state: bool = settings.get("lazy_game_state", False)
+
+    def run(self, scenarios: Union[Scenario, Sequence[Scenario]],
+            controllers: Sequence[List[KesslerController]]) -> Tuple[List[Score], List[PerfDict]]:
+        """
+        Run every env to completion and return one score per env plus per-frame timings
+
+        :param scenarios: One scenario per env, or a single scenario shared by all envs
+        :param controllers: One list of controllers per env, in ship order like ``KesslerGame.run``
+        :return: The scores in env order, and one ``PerfDict`` per lockstep frame if perf tracking is on.
+            ``controller_times`` lists the time for every ship of every env
+        """
+        if isinstance(scenarios, Scenario):
+            scenarios = [scenarios] * len(controllers)
+        if len(scenarios) != len(controllers):
+            raise ValueError("VectorKesslerGame needs one list of controllers per scenario")
+
+        world = _VectorWorld(scenarios, controllers, self.time_step, self.time_limit, self.lazy_game_state)
+        perf_list: List[PerfDict] = []
+        sim_time: float = 0.0
+        step: int = 0
+        while world.active.any():
+            step_start = time.perf_counter()
+            perf_dict: PerfDict = {}
+
+            controller_times = world.call_controllers(sim_time, step, self.perf_tracker)
+            if self.perf_tracker:
+                perf_dict['controller_times'] = controller_times
+                perf_dict['total_controller_time'] = time.perf_counter() - step_start
+                for idx, controller_time in enumerate(controller_times):
+                    team = world.ship_teams[idx]
+                    if controller_time > 0 and team is not None:
+                        team.eval_times.append(controller_time)
+                prev = time.perf_counter()
+
+            world.update()
+            if self.perf_tracker:
+                perf_dict['physics_update'] = time.perf_counter() - prev
+                prev = time.perf_counter()
+
+            world.check_collisions()
+            if self.perf_tracker:
+                perf_dict['collisions_check'] = time.perf_counter() - prev
+
+            sim_time += self.time_step
+            step += 1
+            world.check_stop(sim_time)
+
+            if self.perf_tracker:
+                perf_dict['total_frame_time'] = time.perf_counter() - step_start
+                perf_list.append(perf_dict)
+
+        return world.scores, perf_list
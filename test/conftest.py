@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+from kesslergame import KesslerController, Scenario, Score, TrainerEnvironment
+
+
+class AimingController(KesslerController):
+    """
+    Deterministic controller for comparing runs: turns towards the nearest asteroid, fires when it faces it and drops
+    a mine every few seconds, so bullets, splits, mines and collisions all happen. Every call is recorded in ``trace``.
+    """
+
+    def __init__(self) -> None:
+        self.trace: List[Tuple[Any, ...]] = []
+
+    def actions(self, ship_state: Dict[str, Any], game_state: Dict[str, Any]) -> Tuple[float, float, bool, bool]:
+        x, y = ship_state['position']
+        asteroids = game_state['asteroids']
+        self.trace.append((game_state['sim_frame'], ship_state['position'], ship_state['heading'],
+                           ship_state['lives_remaining'], len(asteroids), len(game_state['bullets']),
+                           len(game_state['mines'])))
+        if not asteroids:
+            return 0.0, 0.0, False, False
+        nearest = min(asteroids, key=lambda asteroid: (asteroid['position'][0] - x) ** 2
+                                                      + (asteroid['position'][1] - y) ** 2)
+        bearing = math.degrees(math.atan2(nearest['position'][1] - y, nearest['position'][0] - x))
+        error = (bearing - ship_state['heading'] + 180.0) % 360.0 - 180.0
+        turn_rate = max(-180.0, min(180.0, 6.0 * error))
+        return 60.0, turn_rate, abs(error) < 10.0, game_state['sim_frame'] % 150 == 75
+
+    @property
+    def name(self) -> str:
+        return "Aiming test controller"
+
+
+class CopyingController(AimingController):
+    """ AimingController that also keeps a plain copy of every object state it is passed"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.states = []
+
+    def actions(self, ship_state: Dict[str, Any], game_state: Dict[str, Any]):
+        self.states.append({key: [dict(state) for state in game_state[key]]
+                            for key in ('asteroids', 'ships', 'bullets', 'mines')})
+        self.states[-1]['ship_state'] = dict(ship_state)
+        return super().actions(ship_state, game_state)
+
+
+def make_scenario(seed: int, num_asteroids: int = 12) -> Scenario:
+    return Scenario(name=f"Test scenario {seed}", num_asteroids=num_asteroids, map_size=(1000, 800), time_limit=10,
+                    ship_states=[{'position': (300, 400), 'lives': 3, 'mines_remaining': 3},
+                                 {'position': (700, 400), 'lives': 3, 'mines_remaining': 3}],
+                    seed=seed)
+
+
+def outcome(score: Score) -> Tuple[Any, ...]:
+    """ Everything a run's score reports, for comparing runs"""
+    teams = tuple((team.asteroids_hit, team.bullets_hit, team.shots_fired, team.bullets_remaining, team.deaths,
+                   team.lives_remaining) for team in score.teams)
+    return score.sim_time, score.stop_reason, teams
+
+
+@pytest.fixture(params=[1, 2, 3])
+def scenario(request) -> Scenario:
+    return make_scenario(request.param)
+
+
+@pytest.fixture
+def play() -> Callable[..., Tuple[Tuple[Any, ...], List[List[Tuple[Any, ...]]]]]:
+    """ Runs a scenario with two AimingControllers and the given game settings, returns its outcome and traces"""
+    def run(scenario: Scenario, **settings: Any) -> Tuple[Tuple[Any, ...], List[List[Tuple[Any, ...]]]]:
+        controllers = [AimingController(), AimingController()]
+        score, _ = TrainerEnvironment(settings=settings).run(scenario=scenario, controllers=controllers)
+        return outcome(score), [controller.trace for controller in controllers]
+    return run
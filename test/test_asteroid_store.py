@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import random
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+import pytest
+
+from kesslergame import KesslerGame, GraphicsType
+from kesslergame.asteroid import Asteroid
+from kesslergame.asteroid_store import AsteroidStore, AsteroidView
+
+from .conftest import make_scenario
+
+
+@pytest.mark.parametrize("spatial_hash", [True, False])
+def test_asteroid_store_matches_objects(play, scenario, spatial_hash):
+    expected = play(scenario, vectorized_asteroids=False, spatial_hash_collisions=spatial_hash)
+    assert play(scenario, vectorized_asteroids=True, spatial_hash_collisions=spatial_hash) == expected
+
+
+def test_asteroid_store_states_match_objects():
+    scenario = make_scenario(4)
+    states = []
+    for vectorized in (False, True):
+        game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'vectorized_asteroids': vectorized,
+                                     'prints_on': False})
+        session = game.session()
+        session.reset(scenario)
+        assert isinstance(session.asteroids, AsteroidStore) == vectorized
+        for _ in range(30):
+            game_state, _, _, _ = session.step([(100.0, 90.0, True, False)] * 2)
+        states.append(game_state['asteroids'])
+    assert states[0] == states[1]
+
+
+def state(asteroid) -> Tuple[Any, ...]:
+    return (asteroid.position, asteroid.velocity, asteroid.radius, asteroid.mass, asteroid.size, asteroid.angle,
+            asteroid.turnrate, asteroid.max_speed, asteroid.num_children)
+
+
+def check(store: AsteroidStore, expected: List[Tuple[Any, ...]]) -> None:
+    """ Every list entry is the view of its own row, and the rows hold the expected states"""
+    assert len(store) == len(expected) == len(store.position)
+    for idx, view in enumerate(store):
+        assert isinstance(view, AsteroidView)
+        assert view._store is store and view._idx == idx
+    assert [state(view) for view in store] == expected
+    assert store.position.tolist() == [list(entry[0]) for entry in expected]
+    assert store.size.tolist() == [entry[4] for entry in expected]
+
+
+def test_list_methods_keep_the_arrays_in_sync():
+    rng = random.Random(0)
+
+    def new() -> Asteroid:
+        return Asteroid((rng.uniform(0.0, 1000.0), rng.uniform(0.0, 800.0)), size=rng.randint(1, 4), rng=rng)
+
+    store = AsteroidStore([new() for _ in range(6)], capacity=2)
+    expected = [state(view) for view in store]
+    removed = []
+
+    def apply(operation: Callable[[List[Any]], Any]) -> None:
+        before = list(store)
+        result = operation(store)
+        expected_result = operation(expected)
+        if isinstance(result, Asteroid):
+            assert state(result) == expected_result
+        check(store, expected)
+        # Views taken out of the store keep their last state
+        for view in before:
+            if not any(view is kept for kept in store):
+                removed.append((view, state(view)))
+
+    added = new()
+    apply(lambda asteroids: asteroids.insert(2, added if asteroids is store else state(added)))
+    apply(lambda asteroids: asteroids.insert(-100, added if asteroids is store else state(added)))
+    apply(lambda asteroids: asteroids.pop())
+    apply(lambda asteroids: asteroids.pop(1))
+    apply(lambda asteroids: asteroids.remove(asteroids[3]))
+    apply(lambda asteroids: asteroids.__delitem__(0))
+    apply(lambda asteroids: asteroids.__delitem__(slice(None, None, 2)))
+    replacements = [new() for _ in range(5)]
+    apply(lambda asteroids: asteroids.__setitem__(
+        0, replacements[0] if asteroids is store else state(replacements[0])))
+    apply(lambda asteroids: asteroids.__setitem__(
+        slice(1, 2), replacements[1:] if asteroids is store else [state(a) for a in replacements[1:]]))
+    # Views of the store moved and repeated within it
+    apply(lambda asteroids: asteroids.__setitem__(slice(0, 2), [asteroids[3], asteroids[3]]))
+    apply(lambda asteroids: asteroids.__iadd__(
+        [asteroids[0], added] if asteroids is store else [asteroids[0], state(added)]))
+    apply(lambda asteroids: asteroids.reverse())
+    apply(lambda asteroids: asteroids.sort(key=lambda asteroid: asteroid[0] if isinstance(asteroid, tuple)
+                                           else asteroid.position))
+    apply(lambda asteroids: asteroids.__imul__(2))
+
+    # Invalid changes raise like a list and leave the store as it was
+    for operation, error in ((lambda: store.pop(100), IndexError), (lambda: store.__delitem__(100), IndexError),
+                             (lambda: store.__setitem__(slice(None, None, 2), [added]), ValueError),
+                             (lambda: store.remove(new()), ValueError)):
+        with pytest.raises(error):
+            operation()
+        check(store, expected)
+
+    # Updates move every row, and the removed views still read their own copies
+    store.update(0.5)
+    moved = [(x + 0.5 * vx, y + 0.5 * vy) for (x, y), (vx, vy), *_ in expected]
+    np.testing.assert_allclose(store.position, moved)
+    assert removed and all(state(view) == last for view, last in removed)
+
+    apply(lambda asteroids: asteroids.__imul__(0))
+    assert not store
+    with pytest.raises(IndexError):
+        store.pop()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from typing import Any, Dict, List, Set
+
+import numpy as np
+import pytest
+
+from kesslergame import KesslerObserver, TrainerEnvironment
+from module.asteroid_tracker import AsteroidTracker
+from module.frame_context import FrameContext, predict_asteroids
+
+from .conftest import AimingController
+
+MAP_SIZE = (1000.0, 800.0)
+DELTA_TIME = 1.0 / 30.0
+
+
+def frame(positions: np.ndarray, velocities: np.ndarray) -> FrameContext:
+    return FrameContext((0.0, 0.0), (0.0, 0.0), 0.0, positions, velocities, map_size=MAP_SIZE)
+
+
+def random_frame(count: int, seed: int = 0) -> FrameContext:
+    rng = np.random.default_rng(seed)
+    return frame(rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE, rng.uniform(-150.0, 150.0, (count, 2)))
+
+
+class IdentityCheck(KesslerObserver):
+    """ Tracks the engine's asteroids every few frames and records the asteroid objects behind each ID"""
+
+    def __init__(self, frames: int) -> None:
+        self.frames = frames
+
+    def start(self, scenario, session) -> None:
+        self.tracker = AsteroidTracker()
+        # Asteroid objects by ID and IDs by asteroid object, kept alive so their id() is never reused
+        self.owners: Dict[int, Set[int]] = {}
+        self.assigned: Dict[int, Set[int]] = {}
+        self.kept: List[Any] = []
+        self.update(session, [])
+
+    def update(self, session, actions) -> None:
+        if session.sim_frame % self.frames:
+            return
+        asteroids = list(session.asteroids)
+        positions = np.array([asteroid.position for asteroid in asteroids], dtype=np.float64).reshape(-1, 2)
+        velocities = np.array([asteroid.velocity for asteroid in asteroids], dtype=np.float64).reshape(-1, 2)
+        ids = self.tracker.update(frame(positions, velocities), DELTA_TIME, session.scenario.map_size, self.frames)
+        self.kept.extend(asteroids)
+        for asteroid, asteroid_id in zip(asteroids, ids.tolist()):
+            self.owners.setdefault(asteroid_id, set()).add(id(asteroid))
+            self.assigned.setdefault(id(asteroid), set()).add(asteroid_id)
+
+
+@pytest.mark.parametrize("frames", [1, 3])
+def test_ids_follow_the_engine_asteroids(scenario, frames):
+    check = IdentityCheck(frames)
+    TrainerEnvironment(settings={'observers': [check]}).run(scenario=scenario,
+                                                            controllers=[AimingController(), AimingController()])
+    # Every asteroid keeps one ID while it survives, and no ID is handed to two asteroids
+    assert all(len(ids) == 1 for ids in check.assigned.values())
+    assert all(len(asteroids) == 1 for asteroids in check.owners.values())
+    # Asteroids were split and destroyed during the game
+    assert len(check.owners) > 2 * len(scenario.asteroids())
+
+
+@pytest.mark.parametrize("split", [0, 7, 19])
+def test_split_in_the_middle_of_the_list(split):
+    tracker = AsteroidTracker()
+    context = random_frame(20)
+    first = tracker.update(context, DELTA_TIME, MAP_SIZE).copy()
+    np.testing.assert_array_equal(first, np.arange(20))
+    np.testing.assert_array_equal(tracker.born, first)
+
+    # The engine removes the parent in place and appends its children, which start where it was but move differently
+    moved = predict_asteroids(context.positions, context.velocities, DELTA_TIME, 1, MAP_SIZE)
+    survivors = np.delete(np.arange(20), split)
+    children = np.repeat(moved[split][None, :], 3, axis=0)
+    child_velocities = context.velocities[split] + np.array([[40.0, 0.0], [-40.0, 10.0], [0.0, -60.0]])
+    ids = tracker.update(frame(np.concatenate((moved[survivors], children)),
+                               np.concatenate((context.velocities[survivors], child_velocities))),
+                         DELTA_TIME, MAP_SIZE)
+
+    np.testing.assert_array_equal(ids[:19], first[survivors])
+    np.testing.assert_array_equal(ids[19:], [20, 21, 22])
+    np.testing.assert_array_equal(tracker.born, [20, 21, 22])
+    np.testing.assert_array_equal(tracker.lost, [first[split]])
+    assert tracker.index_of(int(first[split])) is None
+    assert tracker.index_of(20) == 19
+
+    cache = {asteroid_id: None for asteroid_id in first.tolist()}
+    tracker.prune(cache)
+    assert sorted(cache) == sorted(first[survivors].tolist())
+
+
+def test_asteroids_crossing_the_map_edges():
+    tracker = AsteroidTracker()
+    # Asteroids on and next to every edge and corner, moving across it
+    positions = np.array([[999.9, 400.0], [0.0, 400.0], [500.0, 799.95], [500.0, 0.0], [999.99, 799.99],
+                          [0.01, 0.02], [1000.0, 800.0]])
+    velocities = np.array([[120.0, 0.0], [-90.0, 0.0], [0.0, 60.0], [0.0, -30.0], [100.0, 100.0],
+                           [-100.0, -100.0], [50.0, -50.0]])
+    first = tracker.update(frame(positions, velocities), DELTA_TIME, MAP_SIZE).copy()
+    for frames in (1, 3):
+        positions = predict_asteroids(positions, velocities, DELTA_TIME, frames, MAP_SIZE)
+        np.testing.assert_array_equal(tracker.update(frame(positions, velocities), DELTA_TIME, MAP_SIZE, frames), first)
+        assert len(tracker.born) == 0 and len(tracker.lost) == 0
+
+
+def test_shuffled_asteroids_keep_their_ids():
+    # Out of engine order the runs do not line up, so the asteroids are matched on the grid
+    tracker = AsteroidTracker()
+    context = random_frame(300, seed=1)
+    first = tracker.update(context, DELTA_TIME, MAP_SIZE).copy()
+    rng = np.random.default_rng(2)
+    order = rng.permutation(300)[:250]
+    moved = predict_asteroids(context.positions, context.velocities, DELTA_TIME, 1, MAP_SIZE)
+    ids = tracker.update(frame(moved[order], context.velocities[order]), DELTA_TIME, MAP_SIZE)
+    np.testing.assert_array_equal(ids, first[order])
+    np.testing.assert_array_equal(np.sort(tracker.lost), np.setdiff1d(first, first[order]))
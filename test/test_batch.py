@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from kesslergame import KesslerController, Scenario, TrainerEnvironment
+
+from .conftest import AimingController, make_scenario, outcome
+
+
+class ExitingController(KesslerController):
+    """ Takes its worker process down on the first frame"""
+
+    def actions(self, ship_state: Dict[str, Any], game_state: Dict[str, Any]) -> Tuple[float, float, bool, bool]:
+        os._exit(3)
+
+    @property
+    def name(self) -> str:
+        return "Exiting test controller"
+
+
+class SleepingController(KesslerController):
+    """ Hangs on the first frame, past any test timeout"""
+
+    def actions(self, ship_state: Dict[str, Any], game_state: Dict[str, Any]) -> Tuple[float, float, bool, bool]:
+        time.sleep(60.0)
+        return 0.0, 0.0, False, False
+
+    @property
+    def name(self) -> str:
+        return "Sleeping test controller"
+
+
+# Factories are module level so that they can be pickled to the workers
+
+def aiming() -> List[KesslerController]:
+    return [AimingController(), AimingController()]
+
+
+def exiting() -> List[KesslerController]:
+    return [ExitingController(), AimingController()]
+
+
+def sleeping() -> List[KesslerController]:
+    return [SleepingController(), AimingController()]
+
+
+def unseeded_scenario() -> Scenario:
+    # Asteroids come from the task's seed
+    return Scenario(name="Unseeded", num_asteroids=8, map_size=(1000, 800), time_limit=3,
+                    ship_states=[{'position': (300, 400)}, {'position': (700, 400)}])
+
+
+def run(tasks, **kwargs: Any):
+    batch = TrainerEnvironment().run_many(tasks, **kwargs)
+    return batch, sorted(batch, key=lambda result: result.index)
+
+
+def test_failures_do_not_stop_the_batch():
+    tasks = [(make_scenario(1), aiming), (make_scenario(2), exiting), (make_scenario(3), sleeping),
+             (make_scenario(4), lambda: aiming()), (make_scenario(5), aiming)]
+    batch, results = run(tasks, max_workers=2, timeout=5.0)
+
+    assert [result.status for result in results] == ['ok', 'crashed', 'timeout', 'error', 'ok']
+    assert "code 3" in results[1].error
+    assert results[2].eval_time >= 5.0
+    # The lambda cannot be pickled, so it fails before reaching a worker
+    assert "pickle" in results[3].error.lower()
+    assert (batch.completed, batch.failed) == (2, 3)
+
+    # Results from the pool match running in this process
+    for index in (0, 4):
+        score, _ = TrainerEnvironment().run(scenario=tasks[index][0], controllers=aiming())
+        assert outcome(results[index].score) == outcome(score)
+
+
+def test_same_seed_gives_the_same_results():
+    tasks = [(unseeded_scenario(), aiming) for _ in range(4)]
+    _, first = run(tasks, max_workers=2, seed=7)
+    _, second = run(tasks, max_workers=3, seed=7)
+    _, other = run(tasks, max_workers=2, seed=8)
+
+    assert all(result.ok for result in first + second + other)
+    assert [outcome(result.score) for result in first] == [outcome(result.score) for result in second]
+    assert [result.seed for result in first] == [result.seed for result in second]
+    # Each task gets its own seed, and another base seed gives other games
+    assert len({result.seed for result in first}) == len(tasks)
+    assert [outcome(result.score) for result in first] != [outcome(result.score) for result in other]
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pytest
+
+from module.closest_approach import closest_approach, wrapped_closest_approach
+
+MAP_SIZE = (1000.0, 800.0)
+STEP = 1e-3
+
+
+def stepped(offsets: np.ndarray, velocities: np.ndarray, radii: np.ndarray, horizon: float,
+            map_size: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """ Smallest distance and first time within radii of each asteroid, moving it STEP seconds at a time"""
+    smallest = np.full(len(offsets), np.inf)
+    entry = np.full(len(offsets), np.nan)
+    for time in np.arange(0.0, horizon + 0.5 * STEP, STEP):
+        position = offsets + velocities * time
+        if map_size is not None:
+            size = np.asarray(map_size)
+            position = (position + 0.5 * size) % size - 0.5 * size
+        distance = np.hypot(position[:, 0], position[:, 1])
+        np.minimum(smallest, distance, out=smallest)
+        entry = np.where(np.isnan(entry) & (distance <= radii), time, entry)
+    return smallest, entry
+
+
+def random_asteroids(seed: int, count: int, spread: float, speed: float) -> Tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(seed)
+    offsets = rng.uniform(-spread, spread, (count, 2))
+    velocities = rng.uniform(-speed, speed, (count, 2))
+    radii = rng.choice([28.0, 36.0, 44.0, 52.0], count)
+    return offsets, velocities, radii
+
+
+def assert_matches_stepped(result, expected, velocities: np.ndarray, radii: np.ndarray) -> None:
+    _, distances, collides, entry_times = result
+    smallest, entry = expected
+    # Between steps an asteroid moves at most |v| STEP, which bounds how much the stepped minimum overshoots
+    slack = np.hypot(velocities[:, 0], velocities[:, 1]) * STEP + 1e-9
+    # On a wrapping map a colliding asteroid keeps its first collision, a later pass can come closer
+    missed = ~collides
+    assert (distances[missed] <= smallest[missed] + 1e-9).all()
+    assert (smallest[missed] - distances[missed] <= slack[missed]).all()
+    assert (distances[collides] <= radii[collides]).all()
+    # Away from grazing paths the collisions and entry times agree
+    clear = np.abs(smallest - radii) > slack
+    np.testing.assert_array_equal(collides[clear], ~np.isnan(entry[clear]))
+    hits = clear & collides
+    assert (np.abs(entry_times[hits] - entry[hits]) <= STEP + 1e-9).all()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_closest_approach_matches_stepped_minimum(seed):
+    offsets, velocities, radii = random_asteroids(seed, 300, 400.0, 150.0)
+    # Still asteroids, one of them on the ship, and one flying straight through it
+    velocities[:3] = 0.0
+    offsets[0] = (10.0, -5.0)
+    offsets[3], velocities[3] = (300.0, 0.0), (-100.0, 0.0)
+    result = closest_approach(offsets, velocities, radii, 4.0)
+    assert_matches_stepped(result, stepped(offsets, velocities, radii, 4.0), velocities, radii)
+
+    times, distances, collides, entry_times = result
+    assert times[0] == 0.0 and collides[0] and entry_times[0] == 0.0
+    assert times[3] == pytest.approx(3.0) and distances[3] == pytest.approx(0.0)
+    assert entry_times[3] == pytest.approx((300.0 - radii[3]) / 100.0)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_wrapped_closest_approach_follows_paths_across_several_wraps(seed):
+    # Over 10 seconds at up to 400 per axis, asteroids cross the map up to 4 times along x and 5 times along y
+    horizon = 10.0
+    offsets, velocities, radii = random_asteroids(seed, 400, 1000.0, 400.0)
+    result = wrapped_closest_approach(offsets, velocities, radii, horizon, MAP_SIZE)
+    expected = stepped(offsets, velocities, radii, horizon, MAP_SIZE)
+    assert_matches_stepped(result, expected, velocities, radii)
+
+    # Many of the collisions only happen after the asteroid has crossed the whole map more than once
+    _, entry = expected
+    crossings = np.max(np.abs(velocities) * np.nan_to_num(entry)[:, None] / MAP_SIZE, axis=1)
+    assert np.count_nonzero(crossings > 2.0) > 10
+
+
+def test_wrapped_closest_approach_collides_only_across_the_seam():
+    # Moving away from the ship, out over the right edge and back in on the left, into the ship. The second
+    # moves away diagonally and comes back in over a corner. The third misses, its closest pass is across the seam
+    offsets = np.array([[400.0, 0.0], [350.0, 300.0], [400.0, 100.0]])
+    velocities = np.array([[300.0, 0.0], [325.0, 250.0], [300.0, 0.0]])
+    radii = np.array([44.0, 44.0, 44.0])
+    times, distances, collides, entry_times = closest_approach(offsets, velocities, radii, 3.0)
+    assert not collides.any() and (times == 0.0).all()
+
+    times, distances, collides, entry_times = wrapped_closest_approach(offsets, velocities, radii, 3.0, MAP_SIZE)
+    np.testing.assert_array_equal(collides, [True, True, False])
+    assert entry_times[0] == pytest.approx((600.0 - 44.0) / 300.0)
+    assert distances[1] == pytest.approx(0.0, abs=1e-9) and times[1] == pytest.approx(2.0)
+    assert times[2] == pytest.approx(2.0) and distances[2] == pytest.approx(100.0)
+    assert_matches_stepped((times, distances, collides, entry_times),
+                           stepped(offsets, velocities, radii, 3.0, MAP_SIZE), velocities, radii)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_wrapped_closest_approach_within_max_distance(seed):
+    offsets, velocities, radii = random_asteroids(seed, 400, 1000.0, 400.0)
+    exact = wrapped_closest_approach(offsets, velocities, radii, 3.0, MAP_SIZE)
+    bounded = wrapped_closest_approach(offsets, velocities, radii, 3.0, MAP_SIZE, radii + 100.0)
+    # Distances are exact up to the bound and beyond it otherwise, collisions are all found
+    within = exact[1] < radii + 100.0
+    np.testing.assert_allclose(bounded[1][within], exact[1][within])
+    assert (bounded[1][~within] >= radii[~within] + 100.0).all()
+    np.testing.assert_array_equal(bounded[2], exact[2])
+    np.testing.assert_array_equal(bounded[3], exact[3])
+    assert within.any() and not within.all()
+
+
+def test_wrapped_closest_approach_without_asteroids():
+    empty = np.empty((0, 2))
+    for values in wrapped_closest_approach(empty, empty, np.empty(0), 10.0, MAP_SIZE):
+        assert values.shape == (0,)
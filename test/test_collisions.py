@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+
+import numpy as np
+import pytest
+
+from kesslergame import KesslerGame, GraphicsType, Scenario
+from kesslergame.bullet import Bullet
+from kesslergame.collisions import circle_line_collision, circle_line_collision_pairs, circle_line_collisions
+
+
+def segment_distance(a, b, p) -> float:
+    """ Distance from p to the segment a-b, one point at a time"""
+    ax, ay = a
+    bx, by = b
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0.0 else max(0.0, min(1.0, ((p[0] - ax) * dx + (p[1] - ay) * dy) / length_sq))
+    return math.hypot(p[0] - (ax + t * dx), p[1] - (ay + t * dy))
+
+
+def test_hits_match_brute_force_distances():
+    rng = np.random.default_rng(0)
+    heads = rng.uniform(0.0, 200.0, (60, 2))
+    tails = heads + rng.uniform(-15.0, 15.0, (60, 2))
+    # Zero length segments
+    tails[:5] = heads[:5]
+    centers = rng.uniform(0.0, 200.0, (80, 2))
+    radii = rng.uniform(2.0, 32.0, 80)
+
+    hits = circle_line_collisions(heads, tails, centers, radii)
+    assert hits.shape == (60, 80)
+    expected = np.array([[segment_distance(head, tail, center) < radius for center, radius in zip(centers, radii)]
+                         for head, tail in zip(heads, tails)])
+    np.testing.assert_array_equal(hits, expected)
+    assert hits.any() and hits[:5].any()
+    np.testing.assert_array_equal(circle_line_collision_pairs(heads, tails, centers, radii), np.argwhere(expected))
+
+
+def test_tangent_circles_and_segment_ends():
+    head, tail = (0.0, 0.0), (10.0, 0.0)
+    centers = np.array([[5.0, 4.0], [5.0, 3.999], [14.0, 0.0], [13.999, 0.0], [-4.0, 0.0], [14.0, 3.0]])
+    hits = circle_line_collisions([head], [tail], centers, np.full(len(centers), 4.0))[0]
+    # Touching the segment is not a hit, as in circle_line_collision
+    assert hits.tolist() == [False, True, False, True, False, False]
+    # The scalar check measures the height to the whole line, so a circle past the end of the segment but within
+    # its bounding box still counts as a hit there
+    assert circle_line_collision(head, tail, (14.0, 3.0), 4.0)
+    assert segment_distance(head, tail, (14.0, 3.0)) == pytest.approx(5.0)
+
+
+def test_empty_arrays():
+    assert circle_line_collisions(np.empty((0, 2)), np.empty((0, 2)), [[1.0, 2.0]], [3.0]).shape == (0, 1)
+    assert circle_line_collisions([[0.0, 0.0]], [[1.0, 0.0]], np.empty((0, 2)), np.empty(0)).shape == (1, 0)
+    assert circle_line_collision_pairs(np.empty((0, 2)), np.empty((0, 2)), np.empty((0, 2)), np.empty(0)).shape == (0, 2)
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+@pytest.mark.parametrize("spatial_hash", [False, True])
+def test_exact_path_matches_across_engine_settings(play, scenario, vectorized, spatial_hash):
+    expected = play(scenario, exact_bullet_collisions=True)
+    assert play(scenario, exact_bullet_collisions=True, vectorized_asteroids=vectorized,
+                spatial_hash_collisions=spatial_hash) == expected
+    (_, _, teams), _ = expected
+    assert sum(team[0] for team in teams) > 0
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+@pytest.mark.parametrize("exact", [False, True])
+def test_child_asteroid_hit_by_a_later_bullet(vectorized, exact):
+    # A still asteroid far from the ship, and two bullets that cross its centre next frame. The first splits it,
+    # the second hits one of the children, which start where their parent was
+    scenario = Scenario(name="Children", asteroid_states=[{'position': (500.0, 400.0), 'speed': 0.0, 'size': 4}],
+                        ship_states=[{'position': (100.0, 100.0)}], map_size=(1000, 800), seed=0)
+    game = KesslerGame(settings={'graphics_type': GraphicsType.NoGraphics, 'prints_on': False,
+                                 'exact_bullet_collisions': exact, 'vectorized_asteroids': vectorized})
+    session = game.session()
+    session.reset(scenario)
+    ship = session.ships[0]
+    session.bullets.extend([Bullet((490.0, 400.0), 0.0, owner=ship), Bullet((490.0, 402.0), 0.0, owner=ship)])
+
+    _, events, _, _ = session.step([(0.0, 0.0, False, False)])
+    assert events['bullet_hits'] == [ship.id, ship.id]
+    assert not session.bullets
+    # 4 -> three size 3 children, one of them split again into three size 2 children
+    assert sorted(asteroid.size for asteroid in session.asteroids) == [2, 2, 2, 3, 3]
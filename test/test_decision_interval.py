@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from kesslergame import Score, TrainerEnvironment, VectorKesslerGame
+
+from .conftest import AimingController, make_scenario, outcome
+
+
+class IntervalController(AimingController):
+    """ AimingController left to the engine to hold between decisions"""
+
+    def __init__(self, interval: int) -> None:
+        super().__init__()
+        self.decision_interval = interval
+
+
+class HoldingController(AimingController):
+    """ AimingController called every frame, which holds its own command between every interval-th frame"""
+
+    def __init__(self, interval: int) -> None:
+        super().__init__()
+        self.interval = interval
+        self.held: Optional[Tuple[float, float, bool, bool]] = None
+
+    def actions(self, ship_state: Dict[str, Any], game_state: Dict[str, Any]) -> Tuple[float, float, bool, bool]:
+        if self.held is None or game_state['sim_frame'] % self.interval == 0:
+            self.held = super().actions(ship_state, game_state)
+        return self.held
+
+
+def play(controllers: List[AimingController], vector: bool) -> Score:
+    scenario = make_scenario(2)
+    if vector:
+        scores, _ = VectorKesslerGame(settings={'perf_tracker': True}).run([scenario], [controllers])
+        return scores[0]
+    score, _ = TrainerEnvironment(settings={'perf_tracker': True}).run(scenario=scenario, controllers=controllers)
+    return score
+
+
+@pytest.mark.parametrize("vector", [False, True])
+@pytest.mark.parametrize("interval", [2, 5])
+def test_held_commands_match_a_controller_holding_its_own(interval, vector):
+    engine_held = [IntervalController(interval), IntervalController(1)]
+    self_held = [HoldingController(interval), IntervalController(1)]
+    score = play(engine_held, vector)
+    assert outcome(score) == outcome(play(self_held, vector))
+    assert [controller.trace for controller in engine_held] == [controller.trace for controller in self_held]
+
+    # actions() runs on every interval-th frame only, and only those calls are timed
+    frames = [call[0] for call in engine_held[0].trace]
+    assert frames == list(range(0, frames[-1] + 1, interval))
+    assert len(engine_held[1].trace) > len(frames)
+    # Both ships are on the same team
+    assert sum(len(team.eval_times) for team in score.teams) == sum(len(controller.trace) for controller in engine_held)
+
+
+def test_decision_interval_must_be_a_positive_integer():
+    controller = AimingController()
+    assert controller.decision_interval == 1
+    for value in (0, -1, 1.5):
+        with pytest.raises(ValueError):
+            controller.decision_interval = value
+    controller.decision_interval = 3.0
+    assert controller.decision_interval == 3
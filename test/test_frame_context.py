@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+
+import numpy as np
+import pytest
+
+from module.data import AsteroidData
+from module.frame_context import FrameContext
+
+
+def states(seed: int, count: int = 40):
+    rng = np.random.default_rng(seed)
+    ship_state = {"position": tuple(rng.uniform(0.0, 1000.0, 2).tolist()),
+                  "velocity": tuple(rng.uniform(-200.0, 200.0, 2).tolist()), "heading": float(rng.uniform(0.0, 360.0))}
+    # Moving asteroids only, the scalar path divides by the asteroid speed
+    velocities = rng.uniform(10.0, 150.0, (count, 2)) * rng.choice([-1.0, 1.0], (count, 2))
+    asteroids = [{"position": tuple(position), "velocity": tuple(velocity), "size": size, "radius": 8.0 * size,
+                  "mass": 0.25 * math.pi * (8.0 * size) ** 2}
+                 for position, velocity, size in zip(rng.uniform(0.0, 1000.0, (count, 2)).tolist(),
+                                                     velocities.tolist(), rng.integers(1, 5, count).tolist())]
+    return ship_state, {"asteroids": asteroids, "map_size": (1000, 800)}
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_context_matches_scalar_asteroid_data(seed):
+    ship_state, game_state = states(seed)
+    context = FrameContext.from_state(ship_state, game_state)
+    assert len(context) == len(game_state["asteroids"])
+    for index, asteroid in enumerate(game_state["asteroids"]):
+        data = AsteroidData(asteroid, ship_state)
+        assert context.distances[index] == pytest.approx(data.distance, rel=1e-12)
+        assert context.approach_angles[index] == pytest.approx(data.angle, abs=1e-9)
+        assert context.speeds[index] == pytest.approx(data.speed, rel=1e-12)
+        np.testing.assert_allclose(context.to_ship[index], data.vector_to_ship, rtol=1e-12)
+
+        x, y = data.vector_to_ship
+        bearing = math.degrees(math.atan2(-y, -x)) % 360.0
+        assert context.bearings[index] == pytest.approx(bearing, abs=1e-9)
+        relative = np.subtract(data.velocity, ship_state["velocity"])
+        assert context.closing_speeds[index] == pytest.approx(np.dot(relative, data.vector_to_ship) / data.distance,
+                                                              rel=1e-9, abs=1e-9)
+
+        # AsteroidData read from the context gives the same values as computed from the states
+        shared = AsteroidData.from_context(context, index)
+        assert (shared.position, shared.velocity) == (data.position, data.velocity)
+        assert (shared.distance, shared.speed) == pytest.approx((data.distance, data.speed), rel=1e-12)
+        assert shared.angle == pytest.approx(data.angle, abs=1e-9)
+
+
+def test_still_asteroid_has_no_approach_angle():
+    positions = np.array([[100.0, 100.0], [200.0, 100.0]])
+    velocities = np.array([[0.0, 0.0], [-50.0, 0.0]])
+    context = FrameContext((100.0, 100.0), (0.0, 0.0), 0.0, positions, velocities)
+    assert np.isnan(context.approach_angles[0])
+    assert context.approach_angles[1] == pytest.approx(0.0)
+    assert context.closing_speeds[1] == pytest.approx(50.0)
+    assert context.bearings[1] == pytest.approx(0.0)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import json
+
+import numpy as np
+import pytest
+
+from module.fuzzy_engine import FuzzyRule, MamdaniEngine, trimf
+from module.threat_system import ANGLE_UNIVERSE, DISTANCE_UNIVERSE, TargetingSystem
+
+# Largest difference to skfuzzy allowed, see MamdaniEngine
+TOLERANCE = 2e-3
+
+
+def grid_values(low: float, high: float, terms: dict, count: int) -> np.ndarray:
+    """ Evenly spaced values, plus each triangle's vertices when they fall between low and high"""
+    vertices = [v for abc in terms.values() for v in abc if low <= v <= high]
+    return np.unique(np.concatenate((np.linspace(low, high, count), vertices, [low, high])))
+
+
+@pytest.fixture(scope="module")
+def targeting():
+    return TargetingSystem()
+
+
+def test_threat_engine_matches_skfuzzy(targeting):
+    with open("threats_config.json", "r") as f:
+        config = json.load(f)
+    # The whole distance universe, and the angles the controller passes (0 to 180 degrees, where some rule
+    # always fires), both up to their universe's last point
+    distances, angles = np.meshgrid(grid_values(DISTANCE_UNIVERSE[0], DISTANCE_UNIVERSE[-1], config['distances'], 60),
+                                    grid_values(0.0, ANGLE_UNIVERSE[-1], config['angle'], 60), indexing="ij")
+
+    fis = targeting.create_thread_fis
+    fis.input["distance"] = distances
+    fis.input["angle"] = angles
+    fis.compute()
+    expected = np.asarray(fis.output["threat_level"], dtype=np.float64)
+
+    threat = targeting.create_threat_engine.compute(distance=distances, angle=angles)["threat_level"]
+    assert threat.shape == distances.shape
+    np.testing.assert_allclose(threat, expected, rtol=0.0, atol=TOLERANCE)
+
+
+def test_trimf_edge_cases():
+    x = np.array([-1.0, 0.0, 0.5, 1.0, 1.5, 2.0, 3.0])
+    np.testing.assert_allclose(trimf(x, [0.0, 1.0, 2.0]), [0.0, 0.0, 0.5, 1.0, 0.5, 0.0, 0.0])
+    # Vertical edges where a == b or b == c
+    np.testing.assert_allclose(trimf(x, [1.0, 1.0, 2.0]), [0.0, 0.0, 0.0, 1.0, 0.5, 0.0, 0.0])
+    np.testing.assert_allclose(trimf(x, [0.0, 1.0, 1.0]), [0.0, 0.0, 0.5, 1.0, 0.0, 0.0, 0.0])
+
+
+def test_no_rule_fires_gives_default():
+    engine = MamdaniEngine(inputs={"x": {"low": [0.0, 0.0, 1.0]}}, outputs={"y": {"on": [0.0, 1.0, 2.0]}},
+                           rules=[FuzzyRule({"x": "low"}, "y", "on")])
+    y = engine.compute(x=np.array([0.0, 5.0]))["y"]
+    assert y[0] == pytest.approx(1.0)
+    assert np.isnan(y[1])
+    assert engine.compute(default=-1.0, x=5.0)["y"] == -1.0
+
+
+def test_unknown_rule_terms_are_rejected():
+    with pytest.raises(ValueError):
+        MamdaniEngine(inputs={"x": {"low": [0.0, 0.0, 1.0]}}, outputs={"y": {"on": [0.0, 1.0, 2.0]}},
+                      rules=[FuzzyRule({"x": "high"}, "y", "on")])
+    with pytest.raises(ValueError):
+        FuzzyRule({"x": "low"}, "y", "on", connective="xor")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+
+import numpy as np
+import pytest
+
+from kesslergame import Ship
+from kesslergame.bullet import Bullet
+from module.frame_context import FrameContext
+from module.intercept import BULLET_SPEED, intercept, intercept_times, intercepts
+
+MAP_SIZE = (1000.0, 800.0)
+MUZZLE = Ship(0, (0.0, 0.0)).radius
+
+
+def test_constants_match_the_engine():
+    assert BULLET_SPEED == Bullet((0.0, 0.0), 0.0, owner=None).speed
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_bullets_meet_the_asteroid_centres(seed):
+    rng = np.random.default_rng(seed)
+    ship_position = rng.uniform(0.0, 1.0, 2) * MAP_SIZE
+    positions = rng.uniform(0.0, 1.0, (500, 2)) * MAP_SIZE
+    velocities = rng.uniform(-150.0, 150.0, (500, 2))
+    context = FrameContext(ship_position, (0.0, 0.0), 0.0, positions, velocities, map_size=MAP_SIZE)
+    headings, turn_times, flight_times, in_map = intercepts(context, MUZZLE)
+
+    # Bullets fired from the ship's nose the way the engine fires them
+    far = context.distances > MUZZLE
+    assert not np.isnan(flight_times[far]).any()
+    for heading, flight_time, position, velocity in zip(headings[far], flight_times[far], positions[far],
+                                                        velocities[far]):
+        rad_heading = math.radians(heading)
+        bullet = Bullet((ship_position[0] + MUZZLE * math.cos(rad_heading),
+                         ship_position[1] + MUZZLE * math.sin(rad_heading)), heading, owner=None)
+        bullet.update(flight_time)
+        np.testing.assert_allclose(bullet.position, position + velocity * flight_time, rtol=0.0, atol=1e-9)
+
+    np.testing.assert_allclose(turn_times, np.abs((headings + 180.0) % 360.0 - 180.0) / 180.0)
+    points = positions + velocities * flight_times[:, None]
+    np.testing.assert_array_equal(in_map, np.all((points >= 0.0) & (points <= MAP_SIZE), axis=1))
+
+
+def test_awkward_asteroids():
+    ship_position = np.array([995.0, 400.0])
+    positions = np.array([
+        [1005.0, 400.0],  # over the muzzle
+        [995.0, 400.0],   # on the ship
+        [995.0, 700.0],   # still
+        [990.0, 100.0],   # leaving the map at its right edge before the bullet gets there
+        [0.0, 0.0],       # on the far corner
+    ])
+    velocities = np.array([[10.0, 0.0], [0.0, 0.0], [0.0, 0.0], [400.0, 0.0], [0.0, 0.0]])
+    context = FrameContext(ship_position, (0.0, 0.0), 90.0, positions, velocities, map_size=MAP_SIZE)
+    headings, turn_times, flight_times, in_map = intercepts(context, MUZZLE)
+
+    np.testing.assert_array_equal(flight_times[:2], [0.0, 0.0])
+    assert flight_times[2] == pytest.approx((300.0 - MUZZLE) / BULLET_SPEED)
+    assert headings[2] == pytest.approx(90.0) and turn_times[2] == pytest.approx(0.0)
+    assert in_map[2] and not in_map[3] and in_map[4]
+    assert headings[4] == pytest.approx(math.degrees(math.atan2(-400.0, -995.0)) % 360.0)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_one_intercept_matches_intercepts(seed):
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(0.0, 1.0, (200, 2)) * MAP_SIZE
+    velocities = rng.uniform(-150.0, 150.0, (200, 2))
+    # One asteroid over the muzzle, and one too fast for a bullet to catch
+    positions[:2] = [[505.0, 400.0], [800.0, 400.0]]
+    velocities[:2] = [[0.0, 0.0], [BULLET_SPEED * 2.0, 0.0]]
+    context = FrameContext((500.0, 400.0), (0.0, 0.0), 0.0, positions, velocities, map_size=MAP_SIZE)
+    headings, _, flight_times, _ = intercepts(context, MUZZLE)
+
+    for index in range(len(positions)):
+        heading, flight_time = intercept(context, index, MUZZLE)
+        np.testing.assert_allclose([heading, flight_time], [headings[index], flight_times[index]], rtol=1e-12)
+    assert flight_times[0] == 0.0 and math.isnan(intercept(context, 1, MUZZLE)[1])
+
+
+def test_intercept_times_without_asteroids():
+    assert intercept_times(np.empty((0, 2)), np.empty((0, 2)), MUZZLE).shape == (0,)
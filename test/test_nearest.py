@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+
+import numpy as np
+import pytest
+
+from module.nearest import nearest_k
+
+MAP_SIZE = (1000.0, 800.0)
+
+
+def full_sort(ship, positions, k, max_range, map_size):
+    """ Every asteroid within range sorted by distance then index, the first k of them"""
+    offsets = positions - np.asarray(ship)
+    if map_size is not None:
+        offsets = (offsets + 0.5 * np.asarray(map_size)) % np.asarray(map_size) - 0.5 * np.asarray(map_size)
+    distances = np.hypot(offsets[:, 0], offsets[:, 1])
+    ranked = sorted((distance, index) for index, distance in enumerate(distances.tolist()) if distance <= max_range)
+    ranked = ranked[:k] if k is not None else ranked
+    return [index for _, index in ranked], [distance for distance, _ in ranked]
+
+
+def grid_positions(seed: int, count: int) -> np.ndarray:
+    # Whole numbers on a coarse grid, so many asteroids are the same distance from the ship
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 11, (count, 2)) * np.array([100.0, 80.0])
+
+
+@pytest.mark.parametrize("k", [None, 0, 1, 3, 10, 50, 500])
+@pytest.mark.parametrize("max_range", [math.inf, 250.0, 160.0])
+@pytest.mark.parametrize("map_size", [None, MAP_SIZE])
+def test_nearest_k_matches_full_sort_with_ties(k, max_range, map_size):
+    for seed in range(5):
+        positions = grid_positions(seed, 60)
+        ship = (500.0, 400.0) if seed % 2 else (0.0, 800.0)
+        indexes, distances = nearest_k(ship, positions, k, max_range, map_size)
+        expected_indexes, expected_distances = full_sort(ship, positions, k, max_range, map_size)
+        assert indexes.tolist() == expected_indexes
+        np.testing.assert_allclose(distances, expected_distances, rtol=0.0, atol=1e-12)
+
+
+def test_nearest_k_with_asteroid_states():
+    positions = grid_positions(0, 20)
+    asteroids = [{"position": tuple(position)} for position in positions.tolist()]
+    ship = {"position": (500.0, 400.0)}
+    for k in (None, 3, 25):
+        np.testing.assert_array_equal(nearest_k(ship, asteroids, k)[0], nearest_k((500.0, 400.0), positions, k)[0])
+
+
+def test_nearest_k_across_the_map_edges():
+    # From the left edge the asteroid on the right edge is 1 away around the map, the middle one 400 away
+    positions = np.array([[500.0, 400.0], [999.0, 400.0], [1000.0, 400.0]])
+    indexes, distances = nearest_k((0.0, 400.0), positions, 2, map_size=MAP_SIZE)
+    assert indexes.tolist() == [2, 1]
+    np.testing.assert_allclose(distances, [0.0, 1.0])
+    assert nearest_k((0.0, 400.0), positions, 2)[0].tolist() == [0, 1]
+
+
+def test_nearest_k_without_asteroids():
+    indexes, distances = nearest_k((0.0, 0.0), np.empty((0, 2)), 3, 250.0, MAP_SIZE)
+    assert indexes.shape == (0,) and distances.shape == (0,)
+    assert nearest_k((0.0, 0.0), [], 3)[0].shape == (0,)
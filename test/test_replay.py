@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import random
+import struct
+from typing import Any, List
+
+import numpy as np
+import pytest
+
+from kesslergame import KesslerObserver, ReplayPlayer, ReplayRecorder, Scenario, TrainerEnvironment
+from kesslergame.bullet import Bullet
+from kesslergame.mines import Mine
+
+from .conftest import AimingController, outcome
+
+
+class FrameCapture(KesslerObserver):
+    """ Copies the world of every frame the recorder sees"""
+
+    def start(self, scenario, session) -> None:
+        self.frames: List[Any] = []
+        self.update(session, [None] * len(session.ships))
+
+    def update(self, session, actions) -> None:
+        self.frames.append((
+            session.sim_time,
+            np.array([asteroid.position for asteroid in session.asteroids], dtype=np.float64).reshape(-1, 2),
+            [int(asteroid.size) for asteroid in session.asteroids],
+            [(ship.position, ship.heading, ship.lives) for ship in session.ships],
+            [(bullet.position, bullet.heading) for bullet in session.bullets],
+            [(mine.position, mine.countdown_timer) for mine in session.mines],
+            list(actions),
+        ))
+
+
+def record(path: str, scenario: Scenario, keyframe_interval: int, **settings: Any):
+    capture = FrameCapture()
+    recorder = ReplayRecorder(path, keyframe_interval=keyframe_interval)
+    score, _ = TrainerEnvironment(settings={'observers': [capture, recorder], **settings}).run(
+        scenario=scenario, controllers=[AimingController(), AimingController()])
+    return outcome(score), capture.frames
+
+
+def assert_frame_matches(replay_frame, captured) -> None:
+    sim_time, positions, sizes, ships, bullets, mines, actions = captured
+    assert replay_frame.sim_time == sim_time
+    # Asteroid positions are quantized to 1/256 m, the rest is stored as float32
+    np.testing.assert_allclose(replay_frame.asteroid_positions, positions, rtol=0.0, atol=1.0 / 512.0 + 1e-9)
+    assert replay_frame.asteroid_sizes.tolist() == sizes
+    for ship, (position, heading, lives) in zip(replay_frame.ships, ships):
+        np.testing.assert_allclose(ship.position, position, rtol=1e-6)
+        assert ship.heading == pytest.approx(heading, rel=1e-6, abs=1e-4)
+        assert ship.lives == lives
+    np.testing.assert_allclose(replay_frame.bullet_positions.reshape(-1, 2),
+                               np.array([position for position, _ in bullets]).reshape(-1, 2), rtol=1e-6)
+    np.testing.assert_allclose(replay_frame.mine_states[:, 2], [countdown for _, countdown in mines], atol=1e-6)
+    for replay_action, action in zip(replay_frame.actions, actions):
+        assert (replay_action is None) == (action is None)
+        if action is not None:
+            assert replay_action[2:] == tuple(action[2:])
+            np.testing.assert_allclose(replay_action[:2], action[:2], rtol=1e-6)
+
+
+@pytest.mark.parametrize("keyframe_interval", [1, 7, 30])
+def test_record_play_seek_round_trip(tmp_path, scenario, keyframe_interval):
+    path = str(tmp_path / "game.krpl")
+    result, frames = record(path, scenario, keyframe_interval)
+
+    with ReplayPlayer(path) as player:
+        assert player.complete
+        assert len(player) == len(frames)
+        for replay_frame, captured in zip(player, frames):
+            assert_frame_matches(replay_frame, captured)
+
+        # Seeking backwards, forwards and across keyframes gives the same frames as playing through
+        rng = random.Random(keyframe_interval)
+        for frame in [len(frames) - 1, 0, keyframe_interval, keyframe_interval - 1, 5]\
+                + rng.sample(range(len(frames)), 40):
+            assert_frame_matches(player[frame], frames[frame])
+        assert_frame_matches(player[-1], frames[-1])
+
+        score = player[-1].score
+        _, stop_reason, teams = result
+        assert score.stop_reason == stop_reason.name
+        assert tuple(tuple(getattr(team, field) for field in ('asteroids_hit', 'bullets_hit', 'shots_fired',
+                                                               'bullets_remaining', 'deaths', 'lives_remaining'))
+                     for team in score.teams) == teams
+
+        # Replay objects carry the engine's constants
+        bullet, mine = Bullet((0.0, 0.0), 0.0, owner=None), Mine([0.0, 0.0], owner=None)
+        frame = next(frame for frame in player if len(frame.bullets) and len(frame.mines))
+        assert (frame.bullets[0].length, frame.bullets[0].mass) == (bullet.length, bullet.mass)
+        assert (frame.mines[0].fuse_time, frame.mines[0].mass, frame.mines[0].blast_radius) \
+            == (mine.fuse_time, mine.mass, mine.blast_radius)
+
+
+def test_scenario_without_time_limit(tmp_path):
+    # The engine falls back to the game's time limit, the replay records no scenario time limit
+    path = str(tmp_path / "game.krpl")
+    scenario = Scenario(name="No time limit", num_asteroids=8, map_size=(1000, 800), time_limit=None,
+                        ship_states=[{'position': (300, 400)}, {'position': (700, 400)}], seed=5)
+    (sim_time, _, _), frames = record(path, scenario, 30, time_limit=3)
+
+    with ReplayPlayer(path) as player:
+        assert player.header['scenario']['time_limit'] is None
+        assert player.scenario().time_limit == float("inf")
+        assert player[-1].sim_time == pytest.approx(sim_time)
+        assert len(player) == len(frames)
+
+
+def test_unclosed_replay_is_indexed_by_scanning(tmp_path, scenario):
+    path = str(tmp_path / "game.krpl")
+    _, frames = record(path, scenario, 10)
+    # Cut the index, footer and trailer, as if the run had raised before close()
+    with open(path, 'rb') as file:
+        data = file.read()
+    index_offset = struct.unpack('<QII4s', data[-20:])[0]
+    with open(path, 'wb') as file:
+        file.write(data[:index_offset])
+
+    with ReplayPlayer(path) as player:
+        assert not player.complete
+        assert len(player) == len(frames)
+        for frame in (0, len(frames) // 2, len(frames) - 1):
+            assert_frame_matches(player[frame], frames[frame])
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from typing import Any, List, Tuple
+
+import pytest
+
+from kesslergame import KesslerSession, Scenario, TrainerEnvironment
+
+from .conftest import AimingController, outcome
+
+
+def step_through(session: KesslerSession, scenario: Scenario) -> Tuple[Tuple[Any, ...], List[List[Tuple[Any, ...]]]]:
+    """ Plays a scenario by calling reset() and step() directly, as an RL loop would"""
+    controllers = [AimingController(), AimingController()]
+    game_state = session.reset(scenario, controllers)
+    done = False
+    while not done:
+        actions = [controller.actions(ship.ownstate, game_state) if ship.alive else None
+                   for controller, ship in zip(controllers, session.ships)]
+        game_state, _, done, _ = session.step(actions)
+    return outcome(session.score), [controller.trace for controller in controllers]
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_session_steps_match_run(play, scenario, vectorized):
+    expected = play(scenario, vectorized_asteroids=vectorized)
+    session = TrainerEnvironment(settings={'vectorized_asteroids': vectorized}).session()
+    assert step_through(session, scenario) == expected
+
+
+def test_session_reset_replays_the_episode(play, scenario):
+    expected = play(scenario)
+    session = TrainerEnvironment().session()
+    # The second reset restores the cached initial state of the seeded scenario instead of generating it
+    for _ in range(3):
+        assert step_through(session, scenario) == expected
+
+
+def test_step_after_done_raises(scenario):
+    session = TrainerEnvironment().session()
+    step_through(session, scenario)
+    assert session.done
+    with pytest.raises(RuntimeError):
+        session.step([(0.0, 0.0, False, False)] * 2)
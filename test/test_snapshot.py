@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from typing import Any, Dict, List
+
+import pytest
+
+from kesslergame import KesslerSession, TrainerEnvironment
+
+from .conftest import AimingController, outcome
+
+
+def rollout(session: KesslerSession, game_state: Dict[str, Any], controllers: List[AimingController],
+            frames: int) -> List[Any]:
+    """ Steps the session, returning a plain copy of every game_state, the frame events and the score outcome"""
+    frames_seen = []
+    for _ in range(frames):
+        if session.done:
+            break
+        actions = [controller.actions(ship.ownstate, game_state) if ship.alive else None
+                   for controller, ship in zip(controllers, session.ships)]
+        game_state, events, _, _ = session.step(actions)
+        frames_seen.append(({key: [dict(state) for state in game_state[key]]
+                             for key in ('asteroids', 'ships', 'bullets', 'mines')}, events))
+    return [frames_seen, outcome(session.score)]
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_restore_reproduces_rollout(scenario, vectorized):
+    session = TrainerEnvironment(settings={'vectorized_asteroids': vectorized}).session()
+    controllers = [AimingController(), AimingController()]
+    game_state = session.reset(scenario, controllers)
+    rollout(session, game_state, controllers, 90)
+    snapshot = session.snapshot()
+
+    first = rollout(session, session.game_state(), controllers, 60)
+    for _ in range(2):
+        session.restore(snapshot)
+        assert rollout(session, session.game_state(), controllers, 60) == first
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_restore_then_play_matches_uninterrupted_run(play, scenario, vectorized):
+    expected, _ = play(scenario, vectorized_asteroids=vectorized)
+    session = TrainerEnvironment(settings={'vectorized_asteroids': vectorized}).session()
+    controllers = [AimingController(), AimingController()]
+    game_state = session.reset(scenario, controllers)
+    rollout(session, game_state, controllers, 90)
+    snapshot = session.snapshot()
+
+    # A lookahead rollout to the end of the episode, then back to the snapshot and on with the real game
+    rollout(session, session.game_state(), controllers, 1000)
+    assert session.done
+    session.restore(snapshot)
+    assert not session.done
+    _, result = rollout(session, session.game_state(), controllers, 1000)
+    assert result == expected
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import pytest
+
+
+@pytest.mark.parametrize("cell_size", [32.0, 64.0, 200.0])
+def test_spatial_hash_matches_full_scan(play, scenario, cell_size):
+    expected = play(scenario, spatial_hash_collisions=False)
+    assert play(scenario, spatial_hash_collisions=True, spatial_hash_cell_size=cell_size) == expected
+
+
+def test_seeded_runs_hit_asteroids(play, scenario):
+    (_, _, teams), traces = play(scenario)
+    # The comparison above is only meaningful if bullets actually hit asteroids
+    assert sum(team[0] for team in teams) > 0
+    assert all(len(trace) > 0 for trace in traces)
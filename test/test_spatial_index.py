@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import math
+
+import numpy as np
+import pytest
+
+from module.nearest import nearest_k
+from module.spatial_index import SpatialIndex
+from module.triangle_find import cone_find
+
+MAP_SIZE = (1000.0, 800.0)
+
+# Asteroids and query centres on the map edges and corners, inside and exactly on them
+EDGES = np.array([[0.0, 0.0], [1000.0, 800.0], [0.0, 800.0], [1000.0, 0.0], [0.0, 400.0], [1000.0, 400.0],
+                  [500.0, 0.0], [500.0, 800.0], [999.999, 799.999], [1e-9, 1e-9], [100.0, 0.0], [900.0, 800.0]])
+
+
+def positions_of(seed: int, count: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.concatenate((EDGES, rng.uniform(0.0, 1.0, (count, 2)) * MAP_SIZE))
+
+
+def scan_offsets(positions: np.ndarray, center, wrap: bool) -> np.ndarray:
+    offsets = positions - np.asarray(center)
+    if wrap:
+        size = np.asarray(MAP_SIZE)
+        offsets = (offsets + 0.5 * size) % size - 0.5 * size
+    return offsets
+
+
+def centers(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed + 100)
+    return np.concatenate((EDGES, rng.uniform(0.0, 1.0, (10, 2)) * MAP_SIZE))
+
+
+@pytest.mark.parametrize("min_count", [0, 512])
+@pytest.mark.parametrize("wrap", [True, False])
+def test_query_radius_matches_full_scan(min_count, wrap):
+    positions = positions_of(0, 600)
+    index = SpatialIndex(positions, MAP_SIZE, min_count=min_count)
+    for center in centers(0):
+        for radius in (0.0, 30.0, 250.0, 700.0, math.inf):
+            offsets = scan_offsets(positions, center, wrap)
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+            found, found_distances = index.query_radius(center, radius, wrap)
+            np.testing.assert_array_equal(found, np.flatnonzero(distances <= radius))
+            np.testing.assert_array_equal(found_distances, distances[found])
+
+
+@pytest.mark.parametrize("min_count", [0, 512])
+@pytest.mark.parametrize("wrap", [True, False])
+def test_query_cone_matches_full_scan(min_count, wrap):
+    positions = positions_of(1, 600)
+    index = SpatialIndex(positions, MAP_SIZE, min_count=min_count)
+    for center, heading in zip(centers(1), np.linspace(0.0, 360.0, len(centers(1)))):
+        for angle, depth in ((30.0, 200.0), (90.0, 500.0), (179.0, 50.0), (180.0, 300.0)):
+            expected = cone_find(scan_offsets(positions, center, wrap), heading, angle, depth)
+            np.testing.assert_array_equal(index.query_cone(center, heading, angle, depth, wrap), expected)
+
+
+@pytest.mark.parametrize("min_count", [0, 512])
+@pytest.mark.parametrize("wrap", [True, False])
+@pytest.mark.parametrize("count", [0, 3, 600])
+def test_nearest_k_matches_full_scan(min_count, wrap, count):
+    positions = positions_of(2, count)[:count]
+    index = SpatialIndex(positions, MAP_SIZE, min_count=min_count)
+    map_size = MAP_SIZE if wrap else None
+    for center in centers(2):
+        # k above the asteroid count returns them all
+        for k, max_range in ((1, math.inf), (3, 250.0), (10, math.inf), (count + 5, math.inf), (count + 5, 100.0)):
+            found, distances = index.nearest_k(center, k, max_range, wrap)
+            expected, expected_distances = nearest_k(center, positions, k, max_range, map_size)
+            np.testing.assert_array_equal(found, expected)
+            np.testing.assert_array_equal(distances, expected_distances)
+
+
+def test_grid_without_map_size():
+    # Positions outside DEFAULT_MAP_SIZE still land in a cell, and queries do not wrap
+    positions = np.array([[-50.0, 10.0], [1500.0, 900.0], [20.0, 30.0]])
+    index = SpatialIndex(positions, min_count=0)
+    found, _ = index.query_radius((0.0, 0.0), 100.0)
+    assert found.tolist() == [0, 2]
+    assert index.nearest_k((1400.0, 900.0), 1)[0].tolist() == [1]
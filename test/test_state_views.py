@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import pytest
+
+from kesslergame import TrainerEnvironment
+
+from .conftest import CopyingController, make_scenario
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_lazy_game_state_matches_dicts(play, scenario, vectorized):
+    expected = play(scenario, lazy_game_state=False, vectorized_asteroids=vectorized)
+    assert play(scenario, lazy_game_state=True, vectorized_asteroids=vectorized) == expected
+
+
+def test_lazy_views_read_the_same_states():
+    scenario = make_scenario(5)
+    states = []
+    for lazy in (False, True):
+        controllers = [CopyingController(), CopyingController()]
+        TrainerEnvironment(settings={'lazy_game_state': lazy}).run(scenario=scenario, controllers=controllers)
+        states.append([controller.states for controller in controllers])
+    assert states[0] == states[1]
+    # Mines are only dropped every few seconds, make sure every kind of object was compared
+    assert all(any(frame[key] for frame in states[0][0]) for key in ('asteroids', 'ships', 'bullets', 'mines'))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from module.frame_context import FrameContext, predict_asteroids
+from module.threat_pipeline import ThreatPipeline, predict_ship
+from module.threat_system import TargetingSystem
+
+MAP_SIZE = (1000.0, 800.0)
+DELTA_TIME = 1.0 / 30.0
+
+
+class SlowTargeting(TargetingSystem):
+    """ Takes a while to evaluate, and records update() calls made while an evaluation is running"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.running = threading.Event()
+        self.overlaps = 0
+
+    def update(self, ship_state, game_state):
+        if self.running.is_set():
+            self.overlaps += 1
+        return super().update(ship_state, game_state)
+
+    def evaluate(self, context):
+        self.running.set()
+        try:
+            time.sleep(0.05)
+            return super().evaluate(context)
+        finally:
+            self.running.clear()
+
+
+def frame(seed: int):
+    rng = np.random.default_rng(seed)
+    ship_state = {"position": (500.0, 400.0), "velocity": (30.0, 0.0), "speed": 30.0, "heading": 0.0}
+    positions = rng.uniform(0.0, 1.0, (40, 2)) * MAP_SIZE
+    velocities = rng.uniform(-120.0, 120.0, (40, 2))
+    return ship_state, states(positions, velocities)
+
+
+def states(positions: np.ndarray, velocities: np.ndarray):
+    asteroids = [{"position": tuple(position), "velocity": tuple(velocity), "size": 2, "radius": 16.0, "mass": 1.0}
+                 for position, velocity in zip(positions.tolist(), velocities.tolist())]
+    return {"asteroids": asteroids, "map_size": MAP_SIZE, "delta_time": DELTA_TIME}
+
+
+def next_frame(ship_state, game_state, thrust: float, turn_rate: float):
+    """ The frame the engine gives next if nothing is hit, as predicted by the pipeline"""
+    position, velocity, heading = predict_ship(ship_state, thrust, turn_rate, DELTA_TIME, 1, MAP_SIZE)
+    context = FrameContext.from_state(ship_state, game_state)
+    positions = predict_asteroids(context.positions, context.velocities, DELTA_TIME, 1, MAP_SIZE)
+    next_ship = {"position": position, "velocity": velocity, "speed": float(np.hypot(*velocity)), "heading": heading}
+    return next_ship, states(positions, context.velocities)
+
+
+@pytest.fixture(scope="module")
+def targeting():
+    return TargetingSystem()
+
+
+def synchronous(targeting, ship_state, game_state):
+    return targeting.evaluate(FrameContext.from_state(ship_state, game_state))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_speculative_threats_match_synchronous(targeting, seed):
+    pipeline = ThreatPipeline(targeting, speculate=True)
+    ship_state, game_state = frame(seed)
+    found = 0
+    try:
+        for _ in range(10):
+            threats = pipeline.evaluate(ship_state, game_state)
+            assert threats == synchronous(targeting, ship_state, game_state)
+            found += len(threats[0]) + len(threats[1])
+            pipeline.prefetch(ship_state, game_state, 100.0, 30.0)
+            ship_state, game_state = next_frame(ship_state, game_state, 100.0, 30.0)
+    finally:
+        pipeline.close()
+    assert (pipeline.hits, pipeline.misses) == (9, 0)
+    assert found > 0
+
+
+def test_missed_prediction_falls_back_to_synchronous(targeting):
+    pipeline = ThreatPipeline(targeting, speculate=True)
+    ship_state, game_state = frame(3)
+    try:
+        pipeline.evaluate(ship_state, game_state)
+        pipeline.prefetch(ship_state, game_state, 100.0, 30.0)
+        ship_state, game_state = next_frame(ship_state, game_state, 100.0, 30.0)
+        # An asteroid was destroyed, so the prediction no longer matches
+        del game_state["asteroids"][0]
+        assert pipeline.evaluate(ship_state, game_state) == synchronous(targeting, ship_state, game_state)
+
+        # The ship turned another way than predicted
+        pipeline.prefetch(ship_state, game_state, 100.0, 30.0)
+        ship_state, game_state = next_frame(ship_state, game_state, 100.0, -30.0)
+        assert pipeline.evaluate(ship_state, game_state) == synchronous(targeting, ship_state, game_state)
+    finally:
+        pipeline.close()
+    assert (pipeline.hits, pipeline.misses) == (0, 2)
+
+
+def pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("ThreatPipeline")]
+
+
+def test_close_stops_the_worker_and_evaluate_restarts_it(targeting):
+    before = len(pipeline_threads())
+    pipeline = ThreatPipeline(targeting, speculate=True)
+    ship_state, game_state = frame(4)
+    pipeline.evaluate(ship_state, game_state)
+    pipeline.prefetch(ship_state, game_state, 0.0, 0.0)
+    assert len(pipeline_threads()) == before + 1
+    pipeline.close()
+    assert len(pipeline_threads()) == before
+
+    # The pending speculation was dropped, the next frame is evaluated synchronously
+    ship_state, game_state = next_frame(ship_state, game_state, 0.0, 0.0)
+    assert pipeline.evaluate(ship_state, game_state) == synchronous(targeting, ship_state, game_state)
+    assert (pipeline.hits, pipeline.misses) == (0, 0)
+
+    pipeline.prefetch(ship_state, game_state, 0.0, 0.0)
+    assert len(pipeline_threads()) == before + 1
+    ship_state, game_state = next_frame(ship_state, game_state, 0.0, 0.0)
+    assert pipeline.evaluate(ship_state, game_state) == synchronous(targeting, ship_state, game_state)
+    assert pipeline.hits == 1
+    pipeline.close()
+    assert len(pipeline_threads()) == before
+
+
+def test_table_is_not_refreshed_while_the_worker_reads_it():
+    targeting = SlowTargeting()
+    pipeline = ThreatPipeline(targeting, speculate=True)
+    ship_state, game_state = frame(5)
+    try:
+        for _ in range(3):
+            pipeline.evaluate(ship_state, game_state)
+            pipeline.prefetch(ship_state, game_state, 0.0, 0.0)
+            ship_state, game_state = next_frame(ship_state, game_state, 0.0, 0.0)
+    finally:
+        pipeline.close()
+    assert pipeline.hits == 2
+    assert targeting.overlaps == 0
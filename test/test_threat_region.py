@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import numpy as np
+import pytest
+
+from module.frame_context import FrameContext
+from module.threat_system import THREAT_CUTOFF, TargetingSystem
+
+MAP_SIZE = (1000.0, 800.0)
+
+
+@pytest.fixture(scope="module")
+def targeting():
+    return TargetingSystem(), TargetingSystem(cull=True)
+
+
+def test_region_keeps_every_cell_the_table_can_reach(targeting):
+    _, culled = targeting
+    region = culled.create_threat_region
+    table = culled._surface.table
+    corners = np.maximum.reduce([table[:-1, :-1], table[1:, :-1], table[:-1, 1:], table[1:, 1:]])
+    assert not ((corners >= THREAT_CUTOFF) & ~region.cells).any()
+    # Culling only pays off if the region leaves some cells out
+    assert not region.cells.all()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_culled_threats_match_full_evaluation(targeting, seed):
+    full, culled = targeting
+    rng = np.random.default_rng(seed)
+    found = 0
+    skipped = culled.culled
+    for _ in range(20):
+        ship_position = rng.uniform(0.0, 1.0, 2) * MAP_SIZE
+        positions = rng.uniform(0.0, 1.0, (300, 2)) * MAP_SIZE
+        velocities = rng.uniform(-150.0, 150.0, (300, 2))
+        # Still asteroids (NaN approach angle), one on the ship, and asteroids at the region's reach and the
+        # table's edge, flying straight at the ship
+        velocities[:5] = 0.0
+        positions[0] = ship_position
+        for row, distance in ((5, culled._region.reach), (6, 900.0), (7, 901.0)):
+            positions[row] = ship_position + (distance, 0.0)
+            velocities[row] = (-100.0, 0.0)
+        context = FrameContext(ship_position, (0.0, 0.0), 0.0, positions, velocities, map_size=MAP_SIZE)
+        assert np.isnan(context.approach_angles[:5]).all()
+
+        expected, expected_close = full.evaluate(context)
+        threats, close = culled.evaluate(context)
+        assert threats == expected
+        assert close == expected_close
+        found += len(threats)
+    assert found > 0
+    assert culled.culled > skipped
+
+
+def test_contains_nan_and_out_of_range_inputs(targeting):
+    _, culled = targeting
+    region = culled._region
+    inside = region.contains(np.array([np.nan, 0.0, 0.0, -10.0, 2000.0]), np.array([0.0, np.nan, 0.0, 0.0, 0.0]))
+    assert not inside[0] and not inside[1]
+    assert inside[2] and inside[3] == inside[2]
+    assert inside[4] == region.cells[-1, 0]
+
+
+def test_close_asteroids_use_context_distances(targeting):
+    full, _ = targeting
+    # The asteroid at the right edge is 10 from the ship around the map, but 990 in context.distances
+    positions = np.array([[995.0, 400.0], [150.0, 400.0], [5.0, 600.0]])
+    velocities = np.full((3, 2), 10.0)
+    context = FrameContext((5.0, 400.0), (0.0, 0.0), 0.0, positions, velocities, map_size=MAP_SIZE)
+    _, close = full.evaluate(context)
+    assert list(close) == [1, 2]
+    assert list(close.values()) == context.distances[[1, 2]].tolist()
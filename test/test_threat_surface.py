@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from module import threat_surface
+from module.threat_surface import ThreatSurface
+from module.threat_system import TargetingSystem
+
+
+def live(fis, distances, angles) -> np.ndarray:
+    fis.input["distance"] = distances
+    fis.input["angle"] = angles
+    fis.compute()
+    return np.asarray(fis.output["threat_level"], dtype=np.float64)
+
+
+@pytest.fixture(scope="module")
+def surface():
+    targeting = TargetingSystem()
+    return ThreatSurface(lambda: targeting.create_thread_fis, resolution=(31, 31), cache_dir=None), targeting
+
+
+def test_table_is_exact_at_grid_points(surface):
+    surface, targeting = surface
+    distances, angles = np.meshgrid(surface.distance_grid, surface.angle_grid, indexing="ij")
+    np.testing.assert_allclose(surface.evaluate(distances, angles),
+                               live(targeting.create_thread_fis, distances, angles), rtol=0.0, atol=1e-12)
+
+
+def test_sampled_error_is_the_cell_centre_error(surface):
+    surface, targeting = surface
+    distances = 0.5 * (surface.distance_grid[:-1] + surface.distance_grid[1:])
+    angles = 0.5 * (surface.angle_grid[:-1] + surface.angle_grid[1:])
+    distances, angles = np.meshgrid(distances, angles, indexing="ij")
+    error = np.abs(surface.evaluate(distances, angles) - live(targeting.create_thread_fis, distances, angles))
+    assert surface.sampled_error == pytest.approx(float(error.max()), abs=1e-12)
+    assert surface.sampled_error > 0.0
+
+
+@pytest.fixture
+def cached(tmp_path, monkeypatch):
+    """
+    A copy of threats_config.json in tmp_path, which TargetingSystem reads
+    from the working directory, and a fresh process cache of surfaces
+    """
+    targeting = TargetingSystem()
+    shutil.copy("threats_config.json", tmp_path / "threats_config.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(threat_surface, "_SURFACES", {})
+    calls = []
+
+    def build(fis: bool = True) -> ThreatSurface:
+        def fis_factory():
+            assert fis, "the table should have come from the cache"
+            calls.append(1)
+            return targeting.create_thread_fis
+        # Each process starts with no surfaces in memory
+        threat_surface._SURFACES.clear()
+        return ThreatSurface(fis_factory, config_path=str(tmp_path / "threats_config.json"),
+                             resolution=(31, 31), cache_dir=str(tmp_path / "cache"))
+    return build, calls, tmp_path / "cache"
+
+
+def cache_files(cache_dir):
+    (table_path,) = cache_dir.glob("*.npy")
+    return table_path, table_path.with_suffix(".json")
+
+
+def test_reloads_the_table_from_the_cache(cached):
+    build, calls, cache_dir = cached
+    built = build()
+    assert calls and not isinstance(built.table, np.memmap)
+
+    loaded = build(fis=False)
+    assert isinstance(loaded.table, np.memmap)
+    np.testing.assert_array_equal(loaded.table, built.table)
+    assert loaded.sampled_error == built.sampled_error
+    distances, angles = np.meshgrid(np.linspace(-10.0, 950.0, 17), np.linspace(-5.0, 185.0, 13))
+    np.testing.assert_array_equal(loaded.evaluate(distances, angles), built.evaluate(distances, angles))
+    assert [path.suffix for path in sorted(cache_dir.iterdir())] == [".json", ".npy"]
+
+
+def truncate_table(table_path, manifest_path):
+    with open(table_path, "r+b") as f:
+        f.truncate(os.path.getsize(table_path) // 2)
+
+
+def corrupt_table(table_path, manifest_path):
+    with open(table_path, "r+b") as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(np.float64(0.5).tobytes())
+
+
+def corrupt_checksum(table_path, manifest_path):
+    manifest = json.loads(manifest_path.read_text())
+    manifest["checksum"] = "0" * 40
+    manifest_path.write_text(json.dumps(manifest))
+
+
+def truncate_manifest(table_path, manifest_path):
+    manifest_path.write_text(manifest_path.read_text()[:20])
+
+
+@pytest.mark.parametrize("damage", [truncate_table, corrupt_table, corrupt_checksum, truncate_manifest])
+def test_rebuilds_a_damaged_cache_entry(cached, damage):
+    build, calls, cache_dir = cached
+    built = build()
+    damage(*cache_files(cache_dir))
+
+    calls.clear()
+    rebuilt = build()
+    assert calls and not isinstance(rebuilt.table, np.memmap)
+    np.testing.assert_array_equal(rebuilt.table, built.table)
+    # The rebuilt table replaced the damaged entry
+    np.testing.assert_array_equal(build(fis=False).table, built.table)
+
+
+def test_refresh_rebuilds_when_the_config_changes(cached):
+    build, _, _ = cached
+    surface = build()
+    before = np.array(surface.table)
+    assert not surface.refresh()
+
+    with open("threats_config.json") as f:
+        config = json.load(f)
+    config["distances"]["near"][1] = 400.0
+    with open("threats_config.json", "w") as f:
+        json.dump(config, f)
+
+    assert surface.refresh()
+    assert not np.array_equal(surface.table, before)
+    # Only distances the "near" set covers are rated differently
+    changed = np.abs(surface.table - before).max(axis=1) > 1e-9
+    assert changed.any() and not changed[surface.distance_grid >= 750.0].any()
+    assert not surface.refresh()
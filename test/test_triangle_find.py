@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+import numpy as np
+import pytest
+
+from module.frame_context import FrameContext
+from module.triangle_find import TriangleFind, cone_find
+
+MAP_SIZE = np.array([1000.0, 800.0])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_cone_find_covers_the_shapely_triangle(seed):
+    rng = np.random.default_rng(seed)
+    cone = TriangleFind(30, 200)
+    wrap_only = 0
+    for frame in range(40):
+        # Every other ship sits by a map edge, facing out across it
+        if frame % 2:
+            ship = {"position": (float(rng.uniform(0.0, 60.0)), float(rng.uniform(0.0, 800.0))), "heading": 180.0}
+        else:
+            ship = {"position": tuple(rng.uniform(0.0, 1.0, 2) * MAP_SIZE), "heading": float(rng.uniform(0.0, 360.0))}
+        positions = rng.uniform(0.0, 1.0, (200, 2)) * MAP_SIZE
+        cone.update(ship)
+        expected = cone.triangle_find([{"position": tuple(position)} for position in positions.tolist()])
+        context = FrameContext(ship["position"], (0.0, 0.0), ship["heading"], positions, np.zeros_like(positions),
+                               map_size=tuple(MAP_SIZE))
+
+        # Without wrapping the cone is the shapely triangle
+        assert sorted(cone.cone_find(context)) == expected
+        # The shapely triangle does not wrap. Wrapping also finds the
+        # asteroids across a map edge whose short way round offset is inside it
+        wrapped = cone.cone_find(context, wrap=True)
+        assert set(wrapped) >= set(expected)
+        extras = np.array(sorted(set(wrapped) - set(expected)), dtype=np.intp)
+        offsets = positions[extras] - ship["position"]
+        short = (offsets + 0.5 * MAP_SIZE) % MAP_SIZE - 0.5 * MAP_SIZE
+        assert not np.isclose(offsets, short).all(axis=1).any()
+        assert len(cone_find(short, ship["heading"], cone.angle, cone.depth)) == len(extras)
+        wrap_only += len(extras)
+    assert wrap_only > 0
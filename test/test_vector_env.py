@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2022 Thales. All Rights Reserved.
+# NOTICE: This file is subject to the license agreement defined in file 'LICENSE', which is part of
+# this source code package.
+
+from typing import Any, List, Sequence, Tuple
+
+import pytest
+
+from kesslergame import Scenario, TrainerEnvironment, VectorKesslerGame
+
+from .conftest import AimingController, CopyingController, make_scenario, outcome
+
+
+def sequential(scenarios: Sequence[Scenario]) -> List[Tuple[Any, ...]]:
+    """ Outcome and controller traces of each scenario played on its own by TrainerEnvironment.run"""
+    results = []
+    for scenario in scenarios:
+        controllers = [AimingController() for _ in range(len(scenario.ships()))]
+        score, _ = TrainerEnvironment().run(scenario=scenario, controllers=controllers)
+        results.append((outcome(score), [controller.trace for controller in controllers]))
+    return results
+
+
+def vectorized(scenarios: Sequence[Scenario], lazy_game_state: bool = False) -> List[Tuple[Any, ...]]:
+    """ Outcome and controller traces of each scenario played in lockstep by VectorKesslerGame.run"""
+    controllers = [[AimingController() for _ in range(len(scenario.ships()))] for scenario in scenarios]
+    scores, _ = VectorKesslerGame(settings={'lazy_game_state': lazy_game_state}).run(scenarios, controllers)
+    return [(outcome(score), [controller.trace for controller in env_controllers])
+            for score, env_controllers in zip(scores, controllers)]
+
+
+@pytest.mark.parametrize("lazy_game_state", [False, True])
+@pytest.mark.parametrize("seeds", [[1], [1, 2, 3], [3, 3, 1, 2, 2]])
+def test_vector_envs_match_sequential_runs(seeds, lazy_game_state):
+    scenarios = [make_scenario(seed) for seed in seeds]
+    assert vectorized(scenarios, lazy_game_state) == sequential(scenarios)
+
+
+def test_lazy_views_read_the_same_states():
+    scenarios = [make_scenario(5), make_scenario(2)]
+    states = []
+    for lazy in (False, True):
+        controllers = [[CopyingController(), CopyingController()] for _ in scenarios]
+        VectorKesslerGame(settings={'lazy_game_state': lazy}).run(scenarios, controllers)
+        states.append([[controller.states for controller in env_controllers] for env_controllers in controllers])
+    assert states[0] == states[1]
+    assert all(any(frame[key] for frame in states[0][0][0]) for key in ('asteroids', 'ships', 'bullets', 'mines'))
+
+
+def test_envs_of_different_lengths_and_ship_counts():
+    # The single ship env ends when its ship runs out of lives, while the others play on to their time limit
+    scenarios = [make_scenario(2),
+                 Scenario(name="Single ship", num_asteroids=30, map_size=(600, 600), time_limit=8,
+                          ship_states=[{'position': (300, 300), 'lives': 1, 'mines_remaining': 2}], seed=6),
+                 make_scenario(1, num_asteroids=5)]
+    results = vectorized(scenarios)
+    assert results == sequential(scenarios)
+    assert len({result[0][0] for result in results}) > 1